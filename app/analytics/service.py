@@ -2,7 +2,6 @@ import logging
 from datetime import datetime, time, timedelta
 from typing import Any, Dict, Iterable, Optional
 
-from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from pymongo import DESCENDING
 
@@ -14,6 +13,7 @@ from app.analytics.utils import (
     is_allowed_event,
     request_metadata,
 )
+from app.services.services_store.product_summaries import display_name, load_product_summaries
 
 logger = logging.getLogger("analytics")
 
@@ -218,14 +218,8 @@ async def funnel(db, filters: dict) -> dict:
 
 
 async def _product_names(db, product_ids: Iterable[str]) -> dict[str, str]:
-    object_ids = []
-    for product_id in product_ids:
-        try:
-            object_ids.append(ObjectId(product_id))
-        except Exception:
-            continue
-    products = await db["products"].find({"_id": {"$in": object_ids}}, {"full_name": 1, "name": 1}).to_list(length=200)
-    return {str(product["_id"]): product.get("full_name") or product.get("name") for product in products}
+    summaries = await load_product_summaries(db, product_ids)
+    return {product_id: display_name(summary) for product_id, summary in summaries.items()}
 
 
 async def top_products(db, filters: dict, event_name: str, limit: int = 10) -> list[dict]:
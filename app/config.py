@@ -1,4 +1,6 @@
 # app/config.py
+from typing import List
+
 import certifi
 from pydantic import AnyHttpUrl, HttpUrl, SecretStr
 from pydantic_settings import BaseSettings
@@ -42,11 +44,25 @@ class Settings(BaseSettings):
     TRUST_PROXY_HEADERS: bool = True
     TRUSTED_PROXY_HOPS: int = 1
     REQUIRE_MONGO_TRANSACTIONS: bool = True
+
+    # Notifications admin temps reel
+    NOTIFICATION_BUS_BACKEND: str = "mongo"
+    NOTIFICATION_WS_QUEUE_SIZE: int = 100
+    NOTIFICATION_WS_SEND_TIMEOUT_SECONDS: float = 5.0
+    NOTIFICATION_WS_HEARTBEAT_SECONDS: float = 25.0
     
     # 🔥 Ajoutez ces lignes pour ImageKit 🔥
     imagekit_public_key: SecretStr
     imagekit_private_key: SecretStr
     imagekit_url_endpoint: AnyHttpUrl
+    IMAGEKIT_UPLOAD_URL: str = "https://upload.imagekit.io/api/v1/files/upload"
+    IMAGEKIT_UPLOAD_CONCURRENCY: int = 4
+    IMAGEKIT_UPLOAD_TIMEOUT_SECONDS: float = 300.0
+    MEDIA_IMAGE_MAX_BYTES: int = 20 * 1024 * 1024
+    MEDIA_VIDEO_MAX_BYTES: int = 500 * 1024 * 1024
+    MEDIA_DERIVATIVE_WIDTHS: List[int] = [320, 640, 1080]
+    MEDIA_DERIVATIVE_WORKERS: int = 2
+    MEDIA_RECONCILE_INTERVAL_SECONDS: int = 900
     
     LOGO_URL: HttpUrl = "https://ik.imagekit.io/deuxug3j0/email-images/SavageRiseEmail.png?updatedAt=1754182758176"
     
@@ -3,6 +3,11 @@ from datetime import datetime
 from typing import Any
 
 from app.crud.admin import ensure_default_cms_pages
+from app.crud.drop_countdown import backfill_subscriber_names
+from app.crud.review import SUMMARIES_COLLECTION, recompute_review_summaries
+from app.crud.vlog import recompute_episode_counters
+from app.domain.catalog_search import search_facets
+from app.domain.inventory import availability_summary_pipeline
 
 
 logger = logging.getLogger("mongo_init")
@@ -14,6 +19,8 @@ COLLECTION_INDEXES: dict[str, list[dict[str, Any]]] = {
         {"keys": "created_at", "options": {"background": True}},
         {"keys": "loyalty_points_balance", "options": {"background": True}},
         {"keys": [("is_active", 1), ("email", 1)], "options": {"background": True}},
+        # Pagination par curseur (cle de tri + _id)
+        {"keys": [("created_at", -1), ("_id", -1)], "options": {"background": True}},
     ],
     "products": [
         {
@@ -23,12 +30,21 @@ COLLECTION_INDEXES: dict[str, list[dict[str, Any]]] = {
         {"keys": "price", "options": {"background": True}},
         {"keys": "gender", "options": {"background": True}},
         {"keys": "variants.color", "options": {"background": True}},
-        {"keys": "variants.size", "options": {"background": True}},
+        {"keys": "variants.sizes.size", "options": {"background": True}},
+        {"keys": "search_facets.gender", "options": {"background": True}},
+        {"keys": "search_facets.colors", "options": {"background": True}},
+        {"keys": "search_facets.sizes", "options": {"background": True}},
+        {"keys": "search_facets.categories", "options": {"background": True}},
+        {"keys": [("in_stock", 1), ("_id", -1)], "options": {"background": True}},
+        {"keys": [("available_sizes", 1), ("_id", -1)], "options": {"background": True}},
+        {"keys": [("available_colors", 1), ("_id", -1)], "options": {"background": True}},
     ],
     "packs": [
         {"keys": [("status", 1), ("order", 1)], "options": {"background": True}},
         {"keys": "product_ids", "options": {"background": True}},
         {"keys": [("starts_at", 1), ("ends_at", 1)], "options": {"background": True}},
+        {"keys": [("is_visible", 1), ("order", 1)], "options": {"background": True}},
+        {"keys": "visibility_changes_at", "options": {"background": True}},
     ],
     "orders": [
         {"keys": "user_id", "options": {"background": True}},
@@ -45,6 +61,8 @@ COLLECTION_INDEXES: dict[str, list[dict[str, Any]]] = {
         {"keys": [("payment_status", 1), ("created_at", -1)], "options": {"background": True}},
         {"keys": [("fulfillment_status", 1), ("created_at", -1)], "options": {"background": True}},
         {"keys": [("user_email", 1), ("created_at", -1)], "options": {"background": True}},
+        {"keys": [("created_at", -1), ("_id", -1)], "options": {"background": True}},
+        {"keys": [("total_amount", -1), ("_id", -1)], "options": {"background": True}},
     ],
     "order_idempotency": [
         {"keys": "key", "options": {"unique": True, "background": True}},
@@ -75,14 +93,26 @@ COLLECTION_INDEXES: dict[str, list[dict[str, Any]]] = {
         {"keys": [("priority", 1), ("created_at", -1)], "options": {"background": True}},
         {"keys": "read_by_admin_ids", "options": {"background": True}},
     ],
+    "admin_notification_inbox": [
+        {"keys": [("admin_id", 1), ("notification_id", 1)], "options": {"unique": True, "background": True}},
+        {"keys": [("admin_id", 1), ("created_at", -1), ("_id", -1)], "options": {"background": True}},
+        {"keys": [("admin_id", 1), ("is_read", 1), ("created_at", -1), ("_id", -1)], "options": {"background": True}},
+        {"keys": [("admin_id", 1), ("category", 1), ("created_at", -1), ("_id", -1)], "options": {"background": True}},
+        {"keys": [("admin_id", 1), ("priority", 1), ("created_at", -1), ("_id", -1)], "options": {"background": True}},
+    ],
+    "admin_notification_counters": [],
     "admin_audit_logs": [
-        {"keys": [("created_at", -1)], "options": {"background": True}},
+        {"keys": [("created_at", -1), ("_id", -1)], "options": {"background": True}},
         {"keys": [("module", 1), ("created_at", -1)], "options": {"background": True}},
         {"keys": [("admin_id", 1), ("created_at", -1)], "options": {"background": True}},
         {"keys": [("entity_type", 1), ("entity_id", 1)], "options": {"background": True}},
     ],
+    "meta_feed_rows": [
+        {"keys": [("sort_key", 1), ("_id", 1)], "options": {"background": True}},
+        {"keys": "generation", "options": {"background": True}},
+    ],
     "inventory_movements": [
-        {"keys": [("created_at", -1)], "options": {"background": True}},
+        {"keys": [("created_at", -1), ("_id", -1)], "options": {"background": True}},
         {"keys": [("product_id", 1), ("created_at", -1)], "options": {"background": True}},
         {"keys": [("color", 1), ("size", 1)], "options": {"background": True}},
         {"keys": "operation_key", "options": {"unique": True, "background": True}},
@@ -112,7 +142,9 @@ COLLECTION_INDEXES: dict[str, list[dict[str, Any]]] = {
         {"keys": "user_id", "options": {"background": True}},
         {"keys": [("status", 1), ("created_at", -1)], "options": {"background": True}},
         {"keys": [("product_id", 1), ("status", 1), ("created_at", -1)], "options": {"background": True}},
+        {"keys": [("created_at", -1), ("_id", -1)], "options": {"background": True}},
     ],
+    SUMMARIES_COLLECTION: [],
     "wishlist": [
         {"keys": "user_id", "options": {"background": True}},
         {"keys": [("user_id", 1), ("product_id", 1)], "options": {"unique": True, "background": True}},
@@ -138,12 +170,24 @@ COLLECTION_INDEXES: dict[str, list[dict[str, Any]]] = {
     "drop_notification_subscribers": [
         {"keys": [("drop_key", 1), ("user_id", 1)], "options": {"unique": True, "background": True}},
         {"keys": "drop_key", "options": {"background": True}},
+        {"keys": [("drop_key", 1), ("_id", 1)], "options": {"background": True}},
+        {"keys": [("drop_key", 1), ("created_at", -1), ("_id", -1)], "options": {"background": True}},
+        {"keys": [("created_at", -1), ("_id", -1)], "options": {"background": True}},
+        {"keys": "user_id", "options": {"background": True}},
+        # Recherche admin: prefixe sur les copies minuscules.
+        {"keys": [("drop_key", 1), ("email_lower", 1)], "options": {"background": True}},
+        {"keys": [("drop_key", 1), ("full_name_lower", 1)], "options": {"background": True}},
+    ],
+    "drop_notification_deliveries": [
+        {"keys": [("drop_key", 1), ("user_id", 1)], "options": {"unique": True, "background": True}},
+        {"keys": [("drop_key", 1), ("status", 1)], "options": {"background": True}},
     ],
     "loyalty_transactions": [
         {"keys": [("user_id", 1), ("created_at", -1)], "options": {"background": True}},
         {"keys": "order_id", "options": {"background": True}},
         {"keys": [("type", 1), ("created_at", -1)], "options": {"background": True}},
         {"keys": "operation_key", "options": {"unique": True, "sparse": True, "background": True}},
+        {"keys": [("created_at", -1), ("_id", -1)], "options": {"background": True}},
     ],
     "vlog_chapters": [
         {"keys": "slug", "options": {"unique": True, "background": True}},
@@ -152,11 +196,20 @@ COLLECTION_INDEXES: dict[str, list[dict[str, Any]]] = {
     "vlog_episodes": [
         {"keys": [("chapter_id", 1), ("order", 1)], "options": {"background": True}},
         {"keys": [("status", 1), ("release_date", 1)], "options": {"background": True}},
+        {"keys": [("status", 1), ("scheduled_release", 1), ("release_date", 1)], "options": {"background": True}},
         {"keys": "view_count", "options": {"background": True}},
     ],
+    "media_assets": [
+        {"keys": [("content_hash", 1), ("folder", 1)], "options": {"background": True}},
+        {"keys": "file_id", "options": {"unique": True, "sparse": True, "background": True}},
+        # Selecteurs de medias admin: type + dossier, pagination par curseur
+        {"keys": [("kind", 1), ("folder", 1), ("created_at", -1), ("_id", -1)], "options": {"background": True}},
+        {"keys": [("kind", 1), ("shared_folders", 1), ("created_at", -1), ("_id", -1)], "options": {"sparse": True, "background": True}},
+    ],
     "vlog_media": [
         {"keys": "file_id", "options": {"background": True}},
         {"keys": [("media_type", 1), ("_id", -1)], "options": {"background": True}},
+        {"keys": "content_hash", "options": {"sparse": True, "background": True}},
     ],
     "vlog_episode_likes": [
         {"keys": [("episode_id", 1), ("user_id", 1)], "options": {"unique": True, "background": True}},
@@ -166,6 +219,7 @@ COLLECTION_INDEXES: dict[str, list[dict[str, Any]]] = {
         {"keys": [("episode_id", 1), ("status", 1), ("created_at", -1)], "options": {"background": True}},
         {"keys": [("user_id", 1), ("created_at", -1)], "options": {"background": True}},
         {"keys": [("status", 1), ("created_at", -1)], "options": {"background": True}},
+        {"keys": [("created_at", -1), ("_id", -1)], "options": {"background": True}},
     ],
 }
 
@@ -197,6 +251,32 @@ async def backfill_user_timestamps(db) -> None:
         )
 
 
+async def backfill_product_summaries(db) -> None:
+    await db["products"].update_many({"stock_available_total": {"$exists": False}}, availability_summary_pipeline())
+    projection = {"gender": 1, "categories": 1, "variants.color": 1, "variants.sizes.size": 1}
+    async for product in db["products"].find({"search_facets": {"$exists": False}}, projection):
+        await db["products"].update_one({"_id": product["_id"]}, {"$set": {"search_facets": search_facets(product)}})
+
+
+async def backfill_review_summaries(db) -> None:
+    if await db[SUMMARIES_COLLECTION].estimated_document_count() > 0:
+        return
+    if await db["reviews"].estimated_document_count() == 0:
+        return
+    result = await recompute_review_summaries(db)
+    logger.info("Resumes d'avis initialises: %s produits", result["products"])
+
+
+async def backfill_vlog_episode_counters(db) -> None:
+    await recompute_episode_counters(db, {"like_count": {"$exists": False}})
+
+
+async def backfill_drop_subscriber_names(db) -> None:
+    updated = await backfill_subscriber_names(db)
+    if updated:
+        logger.info("Abonnes drop completes (email/nom): %s", updated)
+
+
 async def ensure_default_shipping_rate(db) -> None:
     if await db["shipping_rates"].count_documents({}) > 0:
         return
@@ -226,6 +306,10 @@ async def init_mongo_database(db) -> None:
     logger.info("Initialisation MongoDB")
     await ensure_core_collections_and_indexes(db)
     await backfill_user_timestamps(db)
+    await backfill_product_summaries(db)
+    await backfill_review_summaries(db)
+    await backfill_vlog_episode_counters(db)
+    await backfill_drop_subscriber_names(db)
     await ensure_default_shipping_rate(db)
     await ensure_superadmin_defaults(db)
     await ensure_default_cms_pages()
@@ -1,21 +1,37 @@
+import base64
+import time
 from math import ceil
-from typing import Any, Dict, Generic, List, Optional, TypeVar
+from typing import Any, Dict, Generic, List, Literal, Optional, Tuple, TypeVar
 
-from fastapi import Query
+from bson import json_util
+from fastapi import HTTPException, Query
 from pydantic import BaseModel, Field
 
 
 T = TypeVar("T")
 
+TOTAL_EXACT = "exact"
+TOTAL_ESTIMATED = "estimated"
+COUNT_CACHE_TTL_SECONDS = 30.0
+COUNT_CACHE_SIZE = 512
+
+_count_cache: Dict[tuple, tuple[int, float]] = {}
+
 
 class PaginationParams(BaseModel):
     page: int = Field(1, ge=1)
     page_size: int = Field(20, ge=1, le=200)
+    cursor: Optional[str] = None
+    total_mode: Optional[Literal["exact", "estimated"]] = None
 
     @property
     def skip(self) -> int:
         return (self.page - 1) * self.page_size
 
+    @property
+    def keyset(self) -> bool:
+        return self.cursor is not None
+
 
 class PageMeta(BaseModel):
     total: int
@@ -36,6 +52,9 @@ class PaginatedResponse(BaseModel, Generic[T]):
     has_prev: bool = False
     sort: Optional[Dict[str, Any]] = None
     filters: Optional[Dict[str, Any]] = None
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    total_is_estimate: bool = False
 
 
 def pagination_params(
@@ -45,6 +64,15 @@ def pagination_params(
     return PaginationParams(page=page, page_size=page_size)
 
 
+def keyset_pagination_params(
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Curseur opaque (next_cursor / prev_cursor); remplace page"),
+    total: Optional[Literal["exact", "estimated"]] = Query(None, description="Calcul du total (defaut: exact en mode page, estime en mode curseur)"),
+) -> PaginationParams:
+    return PaginationParams(page=page, page_size=page_size, cursor=cursor, total_mode=total)
+
+
 def build_page(
     *,
     items: List[T],
@@ -53,6 +81,11 @@ def build_page(
     page_size: int,
     sort: Optional[Dict[str, Any]] = None,
     filters: Optional[Dict[str, Any]] = None,
+    next_cursor: Optional[str] = None,
+    prev_cursor: Optional[str] = None,
+    has_next: Optional[bool] = None,
+    has_prev: Optional[bool] = None,
+    total_is_estimate: bool = False,
 ) -> PaginatedResponse[T]:
     pages = ceil(total / page_size) if total else 0
     return PaginatedResponse[T](
@@ -61,8 +94,124 @@ def build_page(
         page=page,
         page_size=page_size,
         pages=pages,
-        has_next=page < pages,
-        has_prev=page > 1 and pages > 0,
+        has_next=page < pages if has_next is None else has_next,
+        has_prev=page > 1 and pages > 0 if has_prev is None else has_prev,
         sort=sort,
         filters=filters,
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor,
+        total_is_estimate=total_is_estimate,
     )
+
+
+def encode_cursor(sort: Tuple[str, int], doc: Dict[str, Any], direction: Literal["next", "prev"]) -> str:
+    field, order = sort
+    raw = json_util.dumps({"s": [field, order], "d": direction, "v": doc.get(field), "id": doc["_id"]})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, sort: Tuple[str, int]) -> Dict[str, Any]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json_util.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+    if data.get("s") != [sort[0], sort[1]] or data.get("d") not in ("next", "prev") or "id" not in data:
+        raise HTTPException(status_code=400, detail="Curseur invalide pour ce tri")
+    return data
+
+
+def _beyond(field: str, order: int, value: Any, doc_id: Any) -> Dict[str, Any]:
+    """
+    Documents situes apres (value, _id) dans l'ordre (field, order), (_id, order).
+    Les valeurs nulles sont classees en premier par Mongo.
+    """
+    op = "$gt" if order > 0 else "$lt"
+    if field == "_id":
+        return {"_id": {op: doc_id}}
+    if value is None:
+        if order > 0:
+            return {"$or": [{field: {"$ne": None}}, {field: None, "_id": {op: doc_id}}]}
+        return {field: None, "_id": {op: doc_id}}
+    clauses = [{field: {op: value}}, {field: value, "_id": {op: doc_id}}]
+    if order < 0:
+        clauses.append({field: None})
+    return {"$or": clauses}
+
+
+def _mongo_sort(field: str, order: int) -> List[Tuple[str, int]]:
+    return [("_id", order)] if field == "_id" else [(field, order), ("_id", order)]
+
+
+async def count_total(collection, filters: Dict[str, Any], mode: str) -> int:
+    """
+    Total exact (count_documents) ou estime: estimated_document_count sans filtre,
+    sinon comptage mis en cache COUNT_CACHE_TTL_SECONDS.
+    """
+    if mode == TOTAL_EXACT:
+        return await collection.count_documents(filters)
+    if not filters:
+        return await collection.estimated_document_count()
+    key = (collection.name, json_util.dumps(filters, sort_keys=True))
+    cached = _count_cache.get(key)
+    if cached and time.monotonic() - cached[1] < COUNT_CACHE_TTL_SECONDS:
+        return cached[0]
+    total = await collection.count_documents(filters)
+    if len(_count_cache) >= COUNT_CACHE_SIZE:
+        _count_cache.clear()
+    _count_cache[key] = (total, time.monotonic())
+    return total
+
+
+async def paginate_collection(
+    collection,
+    filters: Dict[str, Any],
+    pagination: PaginationParams,
+    *,
+    sort: Tuple[str, int] = ("_id", -1),
+    projection: Optional[Dict[str, Any]] = None,
+    total: Optional[int] = None,
+) -> tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Page de documents + champs de pagination pour build_page (total, curseurs,
+    has_next/has_prev). Mode curseur si `pagination.cursor` est fourni, sinon
+    mode numero de page (skip) qui expose aussi un next_cursor pour basculer.
+    Un `total` deja connu (compteur materialise) evite tout comptage.
+    """
+    field, order = sort
+    limit = pagination.page_size
+    total_mode = pagination.total_mode or (TOTAL_ESTIMATED if pagination.keyset else TOTAL_EXACT)
+
+    if not pagination.keyset:
+        cursor = collection.find(filters, projection).sort(_mongo_sort(field, order)).skip(pagination.skip).limit(limit + 1)
+        docs = await cursor.to_list(length=limit + 1)
+        has_next, has_prev = len(docs) > limit, pagination.page > 1
+        docs = docs[:limit]
+    else:
+        position = decode_cursor(pagination.cursor, sort)
+        backwards = position["d"] == "prev"
+        scan_order = -order if backwards else order
+        boundary = _beyond(field, scan_order, position.get("v"), position["id"])
+        query = {"$and": [filters, boundary]} if filters else boundary
+        cursor = collection.find(query, projection).sort(_mongo_sort(field, scan_order)).limit(limit + 1)
+        docs = await cursor.to_list(length=limit + 1)
+        more = len(docs) > limit
+        docs = docs[:limit]
+        if backwards:
+            docs.reverse()
+            has_next, has_prev = True, more
+        else:
+            has_next, has_prev = more, True
+
+    known_total = total is not None
+    window = {
+        "total": total if known_total else await count_total(collection, filters, total_mode),
+        "total_is_estimate": not known_total and total_mode == TOTAL_ESTIMATED,
+        "has_next": has_next,
+        "has_prev": has_prev,
+        "next_cursor": encode_cursor(sort, docs[-1], "next") if docs and has_next else None,
+        "prev_cursor": encode_cursor(sort, docs[0], "prev") if docs and has_prev else None,
+    }
+    return docs, window
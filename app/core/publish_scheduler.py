@@ -0,0 +1,118 @@
+import asyncio
+import heapq
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger("publish_scheduler")
+
+RELOAD_INTERVAL_SECONDS = 60
+UPCOMING_LIMIT = 100
+
+
+@dataclass(frozen=True)
+class ScheduleSource:
+    """
+    Contenu publie/depublie a heure fixe. `upcoming(db, limit)` renvoie les
+    prochaines bascules; `apply_due(db, now)` materialise celles arrivees a
+    echeance (idempotent) et retourne le nombre de documents modifies.
+    """
+
+    name: str
+    upcoming: Callable[[Any, int], Awaitable[List[datetime]]]
+    apply_due: Callable[[Any, datetime], Awaitable[int]]
+
+
+class PublishScheduler:
+    """
+    Tas (min-heap) des prochaines bascules de toutes les sources: la boucle
+    dort jusqu'a la plus proche et n'interroge Mongo qu'aux echeances, aux
+    rechargements periodiques et apres `reload_soon` (ecriture admin).
+    """
+
+    def __init__(
+        self,
+        sources: Iterable[ScheduleSource] = (),
+        *,
+        reload_interval: float = RELOAD_INTERVAL_SECONDS,
+        upcoming_limit: int = UPCOMING_LIMIT,
+        clock: Callable[[], datetime] = datetime.utcnow,
+    ) -> None:
+        self.sources: Dict[str, ScheduleSource] = {}
+        self.reload_interval = reload_interval
+        self.upcoming_limit = upcoming_limit
+        self.clock = clock
+        self._heap: List[Tuple[datetime, str]] = []
+        self._stale: Set[str] = set()
+        self._wake = asyncio.Event()
+        for source in sources:
+            self.register(source)
+
+    def register(self, source: ScheduleSource) -> None:
+        self.sources[source.name] = source
+        self._stale.add(source.name)
+
+    def reload_soon(self, name: str) -> None:
+        """
+        A appeler apres une ecriture qui deplace les bascules d'une source.
+        """
+        if name in self.sources:
+            self._stale.add(name)
+            self._wake.set()
+
+    def next_boundary(self) -> Optional[datetime]:
+        return self._heap[0][0] if self._heap else None
+
+    async def reload(self, db, names: Optional[Iterable[str]] = None) -> None:
+        names = set(self.sources if names is None else names)
+        self._stale -= names
+        entries = [entry for entry in self._heap if entry[1] not in names]
+        for name in names:
+            entries.extend((when, name) for when in await self.sources[name].upcoming(db, self.upcoming_limit))
+        heapq.heapify(entries)
+        self._heap = entries
+
+    async def run_due(self, db, now: datetime) -> Dict[str, int]:
+        due: Set[str] = set()
+        while self._heap and self._heap[0][0] <= now:
+            due.add(heapq.heappop(self._heap)[1])
+        flipped = {name: await self.sources[name].apply_due(db, now) for name in sorted(due)}
+        if due:
+            # Le tas ne contient que les `upcoming_limit` prochaines bascules par source.
+            await self.reload(db, due)
+        return flipped
+
+    def seconds_until_next(self, now: datetime) -> float:
+        boundary = self.next_boundary()
+        if boundary is None:
+            return self.reload_interval
+        return min(self.reload_interval, max((boundary - now).total_seconds(), 0.0))
+
+    async def run(self, db) -> None:
+        loop = asyncio.get_running_loop()
+        next_reload = loop.time()
+        while True:
+            self._wake.clear()
+            delay = self.reload_interval
+            try:
+                if loop.time() >= next_reload:
+                    await self.reload(db)
+                    next_reload = loop.time() + self.reload_interval
+                elif self._stale:
+                    await self.reload(db, set(self._stale))
+                for name, count in (await self.run_due(db, self.clock())).items():
+                    if count:
+                        logger.info("Scheduled publish: %s %s", count, name)
+                delay = self.seconds_until_next(self.clock())
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Publish scheduler failed")
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+
+publish_scheduler = PublishScheduler()
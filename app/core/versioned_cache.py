@@ -0,0 +1,155 @@
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Iterable, Optional, TypeVar
+
+from fastapi import Request, Response
+from pymongo import ReturnDocument
+
+
+VERSIONS_COLLECTION = "cache_versions"
+VERSION_TTL_SECONDS = 1.0
+CHANGE_LOG_SIZE = 256
+
+V = TypeVar("V")
+
+_known_versions: Dict[str, tuple[int, float]] = {}
+
+
+def strong_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+@dataclass(frozen=True)
+class CachedPayload:
+    body: bytes
+    etag: str
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_body(cls, body: bytes, **meta: Any) -> "CachedPayload":
+        return cls(body=body, etag=strong_etag(body), meta=meta)
+
+
+def _remember_version(namespace: str, version: int) -> int:
+    _known_versions[namespace] = (version, time.monotonic())
+    return version
+
+
+async def current_version(db, namespace: str) -> int:
+    """
+    Version partagee entre workers; relue au plus une fois par
+    VERSION_TTL_SECONDS par worker.
+    """
+    known = _known_versions.get(namespace)
+    if known and time.monotonic() - known[1] < VERSION_TTL_SECONDS:
+        return known[0]
+    doc = await db[VERSIONS_COLLECTION].find_one({"_id": namespace}, {"version": 1})
+    return _remember_version(namespace, int((doc or {}).get("version", 0)))
+
+
+async def bump_version(db, namespace: str, keys: Optional[Iterable[str]] = None) -> int:
+    """
+    Incremente la version et journalise les cles modifiees (None = tout le
+    namespace) dans `changes`, borne a CHANGE_LOG_SIZE entrees.
+    """
+    change_keys = sorted({str(key) for key in keys}) if keys is not None else None
+    doc = await db[VERSIONS_COLLECTION].find_one_and_update(
+        {"_id": namespace},
+        [
+            {"$set": {"version": {"$add": [{"$ifNull": ["$version", 0]}, 1]}}},
+            {
+                "$set": {
+                    "changes": {
+                        "$slice": [
+                            {
+                                "$concatArrays": [
+                                    {"$ifNull": ["$changes", []]},
+                                    [{"version": "$version", "keys": {"$literal": change_keys}}],
+                                ]
+                            },
+                            -CHANGE_LOG_SIZE,
+                        ]
+                    }
+                }
+            },
+        ],
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return _remember_version(namespace, int(doc["version"]))
+
+
+async def changes_since(db, namespace: str, version: int) -> tuple[int, Optional[set[str]]]:
+    """
+    Cles modifiees depuis `version`; None si le journal ne couvre pas l'ecart
+    ou si une invalidation globale a eu lieu (reconstruction complete).
+    """
+    doc = await db[VERSIONS_COLLECTION].find_one({"_id": namespace}, {"version": 1, "changes": 1}) or {}
+    current = _remember_version(namespace, int(doc.get("version", 0)))
+    pending = [change for change in doc.get("changes", []) if int(change["version"]) > version]
+    if current > version and (len(pending) != current - version or any(change.get("keys") is None for change in pending)):
+        return current, None
+    return current, {key for change in pending for key in change["keys"]}
+
+
+def forget_versions() -> None:
+    _known_versions.clear()
+
+
+class VersionedCache(Generic[V]):
+    """
+    Cache LRU en memoire indexe par (version du namespace, cle). Un bump de
+    version rend toutes les entrees precedentes inaccessibles; elles sortent
+    ensuite par LRU.
+    """
+
+    def __init__(self, namespace: str, max_entries: int = 1024) -> None:
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple[int, Hashable], V]" = OrderedDict()
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def get_or_build(
+        self,
+        db,
+        key: Hashable,
+        build: Callable[[], Awaitable[Optional[V]]],
+    ) -> Optional[V]:
+        version = await current_version(db, self.namespace)
+        cache_key = (version, key)
+        cached = self._entries.get(cache_key)
+        if cached is not None:
+            self._entries.move_to_end(cache_key)
+            return cached
+
+        value = await build()
+        if value is None:
+            return None
+        self._entries[cache_key] = value
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+
+class VersionedResponseCache(VersionedCache[CachedPayload]):
+    """
+    Reponses JSON deja serialisees (corps + ETag fort).
+    """
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    candidates = {value.strip().removeprefix("W/") for value in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def cached_json_response(request: Optional[Request], payload: CachedPayload, headers: Optional[Dict[str, Any]] = None) -> Response:
+    response_headers = {"ETag": payload.etag, **(headers or {})}
+    if request is not None and etag_matches(request.headers.get("if-none-match"), payload.etag):
+        return Response(status_code=304, headers=response_headers)
+    return Response(content=payload.body, media_type="application/json", headers=response_headers)
@@ -1,5 +1,7 @@
 from datetime import datetime
 
+from app.core.pagination import paginate_collection
+
 
 COLLECTION = "admin_audit_logs"
 
@@ -9,9 +11,5 @@ async def insert_audit_log(db, data):
     return await db[COLLECTION].insert_one(data)
 
 
-async def list_audit_logs(db, filters, skip, limit):
-    return await db[COLLECTION].find(filters).sort("created_at", -1).skip(skip).limit(limit).to_list(length=limit)
-
-
-async def count_audit_logs(db, filters):
-    return await db[COLLECTION].count_documents(filters)
+async def paginate_audit_logs(db, filters, pagination):
+    return await paginate_collection(db[COLLECTION], filters, pagination, sort=("created_at", -1))
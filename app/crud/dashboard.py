@@ -49,13 +49,6 @@ async def aggregate_top_product_sales(db, limit):
     ]).to_list(length=limit)
 
 
-async def list_product_names_by_ids(db, product_ids):
-    return await db["products"].find(
-        {"_id": {"$in": product_ids}},
-        {"name": 1, "full_name": 1},
-    ).to_list(length=len(product_ids))
-
-
 async def list_low_stock_items(db, threshold, limit):
     return await db["products"].aggregate([
         {"$unwind": "$variants"},
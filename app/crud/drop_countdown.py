@@ -1,6 +1,18 @@
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from app.core.pagination import PaginationParams, paginate_collection
+
+
 DROP_COUNTDOWN_KEY = "store_drop_countdown"
 SETTINGS_COLLECTION = "cms_settings"
 SUBSCRIBERS_COLLECTION = "drop_notification_subscribers"
+DELIVERIES_COLLECTION = "drop_notification_deliveries"
+
+DELIVERY_SENDING = "sending"
+DELIVERY_SENT = "sent"
+DELIVERY_FAILED = "failed"
 
 
 async def find_drop_doc(db):
@@ -15,33 +27,95 @@ async def find_subscription(db, drop_key, user_id):
     return await db[SUBSCRIBERS_COLLECTION].find_one({"drop_key": drop_key, "user_id": user_id})
 
 
-async def upsert_subscription(db, drop_key, user_id, email, now):
-    return await db[SUBSCRIBERS_COLLECTION].update_one(
+async def increment_subscribers_count(db, drop_key, amount):
+    # Sans effet tant que le compteur n'a pas ete initialise pour ce drop_key
+    # (cf. save_subscribers_count).
+    return await db[SETTINGS_COLLECTION].update_one(
+        {"_id": DROP_COUNTDOWN_KEY, "subscribers_drop_key": drop_key},
+        {"$inc": {"subscribers_count": amount}},
+    )
+
+
+async def save_subscribers_count(db, drop_key, count, now):
+    return await db[SETTINGS_COLLECTION].update_one(
+        {"_id": DROP_COUNTDOWN_KEY},
+        {"$set": {"subscribers_drop_key": drop_key, "subscribers_count": count, "subscribers_counted_at": now}},
+    )
+
+
+def subscriber_profile(email, full_name):
+    """
+    Copies email/nom de l'abonnement, avec leurs versions minuscules indexees
+    (recherche admin par prefixe).
+    """
+    return {
+        "email": email,
+        "full_name": full_name,
+        "email_lower": (email or "").strip().lower(),
+        "full_name_lower": (full_name or "").strip().lower(),
+    }
+
+
+async def upsert_subscription(db, drop_key, user_id, email, now, full_name=None):
+    result = await db[SUBSCRIBERS_COLLECTION].update_one(
         {"drop_key": drop_key, "user_id": user_id},
         {
-            "$set": {"email": email, "updated_at": now},
+            "$set": {**subscriber_profile(email, full_name), "updated_at": now},
             "$setOnInsert": {"drop_key": drop_key, "user_id": user_id, "created_at": now},
         },
         upsert=True,
     )
+    if result.upserted_id is not None:
+        await increment_subscribers_count(db, drop_key, 1)
+    return result
 
 
 async def delete_subscription(db, drop_key, user_id):
-    return await db[SUBSCRIBERS_COLLECTION].delete_one({"drop_key": drop_key, "user_id": user_id})
-
-
-async def list_matching_user_ids(db, user_filters, limit=5000):
-    return await db["users"].find(user_filters, {"_id": 1}).to_list(length=limit)
-
-
-async def list_subscribers(db, filters, skip, limit):
-    return await (
-        db[SUBSCRIBERS_COLLECTION]
-        .find(filters)
-        .sort("created_at", -1)
-        .skip(skip)
-        .limit(limit)
-        .to_list(length=limit)
+    result = await db[SUBSCRIBERS_COLLECTION].delete_one({"drop_key": drop_key, "user_id": user_id})
+    if result.deleted_count:
+        await increment_subscribers_count(db, drop_key, -result.deleted_count)
+    return result
+
+
+async def paginate_subscribers(db, filters, pagination: PaginationParams):
+    return await paginate_collection(db[SUBSCRIBERS_COLLECTION], filters, pagination, sort=("created_at", -1))
+
+
+async def backfill_subscriber_names(db, batch_size=500):
+    """
+    Copie email/nom de l'utilisateur sur les abonnements qui n'en ont pas
+    encore (recherche admin sans jointure).
+    """
+    updated = 0
+    while True:
+        batch = await db[SUBSCRIBERS_COLLECTION].find(
+            {"email_lower": {"$exists": False}},
+            {"user_id": 1, "email": 1},
+        ).limit(batch_size).to_list(length=batch_size)
+        if not batch:
+            return updated
+        user_ids = [ObjectId(doc["user_id"]) for doc in batch if ObjectId.is_valid(doc.get("user_id"))]
+        users = await list_users_by_ids(db, user_ids) if user_ids else []
+        users_by_id = {str(user["_id"]): user for user in users}
+        operations = []
+        for doc in batch:
+            user = users_by_id.get(doc.get("user_id")) or {}
+            operations.append(UpdateOne(
+                {"_id": doc["_id"]},
+                {"$set": subscriber_profile(user.get("email") or doc.get("email"), user.get("full_name"))},
+            ))
+        await db[SUBSCRIBERS_COLLECTION].bulk_write(operations, ordered=False)
+        updated += len(operations)
+
+
+async def sync_subscriber_profile(db, user_id, email, full_name, now):
+    """
+    Reporte email/nom modifies sur les abonnements de l'utilisateur (copies
+    servant a la recherche admin).
+    """
+    return await db[SUBSCRIBERS_COLLECTION].update_many(
+        {"user_id": user_id},
+        {"$set": {**subscriber_profile(email, full_name), "updated_at": now}},
     )
 
 
@@ -80,14 +154,19 @@ async def claim_due_drop_notification(db, now, stale_claim_before):
     )
 
 
-async def list_drop_subscriptions(db, drop_key, limit=20000):
-    return await db[SUBSCRIBERS_COLLECTION].find(
-        {"drop_key": drop_key},
-        {"user_id": 1, "email": 1},
-    ).to_list(length=limit)
+def iter_drop_subscriptions(db, drop_key, after_id=None, batch_size=500):
+    filters = {"drop_key": drop_key}
+    if after_id is not None:
+        filters["_id"] = {"$gt": after_id}
+    return (
+        db[SUBSCRIBERS_COLLECTION]
+        .find(filters, {"user_id": 1, "email": 1})
+        .sort("_id", 1)
+        .batch_size(batch_size)
+    )
 
 
-async def list_active_users_with_email(db, user_ids, limit=20000):
+async def list_active_users_with_email(db, user_ids):
     return await db["users"].find(
         {
             "_id": {"$in": user_ids},
@@ -95,18 +174,61 @@ async def list_active_users_with_email(db, user_ids, limit=20000):
             "is_active": True,
         },
         {"email": 1},
-    ).to_list(length=limit)
+    ).to_list(length=len(user_ids))
+
+
+async def claim_delivery(db, drop_key, user_id, email, now):
+    try:
+        return await db[DELIVERIES_COLLECTION].find_one_and_update(
+            {"drop_key": drop_key, "user_id": user_id, "status": {"$ne": DELIVERY_SENT}},
+            {
+                "$set": {"email": email, "status": DELIVERY_SENDING, "updated_at": now},
+                "$setOnInsert": {"drop_key": drop_key, "user_id": user_id, "created_at": now},
+                "$inc": {"attempts": 1},
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+    except DuplicateKeyError:
+        # Une livraison deja "sent" existe pour ce couple drop_key/user_id.
+        return None
+
+
+async def mark_delivery(db, drop_key, user_id, status, now, error=None):
+    update = {"status": status, "updated_at": now, "last_error": error}
+    if status == DELIVERY_SENT:
+        update["sent_at"] = now
+    return await db[DELIVERIES_COLLECTION].update_one(
+        {"drop_key": drop_key, "user_id": user_id},
+        {"$set": update},
+    )
 
 
-async def mark_drop_notification_sent(db, sent_count, failure_count, sent_at):
+async def save_notification_checkpoint(db, last_subscription_id, sent_count, failure_count, now):
     return await db[SETTINGS_COLLECTION].update_one(
+        {"_id": DROP_COUNTDOWN_KEY, "notification_status": "sending"},
+        {
+            "$set": {
+                "notification_checkpoint_id": last_subscription_id,
+                "notification_claimed_at": now,
+            },
+            "$inc": {
+                "notification_recipients_count": sent_count,
+                "notification_failures_count": failure_count,
+            },
+        },
+    )
+
+
+async def mark_drop_notification_sent(db, sent_at):
+    return await db[SETTINGS_COLLECTION].find_one_and_update(
         {"_id": DROP_COUNTDOWN_KEY},
         {
             "$set": {
                 "notification_status": "sent",
                 "notification_sent_at": sent_at,
-                "notification_recipients_count": sent_count,
-                "notification_failures_count": failure_count,
-            }
+            },
+            "$unset": {"notification_checkpoint_id": ""},
         },
+        return_document=ReturnDocument.AFTER,
     )
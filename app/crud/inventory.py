@@ -1,5 +1,7 @@
 from datetime import datetime
 
+from app.core.pagination import paginate_collection
+
 
 MOVEMENTS_COLLECTION = "inventory_movements"
 
@@ -66,11 +68,12 @@ async def find_variant_size(db, product_id, color, size):
     )
 
 
-async def set_variant_stock(db, product_id, color, size, new_stock_on_hand):
+async def set_variant_stock(db, product_id, color, size, new_stock_on_hand, session=None):
     return await db["products"].update_one(
         {"_id": product_id, "variants.color": color},
         {"$set": {"variants.$.sizes.$[s].stock_on_hand": new_stock_on_hand, "updated_at": datetime.utcnow()}},
         array_filters=[{"s.size": size}],
+        session=session,
     )
 
 
@@ -78,9 +81,5 @@ async def insert_movement(db, data):
     return await db[MOVEMENTS_COLLECTION].insert_one(data)
 
 
-async def list_movements(db, filters, skip, limit):
-    return await db[MOVEMENTS_COLLECTION].find(filters).sort("created_at", -1).skip(skip).limit(limit).to_list(length=limit)
-
-
-async def count_movements(db, filters):
-    return await db[MOVEMENTS_COLLECTION].count_documents(filters)
+async def paginate_movements(db, filters, pagination):
+    return await paginate_collection(db[MOVEMENTS_COLLECTION], filters, pagination, sort=("created_at", -1))
@@ -1,3 +1,6 @@
+from app.core.pagination import paginate_collection
+
+
 SETTINGS_COLLECTION = "cms_settings"
 LOYALTY_SETTINGS_KEY = "loyalty_program"
 TRANSACTIONS_COLLECTION = "loyalty_transactions"
@@ -23,19 +26,18 @@ async def insert_loyalty_transaction(db, data, session=None):
     return await db[TRANSACTIONS_COLLECTION].insert_one(data, session=session)
 
 
-async def list_loyalty_transactions(db, filters, skip=0, limit=20):
+async def list_loyalty_transactions(db, filters, limit=20):
     return await (
         db[TRANSACTIONS_COLLECTION]
         .find(filters)
         .sort("created_at", -1)
-        .skip(skip)
         .limit(limit)
         .to_list(length=limit)
     )
 
 
-async def count_loyalty_transactions(db, filters):
-    return await db[TRANSACTIONS_COLLECTION].count_documents(filters)
+async def paginate_loyalty_transactions(db, filters, pagination):
+    return await paginate_collection(db[TRANSACTIONS_COLLECTION], filters, pagination, sort=("created_at", -1))
 
 
 async def decrement_user_points_if_available(db, user_id, points, session=None):
@@ -0,0 +1,99 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pymongo import ReturnDocument, UpdateOne
+
+from app.core.pagination import PaginationParams, paginate_collection
+
+
+MEDIA_ASSETS_COLLECTION = "media_assets"
+
+
+async def find_asset_by_hash(db, content_hash: str, folder: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    query: Dict[str, Any] = {"content_hash": content_hash, "file_id": {"$ne": None}}
+    if folder is not None:
+        query["$or"] = [{"folder": folder}, {"shared_folders": folder}]
+    return await db[MEDIA_ASSETS_COLLECTION].find_one(query)
+
+
+async def share_asset(db, file_id: str, folder: str) -> Optional[Dict[str, Any]]:
+    """
+    Reutilisation du fichier par un autre dossier ou registre: une reference de
+    plus (un fichier sans ref_count en a une) et visible dans ce dossier.
+    """
+    return await db[MEDIA_ASSETS_COLLECTION].find_one_and_update(
+        {"file_id": file_id},
+        [{"$set": {
+            "ref_count": {"$add": [{"$ifNull": ["$ref_count", 1]}, 1]},
+            "shared_folders": {"$setUnion": [{"$ifNull": ["$shared_folders", []]}, [folder]]},
+        }}],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def release_asset(db, file_id: str, folder: str) -> int:
+    """
+    Retire une reference au fichier; retourne le nombre de references
+    restantes (0 si le fichier n'est pas indexe).
+    """
+    doc = await db[MEDIA_ASSETS_COLLECTION].find_one_and_update(
+        {"file_id": file_id},
+        [{"$set": {
+            "ref_count": {"$subtract": [{"$ifNull": ["$ref_count", 1]}, 1]},
+            "shared_folders": {"$setDifference": [{"$ifNull": ["$shared_folders", []]}, [folder]]},
+        }}],
+        return_document=ReturnDocument.AFTER,
+    )
+    return int(doc["ref_count"]) if doc else 0
+
+
+async def save_asset(db, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Enregistre (ou met a jour, par file_id ImageKit) un media dans l'index local.
+    """
+    now = datetime.utcnow()
+    fields = {**data, "updated_at": now, "reconciled_at": now}
+    selector = {"file_id": data["file_id"]} if data.get("file_id") else {"url": data["url"]}
+    return await db[MEDIA_ASSETS_COLLECTION].find_one_and_update(
+        selector,
+        {"$set": fields, "$setOnInsert": {"created_at": now}},
+        upsert=True,
+        return_document=True,
+    )
+
+
+async def paginate_assets(db, filters: Dict[str, Any], pagination: PaginationParams):
+    return await paginate_collection(db[MEDIA_ASSETS_COLLECTION], filters, pagination, sort=("created_at", -1))
+
+
+async def delete_asset_by_file_id(db, file_id: str):
+    return await db[MEDIA_ASSETS_COLLECTION].delete_one({"file_id": file_id})
+
+
+async def upsert_reconciled_assets(db, assets: List[Dict[str, Any]], reconciled_at: datetime) -> None:
+    operations = [
+        UpdateOne(
+            {"file_id": asset["file_id"]},
+            {
+                "$set": {**{k: v for k, v in asset.items() if k != "created_at"}, "reconciled_at": reconciled_at},
+                "$setOnInsert": {"created_at": asset.get("created_at") or reconciled_at},
+            },
+            upsert=True,
+        )
+        for asset in assets
+        if asset.get("file_id")
+    ]
+    if operations:
+        await db[MEDIA_ASSETS_COLLECTION].bulk_write(operations, ordered=False)
+
+
+async def delete_stale_assets(db, folder: str, reconciled_before: datetime) -> int:
+    """
+    Retire de l'index les fichiers du dossier absents du dernier listing ImageKit.
+    """
+    res = await db[MEDIA_ASSETS_COLLECTION].delete_many({
+        "folder": folder,
+        "file_id": {"$ne": None},
+        "reconciled_at": {"$lt": reconciled_before},
+    })
+    return res.deleted_count
@@ -0,0 +1,84 @@
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from pymongo import ReplaceOne
+from pymongo.errors import DuplicateKeyError
+
+
+ROWS_COLLECTION = "meta_feed_rows"
+STATE_COLLECTION = "meta_feed_state"
+FEED_STATE_ID = "catalog"
+
+
+async def get_feed_state(db) -> Optional[Dict[str, Any]]:
+    return await db[STATE_COLLECTION].find_one({"_id": FEED_STATE_ID})
+
+
+async def set_feed_state(db, *, catalog_version: int, format_key: str, generated_at: datetime) -> None:
+    await db[STATE_COLLECTION].update_one(
+        {"_id": FEED_STATE_ID},
+        {
+            "$set": {
+                "catalog_version": catalog_version,
+                "format_key": format_key,
+                "generated_at": generated_at,
+            }
+        },
+        upsert=True,
+    )
+
+
+async def claim_feed_refresh(db, owner: str, now: datetime, stale_before: datetime) -> bool:
+    """
+    Bail de regeneration partage entre workers, porte par le document d'etat.
+    """
+    try:
+        await db[STATE_COLLECTION].find_one_and_update(
+            {
+                "_id": FEED_STATE_ID,
+                "$or": [
+                    {"refresh_owner": {"$exists": False}},
+                    {"refresh_owner": None},
+                    {"refresh_claimed_at": {"$lte": stale_before}},
+                ],
+            },
+            {"$set": {"refresh_owner": owner, "refresh_claimed_at": now}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        # Document present mais bail detenu par un autre worker.
+        return False
+    return True
+
+
+async def release_feed_refresh(db, owner: str) -> None:
+    await db[STATE_COLLECTION].update_one(
+        {"_id": FEED_STATE_ID, "refresh_owner": owner},
+        {"$unset": {"refresh_owner": "", "refresh_claimed_at": ""}},
+    )
+
+
+async def replace_product_rows(db, docs: List[Dict[str, Any]]) -> None:
+    if not docs:
+        return
+    await db[ROWS_COLLECTION].bulk_write(
+        [ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in docs],
+        ordered=False,
+    )
+
+
+async def delete_product_rows(db, product_ids: Iterable[str]) -> None:
+    ids = list(product_ids)
+    if ids:
+        await db[ROWS_COLLECTION].delete_many({"_id": {"$in": ids}})
+
+
+async def delete_rows_except_generation(db, generation: str) -> int:
+    res = await db[ROWS_COLLECTION].delete_many({"generation": {"$ne": generation}})
+    return res.deleted_count
+
+
+async def iter_feed_rows(db, batch_size: int = 500) -> AsyncIterator[Dict[str, Any]]:
+    cursor = db[ROWS_COLLECTION].find({}, {"rows": 1}).sort([("sort_key", 1), ("_id", 1)]).batch_size(batch_size)
+    async for doc in cursor:
+        yield doc
@@ -1,10 +1,16 @@
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.core.pagination import PaginationParams, paginate_collection
 
 
 COLLECTION = "admin_notifications"
+INBOX_COLLECTION = "admin_notification_inbox"
+COUNTERS_COLLECTION = "admin_notification_counters"
 
 
 def visibility_filter(admin_id: str) -> Dict[str, Any]:
@@ -22,36 +28,16 @@ async def insert_notification(db, data: Dict[str, Any]) -> Dict[str, Any]:
     doc = {
         **data,
         "created_at": now,
-        "read_by_admin_ids": [],
-        "read_at_by_admin_ids": {},
     }
     res = await db[COLLECTION].insert_one(doc)
     doc["_id"] = res.inserted_id
     return doc
 
 
-async def list_notifications(
-    db,
-    *,
-    admin_id: str,
-    filters: Dict[str, Any],
-    skip: int,
-    limit: int,
-) -> List[Dict[str, Any]]:
-    query = {"$and": [visibility_filter(admin_id), filters or {}]}
-    return await (
-        db[COLLECTION]
-        .find(query)
-        .sort("created_at", -1)
-        .skip(skip)
-        .limit(limit)
-        .to_list(length=limit)
-    )
-
-
-async def count_notifications(db, *, admin_id: str, filters: Dict[str, Any]) -> int:
-    query = {"$and": [visibility_filter(admin_id), filters or {}]}
-    return await db[COLLECTION].count_documents(query)
+async def find_notifications_by_ids(db, notification_ids: List[ObjectId]) -> List[Dict[str, Any]]:
+    if not notification_ids:
+        return []
+    return await db[COLLECTION].find({"_id": {"$in": notification_ids}}).to_list(length=len(notification_ids))
 
 
 async def find_notification(db, notification_id: str) -> Optional[Dict[str, Any]]:
@@ -62,32 +48,138 @@ async def find_notification(db, notification_id: str) -> Optional[Dict[str, Any]
     return await db[COLLECTION].find_one({"_id": oid})
 
 
-async def mark_notification_read(db, *, notification_id: str, admin_id: str) -> Optional[Dict[str, Any]]:
+# --------------------
+# Inbox par admin (fan-out a l'ecriture)
+# --------------------
+
+def inbox_entry(doc: Dict[str, Any], admin_id: str, *, is_read: bool = False, read_at: Optional[datetime] = None) -> Dict[str, Any]:
+    return {
+        "admin_id": admin_id,
+        "notification_id": doc["_id"],
+        "category": doc.get("category"),
+        "priority": doc.get("priority", "normal"),
+        "created_at": doc["created_at"],
+        "is_read": is_read,
+        "read_at": read_at,
+    }
+
+
+async def list_inbox_admin_ids(db, admin_ids: Optional[List[str]] = None) -> List[str]:
+    query: Dict[str, Any] = {}
+    if admin_ids is not None:
+        query["_id"] = {"$in": admin_ids}
+    docs = await db[COUNTERS_COLLECTION].find(query, {"_id": 1}).to_list(length=None)
+    return [doc["_id"] for doc in docs]
+
+
+async def find_inbox_counters(db, admin_id: str) -> Optional[Dict[str, Any]]:
+    return await db[COUNTERS_COLLECTION].find_one({"_id": admin_id})
+
+
+async def insert_inbox_entries(db, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    if not entries:
+        return []
     try:
-        oid = ObjectId(notification_id)
-    except Exception:
-        return None
+        await db[INBOX_COLLECTION].insert_many(entries, ordered=False)
+        return entries
+    except BulkWriteError as exc:
+        # Les doublons (admin_id, notification_id) sont deja livres.
+        failed = {error["index"] for error in exc.details.get("writeErrors", [])}
+        return [entry for index, entry in enumerate(entries) if index not in failed]
+
+
+async def increment_inbox_counters(db, admin_ids: List[str], *, unread: int = 1, total: int = 1) -> None:
+    if not admin_ids:
+        return
     now = datetime.utcnow()
-    await db[COLLECTION].update_one(
-        {"_id": oid, **visibility_filter(admin_id)},
-        {
-            "$addToSet": {"read_by_admin_ids": admin_id},
-            "$set": {f"read_at_by_admin_ids.{admin_id}": now},
-        },
+    await db[COUNTERS_COLLECTION].bulk_write(
+        [
+            UpdateOne(
+                {"_id": admin_id},
+                {"$inc": {"unread_count": unread, "total_count": total}, "$set": {"updated_at": now}},
+            )
+            for admin_id in admin_ids
+        ],
+        ordered=False,
     )
-    return await db[COLLECTION].find_one({"_id": oid})
 
 
-async def mark_all_notifications_read(db, *, admin_id: str) -> int:
-    now = datetime.utcnow()
-    res = await db[COLLECTION].update_many(
-        {
-            **visibility_filter(admin_id),
-            "read_by_admin_ids": {"$ne": admin_id},
-        },
+async def open_inbox(db, admin_id: str) -> None:
+    await db[COUNTERS_COLLECTION].update_one(
+        {"_id": admin_id},
         {
-            "$addToSet": {"read_by_admin_ids": admin_id},
-            "$set": {f"read_at_by_admin_ids.{admin_id}": now},
+            "$setOnInsert": {
+                "unread_count": 0,
+                "total_count": 0,
+                "initialized": False,
+                "created_at": datetime.utcnow(),
+            }
         },
+        upsert=True,
+    )
+
+
+def iter_visible_notifications(db, admin_id: str):
+    return db[COLLECTION].find(
+        visibility_filter(admin_id),
+        {"category": 1, "priority": 1, "created_at": 1, "read_by_admin_ids": 1, "read_at_by_admin_ids": 1},
+    )
+
+
+async def recount_inbox(db, admin_id: str) -> Dict[str, Any]:
+    unread = await db[INBOX_COLLECTION].count_documents({"admin_id": admin_id, "is_read": False})
+    total = await db[INBOX_COLLECTION].count_documents({"admin_id": admin_id})
+    counters = {"unread_count": unread, "total_count": total, "initialized": True, "updated_at": datetime.utcnow()}
+    await db[COUNTERS_COLLECTION].update_one({"_id": admin_id}, {"$set": counters}, upsert=True)
+    return counters
+
+
+async def paginate_inbox(
+    db,
+    *,
+    admin_id: str,
+    filters: Dict[str, Any],
+    pagination: PaginationParams,
+    total: int,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    return await paginate_collection(
+        db[INBOX_COLLECTION],
+        {"admin_id": admin_id, **(filters or {})},
+        pagination,
+        sort=("created_at", -1),
+        total=total,
+    )
+
+
+async def find_inbox_entry(db, *, admin_id: str, notification_id: ObjectId) -> Optional[Dict[str, Any]]:
+    return await db[INBOX_COLLECTION].find_one({"admin_id": admin_id, "notification_id": notification_id})
+
+
+async def mark_inbox_entry_read(db, *, admin_id: str, notification_id: ObjectId, now: datetime) -> bool:
+    res = await db[INBOX_COLLECTION].update_one(
+        {"admin_id": admin_id, "notification_id": notification_id, "is_read": False},
+        {"$set": {"is_read": True, "read_at": now}},
+    )
+    if not res.modified_count:
+        return False
+    await db[COUNTERS_COLLECTION].update_one(
+        {"_id": admin_id, "unread_count": {"$gt": 0}},
+        {"$inc": {"unread_count": -1}, "$set": {"updated_at": now}},
+    )
+    return True
+
+
+async def mark_inbox_read(db, *, admin_id: str, now: datetime) -> int:
+    res = await db[INBOX_COLLECTION].update_many(
+        {"admin_id": admin_id, "is_read": False},
+        {"$set": {"is_read": True, "read_at": now}},
     )
-    return int(res.modified_count)
+    modified = int(res.modified_count)
+    if modified:
+        # Seulement les entrees effectivement marquees: une notification arrivee
+        # entre les deux ecritures reste comptee comme non lue.
+        await db[COUNTERS_COLLECTION].update_one(
+            {"_id": admin_id},
+            [{"$set": {"unread_count": {"$max": [0, {"$subtract": ["$unread_count", modified]}]}, "updated_at": now}}],
+        )
+    return modified
@@ -4,6 +4,8 @@ from typing import Any, Dict, List, Tuple
 from bson import ObjectId
 from fastapi import HTTPException, status
 
+from app.core.pagination import PaginationParams, paginate_collection
+
 
 async def get_order(db, order_id: ObjectId):
     doc = await db["orders"].find_one({"_id": order_id})
@@ -65,5 +67,15 @@ async def list_orders(
     return [_normalize(x) async for x in cursor]
 
 
+async def paginate_orders(
+    db,
+    filters: Dict[str, Any],
+    pagination: PaginationParams,
+    sort: Tuple[str, int] = ("_id", -1),
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    docs, window = await paginate_collection(db["orders"], filters, pagination, sort=sort)
+    return [_normalize(x) for x in docs], window
+
+
 async def count_orders(db, filters: Dict[str, Any]) -> int:
     return await db["orders"].count_documents(filters)
@@ -1,8 +1,14 @@
+from pymongo import UpdateOne
+
+
 PACKS_COLLECTION = "packs"
 
 
-async def find_product_by_id(db, product_id):
-    return await db["products"].find_one({"_id": product_id})
+async def find_products_for_components(db, product_ids):
+    return await db["products"].find(
+        {"_id": {"$in": product_ids}},
+        {"variants.color": 1, "variants.sizes.size": 1},
+    ).to_list(length=len(product_ids))
 
 
 async def count_products_by_ids(db, product_ids):
@@ -31,3 +37,41 @@ async def update_pack(db, pack_id, data):
 
 async def delete_pack(db, pack_id):
     return await db[PACKS_COLLECTION].delete_one({"_id": pack_id})
+
+
+async def list_visible_packs(db, skip, limit):
+    return await db[PACKS_COLLECTION].find({"is_visible": True}).sort("order", 1).skip(skip).limit(limit).to_list(length=limit)
+
+
+async def find_visible_pack(db, pack_id):
+    return await db[PACKS_COLLECTION].find_one({"_id": pack_id, "is_visible": True})
+
+
+async def list_packs_for_materialization(db, *, product_ids=None, due_before=None):
+    clauses = []
+    if product_ids is not None:
+        clauses.append({"product_ids": {"$in": list(product_ids)}})
+    if due_before is not None:
+        clauses.append({"visibility_changes_at": {"$lte": due_before}})
+    filters = {"$or": clauses} if clauses else {}
+    return await db[PACKS_COLLECTION].find(filters).to_list(length=None)
+
+
+async def set_materialized_fields(db, fields_by_pack_id):
+    if not fields_by_pack_id:
+        return
+    await db[PACKS_COLLECTION].bulk_write(
+        [UpdateOne({"_id": pack_id}, {"$set": fields}) for pack_id, fields in fields_by_pack_id.items()],
+        ordered=False,
+    )
+
+
+async def list_visibility_changes(db, limit):
+    docs = await (
+        db[PACKS_COLLECTION]
+        .find({"visibility_changes_at": {"$ne": None}}, {"visibility_changes_at": 1})
+        .sort("visibility_changes_at", 1)
+        .limit(limit)
+        .to_list(length=limit)
+    )
+    return [doc["visibility_changes_at"] for doc in docs]
@@ -1,8 +1,12 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 from bson import ObjectId
 from fastapi import HTTPException, status
 from fastapi.encoders import jsonable_encoder
 
+from app.core.pagination import PaginationParams, paginate_collection
+from app.domain.catalog_search import search_facets
+from app.domain.inventory import availability_summary, availability_summary_pipeline
+
 # --------------------
 # CRUD Produits
 # --------------------
@@ -19,15 +23,8 @@ async def count_products(db, filters: Dict[str, Any]) -> int:
     return await db["products"].count_documents(filters)
 
 
-async def list_products_page(db, filters: Dict[str, Any], skip: int, limit: int) -> List[Dict[str, Any]]:
-    return await (
-        db["products"]
-        .find(filters)
-        .sort("_id", -1)
-        .skip(skip)
-        .limit(limit)
-        .to_list(length=limit)
-    )
+async def paginate_products(db, filters: Dict[str, Any], pagination: PaginationParams):
+    return await paginate_collection(db["products"], filters, pagination, sort=("_id", -1))
 
 async def create_product(db, product: Any) -> Dict[str, Any]:
     doc = jsonable_encoder(product)
@@ -40,6 +37,8 @@ async def create_product(db, product: Any) -> Dict[str, Any]:
                 "stock_reserved": int(size.get("stock_reserved", 0) or 0),
             })
         variant["sizes"] = normalized_sizes
+    doc.update(availability_summary(doc.get("variants") or [], fallback_in_stock=doc.get("in_stock", True)))
+    doc["search_facets"] = search_facets(doc)
     res = await db["products"].insert_one(doc)
     return await get_product(db, str(res.inserted_id))
 
@@ -58,80 +57,97 @@ async def update_product(db, product_id: str, data: Any) -> Optional[Dict[str, A
             variant["sizes"] = normalized_sizes
     if upd:
         await db["products"].update_one({"_id": oid}, {"$set": upd})
+    if "variants" in upd or "in_stock" in upd:
+        await refresh_availability_summary(db, oid)
+    if upd.keys() & {"variants", "gender", "categories"}:
+        await refresh_search_facets(db, oid)
     return await get_product(db, product_id)
 
 async def delete_product(db, product_id: str) -> None:
     await db["products"].delete_one({"_id": ObjectId(product_id)})
 
 
+async def refresh_availability_summary(db, product_id, session=None):
+    """
+    Recalcule stock_available_total / available_sizes / available_colors / in_stock
+    a partir des variantes; a appeler dans la session de l'ecriture de stock.
+    """
+    oid = product_id if isinstance(product_id, ObjectId) else ObjectId(product_id)
+    return await db["products"].update_one({"_id": oid}, availability_summary_pipeline(), session=session)
+
+
 # --------------------
 # Recherche & filtres
 # --------------------
 
-async def search_products(
-    db,
-    text: Optional[str] = None,
-    min_price: Optional[float] = None,
-    max_price: Optional[float] = None,
-    gender: Optional[str] = None,
-    style: Optional[str] = None,
-    season: Optional[str] = None,
-    target_audience: Optional[str] = None,
-    color: Optional[str] = None,
-    size: Optional[str] = None,
-    sort_by: str = "price",
-    sort_dir: int = 1,
-    skip: int = 0,
-    limit: int = 10
-) -> List[Dict[str, Any]]:
-    query: Dict[str, Any] = {}
-
-    # Plein-texte
-    if text:
-        query["$text"] = {"$search": text}
-
-    # Filtre prix
-    if min_price is not None or max_price is not None:
-        price_f: Dict[str, Any] = {}
-        if min_price is not None:
-            price_f["$gte"] = min_price
-        if max_price is not None:
-            price_f["$lte"] = max_price
-        query["price"] = price_f
-
-    # Facettes standard
-    for field, val in (("gender", gender), ("style", style), ("season", season), ("target_audience", target_audience)):
-        if val:
-            query[field] = val
-
-    # Filtre sur les variants embarqués (toujours OK, même si la logique CRUD est déportée)
-    if color or size:
-        elem: Dict[str, Any] = {}
-        if color:
-            elem["color"] = {"$regex": f"^{color}$", "$options": "i"}
-        if size:
-            elem["size"] = {"$regex": f"^{size}$", "$options": "i"}
-        query["variants"] = {"$elemMatch": elem}
-
-    # Curseur et tri
-    cursor = db["products"].find(query)
-    if text:
-        cursor = cursor.sort([("score", {"$meta": "textScore"})])
-    else:
-        cursor = cursor.sort(sort_by, sort_dir)
-
-    docs = await cursor.skip(skip).limit(limit).to_list(length=limit)
-    for d in docs:
-        d["id"] = str(d["_id"])
-    return docs
+async def faceted_search(db, pipeline: List[Dict[str, Any]]) -> Dict[str, Any]:
+    rows = await db["products"].aggregate(pipeline).to_list(length=1)
+    return rows[0] if rows else {}
+
+
+async def search_hits(db, filters: Dict[str, Any], sort: List[Any], skip: int, limit: int, projection=None) -> List[Dict[str, Any]]:
+    return await db["products"].find(filters, projection).sort(sort).skip(skip).limit(limit).to_list(length=limit)
+
+
+async def refresh_search_facets(db, product_id) -> None:
+    oid = product_id if isinstance(product_id, ObjectId) else ObjectId(product_id)
+    product = await db["products"].find_one({"_id": oid}, {"gender": 1, "categories": 1, "variants.color": 1, "variants.sizes.size": 1})
+    if product:
+        await db["products"].update_one({"_id": oid}, {"$set": {"search_facets": search_facets(product)}})
 
 
 async def aggregate_products(db, pipeline: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
     return await db["products"].aggregate(pipeline).to_list(length=limit)
 
 
-async def list_products_for_meta_catalog(db, limit: int = 5000) -> List[Dict[str, Any]]:
-    return await db["products"].find({}).sort("full_name", 1).to_list(length=limit)
+SEARCH_INDEX_PROJECTION = {
+    "name": 1,
+    "full_name": 1,
+    "sku": 1,
+    "price": 1,
+    "gender": 1,
+    "categories": 1,
+    "in_stock": 1,
+    "available_sizes": 1,
+    "available_colors": 1,
+    "variants.color": 1,
+    "variants.images": 1,
+}
+
+
+async def list_products_for_search_index(db, product_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    filters = {}
+    if product_ids is not None:
+        filters = {"_id": {"$in": [ObjectId(product_id) for product_id in product_ids if ObjectId.is_valid(product_id)]}}
+    return await db["products"].find(filters, SEARCH_INDEX_PROJECTION).to_list(length=None)
+
+
+# Champs utiles a l'affichage d'un produit lie (pack, vlog, avis, tableaux de bord)
+PRODUCT_SUMMARY_PROJECTION = {"name": 1, "full_name": 1, "price": 1, "in_stock": 1, "variants.images": 1}
+
+
+async def find_product_summaries(db, object_ids: List[ObjectId]) -> List[Dict[str, Any]]:
+    return await db["products"].find({"_id": {"$in": object_ids}}, PRODUCT_SUMMARY_PROJECTION).to_list(length=len(object_ids))
+
+
+async def find_products_by_ids(db, product_ids: List[str]) -> List[Dict[str, Any]]:
+    """
+    Produits dans l'ordre des identifiants fournis (les absents sont ignores).
+    """
+    docs = await db["products"].find({"_id": {"$in": [ObjectId(product_id) for product_id in product_ids]}}).to_list(length=len(product_ids))
+    by_id = {str(doc["_id"]): doc for doc in docs}
+    return [by_id[product_id] for product_id in product_ids if product_id in by_id]
+
+
+async def iter_products_for_meta_catalog(db, product_ids: Optional[List[str]] = None, batch_size: int = 200) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Produits du flux Meta en lecture curseur (pas de limite de taille du catalogue).
+    """
+    filters = {}
+    if product_ids is not None:
+        filters = {"_id": {"$in": [ObjectId(product_id) for product_id in product_ids if ObjectId.is_valid(product_id)]}}
+    async for doc in db["products"].find(filters).batch_size(batch_size):
+        yield doc
 
 
 async def find_product_name(db, product_id: ObjectId):
@@ -148,4 +164,5 @@ async def add_category_to_product(db, product_id: str, category_name: str) -> Op
         {"_id": oid},
         {"$addToSet": {"categories": category_name}}
     )
+    await refresh_search_facets(db, oid)
     return await get_product(db, product_id)
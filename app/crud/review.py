@@ -1,36 +1,75 @@
 # app/crud/review.py
 from datetime import datetime
+from typing import Iterable, Optional
+
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
 
+from app.core.pagination import paginate_collection
+from app.domain.reviews import review_stats_out, review_summary_delta, summaries_from_rating_counts
 
-async def find_user_author(db, user_id: str):
-    return await db["users"].find_one(
-        {"_id": ObjectId(str(user_id))},
-        {"full_name": 1, "email": 1}
-    )
 
+SUMMARIES_COLLECTION = "review_summaries"
 
-async def find_product_summary(db, product_id: str):
-    return await db["products"].find_one(
-        {"_id": ObjectId(str(product_id))},
-        {"name": 1, "full_name": 1},
+
+async def apply_review_change(db, before: Optional[dict], after: Optional[dict]) -> None:
+    """
+    Reporte un changement d'avis (creation, edition, moderation, suppression)
+    sur le resume du produit, par increments.
+    """
+    product_id = (after or before or {}).get("product_id")
+    delta = review_summary_delta(before, after)
+    if not product_id or not delta:
+        return
+    await db[SUMMARIES_COLLECTION].update_one(
+        {"_id": str(product_id)},
+        {"$inc": delta, "$set": {"updated_at": datetime.utcnow()}},
+        upsert=True,
     )
 
 
-async def count_reviews(db, filters):
-    return await db["reviews"].count_documents(filters)
+async def find_review_summary(db, product_id: str):
+    return await db[SUMMARIES_COLLECTION].find_one({"_id": str(product_id)})
 
 
-async def list_reviews_by_filters(db, filters, skip, limit):
-    return await (
-        db["reviews"]
-        .find(filters)
-        .sort("created_at", -1)
-        .skip(skip)
-        .limit(limit)
-        .to_list(length=limit)
-    )
+async def recompute_review_summaries(db, product_ids: Optional[Iterable[str]] = None, *, apply: bool = True) -> dict:
+    """
+    Recalcule les resumes depuis `reviews` (reparation apres derive).
+    """
+    match = {"status": {"$ne": "hidden"}}
+    ids = [str(product_id) for product_id in product_ids] if product_ids is not None else None
+    if ids is not None:
+        match["product_id"] = {"$in": ids}
+    rows = await db["reviews"].aggregate([
+        {"$match": match},
+        {"$group": {"_id": {"product_id": "$product_id", "rating": "$rating"}, "count": {"$sum": 1}}},
+    ]).to_list(length=None)
+    expected = summaries_from_rating_counts(rows)
+
+    stale_filter = {"_id": {"$nin": list(expected)}}
+    if ids is not None:
+        stale_filter["_id"]["$in"] = ids
+    drifted = 0
+    current = {doc["_id"]: doc async for doc in db[SUMMARIES_COLLECTION].find({"_id": {"$in": list(expected)}})}
+    for product_id, summary in expected.items():
+        doc = current.get(product_id) or {}
+        if (doc.get("count"), doc.get("rating_sum"), doc.get("histogram")) != (summary["count"], summary["rating_sum"], summary["histogram"]):
+            drifted += 1
+            if apply:
+                await db[SUMMARIES_COLLECTION].replace_one(
+                    {"_id": product_id},
+                    {**summary, "updated_at": datetime.utcnow()},
+                    upsert=True,
+                )
+    removed = await db[SUMMARIES_COLLECTION].count_documents(stale_filter)
+    if apply and removed:
+        await db[SUMMARIES_COLLECTION].delete_many(stale_filter)
+    return {"products": len(expected), "drifted": drifted, "removed": removed}
+
+
+async def paginate_reviews(db, filters, pagination):
+    return await paginate_collection(db["reviews"], filters, pagination, sort=("created_at", -1))
 
 
 async def find_review_by_id(db, review_id):
@@ -38,11 +77,20 @@ async def find_review_by_id(db, review_id):
 
 
 async def update_review_by_id(db, review_id, data):
-    return await db["reviews"].update_one({"_id": review_id}, {"$set": data})
+    before = await db["reviews"].find_one_and_update(
+        {"_id": review_id},
+        {"$set": data},
+        return_document=ReturnDocument.BEFORE,
+    )
+    if before:
+        await apply_review_change(db, before, {**before, **data})
+    return before
 
 
 async def delete_review_by_id(db, review_id):
-    return await db["reviews"].delete_one({"_id": review_id})
+    deleted = await db["reviews"].find_one_and_delete({"_id": review_id})
+    await apply_review_change(db, deleted, None)
+    return deleted
 
 async def create_review(db: AsyncIOMotorDatabase, product_id: str, data: dict):
     doc = {
@@ -53,6 +101,7 @@ async def create_review(db: AsyncIOMotorDatabase, product_id: str, data: dict):
         "updated_at": datetime.utcnow()
     }
     res = await db["reviews"].insert_one(doc)
+    await apply_review_change(db, None, doc)
     return await db["reviews"].find_one({"_id": res.inserted_id})
 
 async def get_review(db, product_id: str, review_id: str):
@@ -63,17 +112,21 @@ async def get_review(db, product_id: str, review_id: str):
 
 async def update_review(db, product_id: str, review_id: str, data: dict):
     data["updated_at"] = datetime.utcnow()
-    await db["reviews"].update_one(
+    before = await db["reviews"].find_one_and_update(
         {"_id": ObjectId(review_id), "product_id": product_id},
-        {"$set": data}
+        {"$set": data},
+        return_document=ReturnDocument.BEFORE,
     )
+    if before:
+        await apply_review_change(db, before, {**before, **data})
     return await get_review(db, product_id, review_id)
 
 async def delete_review(db, product_id: str, review_id: str):
-    await db["reviews"].delete_one({
+    deleted = await db["reviews"].find_one_and_delete({
         "_id": ObjectId(review_id),
         "product_id": product_id
     })
+    await apply_review_change(db, deleted, None)
 
 async def list_reviews(db, product_id: str, rating: int = None, skip: int = 0, limit: int = 10, sort_best: bool = False):
     filt = {"product_id": product_id, "status": {"$ne": "hidden"}}
@@ -84,21 +137,7 @@ async def list_reviews(db, product_id: str, rating: int = None, skip: int = 0, l
         cursor = cursor.sort("rating", -1)
     else:
         cursor = cursor.sort("created_at", -1)
-    return await cursor.skip(skip).to_list(length=limit)
-
-async def get_review_stats(db, product_id: str):
-    pipeline = [
-        {"$match": {"product_id": product_id, "status": {"$ne": "hidden"}}},
-        {"$group": {
-            "_id": "$product_id",
-            "average_rating": {"$avg": "$rating"},
-            "count": {"$sum": 1}
-        }}
-    ]
-    res = await db["reviews"].aggregate(pipeline).to_list(length=1)
-    if res:
-        return {"average_rating": res[0]["average_rating"], "count": res[0]["count"]}
-    return {"average_rating": None, "count": 0}
+    return await cursor.skip(skip).limit(limit).to_list(length=limit)
 
 async def list_user_reviews(
     db: AsyncIOMotorDatabase,
@@ -110,4 +149,7 @@ async def list_user_reviews(
     Renvoie la liste des reviews pour un user donné.
     """
     cursor = db["reviews"].find({"user_id": user_id})
-    return await cursor.sort("created_at", -1).skip(skip).to_list(length=limit)
+    return await cursor.sort("created_at", -1).skip(skip).limit(limit).to_list(length=limit)
+
+async def get_review_stats(db, product_id: str):
+    return review_stats_out(await find_review_summary(db, product_id))
@@ -3,6 +3,8 @@ from typing import Dict, Any, List, Tuple, Optional
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from app.core.pagination import PaginationParams, paginate_collection
+
 def _norm(doc: dict) -> dict:
     if not doc:
         return doc
@@ -10,6 +12,15 @@ def _norm(doc: dict) -> dict:
     doc.pop("_id", None)
     return doc
 
+# Ne remonte que les champs utiles à l’admin (évite de renvoyer hash/méta sensibles)
+ADMIN_USER_PROJECTION = {
+    "email": 1,
+    "full_name": 1,
+    "is_active": 1,
+    "created_at": 1,
+    "last_login_at": 1,   # si tu l’as
+}
+
 async def list_users(
     db: AsyncIOMotorDatabase,
     filters: Dict[str, Any],
@@ -17,23 +28,24 @@ async def list_users(
     limit: int,
     sort: Tuple[str, int] = ("_id", -1),
 ) -> List[Dict[str, Any]]:
-    # Ne remonte que les champs utiles à l’admin (évite de renvoyer hash/méta sensibles)
-    projection = {
-        "email": 1,
-        "full_name": 1,
-        "is_active": 1,
-        "created_at": 1,
-        "last_login_at": 1,   # si tu l’as
-    }
     cursor = (
         db["users"]
-        .find(filters, projection)
+        .find(filters, ADMIN_USER_PROJECTION)
         .skip(skip)
         .limit(limit)
         .sort([sort])
     )
     return [_norm(x) async for x in cursor]
 
+async def paginate_users(
+    db: AsyncIOMotorDatabase,
+    filters: Dict[str, Any],
+    pagination: PaginationParams,
+    sort: Tuple[str, int] = ("_id", -1),
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    docs, window = await paginate_collection(db["users"], filters, pagination, sort=sort, projection=ADMIN_USER_PROJECTION)
+    return [_norm(x) for x in docs], window
+
 async def count_users(db: AsyncIOMotorDatabase, filters: Dict[str, Any]) -> int:
     return await db["users"].count_documents(filters)
 
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from passlib.context import CryptContext
 from bson import ObjectId
@@ -49,6 +49,14 @@ async def mark_email_verified(db, user_id: str):
 async def get_user_by_id(db, oid: ObjectId):
     return await db["users"].find_one({"_id": oid})
 
+async def find_user_authors(db, object_ids: List[ObjectId]) -> List[dict]:
+    if not object_ids:
+        return []
+    return await db["users"].find(
+        {"_id": {"$in": object_ids}},
+        {"full_name": 1, "email": 1},
+    ).to_list(length=None)
+
 async def update_user_password(db, user_id: str, new_password: str) -> bool:
     hashed = pwd_context.hash(new_password)
     result = await db["users"].update_one(
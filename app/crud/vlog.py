@@ -1,3 +1,7 @@
+from pymongo import ReturnDocument, UpdateOne
+
+from app.core.pagination import paginate_collection
+
 SETTINGS_COLLECTION = "cms_settings"
 VLOG_SETTINGS_KEY = "vlog_page"
 CHAPTERS_COLLECTION = "vlog_chapters"
@@ -13,75 +17,57 @@ async def find_chapter_by_slug(db, slug, exclude_id=None):
     return await db[CHAPTERS_COLLECTION].find_one(query)
 
 
-async def find_products_by_ids(db, product_ids):
-    return await db["products"].find({"_id": {"$in": product_ids}}).to_list(length=len(product_ids))
-
-
-async def count_episode_likes(db, episode_id):
-    return await db[LIKES_COLLECTION].count_documents({"episode_id": episode_id})
-
-
-async def count_visible_episode_comments(db, episode_id):
-    return await db[COMMENTS_COLLECTION].count_documents({
-        "episode_id": episode_id,
-        "status": "visible",
-    })
-
-
-async def find_episode_like(db, episode_id, user_id):
-    return await db[LIKES_COLLECTION].find_one({
-        "episode_id": episode_id,
-        "user_id": user_id,
-    })
+async def increment_episode_counter(db, episode_id, field, amount):
+    """
+    Compteurs denormalises like_count / comment_count des episodes.
+    """
+    if not amount:
+        return None
+    return await db[EPISODES_COLLECTION].update_one({"_id": episode_id}, {"$inc": {field: amount}})
 
 
 async def find_vlog_settings(db):
     return await db[SETTINGS_COLLECTION].find_one({"_id": VLOG_SETTINGS_KEY})
 
 
-async def list_chapter_episodes(db, filters, limit=50):
-    return await db[EPISODES_COLLECTION].find(filters).sort("order", 1).to_list(length=limit)
-
-
-async def find_user_summary(db, user_id):
-    return await db["users"].find_one(
-        {"_id": user_id},
-        {"full_name": 1, "email": 1},
-    )
-
-
-async def find_episode_summary(db, episode_id):
-    return await db[EPISODES_COLLECTION].find_one(
-        {"_id": episode_id},
+async def find_episode_titles(db, episode_ids):
+    if not episode_ids:
+        return []
+    return await db[EPISODES_COLLECTION].find(
+        {"_id": {"$in": list(episode_ids)}},
         {"title": 1},
-    )
-
-
-async def count_comments(db, filters):
-    return await db[COMMENTS_COLLECTION].count_documents(filters)
+    ).to_list(length=None)
 
 
-async def list_comments(db, filters, skip, limit):
-    return await (
-        db[COMMENTS_COLLECTION]
-        .find(filters)
-        .sort("created_at", -1)
-        .skip(skip)
-        .limit(limit)
-        .to_list(length=limit)
-    )
+async def paginate_comments(db, filters, pagination):
+    return await paginate_collection(db[COMMENTS_COLLECTION], filters, pagination, sort=("created_at", -1))
 
 
 async def find_comment_by_id(db, comment_id):
     return await db[COMMENTS_COLLECTION].find_one({"_id": comment_id})
 
 
+def _visible_comment(comment) -> int:
+    return 1 if comment and comment.get("status", "visible") == "visible" else 0
+
+
 async def update_comment(db, comment_id, data):
-    return await db[COMMENTS_COLLECTION].update_one({"_id": comment_id}, {"$set": data})
+    before = await db[COMMENTS_COLLECTION].find_one_and_update(
+        {"_id": comment_id},
+        {"$set": data},
+        return_document=ReturnDocument.BEFORE,
+    )
+    if before:
+        delta = _visible_comment({**before, **data}) - _visible_comment(before)
+        await increment_episode_counter(db, before.get("episode_id"), "comment_count", delta)
+    return before
 
 
 async def delete_comment(db, comment_id):
-    return await db[COMMENTS_COLLECTION].delete_one({"_id": comment_id})
+    deleted = await db[COMMENTS_COLLECTION].find_one_and_delete({"_id": comment_id})
+    if deleted:
+        await increment_episode_counter(db, deleted.get("episode_id"), "comment_count", -_visible_comment(deleted))
+    return deleted
 
 
 async def find_public_episode(db, episode_id, statuses):
@@ -91,6 +77,21 @@ async def find_public_episode(db, episode_id, statuses):
     })
 
 
+async def list_episodes_for_chapters(db, chapter_ids, statuses=None):
+    filters = {"chapter_id": {"$in": list(chapter_ids)}}
+    if statuses is not None:
+        filters["status"] = {"$in": statuses}
+    return await db[EPISODES_COLLECTION].find(filters).sort([("chapter_id", 1), ("order", 1)]).to_list(length=None)
+
+
+async def list_liked_episode_ids(db, episode_ids, user_id):
+    docs = await db[LIKES_COLLECTION].find(
+        {"episode_id": {"$in": list(episode_ids)}, "user_id": user_id},
+        {"episode_id": 1},
+    ).to_list(length=None)
+    return {doc["episode_id"] for doc in docs}
+
+
 async def list_chapters(db, filters=None, limit=100):
     return await db[CHAPTERS_COLLECTION].find(filters or {}).sort("order", 1).to_list(length=limit)
 
@@ -99,16 +100,22 @@ async def find_chapter(db, filters):
     return await db[CHAPTERS_COLLECTION].find_one(filters)
 
 
-async def increment_episode_view_count(db, episode_id, now):
-    return await db[EPISODES_COLLECTION].find_one_and_update(
-        {"_id": episode_id},
-        {"$inc": {"view_count": 1}, "$set": {"updated_at": now}},
-        return_document=True,
-    )
+async def increment_episode_view_counts(db, counts, now):
+    """
+    Applique en un seul bulk_write les vues accumulees par episode.
+    """
+    operations = [
+        UpdateOne({"_id": episode_id}, {"$inc": {"view_count": count}, "$set": {"updated_at": now}})
+        for episode_id, count in counts.items()
+        if count
+    ]
+    if not operations:
+        return None
+    return await db[EPISODES_COLLECTION].bulk_write(operations, ordered=False)
 
 
 async def upsert_episode_like(db, episode_id, user_id, now):
-    return await db[LIKES_COLLECTION].update_one(
+    result = await db[LIKES_COLLECTION].update_one(
         {"episode_id": episode_id, "user_id": user_id},
         {"$setOnInsert": {
             "episode_id": episode_id,
@@ -117,17 +124,54 @@ async def upsert_episode_like(db, episode_id, user_id, now):
         }},
         upsert=True,
     )
+    if result.upserted_id is not None:
+        await increment_episode_counter(db, episode_id, "like_count", 1)
+    return result
 
 
 async def delete_episode_like(db, episode_id, user_id):
-    return await db[LIKES_COLLECTION].delete_one({
+    result = await db[LIKES_COLLECTION].delete_one({
         "episode_id": episode_id,
         "user_id": user_id,
     })
+    await increment_episode_counter(db, episode_id, "like_count", -result.deleted_count)
+    return result
 
 
 async def insert_comment(db, data):
-    return await db[COMMENTS_COLLECTION].insert_one(data)
+    result = await db[COMMENTS_COLLECTION].insert_one(data)
+    await increment_episode_counter(db, data["episode_id"], "comment_count", _visible_comment(data))
+    return result
+
+
+async def find_episode_counters(db, episode_id):
+    return await db[EPISODES_COLLECTION].find_one({"_id": episode_id}, {"like_count": 1, "comment_count": 1})
+
+
+async def recompute_episode_counters(db, filters=None):
+    """
+    Recalcule like_count / comment_count depuis les likes et commentaires
+    (initialisation et reparation).
+    """
+    episode_ids = [doc["_id"] async for doc in db[EPISODES_COLLECTION].find(filters or {}, {"_id": 1})]
+    if not episode_ids:
+        return 0
+    likes = await db[LIKES_COLLECTION].aggregate([
+        {"$match": {"episode_id": {"$in": episode_ids}}},
+        {"$group": {"_id": "$episode_id", "count": {"$sum": 1}}},
+    ]).to_list(length=None)
+    comments = await db[COMMENTS_COLLECTION].aggregate([
+        {"$match": {"episode_id": {"$in": episode_ids}, "status": "visible"}},
+        {"$group": {"_id": "$episode_id", "count": {"$sum": 1}}},
+    ]).to_list(length=None)
+    like_counts = {row["_id"]: row["count"] for row in likes}
+    comment_counts = {row["_id"]: row["count"] for row in comments}
+    for episode_id in episode_ids:
+        await db[EPISODES_COLLECTION].update_one(
+            {"_id": episode_id},
+            {"$set": {"like_count": like_counts.get(episode_id, 0), "comment_count": comment_counts.get(episode_id, 0)}},
+        )
+    return len(episode_ids)
 
 
 async def list_visible_episode_comments(db, episode_id, skip, limit):
@@ -160,6 +204,10 @@ async def insert_media(db, data):
     return await db["vlog_media"].insert_one(data)
 
 
+async def find_media_by_hash(db, content_hash):
+    return await db["vlog_media"].find_one({"content_hash": content_hash, "file_id": {"$ne": None}})
+
+
 async def find_media_by_id(db, media_id):
     return await db["vlog_media"].find_one({"_id": media_id})
 
@@ -216,6 +264,25 @@ async def update_episode(db, episode_id, data):
     return await db[EPISODES_COLLECTION].update_one({"_id": episode_id}, {"$set": data})
 
 
+async def list_upcoming_episode_releases(db, limit):
+    docs = await (
+        db[EPISODES_COLLECTION]
+        .find({"status": "coming_soon", "scheduled_release": True, "release_date": {"$ne": None}}, {"release_date": 1})
+        .sort("release_date", 1)
+        .limit(limit)
+        .to_list(length=limit)
+    )
+    return [doc["release_date"] for doc in docs]
+
+
+async def release_due_episodes(db, now):
+    result = await db[EPISODES_COLLECTION].update_many(
+        {"status": "coming_soon", "scheduled_release": True, "release_date": {"$lte": now}},
+        {"$set": {"status": "released", "updated_at": now}},
+    )
+    return result.modified_count
+
+
 async def delete_episode(db, episode_id):
     return await db[EPISODES_COLLECTION].delete_one({"_id": episode_id})
 
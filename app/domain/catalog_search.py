@@ -0,0 +1,89 @@
+import hashlib
+import json
+from typing import Any, Iterable, Optional
+
+
+PRICE_BUCKET_BOUNDARIES = [0, 50, 100, 150, 200, 300]
+PRICE_BUCKET_OVERFLOW = "overflow"
+
+FACET_GENDER = "gender"
+FACET_COLOR = "color"
+FACET_SIZE = "size"
+FACET_CATEGORY = "category"
+FACET_PRICE = "price"
+FACET_AVAILABILITY = "availability"
+
+
+def normalize_facet_value(value: Any) -> str:
+    return " ".join(str(value or "").split()).lower()
+
+
+def _normalized_set(values: Iterable[Any]) -> list[str]:
+    normalized = []
+    for value in values:
+        key = normalize_facet_value(value)
+        if key and key not in normalized:
+            normalized.append(key)
+    return normalized
+
+
+def search_facets(product: dict[str, Any]) -> dict[str, Any]:
+    """
+    Cles de facettes normalisees (minuscules, espaces reduits) stockees sur le
+    produit sous `search_facets`.
+    """
+    variants = product.get("variants") or []
+    return {
+        "gender": normalize_facet_value(product.get("gender")) or None,
+        "colors": _normalized_set(variant.get("color") for variant in variants),
+        "sizes": _normalized_set(row.get("size") for variant in variants for row in variant.get("sizes", []) or []),
+        "categories": _normalized_set(product.get("categories") or []),
+    }
+
+
+def facet_filters(
+    *,
+    gender: Optional[str] = None,
+    color: Optional[str] = None,
+    size: Optional[str] = None,
+    category: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    in_stock: Optional[bool] = None,
+) -> dict[str, dict[str, Any]]:
+    """
+    Filtres Mongo groupes par facette, pour pouvoir compter chaque facette sans
+    son propre filtre.
+    """
+    filters: dict[str, dict[str, Any]] = {}
+    if gender:
+        filters[FACET_GENDER] = {"search_facets.gender": normalize_facet_value(gender)}
+    if color:
+        filters[FACET_COLOR] = {"search_facets.colors": normalize_facet_value(color)}
+    if size:
+        filters[FACET_SIZE] = {"search_facets.sizes": normalize_facet_value(size)}
+    if category:
+        filters[FACET_CATEGORY] = {"search_facets.categories": normalize_facet_value(category)}
+    if min_price is not None or max_price is not None:
+        price_filter: dict[str, Any] = {}
+        if min_price is not None:
+            price_filter["$gte"] = min_price
+        if max_price is not None:
+            price_filter["$lte"] = max_price
+        filters[FACET_PRICE] = {"price": price_filter}
+    if in_stock is not None:
+        filters[FACET_AVAILABILITY] = {"in_stock": in_stock}
+    return filters
+
+
+def merge_filters(filters: dict[str, dict[str, Any]], *, exclude: Optional[str] = None) -> dict[str, Any]:
+    merged: dict[str, Any] = {}
+    for facet, clause in filters.items():
+        if facet != exclude:
+            merged.update(clause)
+    return merged
+
+
+def filter_fingerprint(text: Optional[str], filters: dict[str, dict[str, Any]]) -> str:
+    raw = json.dumps({"text": normalize_facet_value(text), "filters": filters}, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
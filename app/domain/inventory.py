@@ -23,3 +23,86 @@ def inventory_projection(size_row: dict[str, Any]) -> dict[str, Any]:
         "stock_reserved": reserved,
         "stock_available": available,
     }
+
+
+def availability_summary(variants: list[dict[str, Any]], fallback_in_stock: bool = True) -> dict[str, Any]:
+    """
+    Resume de disponibilite stocke sur le produit (cf. availability_summary_pipeline).
+    """
+    total = 0
+    sizes: list[str] = []
+    colors: list[str] = []
+    for variant in variants or []:
+        for size_row in variant.get("sizes", []) or []:
+            available = max(stock_available_value(size_row), 0)
+            total += available
+            if available <= 0:
+                continue
+            if size_row.get("size") not in sizes:
+                sizes.append(size_row.get("size"))
+            if variant.get("color") not in colors:
+                colors.append(variant.get("color"))
+    return {
+        "stock_available_total": total,
+        "available_sizes": sizes,
+        "available_colors": colors,
+        "in_stock": total > 0 if variants else fallback_in_stock,
+    }
+
+
+def availability_summary_pipeline() -> list[dict[str, Any]]:
+    """
+    Equivalent serveur de availability_summary, utilisable comme update pipeline
+    (dans la meme transaction que l'ecriture de stock).
+    """
+    rows = {
+        "$reduce": {
+            "input": {"$ifNull": ["$variants", []]},
+            "initialValue": [],
+            "in": {
+                "$concatArrays": [
+                    "$$value",
+                    {
+                        "$map": {
+                            "input": {"$ifNull": ["$$this.sizes", []]},
+                            "as": "size_row",
+                            "in": {
+                                "color": "$$this.color",
+                                "size": "$$size_row.size",
+                                "available": {
+                                    "$max": [
+                                        0,
+                                        {
+                                            "$subtract": [
+                                                {"$ifNull": ["$$size_row.stock_on_hand", 0]},
+                                                {"$ifNull": ["$$size_row.stock_reserved", 0]},
+                                            ]
+                                        },
+                                    ]
+                                },
+                            },
+                        }
+                    },
+                ]
+            },
+        }
+    }
+    available_rows = {"$filter": {"input": "$_availability_rows", "as": "row", "cond": {"$gt": ["$$row.available", 0]}}}
+    return [
+        {"$set": {"_availability_rows": rows}},
+        {
+            "$set": {
+                "stock_available_total": {"$sum": "$_availability_rows.available"},
+                "available_sizes": {"$setUnion": [{"$map": {"input": available_rows, "as": "row", "in": "$$row.size"}}]},
+                "available_colors": {"$setUnion": [{"$map": {"input": available_rows, "as": "row", "in": "$$row.color"}}]},
+                "in_stock": {
+                    "$cond": [
+                        {"$gt": [{"$size": {"$ifNull": ["$variants", []]}}, 0]},
+                        {"$gt": [{"$sum": "$_availability_rows.available"}, 0]},
+                        {"$ifNull": ["$in_stock", True]},
+                    ]
+                },
+            }
+        },
+        {"$unset": "_availability_rows"},
+    ]
@@ -0,0 +1,55 @@
+from typing import Any, Optional
+
+
+REVIEW_RATINGS = (1, 2, 3, 4, 5)
+
+
+def counts_in_summary(review: Optional[dict[str, Any]]) -> bool:
+    return bool(review) and review.get("status", "visible") != "hidden" and review.get("rating") in REVIEW_RATINGS
+
+
+def review_contribution(review: Optional[dict[str, Any]]) -> dict[str, int]:
+    if not counts_in_summary(review):
+        return {}
+    rating = int(review["rating"])
+    return {"count": 1, "rating_sum": rating, f"histogram.{rating}": 1}
+
+
+def review_summary_delta(before: Optional[dict[str, Any]], after: Optional[dict[str, Any]]) -> dict[str, int]:
+    """
+    Increments `$inc` a appliquer au resume produit pour passer de `before` a
+    `after` (None = avis inexistant). Vide si l'avis ne change pas les stats.
+    """
+    delta: dict[str, int] = {}
+    for key, value in review_contribution(after).items():
+        delta[key] = delta.get(key, 0) + value
+    for key, value in review_contribution(before).items():
+        delta[key] = delta.get(key, 0) - value
+    return {key: value for key, value in delta.items() if value}
+
+
+def review_stats_out(summary: Optional[dict[str, Any]]) -> dict[str, Any]:
+    summary = summary or {}
+    count = int(summary.get("count", 0) or 0)
+    histogram = summary.get("histogram") or {}
+    return {
+        "average_rating": round(summary.get("rating_sum", 0) / count, 2) if count else None,
+        "count": count,
+        "histogram": {str(rating): int(histogram.get(str(rating), 0) or 0) for rating in REVIEW_RATINGS},
+    }
+
+
+def summaries_from_rating_counts(rows: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    """
+    Resumes a partir de lignes {_id: {product_id, rating}, count} (reparation).
+    """
+    summaries: dict[str, dict[str, Any]] = {}
+    for row in rows:
+        product_id, rating = row["_id"]["product_id"], row["_id"]["rating"]
+        if rating not in REVIEW_RATINGS:
+            continue
+        summary = summaries.setdefault(product_id, {"count": 0, "rating_sum": 0, "histogram": {}})
+        summary["count"] += row["count"]
+        summary["rating_sum"] += rating * row["count"]
+        summary["histogram"][str(rating)] = row["count"]
+    return summaries
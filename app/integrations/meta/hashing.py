@@ -1,9 +1,12 @@
 import hashlib
 import re
+from functools import lru_cache
 from typing import Optional
 
 
 SPACE_RE = re.compile(r"\s+")
+HASH_CACHE_SIZE = 4096
+IDENTITY_CACHE_SIZE = 2048
 
 
 def _clean_text(value: object) -> Optional[str]:
@@ -64,8 +67,40 @@ def sha256_hexdigest(value: str) -> str:
     return hashlib.sha256(value.encode("utf-8")).hexdigest()
 
 
-def normalized_sha256(value: object, *, normalizer) -> Optional[str]:
+@lru_cache(maxsize=HASH_CACHE_SIZE)
+def _cached_normalized_sha256(value: str, normalizer) -> Optional[str]:
     normalized = normalizer(value)
     if not normalized:
         return None
     return sha256_hexdigest(normalized)
+
+
+def normalized_sha256(value: object, *, normalizer) -> Optional[str]:
+    if value is None:
+        return None
+    return _cached_normalized_sha256(str(value), normalizer)
+
+
+@lru_cache(maxsize=IDENTITY_CACHE_SIZE)
+def hashed_identity(
+    email: Optional[str],
+    phone: Optional[str],
+    first_name: Optional[str],
+    last_name: Optional[str],
+    city: Optional[str],
+    country: Optional[str],
+    external_id: Optional[str],
+) -> tuple[tuple[str, str], ...]:
+    """
+    Champs user_data hashes pour une identite client, memoises pour les clients recurrents.
+    """
+    fields = (
+        ("em", normalized_sha256(email, normalizer=normalize_email)),
+        ("ph", normalized_sha256(phone, normalizer=normalize_phone)),
+        ("fn", normalized_sha256(first_name, normalizer=normalize_name)),
+        ("ln", normalized_sha256(last_name, normalizer=normalize_name)),
+        ("ct", normalized_sha256(city, normalizer=normalize_city)),
+        ("country", normalized_sha256(country, normalizer=normalize_country)),
+        ("external_id", normalized_sha256(external_id, normalizer=normalize_external_id)),
+    )
+    return tuple((key, value) for key, value in fields if value)
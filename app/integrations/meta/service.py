@@ -17,15 +17,7 @@ from app.integrations.meta.client import (
     MetaPermanentError,
     MetaRetryableError,
 )
-from app.integrations.meta.hashing import (
-    normalize_city,
-    normalize_country,
-    normalize_email,
-    normalize_external_id,
-    normalize_name,
-    normalize_phone,
-    normalized_sha256,
-)
+from app.integrations.meta.hashing import hashed_identity
 from app.integrations.meta.schemas import MetaEventContext, MetaEventData, MetaEventsRequest
 from app.services.services_store import outbox_service
 
@@ -53,11 +45,6 @@ def _split_full_name(full_name: Optional[str]) -> tuple[Optional[str], Optional[
     return parts[0], " ".join(parts[1:])
 
 
-def _append_if_present(target: dict, key: str, value: Optional[str]) -> None:
-    if value:
-        target.setdefault(key, []).append(value)
-
-
 def _decimal_to_number(value: Decimal) -> float:
     return float(value.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
 
@@ -113,14 +100,18 @@ def _build_user_data(
     external_id: Optional[str],
     context: MetaEventContext,
 ) -> dict:
-    user_data: dict[str, object] = {}
-    _append_if_present(user_data, "em", normalized_sha256(email, normalizer=normalize_email))
-    _append_if_present(user_data, "ph", normalized_sha256(phone, normalizer=normalize_phone))
-    _append_if_present(user_data, "fn", normalized_sha256(first_name, normalizer=normalize_name))
-    _append_if_present(user_data, "ln", normalized_sha256(last_name, normalizer=normalize_name))
-    _append_if_present(user_data, "ct", normalized_sha256(city, normalizer=normalize_city))
-    _append_if_present(user_data, "country", normalized_sha256(country, normalizer=normalize_country))
-    _append_if_present(user_data, "external_id", normalized_sha256(external_id, normalizer=normalize_external_id))
+    user_data: dict[str, object] = {
+        key: [value]
+        for key, value in hashed_identity(
+            email,
+            phone,
+            first_name,
+            last_name,
+            city,
+            country,
+            str(external_id) if external_id is not None else None,
+        )
+    }
     if context.client_ip_address:
         user_data["client_ip_address"] = context.client_ip_address
     if context.client_user_agent:
@@ -44,12 +44,24 @@ from app.routers.routers_store import (
     promocodes,
     reviews,
     shipping_rates,
+    storefront_bootstrap,
     storefront_vlog,
     variants,
     wishlist,
 )
 from app.startup import init_mongo
+from app.services.services_store.email_templates import precompile_templates
+from app.services.services_cms.imagekit_streaming import imagekit_uploader
+from app.services.services_cms.media_derivatives import shutdown_derivative_pool
+from app.services.services_cms.media_library import media_reconcile_loop
+from app.core.publish_scheduler import publish_scheduler
+from app.services.services_cms.vlog_schedule import episode_schedule
+from app.services.services_store.pack_materializer import pack_materializer_loop, pack_schedule
+from app.services.services_store.vlog_view_counter import episode_view_flush_loop, flush_episode_views_on_shutdown
+from app.services.services_store.product_summaries import ProductSummaryScopeMiddleware
+from app.services.services_store.search_index import product_search_index
 from app.services.services_cms.drop_countdown_notifier import drop_countdown_monitor_loop
+from app.services.services_erp.notification_service import notification_manager
 
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -65,6 +77,7 @@ app.add_middleware(
   allow_methods=["*"],
   allow_headers=["*"],
 )
+app.add_middleware(ProductSummaryScopeMiddleware)
 
 # Health-check model
 class HealthStatus(BaseModel):
@@ -84,7 +97,17 @@ async def check_health():
 async def on_startup():
     # Crée collections et index avant que l'app n'accepte des requêtes
     await init_mongo()
+    precompile_templates()
+    await product_search_index.rebuild(db)
     app.state.drop_countdown_task = asyncio.create_task(drop_countdown_monitor_loop())
+    app.state.pack_materializer_task = asyncio.create_task(pack_materializer_loop())
+    publish_scheduler.register(pack_schedule)
+    publish_scheduler.register(episode_schedule)
+    app.state.publish_scheduler_task = asyncio.create_task(publish_scheduler.run(db))
+    app.state.episode_view_flush_task = asyncio.create_task(episode_view_flush_loop())
+    app.state.media_reconcile_task = asyncio.create_task(media_reconcile_loop())
+    app.state.notification_bus_task = asyncio.create_task(notification_manager.bus.run())
+    app.state.notification_heartbeat_task = asyncio.create_task(notification_manager.run_heartbeat())
     app.state.meta_worker_id = build_meta_worker_id()
     app.state.meta_outbox_task = asyncio.create_task(
         run_meta_outbox_loop(
@@ -97,9 +120,20 @@ async def on_startup():
 
 @app.on_event("shutdown")
 async def on_shutdown():
-    task = getattr(app.state, "drop_countdown_task", None)
-    if task:
-        task.cancel()
+    for name in ("drop_countdown_task", "pack_materializer_task", "publish_scheduler_task", "episode_view_flush_task", "media_reconcile_task", "notification_bus_task", "notification_heartbeat_task"):
+        task = getattr(app.state, name, None)
+        if task:
+            task.cancel()
+    # Le flush en cours doit avoir remis ses increments avant le flush final.
+    flush_task = getattr(app.state, "episode_view_flush_task", None)
+    if flush_task:
+        try:
+            await flush_task
+        except asyncio.CancelledError:
+            pass
+    await flush_episode_views_on_shutdown()
+    await imagekit_uploader.aclose()
+    shutdown_derivative_pool()
     meta_task = getattr(app.state, "meta_outbox_task", None)
     if meta_task:
         meta_task.cancel()
@@ -123,6 +157,7 @@ app.include_router(shipping_rates.router)
 app.include_router(promocodes.router)
 app.include_router(store_header_video.router)
 app.include_router(storefront_vlog.router)
+app.include_router(storefront_bootstrap.router)
 app.include_router(loyalty.router)
 app.include_router(packs.router)
 app.include_router(meta_catalog.router)
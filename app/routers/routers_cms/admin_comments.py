@@ -2,6 +2,7 @@ from typing import Optional
 
 from fastapi import APIRouter, Depends, Query, Response, status
 
+from app.core.pagination import PaginationParams, keyset_pagination_params
 from app.db import get_db
 from app.dependencies_admin import require_permission
 from app.schemas.review import AdminReviewUpdate, PaginatedReviewsOut, ReviewOut, ReviewStatus
@@ -16,29 +17,27 @@ router = APIRouter(prefix="/admin/comments", tags=["admin-comments"])
 async def admin_list_comments(
     _admin=Depends(require_permission("engagement")),
     db=Depends(get_db),
-    page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1, le=200),
+    pagination: PaginationParams = Depends(keyset_pagination_params),
     status_filter: Optional[VlogCommentStatus] = Query(None, alias="status"),
     episode_id: Optional[str] = Query(None),
     user_id: Optional[str] = Query(None),
     q: Optional[str] = Query(None, description="Recherche dans le contenu du commentaire"),
 ):
-    return await engagement_service.list_comments(db, page, page_size, status_filter, episode_id, user_id, q)
+    return await engagement_service.list_comments(db, pagination, status_filter, episode_id, user_id, q)
 
 
 @router.get("/product-reviews", response_model=PaginatedReviewsOut)
 async def admin_list_product_reviews(
     _admin=Depends(require_permission("engagement")),
     db=Depends(get_db),
-    page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1, le=200),
+    pagination: PaginationParams = Depends(keyset_pagination_params),
     status_filter: Optional[ReviewStatus] = Query(None, alias="status"),
     product_id: Optional[str] = Query(None),
     user_id: Optional[str] = Query(None),
     rating: Optional[int] = Query(None, ge=1, le=5),
     q: Optional[str] = Query(None, description="Recherche dans le titre ou commentaire"),
 ):
-    return await engagement_service.list_product_reviews(db, page, page_size, status_filter, product_id, user_id, rating, q)
+    return await engagement_service.list_product_reviews(db, pagination, status_filter, product_id, user_id, rating, q)
 
 
 @router.patch("/product-reviews/{review_id}", response_model=ReviewOut)
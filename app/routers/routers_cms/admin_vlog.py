@@ -47,8 +47,9 @@ async def admin_upload_vlog_media(
     media_type: MediaType = Query(...),
     file: UploadFile = File(...),
     _admin=Depends(require_permission("vlog")),
+    db=Depends(get_db),
 ):
-    return await admin_vlog_service.upload_media(file, media_type)
+    return await admin_vlog_service.upload_media(db, file, media_type)
 
 
 @router.get("/media/upload-auth", response_model=ImageKitDirectUploadAuth)
@@ -2,6 +2,7 @@ from typing import Optional
 
 from fastapi import APIRouter, Depends, Query
 
+from app.core.pagination import PaginationParams, keyset_pagination_params
 from app.db import get_db
 from app.dependencies_admin import require_permission
 from app.schemas.drop_countdown import (
@@ -27,12 +28,11 @@ async def admin_get_drop_countdown(
 async def admin_list_drop_subscribers(
     _admin=Depends(require_permission("drop_countdown")),
     db=Depends(get_db),
-    page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1, le=200),
+    pagination: PaginationParams = Depends(keyset_pagination_params),
     q: Optional[str] = Query(None, description="Recherche email ou nom"),
     current_drop_only: bool = Query(True),
 ):
-    return await drop_countdown_service.list_subscribers(db, page, page_size, q, current_drop_only)
+    return await drop_countdown_service.list_subscribers(db, pagination, q, current_drop_only)
 
 
 @router.put("/admin/drop-countdown", response_model=DropCountdownOut)
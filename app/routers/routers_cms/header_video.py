@@ -1,5 +1,8 @@
+from typing import Optional
+
 from fastapi import APIRouter, Depends, File, Query, UploadFile
 
+from app.core.pagination import PaginationParams
 from app.db import get_db
 from app.dependencies_admin import require_permission
 from app.schemas.header_video import (
@@ -28,8 +31,12 @@ async def admin_list_header_videos(
     _admin=Depends(require_permission("header_video")),
     limit: int = Query(50, ge=1, le=100),
     skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Curseur opaque (next_cursor); remplace skip"),
+    q: Optional[str] = Query(None, max_length=100, description="Recherche sur le nom du fichier"),
+    db=Depends(get_db),
 ):
-    return await list_header_videos(limit=limit, skip=skip)
+    pagination = PaginationParams(page=skip // limit + 1, page_size=limit, cursor=cursor)
+    return await list_header_videos(db, pagination, q)
 
 
 @router.get("/admin/header-video", response_model=HeaderVideoConfig)
@@ -61,8 +68,12 @@ async def admin_list_header_images(
     _admin=Depends(require_permission("header_video")),
     limit: int = Query(50, ge=1, le=100),
     skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Curseur opaque (next_cursor); remplace skip"),
+    q: Optional[str] = Query(None, max_length=100, description="Recherche sur le nom du fichier"),
+    db=Depends(get_db),
 ):
-    return await list_header_images(limit=limit, skip=skip)
+    pagination = PaginationParams(page=skip // limit + 1, page_size=limit, cursor=cursor)
+    return await list_header_images(db, pagination, q)
 
 
 @router.post("/admin/header-image/upload", response_model=HeaderVideoUploadOut, status_code=201)
@@ -2,7 +2,7 @@ from typing import Optional
 
 from fastapi import APIRouter, Depends, Query
 
-from app.core.pagination import PaginatedResponse, PaginationParams, pagination_params
+from app.core.pagination import PaginatedResponse, PaginationParams, keyset_pagination_params
 from app.db import get_db
 from app.dependencies_admin import require_superadmin
 from app.schemas.audit import AuditLogOut
@@ -16,7 +16,7 @@ router = APIRouter(prefix="/admin/audit-logs", tags=["admin-audit"])
 async def admin_list_audit_logs(
     _super=Depends(require_superadmin),
     db=Depends(get_db),
-    pagination: PaginationParams = Depends(pagination_params),
+    pagination: PaginationParams = Depends(keyset_pagination_params),
     module: Optional[str] = Query(None),
     action: Optional[str] = Query(None),
     admin_id: Optional[str] = Query(None),
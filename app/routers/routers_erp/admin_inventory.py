@@ -2,7 +2,7 @@ from typing import Optional
 
 from fastapi import APIRouter, Depends, Query
 
-from app.core.pagination import PaginatedResponse, PaginationParams, pagination_params
+from app.core.pagination import PaginatedResponse, PaginationParams, keyset_pagination_params, pagination_params
 from app.db import get_db
 from app.dependencies_admin import get_current_admin, require_permission
 from app.schemas.inventory import InventoryAdjustmentIn, InventoryItemOut, InventoryMovementOut
@@ -40,7 +40,7 @@ async def admin_adjust_inventory(
 async def admin_list_inventory_movements(
     _admin=Depends(require_permission("products")),
     db=Depends(get_db),
-    pagination: PaginationParams = Depends(pagination_params),
+    pagination: PaginationParams = Depends(keyset_pagination_params),
     product_id: Optional[str] = Query(None),
     color: Optional[str] = Query(None),
     size: Optional[str] = Query(None),
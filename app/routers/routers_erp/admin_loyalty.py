@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, Query
 
+from app.core.pagination import PaginationParams, keyset_pagination_params
 from app.db import get_db
 from app.dependencies_admin import require_permission
 from app.schemas.loyalty import (
@@ -53,9 +54,8 @@ async def admin_adjust_user_loyalty(
 async def admin_list_loyalty_transactions(
     _admin=Depends(require_permission("loyalty")),
     db=Depends(get_db),
-    page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1, le=200),
+    pagination: PaginationParams = Depends(keyset_pagination_params),
     user_id: str | None = Query(None),
     order_id: str | None = Query(None),
 ):
-    return await loyalty_service.list_loyalty_transactions(db, page, page_size, user_id, order_id)
+    return await loyalty_service.list_loyalty_transactions(db, pagination, user_id, order_id)
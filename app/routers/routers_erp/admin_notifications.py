@@ -2,7 +2,7 @@ from typing import Literal, Optional
 
 from fastapi import APIRouter, Depends, Query, WebSocket
 
-from app.core.pagination import PaginatedResponse, PaginationParams, pagination_params
+from app.core.pagination import PaginatedResponse, PaginationParams, keyset_pagination_params
 from app.db import get_db
 from app.dependencies_admin import get_current_admin, require_superadmin
 from app.schemas.notification import NotificationCreate, NotificationOut, NotificationUnreadCount
@@ -16,7 +16,7 @@ router = APIRouter(prefix="/admin/notifications", tags=["admin-notifications"])
 async def admin_list_notifications(
     current_admin=Depends(get_current_admin),
     db=Depends(get_db),
-    pagination: PaginationParams = Depends(pagination_params),
+    pagination: PaginationParams = Depends(keyset_pagination_params),
     status_filter: Literal["unread", "read", "all"] = Query("all", alias="status"),
     category: Optional[str] = Query(None),
     priority: Optional[Literal["low", "normal", "high", "urgent"]] = Query(None),
@@ -2,6 +2,7 @@ from typing import Literal, Optional
 
 from fastapi import APIRouter, Depends, Query
 
+from app.core.pagination import PaginationParams, keyset_pagination_params
 from app.db import get_db
 from app.dependencies_admin import require_permission
 from app.services.services_erp import admin_order_service
@@ -13,8 +14,7 @@ router = APIRouter(prefix="/admin/orders", tags=["admin-orders"])
 @router.get("/", summary="Lister toutes les commandes (admin)")
 async def admin_list_orders(
     _admin=Depends(require_permission("orders")),
-    page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1, le=200),
+    pagination: PaginationParams = Depends(keyset_pagination_params),
     status: Optional[str] = Query(None, description="Filtrer par statut"),
     email: Optional[str] = Query(None, description="Filtrer par email client (exact ou partiel)"),
     date_from: Optional[str] = Query(None, description="ISO date/time (incluse)"),
@@ -23,4 +23,4 @@ async def admin_list_orders(
     sort_dir: Literal["asc", "desc"] = "desc",
     db=Depends(get_db),
 ):
-    return await admin_order_service.list_orders(db, page, page_size, status, email, date_from, date_to, sort_by, sort_dir)
+    return await admin_order_service.list_orders(db, pagination, status, email, date_from, date_to, sort_by, sort_dir)
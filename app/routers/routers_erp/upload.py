@@ -2,9 +2,10 @@ from typing import List
 
 from fastapi import APIRouter, Depends, File, UploadFile
 
+from app.db import get_db
 from app.dependencies_admin import require_permission
 from app.schemas.image import MultipleImageUploadOut
-from app.services.services_cms.imagekit_upload import upload_to_imagekit
+from app.services.services_cms.imagekit_upload import upload_many_to_imagekit
 
 
 router = APIRouter(tags=["admin-upload"])
@@ -14,8 +15,7 @@ router = APIRouter(tags=["admin-upload"])
 async def upload_images(
     files: List[UploadFile] = File(...),
     _admin=Depends(require_permission("products")),
+    db=Depends(get_db),
 ):
-    urls = []
-    for file in files:
-        urls.append(await upload_to_imagekit(file))
-    return MultipleImageUploadOut(urls=urls)
+    assets = await upload_many_to_imagekit(db, files)
+    return MultipleImageUploadOut(urls=[asset["url"] for asset in assets])
@@ -1,32 +1,14 @@
 from fastapi import APIRouter, BackgroundTasks, Depends, Request, status
 from fastapi.responses import JSONResponse
-from jinja2 import Environment, FileSystemLoader, pass_eval_context
 from app.analytics.service import track_event
 from app.db import get_db
 from app.schemas.contact import ContactMessage
 from app.services.services_store.email import send_email
+from app.services.services_store.email_templates import render_template
 from app.config import settings
-from markupsafe import Markup, escape
 
 router = APIRouter(tags=["contact"])
 
-# Initialisation de Jinja avec un filtre nl2br
-jinja_env = Environment(
-    loader=FileSystemLoader("templates"),
-    autoescape=True
-)
-
-@pass_eval_context
-def nl2br(eval_ctx, value: str) -> Markup:
-    """
-    Transforme les sauts de ligne en <br> pour l’email HTML.
-    """
-    escaped = escape(value)
-    result = escaped.replace("\n", "<br>\n")
-    return Markup(result)
-
-jinja_env.filters["nl2br"] = nl2br
-
 @router.post(
     "/contact",
     status_code=status.HTTP_202_ACCEPTED,
@@ -38,9 +20,9 @@ async def submit_contact(
     request: Request,
     db=Depends(get_db),
 ):
-    # 1) Charge le template HTML
-    template = jinja_env.get_template("contact_email.html")
-    html_body = template.render(
+    # 1) Rend le template HTML (precompile au demarrage)
+    html_body = render_template(
+        "contact_email.html",
         full_name=payload.full_name,
         email=payload.email,
         subject=payload.subject,
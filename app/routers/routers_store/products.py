@@ -2,30 +2,33 @@ from typing import List, Optional
 
 from fastapi import APIRouter, Depends, Query, Request
 
-from app.core.pagination import PaginatedResponse, PaginationParams, pagination_params
+from app.core.pagination import PaginatedResponse, PaginationParams, keyset_pagination_params
 from app.db import get_db
 from app.dependencies import get_current_user_optional
-from app.schemas.product import ProductOut
-from app.services.services_store import product_service
+from app.schemas.product import ProductOut, ProductSearchOut, ProductSuggestOut
+from app.services.services_store import catalog_search_service, product_service
 
 
 router = APIRouter(prefix="/products", tags=["products"])
 
 
 @router.get("/", response_model=List[ProductOut])
-async def list_products(skip: int = 0, limit: int = 10, db=Depends(get_db)):
-    return await product_service.list_products(db, skip, limit)
+async def list_products(request: Request, skip: int = 0, limit: int = 10, db=Depends(get_db)):
+    return await product_service.list_products(db, request, skip, limit)
 
 
 @router.get("/page", response_model=PaginatedResponse[ProductOut])
 async def list_products_page(
+    request: Request,
     db=Depends(get_db),
-    pagination: PaginationParams = Depends(pagination_params),
+    pagination: PaginationParams = Depends(keyset_pagination_params),
     gender: Optional[str] = Query(None),
     in_stock: Optional[bool] = Query(None),
     q: Optional[str] = Query(None, description="Recherche produit"),
+    size: Optional[str] = Query(None, description="Taille disponible en stock"),
+    color: Optional[str] = Query(None, description="Couleur disponible en stock"),
 ):
-    return await product_service.list_products_page(db, pagination, gender, in_stock, q)
+    return await product_service.list_products_page(db, pagination, gender, in_stock, q, request, size=size, color=color)
 
 
 @router.get(
@@ -52,6 +55,58 @@ async def search_products_endpoint(
     )
 
 
+@router.get(
+    "/suggest",
+    response_model=ProductSuggestOut,
+    summary="Autocompletion produits (nom, SKU, categories, couleurs)",
+)
+async def suggest_products_endpoint(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(8, ge=1, le=20),
+    db=Depends(get_db),
+):
+    return await product_service.suggest_products(db, q, limit)
+
+
+@router.get(
+    "/search/faceted",
+    response_model=ProductSearchOut,
+    summary="Recherche avec comptes par facette (genre, couleur, taille, prix, categorie, disponibilite)",
+)
+async def faceted_search_endpoint(
+    request: Request,
+    text: Optional[str] = Query(None, description="Terme plein-texte"),
+    gender: Optional[str] = Query(None),
+    color: Optional[str] = Query(None),
+    size: Optional[str] = Query(None),
+    category: Optional[str] = Query(None),
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    in_stock: Optional[bool] = Query(None),
+    sort: Optional[str] = Query(None, pattern="^(price|full_name):(asc|desc)$"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(24, ge=1, le=100),
+    db=Depends(get_db),
+    current_user=Depends(get_current_user_optional),
+):
+    return await catalog_search_service.faceted_search_response(
+        db,
+        request,
+        current_user,
+        text=text,
+        gender=gender,
+        color=color,
+        size=size,
+        category=category,
+        min_price=min_price,
+        max_price=max_price,
+        in_stock=in_stock,
+        sort=sort,
+        skip=skip,
+        limit=limit,
+    )
+
+
 @router.get(
     "/{product_id}",
     response_model=ProductOut,
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends, Request
+
+from app.core.versioned_cache import cached_json_response
+from app.db import get_db
+from app.schemas.storefront_bootstrap import StorefrontBootstrapOut
+from app.services.services_cms.storefront_bootstrap import read_storefront_bootstrap
+
+
+router = APIRouter(tags=["storefront"])
+
+
+@router.get("/storefront/bootstrap", response_model=StorefrontBootstrapOut)
+async def read_storefront_bootstrap_bundle(request: Request, db=Depends(get_db)):
+    """
+    Header video, drop actif et reglages vlog en une seule reponse (ETag).
+    """
+    return cached_json_response(request, await read_storefront_bootstrap(db))
@@ -20,10 +20,11 @@ router = APIRouter(prefix="/storefront/vlog", tags=["storefront-vlog"])
 
 @router.get("", response_model=VlogPageOut)
 async def read_storefront_vlog(
+    request: Request,
     db=Depends(get_db),
     current_user=Depends(get_current_user_optional),
 ):
-    return await storefront_vlog_service.read_storefront_vlog(db, current_user)
+    return await storefront_vlog_service.read_storefront_vlog(db, current_user, request)
 
 
 @router.get("/chapters/{slug}", response_model=VlogChapterWithEpisodesOut)
@@ -72,4 +72,9 @@ class DropSubscribersPage(BaseModel):
     page: int
     page_size: int
     pages: int
+    has_next: bool = False
+    has_prev: bool = False
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    total_is_estimate: bool = False
     drop_key: Optional[str] = None
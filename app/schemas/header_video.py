@@ -35,3 +35,6 @@ class HeaderVideoUploadOut(HeaderVideoConfig):
 
 class HeaderVideoListOut(BaseModel):
     items: List[HeaderVideoAsset] = Field(default_factory=list)
+    total: Optional[int] = None
+    has_next: bool = False
+    next_cursor: Optional[str] = None
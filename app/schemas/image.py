@@ -1,6 +1,6 @@
 # app/schemas/image.py
 from pydantic import BaseModel, HttpUrl
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 class ImageCreate(BaseModel):
     url: HttpUrl
@@ -10,6 +10,9 @@ class ImageCreate(BaseModel):
 class ImageOut(ImageCreate):
     id: str
     url: HttpUrl
+    width: Optional[int] = None
+    height: Optional[int] = None
+    derivatives: Dict[str, str] = {}
     class Config:
         from_attributes = True
         
@@ -70,3 +70,8 @@ class PaginatedLoyaltyTransactionsOut(BaseModel):
     page: int
     page_size: int
     pages: int
+    has_next: bool = False
+    has_prev: bool = False
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    total_is_estimate: bool = False
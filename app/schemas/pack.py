@@ -76,6 +76,7 @@ class PackOut(PackBase):
     original_price: float = 0
     pack_price: float = 0
     savings_value: float = 0
+    in_stock: bool = True
     created_at: datetime
     updated_at: datetime
 
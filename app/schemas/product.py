@@ -4,6 +4,7 @@ from typing import List, Optional, Dict
 
 from .variant import VariantCreate, VariantOut
 from .image import ImageCreate
+from .review import ReviewStats
 
 class ProductBase(BaseModel):
     # Identification
@@ -62,10 +63,57 @@ class ProductOut(ProductBase):
     meta_item_group_id: str
     price: float
     in_stock: bool
+    stock_available_total: Optional[int] = None
+    available_sizes: List[str] = Field(default_factory=list)
+    available_colors: List[str] = Field(default_factory=list)
     variants: List[VariantOut] = []
+    review_stats: Optional[ReviewStats] = None
     class Config:
         from_attributes = True
         
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class PriceBucketCount(BaseModel):
+    min: float
+    max: Optional[float] = None
+    count: int
+
+
+class ProductSearchFacets(BaseModel):
+    gender: List[FacetCount] = Field(default_factory=list)
+    color: List[FacetCount] = Field(default_factory=list)
+    size: List[FacetCount] = Field(default_factory=list)
+    category: List[FacetCount] = Field(default_factory=list)
+    price: List[PriceBucketCount] = Field(default_factory=list)
+    availability: List[FacetCount] = Field(default_factory=list)
+
+
+class ProductSearchOut(BaseModel):
+    items: List[ProductOut] = Field(default_factory=list)
+    total: int
+    skip: int
+    limit: int
+    facets: ProductSearchFacets
+
+
+class ProductSuggestion(BaseModel):
+    id: str
+    name: str
+    full_name: str
+    sku: Optional[str] = None
+    price: float
+    in_stock: bool
+    image_url: Optional[str] = None
+
+
+class ProductSuggestOut(BaseModel):
+    items: List[ProductSuggestion] = Field(default_factory=list)
+    terms: List[str] = Field(default_factory=list)
+
+
 class ProductUpdate(BaseModel):
     style_id: Optional[str] = None
     name: Optional[str] = None
@@ -1,6 +1,6 @@
 # app/schemas/review.py
 from pydantic import BaseModel, Field
-from typing import List, Literal, Optional
+from typing import Dict, List, Literal, Optional
 from datetime import datetime
 
 ReviewStatus = Literal["visible", "hidden"]
@@ -35,6 +35,7 @@ class ReviewOut(ReviewBase):
 class ReviewStats(BaseModel):
     average_rating: Optional[float]
     count: int
+    histogram: Dict[str, int] = Field(default_factory=dict)
 
 class PaginatedReviewsOut(BaseModel):
     items: List[ReviewOut] = Field(default_factory=list)
@@ -42,3 +43,8 @@ class PaginatedReviewsOut(BaseModel):
     page: int
     page_size: int
     pages: int
+    has_next: bool = False
+    has_prev: bool = False
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    total_is_estimate: bool = False
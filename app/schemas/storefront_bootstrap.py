@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+from .drop_countdown import DropCountdownOut
+from .header_video import HeaderVideoConfig
+from .vlog import VlogSettingsOut
+
+
+class StorefrontBootstrapOut(BaseModel):
+    """
+    Contenu CMS public du premier affichage. Les compteurs du drop
+    (seconds_remaining) sont relatifs a generated_at.
+    """
+
+    header_video: Optional[HeaderVideoConfig] = None
+    drop: Optional[DropCountdownOut] = None
+    vlog: VlogSettingsOut
+    generated_at: datetime
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Literal, Optional
+from typing import Dict, List, Literal, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -18,6 +18,10 @@ class VlogMediaAsset(BaseModel):
     file_path: Optional[str] = None
     mime: Optional[str] = None
     size: Optional[int] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    content_hash: Optional[str] = None
+    derivatives: Dict[str, str] = Field(default_factory=dict)
 
 
 class ImageKitDirectUploadAuth(BaseModel):
@@ -42,6 +46,7 @@ class VlogMediaRegister(BaseModel):
     file_path: Optional[str] = Field(None, alias="filePath")
     mime: Optional[str] = None
     size: Optional[int] = None
+    content_hash: Optional[str] = None
 
 
 class VlogMediaOut(VlogMediaRegister):
@@ -122,6 +127,8 @@ class VlogEpisodeBase(BaseModel):
     thumbnail_url: Optional[str] = None
     release_date: Optional[datetime] = None
     status: EpisodeStatus = "draft"
+    # Sortie automatique: un episode "coming_soon" passe "released" a release_date.
+    scheduled_release: bool = False
     linked_product_ids: List[str] = Field(default_factory=list)
     order: int = 0
 
@@ -138,6 +145,7 @@ class VlogEpisodeUpdate(BaseModel):
     thumbnail_url: Optional[str] = None
     release_date: Optional[datetime] = None
     status: Optional[EpisodeStatus] = None
+    scheduled_release: Optional[bool] = None
     linked_product_ids: Optional[List[str]] = None
     order: Optional[int] = None
 
@@ -210,3 +218,8 @@ class PaginatedVlogCommentsOut(BaseModel):
     page: int
     page_size: int
     pages: int
+    has_next: bool = False
+    has_prev: bool = False
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    total_is_estimate: bool = False
@@ -1,8 +1,10 @@
+from datetime import timezone
 from typing import List, Optional
 
 from fastapi import HTTPException, UploadFile, status
 
 from app.config import settings
+from app.core.publish_scheduler import publish_scheduler
 from app.crud import vlog as vlog_crud
 from app.schemas.vlog import (
     ImageKitDirectUploadAuth,
@@ -16,10 +18,15 @@ from app.schemas.vlog import (
 )
 from app.services.services_cms.imagekit_client import ik
 from app.services.services_cms.imagekit_media import VLOG_MEDIA_FOLDERS, upload_vlog_media_to_imagekit
+from app.services.services_cms.storefront_bootstrap import publish_storefront_bootstrap
+from app.services.services_cms.vlog_cache import invalidate_vlog
+from app.services.services_cms.vlog_schedule import EPISODE_SCHEDULE
 from app.services.services_cms.vlog_service import (
     chapter_out,
     chapter_with_episodes,
+    chapters_with_episodes,
     episode_out,
+    render_episodes,
     now_utc,
     settings_out,
     unique_chapter_slug,
@@ -31,11 +38,13 @@ async def update_settings(db, payload) -> VlogSettingsOut:
     value = payload.model_dump()
     updated_at = now_utc()
     await vlog_crud.save_vlog_settings(db, value, updated_at)
+    await invalidate_vlog(db)
+    await publish_storefront_bootstrap(db)
     return VlogSettingsOut(**value, updated_at=updated_at)
 
 
-async def upload_media(file: UploadFile, media_type: MediaType) -> VlogMediaAsset:
-    asset = await upload_vlog_media_to_imagekit(file, media_type)
+async def upload_media(db, file: UploadFile, media_type: MediaType) -> VlogMediaAsset:
+    asset = await upload_vlog_media_to_imagekit(db, file, media_type)
     return VlogMediaAsset(**asset)
 
 
@@ -75,7 +84,7 @@ async def list_media(db, media_type: Optional[MediaType], limit: int, skip: int)
 
 async def list_chapters(db) -> List[VlogChapterWithEpisodesOut]:
     chapter_docs = await vlog_crud.list_chapters(db, limit=100)
-    return [await chapter_with_episodes(db, chapter, public_only=False) for chapter in chapter_docs]
+    return await chapters_with_episodes(db, chapter_docs, public_only=False)
 
 
 async def create_chapter(db, payload) -> VlogChapterOut:
@@ -85,6 +94,7 @@ async def create_chapter(db, payload) -> VlogChapterOut:
     data["created_at"] = now
     data["updated_at"] = now
     res = await vlog_crud.insert_chapter(db, data)
+    await invalidate_vlog(db)
     created = await vlog_crud.find_chapter_by_id(db, res.inserted_id)
     return chapter_out(created)
 
@@ -108,6 +118,7 @@ async def update_chapter(db, chapter_id: str, payload) -> VlogChapterOut:
         data["slug"] = await unique_chapter_slug(db, data.get("title", existing["title"]), data.get("slug"), exclude_id=oid)
     data["updated_at"] = now_utc()
     await vlog_crud.update_chapter(db, oid, data)
+    await invalidate_vlog(db)
     updated = await vlog_crud.find_chapter_by_id(db, oid)
     return chapter_out(updated)
 
@@ -125,6 +136,7 @@ async def delete_chapter(db, chapter_id: str, delete_episodes: bool) -> None:
         if episode_ids:
             await vlog_crud.delete_likes_by_episode_ids(db, episode_ids)
             await vlog_crud.delete_comments_by_episode_ids(db, episode_ids)
+    await invalidate_vlog(db)
 
 
 async def update_chapter_short_film(db, chapter_id: str, payload) -> VlogChapterOut:
@@ -133,10 +145,30 @@ async def update_chapter_short_film(db, chapter_id: str, payload) -> VlogChapter
     if not existing:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Chapitre non trouve")
     await vlog_crud.update_chapter(db, oid, {"short_film": payload.model_dump(), "updated_at": now_utc()})
+    await invalidate_vlog(db)
     updated = await vlog_crud.find_chapter_by_id(db, oid)
     return chapter_out(updated)
 
 
+SCHEDULE_FIELDS = ("status", "release_date", "scheduled_release")
+
+
+def validate_scheduled_release(episode: dict, now) -> None:
+    """
+    Une sortie programmee ne s'applique jamais retroactivement: la date doit
+    etre future au moment ou l'admin la programme.
+    """
+    if not episode.get("scheduled_release") or episode.get("status") != "coming_soon":
+        return
+    if not episode.get("release_date"):
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Date de sortie requise pour une sortie programmee")
+    release_date = episode["release_date"]
+    if release_date.tzinfo:
+        release_date = release_date.astimezone(timezone.utc).replace(tzinfo=None)
+    if release_date <= now:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "La date de sortie programmee doit etre dans le futur")
+
+
 async def create_episode(db, chapter_id: str, payload) -> VlogEpisodeOut:
     chapter_oid = validate_object_id(chapter_id, "Chapitre ID")
     if not await vlog_crud.find_chapter_by_id(db, chapter_oid):
@@ -144,11 +176,17 @@ async def create_episode(db, chapter_id: str, payload) -> VlogEpisodeOut:
 
     now = now_utc()
     data = payload.model_dump()
+    validate_scheduled_release(data, now)
     data["chapter_id"] = chapter_oid
     data["view_count"] = 0
+    data["like_count"] = 0
+    data["comment_count"] = 0
     data["created_at"] = now
     data["updated_at"] = now
     res = await vlog_crud.insert_episode(db, data)
+    await invalidate_vlog(db)
+    if data["scheduled_release"]:
+        publish_scheduler.reload_soon(EPISODE_SCHEDULE)
     created = await vlog_crud.find_episode_by_id(db, res.inserted_id)
     return await episode_out(db, created)
 
@@ -156,7 +194,7 @@ async def create_episode(db, chapter_id: str, payload) -> VlogEpisodeOut:
 async def list_episodes(db, chapter_id: str) -> List[VlogEpisodeOut]:
     chapter_oid = validate_object_id(chapter_id, "Chapitre ID")
     docs = await vlog_crud.list_episodes_by_chapter(db, chapter_oid, limit=50)
-    return [await episode_out(db, doc) for doc in docs]
+    return await render_episodes(db, docs)
 
 
 async def update_episode(db, episode_id: str, payload) -> VlogEpisodeOut:
@@ -166,7 +204,13 @@ async def update_episode(db, episode_id: str, payload) -> VlogEpisodeOut:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Episode non trouve")
     data = payload.model_dump(exclude_unset=True)
     data["updated_at"] = now_utc()
+    reschedules = any(field in data for field in SCHEDULE_FIELDS)
+    if reschedules:
+        validate_scheduled_release({**existing, **data}, data["updated_at"])
     await vlog_crud.update_episode(db, oid, data)
+    await invalidate_vlog(db)
+    if reschedules:
+        publish_scheduler.reload_soon(EPISODE_SCHEDULE)
     updated = await vlog_crud.find_episode_by_id(db, oid)
     return await episode_out(db, updated)
 
@@ -179,3 +223,4 @@ async def delete_episode(db, episode_id: str) -> None:
     await vlog_crud.delete_episode(db, oid)
     await vlog_crud.delete_likes_by_episode(db, oid)
     await vlog_crud.delete_comments_by_episode(db, oid)
+    await invalidate_vlog(db)
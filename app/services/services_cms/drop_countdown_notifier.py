@@ -1,22 +1,25 @@
 import asyncio
 import logging
 from datetime import datetime, timedelta
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from bson import ObjectId
-from jinja2 import Environment, FileSystemLoader
 
 from app.config import settings
 from app.crud import drop_countdown as countdown_crud
 from app.db import client
+from app.services.services_cms.drop_countdown_service import reconcile_subscribers_count
+from app.services.services_cms.storefront_bootstrap import invalidate_storefront_bootstrap
 from app.services.services_store.email import send_email
+from app.services.services_store.email_templates import CampaignTemplate, campaign_template, personalize_many
 
 logger = logging.getLogger("drop_countdown")
 
 CHECK_INTERVAL_SECONDS = 30
 SEND_CLAIM_TTL_MINUTES = 30
-
-jinja_env = Environment(loader=FileSystemLoader("templates"), autoescape=True)
+SEND_BATCH_SIZE = 500
+SEND_CONCURRENCY = 8
+SUBSCRIBERS_RECONCILE_INTERVAL_SECONDS = 600
 
 
 def _frontend_url(path_or_url: str) -> str:
@@ -25,18 +28,21 @@ def _frontend_url(path_or_url: str) -> str:
     return f"{str(settings.FRONTEND_URL).rstrip('/')}/{path_or_url.lstrip('/')}"
 
 
-def _render_email(value: Dict[str, Any], recipient_email: str) -> tuple[str, str]:
+def _render_email(value: Dict[str, Any], campaign_key: str) -> tuple[str, CampaignTemplate]:
     cta_url = _frontend_url(value.get("cta_url") or "/products")
-    template = jinja_env.get_template("drop_release.html")
-    html = template.render(
-        drop_name=value.get("drop_name") or "Savage Rise Drop",
-        title=value.get("title") or "Le drop est disponible",
-        subtitle=value.get("subtitle"),
-        preview=value.get("email_preview"),
-        cta_label=value.get("cta_label") or "Shop the drop",
-        cta_url=cta_url,
-        recipient_email=recipient_email,
-        logo_url=settings.LOGO_URL,
+    campaign = campaign_template(
+        "drop_release.html",
+        campaign_key,
+        {
+            "drop_name": value.get("drop_name") or "Savage Rise Drop",
+            "title": value.get("title") or "Le drop est disponible",
+            "subtitle": value.get("subtitle"),
+            "preview": value.get("email_preview"),
+            "cta_label": value.get("cta_label") or "Shop the drop",
+            "cta_url": cta_url,
+            "logo_url": settings.LOGO_URL,
+        },
+        personalized_fields=["recipient_email"],
     )
     text = (
         f"{value.get('drop_name') or 'Savage Rise Drop'} est disponible.\n\n"
@@ -44,7 +50,7 @@ def _render_email(value: Dict[str, Any], recipient_email: str) -> tuple[str, str
         f"{cta_url}\n\n"
         "L'equipe Savage Rise"
     )
-    return text, html
+    return text, campaign
 
 
 def drop_key_from_value(value: dict) -> str:
@@ -56,21 +62,52 @@ def drop_key_from_value(value: dict) -> str:
     return f"{value.get('drop_name', 'drop')}::{launch_part}"
 
 
-async def send_due_drop_notification_once() -> bool:
-    db = client[settings.MONGODB_DB_NAME]
-    now = datetime.utcnow()
-    stale_claim_before = now - timedelta(minutes=SEND_CLAIM_TTL_MINUTES)
+def delivery_key_from_claim(claim: Dict[str, Any]) -> str:
+    """
+    Cle des livraisons: drop_key + generation d'envoi, pour qu'un envoi
+    reinitialise par l'admin (ex. nouveau sujet) reparte pour tous les abonnes.
+    """
+    drop_key = drop_key_from_value(claim["value"])
+    generation = claim.get("notification_generation")
+    return f"{drop_key}#{generation}" if generation else drop_key
+
+
+async def _deliver_drop_email(
+    db,
+    semaphore: asyncio.Semaphore,
+    delivery_key: str,
+    user_id: str,
+    email: str,
+    subject: str,
+    text: str,
+    html: str,
+) -> Optional[bool]:
+    async with semaphore:
+        delivery = await countdown_crud.claim_delivery(db, delivery_key, user_id, email, datetime.utcnow())
+        if delivery is None:
+            return None
+        try:
+            await asyncio.to_thread(
+                send_email,
+                subject=subject,
+                recipient=email,
+                body=text,
+                html=html,
+            )
+        except Exception as exc:
+            logger.exception("Failed to send drop release email to %s", email)
+            await countdown_crud.mark_delivery(
+                db, delivery_key, user_id, countdown_crud.DELIVERY_FAILED, datetime.utcnow(), error=str(exc)[:300]
+            )
+            return False
+        await countdown_crud.mark_delivery(db, delivery_key, user_id, countdown_crud.DELIVERY_SENT, datetime.utcnow())
+        return True
 
-    claim = await countdown_crud.claim_due_drop_notification(db, now, stale_claim_before)
-    if not claim:
-        return False
 
-    value = claim["value"]
-    drop_key = drop_key_from_value(value)
-    subscriptions = await countdown_crud.list_drop_subscriptions(db, drop_key, limit=20000)
+async def _send_drop_batch(db, semaphore, delivery_key, batch, subject, text, campaign) -> tuple[int, int]:
     user_ids = []
     fallback_emails: Dict[str, str] = {}
-    for subscription in subscriptions:
+    for subscription in batch:
         user_id = subscription.get("user_id")
         if not user_id:
             continue
@@ -80,36 +117,71 @@ async def send_due_drop_notification_once() -> bool:
         except Exception:
             continue
 
-    users = await countdown_crud.list_active_users_with_email(db, user_ids, limit=20000)
+    users = await countdown_crud.list_active_users_with_email(db, user_ids) if user_ids else []
+    recipients = []
+    for user in users:
+        user_id = str(user["_id"])
+        email = user.get("email") or fallback_emails.get(user_id)
+        if email:
+            recipients.append((user_id, email))
 
-    sent_count = 0
-    failure_count = 0
-    subject = value.get("email_subject") or "Le nouveau drop Savage Rise est disponible"
+    # Personnalisation du lot entier (pool de threads au-dela du seuil).
+    htmls = await personalize_many(campaign, [{"recipient_email": email} for _, email in recipients])
+    jobs = [
+        _deliver_drop_email(db, semaphore, delivery_key, user_id, email, subject, text, html)
+        for (user_id, email), html in zip(recipients, htmls)
+    ]
 
-    for user in users:
-        email = user.get("email") or fallback_emails.get(str(user["_id"]))
-        if not email:
-            continue
-        try:
-            text, html = _render_email(value, email)
-            await asyncio.to_thread(
-                send_email,
-                subject=subject,
-                recipient=email,
-                body=text,
-                html=html,
-            )
-            sent_count += 1
-        except Exception:
-            failure_count += 1
-            logger.exception("Failed to send drop release email to %s", email)
+    results = await asyncio.gather(*jobs)
+    return sum(1 for result in results if result is True), sum(1 for result in results if result is False)
+
+
+async def send_due_drop_notification_once() -> bool:
+    db = client[settings.MONGODB_DB_NAME]
+    now = datetime.utcnow()
+    stale_claim_before = now - timedelta(minutes=SEND_CLAIM_TTL_MINUTES)
+
+    claim = await countdown_crud.claim_due_drop_notification(db, now, stale_claim_before)
+    if not claim:
+        return False
 
-    await countdown_crud.mark_drop_notification_sent(db, sent_count, failure_count, datetime.utcnow())
-    logger.info("Drop notification sent to %s users, %s failures", sent_count, failure_count)
+    value = claim["value"]
+    drop_key = drop_key_from_value(value)
+    delivery_key = delivery_key_from_claim(claim)
+    subject = value.get("email_subject") or "Le nouveau drop Savage Rise est disponible"
+    text, campaign = _render_email(value, f"{drop_key}@{claim.get('updated_at')}")
+    semaphore = asyncio.Semaphore(SEND_CONCURRENCY)
+
+    checkpoint_id = claim.get("notification_checkpoint_id")
+    if checkpoint_id is not None:
+        logger.info("Resuming drop notification %s after subscription %s", drop_key, checkpoint_id)
+
+    cursor = countdown_crud.iter_drop_subscriptions(db, drop_key, after_id=checkpoint_id, batch_size=SEND_BATCH_SIZE)
+    batch = []
+    async for subscription in cursor:
+        batch.append(subscription)
+        if len(batch) < SEND_BATCH_SIZE:
+            continue
+        sent, failed = await _send_drop_batch(db, semaphore, delivery_key, batch, subject, text, campaign)
+        await countdown_crud.save_notification_checkpoint(db, batch[-1]["_id"], sent, failed, datetime.utcnow())
+        batch = []
+    if batch:
+        sent, failed = await _send_drop_batch(db, semaphore, delivery_key, batch, subject, text, campaign)
+        await countdown_crud.save_notification_checkpoint(db, batch[-1]["_id"], sent, failed, datetime.utcnow())
+
+    final = await countdown_crud.mark_drop_notification_sent(db, datetime.utcnow())
+    await invalidate_storefront_bootstrap(db)
+    logger.info(
+        "Drop notification sent to %s users, %s failures",
+        (final or {}).get("notification_recipients_count", 0),
+        (final or {}).get("notification_failures_count", 0),
+    )
     return True
 
 
 async def drop_countdown_monitor_loop() -> None:
+    loop = asyncio.get_running_loop()
+    next_reconcile = loop.time()
     while True:
         try:
             await send_due_drop_notification_once()
@@ -117,4 +189,12 @@ async def drop_countdown_monitor_loop() -> None:
             raise
         except Exception:
             logger.exception("Drop countdown monitor failed")
+        if loop.time() >= next_reconcile:
+            next_reconcile = loop.time() + SUBSCRIBERS_RECONCILE_INTERVAL_SECONDS
+            try:
+                await reconcile_subscribers_count(client[settings.MONGODB_DB_NAME])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Drop subscribers reconcile failed")
         await asyncio.sleep(CHECK_INTERVAL_SECONDS)
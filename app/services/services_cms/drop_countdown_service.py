@@ -1,3 +1,4 @@
+import re
 from datetime import datetime
 from typing import Optional
 
@@ -5,6 +6,7 @@ from bson import ObjectId
 from fastapi import HTTPException, Request, status
 
 from app.analytics.service import track_event
+from app.core.pagination import PaginationParams
 from app.crud import drop_countdown as countdown_crud
 from app.schemas.drop_countdown import (
     DropCountdownOut,
@@ -12,6 +14,10 @@ from app.schemas.drop_countdown import (
     DropSubscriberOut,
     DropSubscribersPage,
 )
+from app.services.services_cms.storefront_bootstrap import (
+    invalidate_storefront_bootstrap,
+    publish_storefront_bootstrap,
+)
 
 
 def seconds_remaining(launch_at: datetime) -> int:
@@ -24,8 +30,30 @@ def drop_key_from_value(value: dict) -> str:
     return f"{value.get('drop_name', 'drop')}::{launch_part}"
 
 
-async def subscribers_count(db, value: dict) -> int:
-    return await countdown_crud.count_subscribers(db, {"drop_key": drop_key_from_value(value)})
+async def reconcile_subscribers_count(db, doc: Optional[dict] = None) -> int:
+    """
+    Recompte les abonnes du drop courant et corrige le compteur maintenu
+    (derive eventuelle des `$inc`, ou nouveau drop_key).
+    """
+    doc = doc or await countdown_crud.find_drop_doc(db)
+    if not doc or not doc.get("value"):
+        return 0
+    drop_key = drop_key_from_value(doc["value"])
+    count = await countdown_crud.count_subscribers(db, {"drop_key": drop_key})
+    if doc.get("subscribers_drop_key") != drop_key or doc.get("subscribers_count") != count:
+        await countdown_crud.save_subscribers_count(db, drop_key, count, datetime.utcnow())
+        await invalidate_storefront_bootstrap(db)
+    return count
+
+
+async def subscribers_count(db, doc: dict) -> int:
+    """
+    Compteur maintenu sur le document du drop; recompte une seule fois si
+    le compteur ne correspond pas au drop courant.
+    """
+    if doc.get("subscribers_drop_key") == drop_key_from_value(doc["value"]):
+        return max(0, int(doc.get("subscribers_count", 0) or 0))
+    return await reconcile_subscribers_count(db, doc)
 
 
 def subscriber_out(subscription: dict, user: Optional[dict]) -> DropSubscriberOut:
@@ -51,7 +79,7 @@ async def doc_to_out(db, doc: dict) -> DropCountdownOut:
         is_released=datetime.utcnow() >= launch_at,
         notification_sent_at=doc.get("notification_sent_at"),
         notification_recipients_count=doc.get("notification_recipients_count", 0),
-        subscribers_count=await subscribers_count(db, value),
+        subscribers_count=await subscribers_count(db, doc),
     )
 
 
@@ -80,7 +108,7 @@ async def get_notification_status(db, current_user) -> DropNotificationStatus:
     return DropNotificationStatus(
         drop_key=drop_key,
         is_subscribed=subscription is not None,
-        subscribers_count=await subscribers_count(db, doc["value"]),
+        subscribers_count=await subscribers_count(db, doc),
     )
 
 
@@ -95,7 +123,11 @@ async def subscribe_notification(db, request: Request, current_user) -> DropNoti
 
     drop_key = drop_key_from_value(doc["value"])
     user_id = str(current_user["_id"])
-    await countdown_crud.upsert_subscription(db, drop_key, user_id, current_user["email"], datetime.utcnow())
+    await countdown_crud.upsert_subscription(
+        db, drop_key, user_id, current_user["email"], datetime.utcnow(), full_name=current_user.get("full_name")
+    )
+    await invalidate_storefront_bootstrap(db)
+    updated = await countdown_crud.find_drop_doc(db)
     await track_event(
         db,
         "notify_me_clicked",
@@ -110,7 +142,7 @@ async def subscribe_notification(db, request: Request, current_user) -> DropNoti
     return DropNotificationStatus(
         drop_key=drop_key,
         is_subscribed=True,
-        subscribers_count=await subscribers_count(db, doc["value"]),
+        subscribers_count=await subscribers_count(db, updated),
     )
 
 
@@ -121,63 +153,60 @@ async def unsubscribe_notification(db, current_user) -> DropNotificationStatus:
 
     drop_key = drop_key_from_value(doc["value"])
     await countdown_crud.delete_subscription(db, drop_key, str(current_user["_id"]))
+    await invalidate_storefront_bootstrap(db)
+    updated = await countdown_crud.find_drop_doc(db)
     return DropNotificationStatus(
         drop_key=drop_key,
         is_subscribed=False,
-        subscribers_count=await subscribers_count(db, doc["value"]),
+        subscribers_count=await subscribers_count(db, updated),
     )
 
 
-async def list_subscribers(db, page: int, page_size: int, q: Optional[str], current_drop_only: bool) -> DropSubscribersPage:
+async def list_subscribers(db, pagination: PaginationParams, q: Optional[str], current_drop_only: bool) -> DropSubscribersPage:
+    """
+    Abonnes tries par date d'inscription (pagination par curseur); la
+    recherche est un prefixe (indexe) sur l'email et le nom copies en
+    minuscules sur l'abonnement, seuls les utilisateurs de la page sont charges.
+    """
     filters = {}
     drop_key = None
 
     if current_drop_only:
         doc = await countdown_crud.find_drop_doc(db)
         if not doc:
-            return DropSubscribersPage(items=[], total=0, page=page, page_size=page_size, pages=0)
+            return DropSubscribersPage(items=[], total=0, page=pagination.page, page_size=pagination.page_size, pages=0)
         drop_key = drop_key_from_value(doc["value"])
         filters["drop_key"] = drop_key
 
-    if q:
-        user_filters = {
-            "$or": [
-                {"email": {"$regex": q, "$options": "i"}},
-                {"full_name": {"$regex": q, "$options": "i"}},
-            ]
-        }
-        matching_users = await countdown_crud.list_matching_user_ids(db, user_filters, limit=5000)
-        matching_user_ids = [str(user["_id"]) for user in matching_users]
+    if q and q.strip():
+        prefix = f"^{re.escape(q.strip().lower())}"
         filters["$or"] = [
-            {"email": {"$regex": q, "$options": "i"}},
-            {"user_id": {"$in": matching_user_ids}},
+            {"email_lower": {"$regex": prefix}},
+            {"full_name_lower": {"$regex": prefix}},
         ]
 
-    skip = (page - 1) * page_size
-    total = await countdown_crud.count_subscribers(db, filters)
-    subscriptions = await countdown_crud.list_subscribers(db, filters, skip, page_size)
-
-    user_ids = []
-    for subscription in subscriptions:
-        try:
-            user_ids.append(ObjectId(subscription["user_id"]))
-        except Exception:
-            continue
+    subscriptions, window = await countdown_crud.paginate_subscribers(db, filters, pagination)
 
-    users = await countdown_crud.list_users_by_ids(db, user_ids)
+    user_ids = [
+        ObjectId(subscription["user_id"])
+        for subscription in subscriptions
+        if ObjectId.is_valid(subscription.get("user_id"))
+    ]
+    users = await countdown_crud.list_users_by_ids(db, user_ids) if user_ids else []
     users_by_id = {str(user["_id"]): user for user in users}
     items = [
         subscriber_out(subscription, users_by_id.get(subscription["user_id"]))
         for subscription in subscriptions
     ]
 
+    total = window["total"]
     return DropSubscribersPage(
         items=items,
-        total=total,
-        page=page,
-        page_size=page_size,
-        pages=(total + page_size - 1) // page_size,
+        page=pagination.page,
+        page_size=pagination.page_size,
+        pages=(total + pagination.page_size - 1) // pagination.page_size,
         drop_key=drop_key,
+        **window,
     )
 
 
@@ -203,14 +232,18 @@ async def update_drop_countdown(db, payload) -> DropCountdownOut:
         "$setOnInsert": {"created_at": now},
     }
     if reset_notification:
+        # Nouvelle generation d'envoi: les livraisons deja "sent" ne bloquent plus le renvoi.
+        update["$set"]["notification_generation"] = now.isoformat()
         update["$unset"] = {
             "notification_sent_at": "",
             "notification_claimed_at": "",
             "notification_status": "",
             "notification_recipients_count": "",
             "notification_failures_count": "",
+            "notification_checkpoint_id": "",
         }
 
     await countdown_crud.save_drop_countdown(db, update)
+    await publish_storefront_bootstrap(db)
     updated = await countdown_crud.find_drop_doc(db)
     return await doc_to_out(db, updated)
@@ -1,55 +1,79 @@
-from typing import Optional
+from typing import Any, Dict, Iterable, List, Optional
 
+from bson import ObjectId
 from fastapi import HTTPException, status
 
+from app.core.pagination import PaginationParams
 from app.crud import review as review_crud
+from app.crud import users as users_crud
 from app.crud import vlog as vlog_crud
 from app.schemas.review import PaginatedReviewsOut, ReviewOut
 from app.schemas.vlog import PaginatedVlogCommentsOut, VlogCommentOut
+from app.services.services_cms.vlog_cache import invalidate_vlog
 from app.services.services_cms.vlog_service import now_utc, validate_object_id
+from app.services.services_store.catalog_cache import invalidate_catalog
+from app.services.services_store.product_summaries import display_name, load_product_summaries
+
+
+def author_name(user: Optional[Dict[str, Any]]) -> str:
+    return (user or {}).get("full_name") or (user or {}).get("email") or "Utilisateur"
+
+
+async def load_authors(db, user_ids: Iterable[Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Auteurs (full_name, email) d'une page entiere en une requete `$in`,
+    indexes par identifiant texte; les identifiants invalides sont ignores.
+    """
+    wanted = {str(user_id) for user_id in user_ids if user_id is not None}
+    object_ids = [ObjectId(user_id) for user_id in wanted if ObjectId.is_valid(user_id)]
+    return {str(user["_id"]): user for user in await users_crud.find_user_authors(db, object_ids)}
+
+
+async def comments_out(db, docs: List[Dict[str, Any]]) -> List[VlogCommentOut]:
+    authors = await load_authors(db, [doc["user_id"] for doc in docs])
+    episode_ids = list({doc["episode_id"] for doc in docs})
+    episodes = {episode["_id"]: episode for episode in await vlog_crud.find_episode_titles(db, episode_ids)}
+    return [
+        VlogCommentOut(
+            id=str(doc["_id"]),
+            episode_id=str(doc["episode_id"]),
+            user_id=str(doc["user_id"]),
+            content=doc["content"],
+            status=doc.get("status", "visible"),
+            author=author_name(authors.get(str(doc["user_id"]))),
+            episode_title=(episodes.get(doc["episode_id"]) or {}).get("title"),
+            created_at=doc["created_at"],
+            updated_at=doc["updated_at"],
+        )
+        for doc in docs
+    ]
 
 
 async def comment_out(db, doc) -> VlogCommentOut:
-    user = await vlog_crud.find_user_summary(db, doc["user_id"])
-    episode = await vlog_crud.find_episode_summary(db, doc["episode_id"])
-    return VlogCommentOut(
-        id=str(doc["_id"]),
-        episode_id=str(doc["episode_id"]),
-        user_id=str(doc["user_id"]),
-        content=doc["content"],
-        status=doc.get("status", "visible"),
-        author=(user or {}).get("full_name") or (user or {}).get("email") or "Utilisateur",
-        episode_title=(episode or {}).get("title"),
-        created_at=doc["created_at"],
-        updated_at=doc["updated_at"],
-    )
+    return (await comments_out(db, [doc]))[0]
+
+
+async def reviews_out(db, docs: List[Dict[str, Any]]) -> List[ReviewOut]:
+    authors = await load_authors(db, [doc.get("user_id") for doc in docs])
+    products = await load_product_summaries(db, [doc.get("product_id") for doc in docs])
+    items = []
+    for doc in docs:
+        payload = {k: v for k, v in doc.items() if k != "_id"}
+        payload["id"] = str(doc["_id"])
+        payload["status"] = payload.get("status", "visible")
+        payload["author"] = author_name(authors.get(str(doc.get("user_id"))))
+        payload["product_name"] = display_name(products.get(str(doc.get("product_id"))))
+        items.append(ReviewOut(**payload))
+    return items
 
 
 async def review_out(db, doc) -> ReviewOut:
-    user = None
-    try:
-        user = await review_crud.find_user_author(db, doc.get("user_id"))
-    except Exception:
-        user = None
-
-    product = None
-    try:
-        product = await review_crud.find_product_summary(db, doc.get("product_id"))
-    except Exception:
-        product = None
-
-    payload = {k: v for k, v in doc.items() if k != "_id"}
-    payload["id"] = str(doc["_id"])
-    payload["status"] = payload.get("status", "visible")
-    payload["author"] = (user or {}).get("full_name") or (user or {}).get("email") or "Utilisateur"
-    payload["product_name"] = (product or {}).get("full_name") or (product or {}).get("name")
-    return ReviewOut(**payload)
+    return (await reviews_out(db, [doc]))[0]
 
 
 async def list_comments(
     db,
-    page: int,
-    page_size: int,
+    pagination: PaginationParams,
     status_filter,
     episode_id: Optional[str],
     user_id: Optional[str],
@@ -65,22 +89,20 @@ async def list_comments(
     if q:
         filters["content"] = {"$regex": q, "$options": "i"}
 
-    skip = (page - 1) * page_size
-    total = await vlog_crud.count_comments(db, filters)
-    docs = await vlog_crud.list_comments(db, filters, skip, page_size)
+    docs, window = await vlog_crud.paginate_comments(db, filters, pagination)
+    total = window["total"]
     return PaginatedVlogCommentsOut(
-        items=[await comment_out(db, doc) for doc in docs],
-        total=total,
-        page=page,
-        page_size=page_size,
-        pages=(total + page_size - 1) // page_size,
+        items=await comments_out(db, docs),
+        page=pagination.page,
+        page_size=pagination.page_size,
+        pages=(total + pagination.page_size - 1) // pagination.page_size,
+        **window,
     )
 
 
 async def list_product_reviews(
     db,
-    page: int,
-    page_size: int,
+    pagination: PaginationParams,
     status_filter,
     product_id: Optional[str],
     user_id: Optional[str],
@@ -104,15 +126,14 @@ async def list_product_reviews(
             {"comment": {"$regex": q, "$options": "i"}},
         ]
 
-    skip = (page - 1) * page_size
-    total = await review_crud.count_reviews(db, filters)
-    docs = await review_crud.list_reviews_by_filters(db, filters, skip, page_size)
+    docs, window = await review_crud.paginate_reviews(db, filters, pagination)
+    total = window["total"]
     return PaginatedReviewsOut(
-        items=[await review_out(db, doc) for doc in docs],
-        total=total,
-        page=page,
-        page_size=page_size,
-        pages=(total + page_size - 1) // page_size,
+        items=await reviews_out(db, docs),
+        page=pagination.page,
+        page_size=pagination.page_size,
+        pages=(total + pagination.page_size - 1) // pagination.page_size,
+        **window,
     )
 
 
@@ -129,6 +150,8 @@ async def update_product_review(db, review_id: str, payload) -> ReviewOut:
         data["comment"] = data["comment"].strip()
     data["updated_at"] = now_utc()
     await review_crud.update_review_by_id(db, oid, data)
+    if existing.get("product_id"):
+        await invalidate_catalog(db, existing["product_id"])
     updated = await review_crud.find_review_by_id(db, oid)
     return await review_out(db, updated)
 
@@ -139,6 +162,8 @@ async def delete_product_review(db, review_id: str) -> None:
     if not existing:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Avis non trouve")
     await review_crud.delete_review_by_id(db, oid)
+    if existing.get("product_id"):
+        await invalidate_catalog(db, existing["product_id"])
 
 
 async def update_comment(db, comment_id: str, payload) -> VlogCommentOut:
@@ -154,6 +179,7 @@ async def update_comment(db, comment_id: str, payload) -> VlogCommentOut:
             raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, "Commentaire vide")
     data["updated_at"] = now_utc()
     await vlog_crud.update_comment(db, oid, data)
+    await invalidate_vlog(db)
     updated = await vlog_crud.find_comment_by_id(db, oid)
     return await comment_out(db, updated)
 
@@ -164,3 +190,4 @@ async def delete_comment(db, comment_id: str) -> None:
     if not existing:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Commentaire non trouve")
     await vlog_crud.delete_comment(db, oid)
+    await invalidate_vlog(db)
@@ -1,14 +1,20 @@
+from typing import Optional
+
 from fastapi import HTTPException, UploadFile, status
 
+from app.core.pagination import PaginationParams
 from app.crud import header_video as header_video_crud
+from app.crud import media_asset as media_asset_crud
 from app.schemas.header_video import HeaderVideoAsset, HeaderVideoConfig, HeaderVideoListOut, HeaderVideoUpdate, HeaderVideoUploadOut
 from app.services.services_cms.imagekit_video import (
+    HEADER_IMAGE_FOLDER,
+    HEADER_VIDEO_FOLDER,
     delete_header_video_from_imagekit,
-    list_header_images_from_imagekit,
-    list_header_videos_from_imagekit,
     upload_header_image_to_imagekit,
     upload_header_video_to_imagekit,
 )
+from app.services.services_cms.media_library import list_media_assets
+from app.services.services_cms.storefront_bootstrap import publish_storefront_bootstrap
 
 
 def doc_to_config(doc) -> HeaderVideoConfig:
@@ -25,15 +31,26 @@ async def get_header_video_config(db) -> HeaderVideoConfig:
 async def save_header_config(db, config: HeaderVideoConfig) -> HeaderVideoConfig:
     value = config.model_dump()
     await header_video_crud.save_header_video_config(db, value)
+    await publish_storefront_bootstrap(db)
     return HeaderVideoConfig(**value)
 
 
-async def list_header_videos(limit: int, skip: int) -> HeaderVideoListOut:
-    return HeaderVideoListOut(items=await list_header_videos_from_imagekit(limit=limit, skip=skip))
+async def list_header_media(db, kind: str, folder: str, pagination: PaginationParams, q: Optional[str]) -> HeaderVideoListOut:
+    docs, window = await list_media_assets(db, pagination, kind=kind, folder=folder, q=q)
+    return HeaderVideoListOut(
+        items=[HeaderVideoAsset(**doc) for doc in docs],
+        total=window["total"],
+        has_next=window["has_next"],
+        next_cursor=window["next_cursor"],
+    )
+
 
+async def list_header_videos(db, pagination: PaginationParams, q: Optional[str] = None) -> HeaderVideoListOut:
+    return await list_header_media(db, "video", HEADER_VIDEO_FOLDER, pagination, q)
 
-async def list_header_images(limit: int, skip: int) -> HeaderVideoListOut:
-    return HeaderVideoListOut(items=await list_header_images_from_imagekit(limit=limit, skip=skip))
+
+async def list_header_images(db, pagination: PaginationParams, q: Optional[str] = None) -> HeaderVideoListOut:
+    return await list_header_media(db, "image", HEADER_IMAGE_FOLDER, pagination, q)
 
 
 async def update_header_video(db, payload: HeaderVideoUpdate) -> HeaderVideoConfig:
@@ -41,7 +58,7 @@ async def update_header_video(db, payload: HeaderVideoUpdate) -> HeaderVideoConf
 
 
 async def upload_header_video(db, file: UploadFile, set_active: bool) -> HeaderVideoUploadOut:
-    asset = await upload_header_video_to_imagekit(file)
+    asset = await upload_header_video_to_imagekit(db, file)
     doc = await header_video_crud.find_header_video_doc(db)
     config = doc_to_config(doc) if doc else HeaderVideoConfig(video=asset)
     config.video = asset
@@ -51,7 +68,7 @@ async def upload_header_video(db, file: UploadFile, set_active: bool) -> HeaderV
 
 
 async def upload_header_image(db, file: UploadFile, set_active: bool) -> HeaderVideoUploadOut:
-    asset = await upload_header_image_to_imagekit(file)
+    asset = await upload_header_image_to_imagekit(db, file)
     doc = await header_video_crud.find_header_video_doc(db)
     if not doc:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, "Configurez d'abord une video hero")
@@ -68,11 +85,21 @@ async def select_header_image(db, image: HeaderVideoAsset) -> HeaderVideoConfig:
     return await save_header_config(db, config)
 
 
-async def delete_header_video(db, file_id: str) -> None:
+async def release_header_file(db, file_id: str, folder: str) -> None:
+    # Un fichier deduplique peut servir ailleurs: suppression a la derniere reference.
+    if await media_asset_crud.release_asset(db, file_id, folder) > 0:
+        return
     await delete_header_video_from_imagekit(file_id)
+    await media_asset_crud.delete_asset_by_file_id(db, file_id)
+
+
+async def delete_header_video(db, file_id: str) -> None:
+    await release_header_file(db, file_id, HEADER_VIDEO_FOLDER)
     await header_video_crud.delete_header_video_config_for_file(db, file_id)
+    await publish_storefront_bootstrap(db)
 
 
 async def delete_header_image(db, file_id: str) -> None:
-    await delete_header_video_from_imagekit(file_id)
+    await release_header_file(db, file_id, HEADER_IMAGE_FOLDER)
     await header_video_crud.unset_header_image_for_file(db, file_id)
+    await publish_storefront_bootstrap(db)
@@ -0,0 +1,292 @@
+import asyncio
+import hashlib
+import io
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from fastapi import HTTPException, UploadFile, status
+
+from app.config import settings
+
+logger = logging.getLogger("imagekit.upload")
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+ProgressCallback = Callable[[int, int], None]
+ChunkReader = Callable[[int], Awaitable[bytes]]
+
+
+class MultipartStream:
+    """
+    Corps multipart/form-data produit par blocs pour httpx. Le fichier est lu
+    via `read` (UploadFile.read passe par le threadpool quand le spool est
+    sur disque), jamais de lecture bloquante sur la boucle; chaque bloc
+    envoye est signale a `on_progress`.
+    """
+
+    def __init__(
+        self,
+        fields: Dict[str, str],
+        *,
+        file_name: str,
+        content_type: str,
+        size: int,
+        read: ChunkReader,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> None:
+        self.boundary = os.urandom(16).hex()
+        self.total = size
+        self.sent = 0
+        self._read = read
+        self._on_progress = on_progress
+        parts = [
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{_quote(name)}"\r\n\r\n{value}\r\n'
+            for name, value in fields.items()
+        ]
+        parts.append(
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="file"; filename="{_quote(file_name)}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        )
+        self._head = "".join(parts).encode("utf-8")
+        self._tail = f"\r\n--{self.boundary}--\r\n".encode("ascii")
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {
+            "Content-Type": f"multipart/form-data; boundary={self.boundary}",
+            "Content-Length": str(len(self._head) + self.total + len(self._tail)),
+        }
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        yield self._head
+        remaining = self.total
+        while remaining > 0:
+            chunk = await self._read(min(READ_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            self.sent += len(chunk)
+            if self._on_progress:
+                self._on_progress(self.sent, self.total)
+            yield chunk
+        yield self._tail
+
+
+def _quote(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
+
+
+def _bytes_reader(content: bytes) -> ChunkReader:
+    buffer = io.BytesIO(content)
+
+    async def read(size: int) -> bytes:
+        return buffer.read(size)
+
+    return read
+
+
+def log_progress(file_name: str) -> ProgressCallback:
+    last_step = -1
+
+    def report(sent: int, total: int) -> None:
+        nonlocal last_step
+        step = (sent * 10 // total) if total else 10
+        if step != last_step:
+            last_step = step
+            logger.debug("Upload %s: %s/%s octets", file_name, sent, total)
+
+    return report
+
+
+@dataclass(frozen=True)
+class InspectedUpload:
+    size: int
+    content_hash: str
+
+
+async def inspect_upload(file: UploadFile, max_bytes: int) -> InspectedUpload:
+    """
+    Parcourt le fichier spoole (memoire puis disque, cf. Starlette) par blocs
+    sans le charger en entier: taille bornee par `max_bytes` et empreinte
+    sha256 du contenu. Le fichier est rembobine pour l'envoi.
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise HTTPException(status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, "Fichier trop volumineux")
+    size = 0
+    digest = hashlib.sha256()
+    while True:
+        chunk = await file.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, "Fichier trop volumineux")
+        digest.update(chunk)
+    await file.seek(0)
+    return InspectedUpload(size=size, content_hash=digest.hexdigest())
+
+
+def asset_from_response(data: Dict[str, Any], content_type: Optional[str]) -> Dict[str, Any]:
+    return {
+        "file_id": data.get("fileId"),
+        "name": data.get("name"),
+        "url": data.get("url"),
+        "thumbnail_url": data.get("thumbnailUrl") or data.get("thumbnail"),
+        "file_path": data.get("filePath"),
+        "mime": data.get("mime") or content_type,
+        "size": data.get("size"),
+        "width": data.get("width"),
+        "height": data.get("height"),
+    }
+
+
+class ImageKitUploader:
+    """
+    Upload binaire multipart vers l'API ImageKit via un client httpx
+    asynchrone partage (pool de connexions), sans base64 ni thread.
+    """
+
+    def __init__(
+        self,
+        upload_url: str,
+        private_key: str,
+        *,
+        concurrency: int = 4,
+        timeout_seconds: float = 300.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self.upload_url = upload_url
+        self.private_key = private_key
+        self.concurrency = max(concurrency, 1)
+        self.timeout_seconds = timeout_seconds
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                auth=(self.private_key, ""),
+                timeout=httpx.Timeout(self.timeout_seconds, connect=10.0),
+                limits=httpx.Limits(max_connections=self.concurrency * 2, max_keepalive_connections=self.concurrency),
+                transport=self.transport,
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def upload(
+        self,
+        file: UploadFile,
+        *,
+        folder: str,
+        use_unique_file_name: bool,
+        max_bytes: int,
+        inspected: Optional[InspectedUpload] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> Dict[str, Any]:
+        inspected = inspected or await inspect_upload(file, max_bytes)
+        file_name = file.filename or "upload"
+        return await self._post(
+            file_name,
+            file.read,
+            inspected.size,
+            file.content_type,
+            folder=folder,
+            use_unique_file_name=use_unique_file_name,
+            on_progress=on_progress or log_progress(file_name),
+        )
+
+    async def upload_bytes(
+        self,
+        content: bytes,
+        *,
+        file_name: str,
+        folder: str,
+        content_type: str,
+        use_unique_file_name: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Upload d'un contenu deja en memoire (ex. derivees generees localement).
+        """
+        return await self._post(
+            file_name,
+            _bytes_reader(content),
+            len(content),
+            content_type,
+            folder=folder,
+            use_unique_file_name=use_unique_file_name,
+        )
+
+    async def _post(
+        self,
+        file_name: str,
+        read: ChunkReader,
+        size: int,
+        content_type: Optional[str],
+        *,
+        folder: str,
+        use_unique_file_name: bool,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> Dict[str, Any]:
+        body = MultipartStream(
+            {
+                "fileName": file_name,
+                "folder": folder,
+                "useUniqueFileName": "true" if use_unique_file_name else "false",
+            },
+            file_name=file_name,
+            content_type=content_type or "application/octet-stream",
+            size=size,
+            read=read,
+            on_progress=on_progress,
+        )
+        try:
+            response = await self._http().post(self.upload_url, content=body, headers=body.headers)
+        except httpx.HTTPError as e:
+            raise HTTPException(status.HTTP_502_BAD_GATEWAY, f"Echec de l'upload ImageKit : {e}")
+
+        if response.status_code >= 400:
+            try:
+                message = response.json().get("message")
+            except ValueError:
+                message = None
+            raise HTTPException(
+                status.HTTP_502_BAD_GATEWAY,
+                f"Echec de l'upload ImageKit : {message or response.status_code}",
+            )
+
+        asset = asset_from_response(response.json(), content_type)
+        if not asset["url"]:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, f"Aucune URL dans la reponse : {response.text}")
+        return asset
+
+    async def upload_many(
+        self,
+        files: List[UploadFile],
+        upload: Callable[[UploadFile], Awaitable[Any]],
+    ) -> List[Any]:
+        """
+        Lance `upload` sur chaque fichier, `concurrency` a la fois; l'ordre
+        des resultats suit celui des fichiers.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(file: UploadFile):
+            async with semaphore:
+                return await upload(file)
+
+        return list(await asyncio.gather(*(run(file) for file in files)))
+
+
+imagekit_uploader = ImageKitUploader(
+    settings.IMAGEKIT_UPLOAD_URL,
+    settings.imagekit_private_key.get_secret_value(),
+    concurrency=settings.IMAGEKIT_UPLOAD_CONCURRENCY,
+    timeout_seconds=settings.IMAGEKIT_UPLOAD_TIMEOUT_SECONDS,
+)
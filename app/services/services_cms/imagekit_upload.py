@@ -1,43 +1,25 @@
-import io
-import base64
-from fastapi import UploadFile, HTTPException, status
-from fastapi.concurrency import run_in_threadpool
-from imagekitio.models.UploadFileRequestOptions import UploadFileRequestOptions
-from imagekitio.models.results.UploadFileResult import UploadFileResult
-from .imagekit_client import ik
-
-async def upload_to_imagekit(file: UploadFile) -> str:
-    # Vérif MIME
-    if not file.content_type.startswith("image/"):
-        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Le fichier doit être une image")
+from typing import Any, Dict, List
 
-    # Lecture brute du binaire
-    file_bytes = await file.read()
-
-    # Encodage Base64 (le paramètre file accepte URL/Base64/Binary) :contentReference[oaicite:0]{index=0}
-    file_base64 = base64.b64encode(file_bytes).decode("ascii")
+from fastapi import UploadFile, HTTPException, status
 
-    opts = UploadFileRequestOptions(folder="uploads", use_unique_file_name=False)
+from app.config import settings
+from .imagekit_streaming import imagekit_uploader
+from .media_pipeline import store_media
 
-    def do_upload():
-        # on passe la chaîne Base64
-        return ik.upload_file(
-            file=file_base64,
-            file_name=file.filename,
-            options=opts
-        )
 
-    try:
-        res = await run_in_threadpool(do_upload)
-    except Exception as e:
-        raise HTTPException(status.HTTP_502_BAD_GATEWAY, f"Échec de l’upload ImageKit : {e}")
+async def upload_to_imagekit(db, file: UploadFile) -> Dict[str, Any]:
+    # Vérif MIME
+    if not file.content_type or not file.content_type.startswith("image/"):
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Le fichier doit être une image")
 
-    # Extraction de l’URL
-    if not isinstance(res, UploadFileResult):
-        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, f"Réponse inattendue : {res!r}")
+    # Envoi binaire en flux, dédupliqué par empreinte (plus d'écrasement par nom)
+    return await store_media(
+        db,
+        file,
+        folder="uploads",
+        max_bytes=settings.MEDIA_IMAGE_MAX_BYTES,
+    )
 
-    url = getattr(res, "url", None)
-    if not url:
-        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, f"Aucune URL dans la réponse : {res!r}")
 
-    return url
+async def upload_many_to_imagekit(db, files: List[UploadFile]) -> List[Dict[str, Any]]:
+    return await imagekit_uploader.upload_many(files, lambda file: upload_to_imagekit(db, file))
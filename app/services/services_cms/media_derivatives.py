@@ -0,0 +1,52 @@
+import asyncio
+import io
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Optional
+
+from PIL import Image, ImageOps
+
+from app.config import settings
+
+WEBP_QUALITY = 80
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def render_webp_derivatives(content: bytes, widths: Iterable[int]) -> Dict[int, bytes]:
+    """
+    Une WebP par largeur demandee, strictement plus etroite que l'original
+    (jamais d'agrandissement). Execute dans le pool de processus.
+    """
+    with Image.open(io.BytesIO(content)) as source:
+        image = ImageOps.exif_transpose(source)
+        has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+        image = image.convert("RGBA" if has_alpha else "RGB")
+        derivatives: Dict[int, bytes] = {}
+        for width in sorted(set(widths)):
+            if width <= 0 or width >= image.width:
+                continue
+            height = max(1, round(image.height * width / image.width))
+            buffer = io.BytesIO()
+            image.resize((width, height), Image.Resampling.LANCZOS).save(buffer, "WEBP", quality=WEBP_QUALITY)
+            derivatives[width] = buffer.getvalue()
+        return derivatives
+
+
+def _pool() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.MEDIA_DERIVATIVE_WORKERS)
+    return _executor
+
+
+async def generate_webp_derivatives(content: bytes, widths: Iterable[int]) -> Dict[int, bytes]:
+    # Decodage et redimensionnement hors de la boucle asyncio et hors du GIL.
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_pool(), render_webp_derivatives, content, tuple(widths))
+
+
+def shutdown_derivative_pool() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from imagekitio.models.ListAndSearchFileRequestOptions import ListAndSearchFileRequestOptions
+from imagekitio.models.results.ListFileResult import ListFileResult
+
+from app.config import settings
+from app.core.pagination import PaginationParams
+from app.crud import media_asset as media_asset_crud
+from app.db import db
+
+from .imagekit_client import ik
+from .imagekit_media import VLOG_MEDIA_FOLDERS
+from .imagekit_video import HEADER_IMAGE_FOLDER, HEADER_VIDEO_FOLDER
+from .media_pipeline import media_kind
+
+logger = logging.getLogger("media_library")
+
+LIST_PAGE_SIZE = 1000
+# Dossiers servis par les selecteurs de medias admin.
+RECONCILED_FOLDERS = (HEADER_VIDEO_FOLDER, HEADER_IMAGE_FOLDER, *sorted(set(VLOG_MEDIA_FOLDERS.values())))
+
+
+def media_filters(kind: Optional[str] = None, folder: Optional[str] = None, q: Optional[str] = None) -> Dict[str, Any]:
+    filters: Dict[str, Any] = {}
+    if kind:
+        filters["kind"] = kind
+    if folder:
+        # Fichiers du dossier et fichiers partages avec lui (deduplication).
+        filters["$or"] = [{"folder": folder}, {"shared_folders": folder}]
+    if q:
+        filters["name"] = {"$regex": re.escape(q.strip()), "$options": "i"}
+    return filters
+
+
+async def list_media_assets(
+    database,
+    pagination: PaginationParams,
+    *,
+    kind: Optional[str] = None,
+    folder: Optional[str] = None,
+    q: Optional[str] = None,
+):
+    """
+    Selecteur de medias servi par l'index local `media_assets` (aucun appel
+    ImageKit); pagination par curseur sur created_at.
+    """
+    return await media_asset_crud.paginate_assets(database, media_filters(kind, folder, q), pagination)
+
+
+def asset_from_listing(item: Any, folder: str) -> Dict[str, Any]:
+    name = getattr(item, "name", None)
+    mime = getattr(item, "mime", None)
+    created_at = getattr(item, "created_at", None)
+    if isinstance(created_at, str):
+        try:
+            created_at = datetime.fromisoformat(created_at.replace("Z", "+00:00")).replace(tzinfo=None)
+        except ValueError:
+            created_at = None
+    return {
+        "file_id": getattr(item, "file_id", None),
+        "name": name,
+        "url": getattr(item, "url", None),
+        "thumbnail_url": getattr(item, "thumbnail", None) or getattr(item, "thumbnail_url", None),
+        "file_path": getattr(item, "file_path", None),
+        "mime": mime,
+        "size": getattr(item, "size", None),
+        "width": getattr(item, "width", None),
+        "height": getattr(item, "height", None),
+        "folder": folder,
+        "kind": media_kind(mime, name),
+        "created_at": created_at,
+    }
+
+
+async def list_remote_folder(folder: str) -> List[Dict[str, Any]]:
+    assets: List[Dict[str, Any]] = []
+    skip = 0
+    while True:
+        opts = ListAndSearchFileRequestOptions(
+            type="file",
+            sort="DESC_CREATED",
+            path=folder,
+            file_type="all",
+            limit=LIST_PAGE_SIZE,
+            skip=skip,
+        )
+        res = await run_in_threadpool(lambda: ik.list_files(options=opts))
+        if not isinstance(res, ListFileResult):
+            raise RuntimeError(f"Reponse inattendue : {res!r}")
+        items = res.list or []
+        assets.extend(asset for asset in (asset_from_listing(item, folder) for item in items) if asset["url"])
+        if len(items) < LIST_PAGE_SIZE:
+            return assets
+        skip += LIST_PAGE_SIZE
+
+
+async def reconcile_folder(database, folder: str) -> Dict[str, int]:
+    started_at = datetime.utcnow()
+    assets = await list_remote_folder(folder)
+    await media_asset_crud.upsert_reconciled_assets(database, assets, started_at)
+    removed = await media_asset_crud.delete_stale_assets(database, folder, started_at)
+    return {"listed": len(assets), "removed": removed}
+
+
+async def reconcile_media_assets(database) -> Dict[str, Dict[str, int]]:
+    """
+    Aligne l'index local sur ImageKit, dossier par dossier; un dossier en
+    echec garde son index precedent.
+    """
+    report = {}
+    for folder in RECONCILED_FOLDERS:
+        try:
+            report[folder] = await reconcile_folder(database, folder)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Media reconcile failed for %s", folder)
+    return report
+
+
+async def media_reconcile_loop() -> None:
+    while True:
+        try:
+            await reconcile_media_assets(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Media reconcile failed")
+        await asyncio.sleep(settings.MEDIA_RECONCILE_INTERVAL_SECONDS)
+
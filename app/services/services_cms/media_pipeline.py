@@ -0,0 +1,127 @@
+import asyncio
+import logging
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, Optional
+
+from fastapi import UploadFile
+
+from app.config import settings
+from app.crud import media_asset as media_asset_crud
+from app.crud import vlog as vlog_crud
+
+from .imagekit_streaming import imagekit_uploader, inspect_upload
+from .media_derivatives import generate_webp_derivatives
+
+logger = logging.getLogger("media_pipeline")
+
+ASSET_FIELDS = ("file_id", "name", "url", "thumbnail_url", "file_path", "mime", "size", "width", "height", "content_hash", "derivatives")
+# Sous-dossier des derivees: hors du listing du dossier, donc hors reconciliation.
+DERIVATIVES_SUBFOLDER = "derivatives"
+
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
+VIDEO_EXTENSIONS = {".mp4", ".webm", ".mov", ".m4v", ".avi", ".mkv"}
+
+
+def media_kind(mime: Optional[str], name: Optional[str] = None) -> str:
+    if mime and mime.startswith("video/"):
+        return "video"
+    if mime and mime.startswith("image/"):
+        return "image"
+    suffix = Path(name or "").suffix.lower()
+    if suffix in VIDEO_EXTENSIONS:
+        return "video"
+    if suffix in IMAGE_EXTENSIONS:
+        return "image"
+    return "file"
+
+
+def asset_out(doc: Dict[str, Any]) -> Dict[str, Any]:
+    asset = {field: doc.get(field) for field in ASSET_FIELDS}
+    asset["derivatives"] = asset["derivatives"] or {}
+    return asset
+
+
+async def upload_derivatives(file: UploadFile, folder: str) -> Dict[str, str]:
+    """
+    Genere les largeurs configurees en WebP et les envoie a cote de l'original:
+    le storefront sert ces fichiers sans transformation ImageKit. Retourne
+    {largeur: url}; vide si l'image ne peut pas etre decodee.
+    """
+    await file.seek(0)
+    content = await file.read()
+    try:
+        rendered = await generate_webp_derivatives(content, settings.MEDIA_DERIVATIVE_WIDTHS)
+    except Exception:
+        logger.exception("Derivative generation failed for %s", file.filename)
+        return {}
+    stem = Path(file.filename or "image").stem
+    widths = sorted(rendered)
+    uploads = await asyncio.gather(
+        *(
+            imagekit_uploader.upload_bytes(
+                rendered[width],
+                file_name=f"{stem}-{width}w.webp",
+                folder=f"{folder.rstrip('/')}/{DERIVATIVES_SUBFOLDER}",
+                content_type="image/webp",
+            )
+            for width in widths
+        )
+    )
+    return {str(width): uploaded["url"] for width, uploaded in zip(widths, uploads)}
+
+
+async def find_existing_asset(db, content_hash: str, folder: str) -> Optional[Dict[str, Any]]:
+    """
+    Meme contenu deja dans le dossier, sinon deja connu ailleurs (media_assets
+    ou vlog_media): le fichier est alors partage et compte une reference de
+    plus, une suppression ne le retire d'ImageKit qu'a la derniere reference.
+    """
+    existing = await media_asset_crud.find_asset_by_hash(db, content_hash, folder)
+    if existing:
+        return existing
+    shared = await media_asset_crud.find_asset_by_hash(db, content_hash)
+    if shared is None:
+        media = await vlog_crud.find_media_by_hash(db, content_hash)
+        if media is None:
+            return None
+        # Fichier enregistre par upload direct: indexe avec sa reference vlog.
+        shared = await media_asset_crud.save_asset(db, {
+            **{field: media.get(field) for field in ASSET_FIELDS if field != "derivatives"},
+            "folder": str(PurePosixPath(media["file_path"]).parent) if media.get("file_path") else None,
+            "kind": media_kind(media.get("mime"), media.get("name")),
+        })
+    return await media_asset_crud.share_asset(db, shared["file_id"], folder)
+
+
+async def store_media(
+    db,
+    file: UploadFile,
+    *,
+    folder: str,
+    max_bytes: int,
+    use_unique_file_name: bool = True,
+) -> Dict[str, Any]:
+    """
+    Upload d'un media avec deduplication par empreinte: un contenu deja
+    connu n'est pas renvoye a ImageKit (cf. find_existing_asset). Les images
+    recoivent leurs dimensions et leurs derivees WebP.
+    """
+    inspected = await inspect_upload(file, max_bytes)
+    existing = await find_existing_asset(db, inspected.content_hash, folder)
+    if existing and existing.get("url"):
+        return asset_out(existing)
+
+    asset = await imagekit_uploader.upload(
+        file,
+        folder=folder,
+        use_unique_file_name=use_unique_file_name,
+        max_bytes=max_bytes,
+        inspected=inspected,
+    )
+    asset["content_hash"] = inspected.content_hash
+    asset["size"] = asset.get("size") or inspected.size
+    kind = media_kind(asset.get("mime"), asset.get("name"))
+    asset["derivatives"] = await upload_derivatives(file, folder) if kind == "image" else {}
+    await media_asset_crud.save_asset(db, {**asset, "folder": folder, "kind": kind})
+    return asset
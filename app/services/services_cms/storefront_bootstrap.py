@@ -0,0 +1,123 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from bson import Binary
+from fastapi import HTTPException
+
+from app.core.versioned_cache import CachedPayload, bump_version, current_version
+from app.crud import header_video as header_video_crud
+from app.schemas.header_video import HeaderVideoConfig
+from app.schemas.storefront_bootstrap import StorefrontBootstrapOut
+
+CMS_NAMESPACE = "cms"
+SNAPSHOT_COLLECTION = "cms_settings"
+SNAPSHOT_KEY = "storefront_bootstrap"
+
+
+@dataclass(frozen=True)
+class BootstrapSnapshot:
+    version: int
+    payload: CachedPayload
+    # Bascule horaire (lancement du drop) apres laquelle l'instantane est perime.
+    expires_at: Optional[datetime]
+
+    def fresh(self, version: int, now: datetime) -> bool:
+        return self.version == version and (self.expires_at is None or now < self.expires_at)
+
+
+_snapshot: Optional[BootstrapSnapshot] = None
+_lock = asyncio.Lock()
+
+
+async def build_bootstrap(db) -> tuple[bytes, Optional[datetime]]:
+    # Import tardif: ces services publient eux-memes l'instantane.
+    from app.services.services_cms.drop_countdown_service import get_active_storefront_drop
+    from app.services.services_cms.vlog_service import settings_out
+
+    now = datetime.utcnow()
+    header_doc = await header_video_crud.find_header_video_doc(db)
+    try:
+        drop = await get_active_storefront_drop(db)
+    except HTTPException:
+        drop = None
+    bundle = StorefrontBootstrapOut(
+        header_video=HeaderVideoConfig(**header_doc["value"]) if header_doc else None,
+        drop=drop,
+        vlog=await settings_out(db),
+        generated_at=now,
+    )
+    expires_at = drop.launch_at if drop and drop.launch_at > now else None
+    return bundle.model_dump_json().encode("utf-8"), expires_at
+
+
+async def _store_snapshot(db, version: int) -> BootstrapSnapshot:
+    global _snapshot
+    body, expires_at = await build_bootstrap(db)
+    snapshot = BootstrapSnapshot(version=version, payload=CachedPayload.from_body(body), expires_at=expires_at)
+    await db[SNAPSHOT_COLLECTION].update_one(
+        {"_id": SNAPSHOT_KEY},
+        {"$set": {
+            "version": version,
+            "body": Binary(body),
+            "etag": snapshot.payload.etag,
+            "expires_at": expires_at,
+            "updated_at": datetime.utcnow(),
+        }},
+        upsert=True,
+    )
+    _snapshot = snapshot
+    return snapshot
+
+
+async def publish_storefront_bootstrap(db) -> BootstrapSnapshot:
+    """
+    A appeler apres chaque ecriture CMS admin visible sur la vitrine
+    (header, drop, reglages vlog): reconstruit et stocke l'instantane.
+    """
+    version = await bump_version(db, CMS_NAMESPACE)
+    async with _lock:
+        return await _store_snapshot(db, version)
+
+
+async def invalidate_storefront_bootstrap(db) -> int:
+    """
+    Invalidation paresseuse (ecritures frequentes, ex. abonnements au drop):
+    l'instantane sera reconstruit a la prochaine lecture.
+    """
+    return await bump_version(db, CMS_NAMESPACE)
+
+
+async def read_storefront_bootstrap(db) -> CachedPayload:
+    """
+    Sert l'instantane depuis la memoire; apres une ecriture (autre worker
+    compris) il est relu depuis Mongo, et reconstruit seulement s'il manque
+    ou est perime.
+    """
+    version = await current_version(db, CMS_NAMESPACE)
+    now = datetime.utcnow()
+    if _snapshot and _snapshot.fresh(version, now):
+        return _snapshot.payload
+    async with _lock:
+        if _snapshot and _snapshot.fresh(version, now):
+            return _snapshot.payload
+        doc = await db[SNAPSHOT_COLLECTION].find_one({"_id": SNAPSHOT_KEY})
+        if doc and doc.get("version") == version and (doc.get("expires_at") is None or now < doc["expires_at"]):
+            return _remember(BootstrapSnapshot(
+                version=version,
+                payload=CachedPayload(body=bytes(doc["body"]), etag=doc["etag"]),
+                expires_at=doc.get("expires_at"),
+            )).payload
+        return (await _store_snapshot(db, version)).payload
+
+
+def _remember(snapshot: BootstrapSnapshot) -> BootstrapSnapshot:
+    global _snapshot
+    _snapshot = snapshot
+    return snapshot
+
+
+def forget_storefront_bootstrap() -> None:
+    global _snapshot
+    _snapshot = None
@@ -0,0 +1,16 @@
+from app.core.versioned_cache import VersionedResponseCache, bump_version
+
+
+VLOG_NAMESPACE = "vlog"
+VLOG_CACHE_SIZE = 128
+
+# Pages vlog anonymes deja serialisees, par version vlog (+ version catalogue dans la cle).
+vlog_page_cache = VersionedResponseCache(VLOG_NAMESPACE, max_entries=VLOG_CACHE_SIZE)
+
+
+async def invalidate_vlog(db) -> int:
+    """
+    A appeler apres toute ecriture visible sur la page vlog publique:
+    reglages, chapitres, episodes, likes et moderation des commentaires.
+    """
+    return await bump_version(db, VLOG_NAMESPACE)
@@ -0,0 +1,21 @@
+from app.core.publish_scheduler import ScheduleSource
+from app.crud import vlog as vlog_crud
+from app.services.services_cms.vlog_cache import invalidate_vlog
+
+
+EPISODE_SCHEDULE = "vlog_episodes"
+
+
+async def release_due_episodes(db, now) -> int:
+    """
+    Passe en "released" les episodes "coming_soon" programmes par un admin
+    (scheduled_release) dont la release_date est atteinte, puis invalide la
+    page vlog.
+    """
+    released = await vlog_crud.release_due_episodes(db, now)
+    if released:
+        await invalidate_vlog(db)
+    return released
+
+
+episode_schedule = ScheduleSource(EPISODE_SCHEDULE, vlog_crud.list_upcoming_episode_releases, release_due_episodes)
@@ -6,6 +6,7 @@ from bson import ObjectId
 from fastapi import HTTPException, status
 
 from app.crud import vlog as vlog_crud
+from app.services.services_store.product_summaries import load_product_summaries
 from app.schemas.vlog import (
     ProductSummary,
     VlogChapterOut,
@@ -60,58 +61,43 @@ def chapter_out(doc) -> VlogChapterOut:
     return VlogChapterOut(**payload)
 
 
-def first_product_image(product: Dict) -> Optional[str]:
-    for variant in product.get("variants", []):
-        for image in variant.get("images", []):
-            if isinstance(image, dict) and image.get("url"):
-                return image["url"]
-            if isinstance(image, str):
-                return image
-    return None
-
-
-async def product_summaries(db, product_ids: List[str]) -> List[ProductSummary]:
-    object_ids = []
-    for product_id in product_ids:
-        try:
-            object_ids.append(ObjectId(product_id))
-        except Exception:
-            continue
-    if not object_ids:
-        return []
-
-    docs = await vlog_crud.find_products_by_ids(db, object_ids)
-    by_id = {str(doc["_id"]): doc for doc in docs}
-    summaries = []
-    for product_id in product_ids:
-        doc = by_id.get(product_id)
-        if not doc:
-            continue
-        summaries.append(ProductSummary(
-            id=product_id,
-            name=doc["name"],
-            full_name=doc.get("full_name"),
-            price=doc["price"],
-            image_url=first_product_image(doc),
-            in_stock=doc.get("in_stock", True),
-        ))
-    return summaries
-
-
-async def episode_out(db, doc, current_user: Optional[Dict] = None) -> VlogEpisodeOut:
+def render_episode(doc, summaries: Dict[str, Dict], liked: bool = False) -> VlogEpisodeOut:
     payload = {k: v for k, v in doc.items() if k != "_id"}
     payload["id"] = str(doc["_id"])
     payload["chapter_id"] = str(payload["chapter_id"])
-    payload["products"] = await product_summaries(db, payload.get("linked_product_ids", []))
+    payload["products"] = [
+        ProductSummary(**summaries[str(product_id)])
+        for product_id in payload.get("linked_product_ids", [])
+        if str(product_id) in summaries
+    ]
     payload["view_count"] = int(payload.get("view_count", 0) or 0)
-    payload["like_count"] = await vlog_crud.count_episode_likes(db, doc["_id"])
-    payload["comment_count"] = await vlog_crud.count_visible_episode_comments(db, doc["_id"])
-    payload["liked_by_current_user"] = False
-    if current_user:
-        payload["liked_by_current_user"] = await vlog_crud.find_episode_like(db, doc["_id"], current_user["_id"]) is not None
+    payload["like_count"] = max(int(payload.get("like_count", 0) or 0), 0)
+    payload["comment_count"] = max(int(payload.get("comment_count", 0) or 0), 0)
+    payload["liked_by_current_user"] = liked
     return VlogEpisodeOut(**payload)
 
 
+async def render_episodes(db, docs: List[Dict], current_user: Optional[Dict] = None) -> List[VlogEpisodeOut]:
+    """
+    Episodes avec une requete produits `$in` et une requete likes pour tout le
+    lot; les compteurs viennent des champs like_count / comment_count.
+    """
+    if not docs:
+        return []
+    summaries = await load_product_summaries(
+        db,
+        [product_id for doc in docs for product_id in doc.get("linked_product_ids", [])],
+    )
+    liked = set()
+    if current_user:
+        liked = await vlog_crud.list_liked_episode_ids(db, [doc["_id"] for doc in docs], current_user["_id"])
+    return [render_episode(doc, summaries, doc["_id"] in liked) for doc in docs]
+
+
+async def episode_out(db, doc, current_user: Optional[Dict] = None) -> VlogEpisodeOut:
+    return (await render_episodes(db, [doc], current_user=current_user))[0]
+
+
 async def settings_out(db) -> VlogSettingsOut:
     doc = await vlog_crud.find_vlog_settings(db)
     if not doc:
@@ -119,11 +105,36 @@ async def settings_out(db) -> VlogSettingsOut:
     return VlogSettingsOut(**doc["value"], updated_at=doc.get("updated_at"))
 
 
+async def chapters_with_episodes(
+    db,
+    chapter_docs: List[Dict],
+    public_only: bool,
+    current_user: Optional[Dict] = None,
+) -> List[VlogChapterWithEpisodesOut]:
+    """
+    Assemble une page de chapitres: une requete episodes pour tous les
+    chapitres, puis un seul rendu groupe (produits, likes).
+    """
+    if not chapter_docs:
+        return []
+    statuses = PUBLIC_EPISODE_STATUSES if public_only else None
+    episode_docs = await vlog_crud.list_episodes_for_chapters(db, [chapter["_id"] for chapter in chapter_docs], statuses)
+    by_chapter: Dict[ObjectId, List[Dict]] = {}
+    for episode in episode_docs:
+        # Meme plafond que l'ancienne lecture chapitre par chapitre.
+        episodes = by_chapter.setdefault(episode["chapter_id"], [])
+        if len(episodes) < 50:
+            episodes.append(episode)
+    kept = [episode for chapter in chapter_docs for episode in by_chapter.get(chapter["_id"], [])]
+    rendered = iter(await render_episodes(db, kept, current_user=current_user))
+
+    chapters = []
+    for chapter_doc in chapter_docs:
+        chapter = chapter_out(chapter_doc).model_dump()
+        chapter["episodes"] = [next(rendered) for _ in by_chapter.get(chapter_doc["_id"], [])]
+        chapters.append(VlogChapterWithEpisodesOut(**chapter))
+    return chapters
+
+
 async def chapter_with_episodes(db, chapter_doc, public_only: bool, current_user: Optional[Dict] = None) -> VlogChapterWithEpisodesOut:
-    chapter = chapter_out(chapter_doc).model_dump()
-    episode_filter = {"chapter_id": chapter_doc["_id"]}
-    if public_only:
-        episode_filter["status"] = {"$in": PUBLIC_EPISODE_STATUSES}
-    episode_docs = await vlog_crud.list_chapter_episodes(db, episode_filter, limit=50)
-    chapter["episodes"] = [await episode_out(db, episode, current_user=current_user) for episode in episode_docs]
-    return VlogChapterWithEpisodesOut(**chapter)
+    return (await chapters_with_episodes(db, [chapter_doc], public_only, current_user=current_user))[0]
@@ -8,12 +8,12 @@ from app.core.pagination import build_page
 from app.crud.admin import get_by_email
 from app.schemas.notification import NotificationUnreadCount
 from app.services.services_erp.notification_service import (
-    count_notifications,
     create_notification,
     list_notifications,
     mark_all_notifications_read,
     mark_notification_read,
     notification_manager,
+    unread_notifications_count,
 )
 
 
@@ -23,9 +23,9 @@ def admin_id(admin) -> str:
 
 def status_filter(status_filter: Literal["unread", "read", "all"], admin_id_value: str) -> dict:
     if status_filter == "unread":
-        return {"read_by_admin_ids": {"$ne": admin_id_value}}
+        return {"is_read": False}
     if status_filter == "read":
-        return {"read_by_admin_ids": admin_id_value}
+        return {"is_read": True}
     return {}
 
 
@@ -36,21 +36,19 @@ async def list_page(db, current_admin, pagination, status_value, category: Optio
         filters["category"] = category
     if priority:
         filters["priority"] = priority
-    items = await list_notifications(db, admin_id=current_admin_id, filters=filters, skip=pagination.skip, limit=pagination.page_size)
-    total = await count_notifications(db, admin_id=current_admin_id, filters=filters)
+    items, window = await list_notifications(db, admin_id=current_admin_id, filters=filters, pagination=pagination)
     return build_page(
         items=items,
-        total=total,
         page=pagination.page,
         page_size=pagination.page_size,
         sort={"by": "created_at", "dir": "desc"},
         filters={"status": status_value, "category": category, "priority": priority},
+        **window,
     )
 
 
 async def unread_count(db, current_admin):
-    current_admin_id = admin_id(current_admin)
-    total = await count_notifications(db, admin_id=current_admin_id, filters={"read_by_admin_ids": {"$ne": current_admin_id}})
+    total = await unread_notifications_count(db, admin_id=admin_id(current_admin))
     return NotificationUnreadCount(unread_count=total)
 
 
@@ -4,6 +4,7 @@ from typing import Optional
 from bson import ObjectId
 from fastapi import HTTPException, status
 
+from app.core.pagination import PaginationParams
 from app.crud import order as order_crud
 from app.services.services_store import order_domain_service
 
@@ -15,7 +16,7 @@ def parse_oid(order_id: str) -> ObjectId:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, "ID de commande invalide")
 
 
-async def list_orders(db, page: int, page_size: int, status_value: Optional[str], email: Optional[str], date_from: Optional[str], date_to: Optional[str], sort_by: str, sort_dir: str):
+async def list_orders(db, pagination: PaginationParams, status_value: Optional[str], email: Optional[str], date_from: Optional[str], date_to: Optional[str], sort_by: str, sort_dir: str):
     filters = {}
     if status_value:
         filters["status"] = status_value
@@ -36,19 +37,18 @@ async def list_orders(db, page: int, page_size: int, status_value: Optional[str]
         if created_q:
             filters["created_at"] = created_q
 
-    skip = (page - 1) * page_size
     direction = -1 if sort_dir == "desc" else 1
     sort_field = "created_at" if sort_by == "created_at" else sort_by
-    items = await order_crud.list_orders(db, filters, skip, page_size, (sort_field, direction))
-    total = await order_crud.count_orders(db, filters)
+    items, window = await order_crud.paginate_orders(db, filters, pagination, (sort_field, direction))
+    total = window["total"]
     return {
         "items": items,
-        "total": total,
-        "page": page,
-        "page_size": page_size,
-        "pages": (total + page_size - 1) // page_size,
+        "page": pagination.page,
+        "page_size": pagination.page_size,
+        "pages": (total + pagination.page_size - 1) // pagination.page_size,
         "sort": {"by": sort_field, "dir": sort_dir},
         "filters": filters,
+        **window,
     }
 
 
@@ -2,6 +2,7 @@ from bson import ObjectId
 from fastapi import HTTPException, status
 
 from app.crud import product as product_crud
+from app.services.services_store.catalog_cache import invalidate_catalog
 from app.services.services_store.product_service import product_to_out
 
 
@@ -14,6 +15,7 @@ def validate_product_id(product_id: str) -> None:
 
 async def create_product(db, product):
     created = await product_crud.create_product(db, product)
+    await invalidate_catalog(db, created["_id"])
     return product_to_out(created)
 
 
@@ -25,6 +27,7 @@ async def update_product(db, product_id: str, product):
     updated = await product_crud.update_product(db, product_id, product)
     if not updated:
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Echec lors de la mise a jour")
+    await invalidate_catalog(db, product_id)
     return product_to_out(updated)
 
 
@@ -34,3 +37,4 @@ async def delete_product(db, product_id: str) -> None:
     if not product:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Produit non trouve")
     await product_crud.delete_product(db, product_id)
+    await invalidate_catalog(db, product_id)
@@ -3,6 +3,7 @@ from typing import Optional
 from bson import ObjectId
 from fastapi import HTTPException, status
 
+from app.core.pagination import PaginationParams
 from app.crud import user_admin as user_crud
 
 
@@ -13,7 +14,7 @@ def parse_oid(value: str) -> ObjectId:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, "ID utilisateur invalide")
 
 
-async def list_users(db, page: int, page_size: int, q: Optional[str], is_active: Optional[bool], sort_by: str, sort_dir: str):
+async def list_users(db, pagination: PaginationParams, q: Optional[str], is_active: Optional[bool], sort_by: str, sort_dir: str):
     filters = {}
     if q:
         filters["$or"] = [
@@ -22,19 +23,18 @@ async def list_users(db, page: int, page_size: int, q: Optional[str], is_active:
         ]
     if is_active is not None:
         filters["is_active"] = is_active
-    skip = (page - 1) * page_size
     direction = -1 if sort_dir == "desc" else 1
     sort_field = "created_at" if sort_by == "created_at" else sort_by
-    items = await user_crud.list_users(db, filters, skip, page_size, (sort_field, direction))
-    total = await user_crud.count_users(db, filters)
+    items, window = await user_crud.paginate_users(db, filters, pagination, (sort_field, direction))
+    total = window["total"]
     return {
         "items": items,
-        "total": total,
-        "page": page,
-        "page_size": page_size,
-        "pages": (total + page_size - 1) // page_size,
+        "page": pagination.page,
+        "page_size": pagination.page_size,
+        "pages": (total + pagination.page_size - 1) // pagination.page_size,
         "sort": {"by": sort_field, "dir": sort_dir},
         "filters": filters,
+        **window,
     }
 
 
@@ -7,6 +7,7 @@ from app.domain.inventory import inventory_projection
 from app.schemas.variant import VariantInventoryOut
 from app.services.services_cms.imagekit_upload import upload_to_imagekit
 from app.services.services_erp.audit_service import log_action
+from app.services.services_store.catalog_cache import invalidate_catalog
 from app.services.services_store.product_service import product_to_out
 
 
@@ -30,6 +31,9 @@ async def create_variant(db, product_id: str, variant):
         for row in payload.get("sizes", [])
     ]
     created_variant = await variant_crud.add_variant(db, product_id, payload)
+    await product_crud.refresh_availability_summary(db, product_id)
+    await product_crud.refresh_search_facets(db, product_id)
+    await invalidate_catalog(db, product_id)
     product = await product_crud.get_product(db, product_id)
     if not product:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Produit introuvable")
@@ -70,6 +74,9 @@ async def rename_color(db, product_id: str, current_color: str, payload, admin):
         modified = await variant_crud.rename_variant_color(db, product_id, current_stored_color, new_color)
         if not modified:
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="La couleur n'a pas pu etre renommee")
+        await product_crud.refresh_availability_summary(db, product_id)
+        await product_crud.refresh_search_facets(db, product_id)
+        await invalidate_catalog(db, product_id)
 
     result = {**current_variant, "color": new_color, "sizes": [inventory_projection(dict(row)) for row in current_variant.get("sizes", [])]}
     await log_action(
@@ -103,6 +110,9 @@ async def add_size(db, product_id: str, color: str, payload, admin):
     modified = await variant_crud.add_size_to_variant(db, product_id, variant["color"], size_data)
     if not modified:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="La taille n'a pas pu etre ajoutee")
+    await product_crud.refresh_availability_summary(db, product_id)
+    await product_crud.refresh_search_facets(db, product_id)
+    await invalidate_catalog(db, product_id)
 
     result = {**variant, "sizes": [inventory_projection(dict(row)) for row in [*variant.get("sizes", []), size_data]]}
     await log_action(
@@ -121,14 +131,21 @@ async def update_stock(db, product_id: str, color: str, size: str, new_stock_on_
     modified = await variant_crud.update_variant_stock(db, parse_oid(product_id), color, size, new_stock_on_hand)
     if not modified:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Variante ou taille non trouvee")
+    await product_crud.refresh_availability_summary(db, product_id)
+    await invalidate_catalog(db, product_id)
 
 
 async def upload_variant_image(db, product_id: str, color: str, file: UploadFile):
-    url = await upload_to_imagekit(file)
-    return await variant_crud.add_image_to_variant(db, parse_oid(product_id), color, {"url": url})
+    asset = await upload_to_imagekit(db, file)
+    image_doc = {"url": asset["url"]}
+    image_doc.update({key: asset[key] for key in ("width", "height", "derivatives") if asset.get(key)})
+    image = await variant_crud.add_image_to_variant(db, parse_oid(product_id), color, image_doc)
+    await invalidate_catalog(db, product_id)
+    return image
 
 
 async def delete_variant_image(db, product_id: str, color: str, image_id: str):
     success = await variant_crud.remove_image_from_variant(db, parse_oid(product_id), color, image_id)
     if not success:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image non trouvee")
+    await invalidate_catalog(db, product_id)
@@ -51,13 +51,12 @@ async def list_logs(db, pagination, module=None, action=None, admin_id=None, ent
         filters["entity_type"] = entity_type
     if entity_id:
         filters["entity_id"] = entity_id
-    total = await audit_crud.count_audit_logs(db, filters)
-    docs = await audit_crud.list_audit_logs(db, filters, pagination.skip, pagination.page_size)
+    docs, window = await audit_crud.paginate_audit_logs(db, filters, pagination)
     return build_page(
         items=[audit_out(doc) for doc in docs],
-        total=total,
         page=pagination.page,
         page_size=pagination.page_size,
         sort={"by": "created_at", "dir": "desc"},
         filters=filters,
+        **window,
     )
@@ -2,6 +2,7 @@ from fastapi import HTTPException
 
 from app.crud import category as category_crud
 from app.crud.product import add_category_to_product
+from app.services.services_store.catalog_cache import invalidate_catalog
 from app.services.services_store.category_service import category_to_out, list_categories_page
 from app.services.services_store.product_service import product_to_out
 
@@ -34,4 +35,5 @@ async def add_product_to_category(db, category_id: str, product_id: str):
     updated = await add_category_to_product(db, product_id, category["name"])
     if not updated:
         raise HTTPException(404, "Produit non trouve")
+    await invalidate_catalog(db, product_id)
     return product_to_out(updated)
@@ -1,10 +1,9 @@
 from datetime import datetime, timedelta
 
-from bson import ObjectId
-
 from app.crud.admin import list_cms_pages
 from app.crud import dashboard as dashboard_crud
 from app.dependencies_admin import admin_capabilities, is_superadmin
+from app.services.services_store.product_summaries import display_name, load_product_summaries
 
 
 def can_access(admin, permission: str) -> bool:
@@ -38,23 +37,12 @@ async def revenue_for_period(db, start: datetime) -> dict:
 async def top_products(db, limit: int = 5) -> list[dict]:
     rows = await dashboard_crud.aggregate_top_product_sales(db, limit)
 
-    product_ids = []
-    for row in rows:
-        try:
-            product_ids.append(ObjectId(row["_id"]))
-        except Exception:
-            pass
-    products = await dashboard_crud.list_product_names_by_ids(db, product_ids)
-    product_map = {str(product["_id"]): product for product in products}
+    products = await load_product_summaries(db, [row["_id"] for row in rows])
 
     return [
         {
             "product_id": row["_id"],
-            "product_name": (
-                product_map.get(row["_id"], {}).get("full_name")
-                or product_map.get(row["_id"], {}).get("name")
-                or row["_id"]
-            ),
+            "product_name": display_name(products.get(str(row["_id"]))) or row["_id"],
             "qty": int(row.get("qty", 0) or 0),
             "revenue": round(float(row.get("revenue", 0) or 0), 2),
         }
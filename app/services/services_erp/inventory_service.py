@@ -6,9 +6,11 @@ from fastapi import HTTPException, status
 
 from app.core.pagination import build_page
 from app.crud import inventory as inventory_crud
+from app.crud import product as product_crud
 from app.domain.order_constants import INVENTORY_MOVEMENT_MANUAL
 from app.schemas.inventory import InventoryItemOut, InventoryMovementOut
 from app.services.services_erp.audit_service import log_action
+from app.services.services_store.catalog_cache import invalidate_catalog
 
 
 def validate_oid(value: str, label: str = "ID") -> ObjectId:
@@ -101,7 +103,11 @@ async def adjust_stock(db, payload, admin):
         raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, "delta ou new_stock_on_hand est requis")
 
     delta = new_on_hand - previous_on_hand
-    await inventory_crud.set_variant_stock(db, product_id, payload.color, payload.size, new_on_hand)
+    async with await db.client.start_session() as session:
+        async with session.start_transaction():
+            await inventory_crud.set_variant_stock(db, product_id, payload.color, payload.size, new_on_hand, session=session)
+            await product_crud.refresh_availability_summary(db, product_id, session=session)
+    await invalidate_catalog(db, product_id)
     now = datetime.utcnow()
     data = {
         "product_id": str(product_id),
@@ -148,13 +154,12 @@ async def list_movements(db, pagination, product_id=None, color=None, size=None,
         filters["size"] = size
     if source:
         filters["source"] = source
-    total = await inventory_crud.count_movements(db, filters)
-    docs = await inventory_crud.list_movements(db, filters, pagination.skip, pagination.page_size)
+    docs, window = await inventory_crud.paginate_movements(db, filters, pagination)
     return build_page(
         items=[movement_out(doc) for doc in docs],
-        total=total,
         page=pagination.page,
         page_size=pagination.page_size,
         sort={"by": "created_at", "dir": "desc"},
         filters=filters,
+        **window,
     )
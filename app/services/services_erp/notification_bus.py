@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid
+
+from app.config import settings
+
+
+logger = logging.getLogger("notification_bus")
+
+BUS_COLLECTION = "admin_notification_bus"
+BUS_COLLECTION_SIZE_BYTES = 8 * 1024 * 1024
+BUS_COLLECTION_MAX_DOCS = 5000
+TAIL_RETRY_SECONDS = 1.0
+
+Deliver = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def build_bus_worker_id(prefix: str = "notif-bus") -> str:
+    return f"{prefix}:{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class LocalNotificationBus:
+    """
+    Bus mono-processus: les messages publies sont livres directement aux sockets
+    du worker courant. Suffisant avec un seul worker uvicorn.
+    """
+
+    def __init__(self) -> None:
+        self._deliver: Optional[Deliver] = None
+
+    def bind(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    async def publish(self, message: Dict[str, Any]) -> None:
+        if self._deliver:
+            await self._deliver(message)
+
+    async def run(self) -> None:
+        await asyncio.Event().wait()
+
+
+class MongoNotificationBus(LocalNotificationBus):
+    """
+    Bus inter-workers adosse a une collection capped: chaque worker publie par
+    insert_one et suit la collection avec un curseur tailable pour relayer les
+    messages (y compris les siens) vers ses sockets locales.
+    """
+
+    def __init__(self, db=None, *, collection_name: str = BUS_COLLECTION) -> None:
+        super().__init__()
+        self._db = db
+        self.collection_name = collection_name
+        self.worker_id = build_bus_worker_id()
+        self._running = False
+
+    @property
+    def db(self):
+        if self._db is None:
+            from app.db import db
+
+            self._db = db
+        return self._db
+
+    async def ensure_collection(self) -> None:
+        try:
+            await self.db.create_collection(
+                self.collection_name,
+                capped=True,
+                size=BUS_COLLECTION_SIZE_BYTES,
+                max=BUS_COLLECTION_MAX_DOCS,
+            )
+        except CollectionInvalid:
+            pass
+        if await self._latest_id() is None:
+            # Un curseur tailable meurt immediatement sur une collection vide.
+            await self.db[self.collection_name].insert_one(
+                {"message": None, "origin": self.worker_id, "created_at": datetime.utcnow()}
+            )
+
+    async def publish(self, message: Dict[str, Any]) -> None:
+        if not self._running:
+            await super().publish(message)
+            return
+        try:
+            await self.db[self.collection_name].insert_one(
+                {"message": message, "origin": self.worker_id, "created_at": datetime.utcnow()}
+            )
+        except Exception:
+            logger.exception("Notification bus publish failed, delivering locally only")
+            await super().publish(message)
+
+    async def _latest_id(self):
+        latest = await self.db[self.collection_name].find_one({}, {"_id": 1}, sort=[("$natural", -1)])
+        return latest["_id"] if latest else None
+
+    async def run(self) -> None:
+        await self.ensure_collection()
+        last_id = await self._latest_id()
+        self._running = True
+        try:
+            while True:
+                query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+                cursor = self.db[self.collection_name].find(query, cursor_type=CursorType.TAILABLE_AWAIT)
+                try:
+                    # Un lot vide (attente ecoulee) termine l'iteration sans tuer le
+                    # curseur: on le reprend tant qu'il est vivant, sans le rouvrir.
+                    while cursor.alive:
+                        async for doc in cursor:
+                            last_id = doc["_id"]
+                            if self._deliver and doc.get("message"):
+                                await self._deliver(doc["message"])
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.exception("Notification bus cursor failed")
+                finally:
+                    await cursor.close()
+                await asyncio.sleep(TAIL_RETRY_SECONDS)
+        finally:
+            self._running = False
+
+
+def build_notification_bus() -> LocalNotificationBus:
+    if settings.NOTIFICATION_BUS_BACKEND == "mongo":
+        return MongoNotificationBus()
+    return LocalNotificationBus()
@@ -1,54 +1,123 @@
-from typing import Any, Dict, List, Optional
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
 
 from fastapi.encoders import jsonable_encoder
 from starlette.websockets import WebSocket
 
+from app.config import settings
+from app.core.pagination import PaginationParams
 from app.crud import notification as notification_crud
 from app.schemas.notification import NotificationCreate, NotificationOut
+from app.services.services_erp.notification_bus import LocalNotificationBus, build_notification_bus
+
+
+logger = logging.getLogger("notifications")
 
 
 NOTIFICATIONS_COLLECTION = notification_crud.COLLECTION
+INBOX_BACKFILL_BATCH_SIZE = 500
+
+
+class _SocketChannel:
+    def __init__(self, websocket: WebSocket, queue_size: int) -> None:
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.task: Optional[asyncio.Task] = None
 
 
 class NotificationConnectionManager:
-    def __init__(self) -> None:
-        self._connections: Dict[str, List[WebSocket]] = {}
+    def __init__(
+        self,
+        bus: Optional[LocalNotificationBus] = None,
+        *,
+        queue_size: int = 100,
+        send_timeout_seconds: float = 5.0,
+        heartbeat_seconds: float = 25.0,
+    ) -> None:
+        self._connections: Dict[str, List[_SocketChannel]] = {}
+        self.queue_size = queue_size
+        self.send_timeout_seconds = send_timeout_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.bus = bus or LocalNotificationBus()
+        self.bus.bind(self.deliver)
 
     async def connect(self, admin_id: str, websocket: WebSocket) -> None:
         await websocket.accept()
-        self._connections.setdefault(admin_id, []).append(websocket)
+        channel = _SocketChannel(websocket, self.queue_size)
+        channel.task = asyncio.create_task(self._sender(admin_id, channel))
+        self._connections.setdefault(admin_id, []).append(channel)
 
     def disconnect(self, admin_id: str, websocket: WebSocket) -> None:
-        sockets = self._connections.get(admin_id, [])
-        if websocket in sockets:
-            sockets.remove(websocket)
-        if not sockets and admin_id in self._connections:
+        channels = self._connections.get(admin_id, [])
+        for channel in [item for item in channels if item.websocket is websocket]:
+            channels.remove(channel)
+            if channel.task and channel.task is not asyncio.current_task():
+                channel.task.cancel()
+        if not channels and admin_id in self._connections:
             self._connections.pop(admin_id, None)
 
+    async def _sender(self, admin_id: str, channel: _SocketChannel) -> None:
+        try:
+            while True:
+                message = await channel.queue.get()
+                await asyncio.wait_for(channel.websocket.send_json(message), timeout=self.send_timeout_seconds)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.disconnect(admin_id, channel.websocket)
+            await self._close(channel.websocket)
+
+    async def _close(self, websocket: WebSocket) -> None:
+        try:
+            await websocket.close(code=1013)
+        except Exception:
+            pass
+
+    def _enqueue(self, admin_id: str, channel: _SocketChannel, message: Dict[str, Any]) -> None:
+        try:
+            channel.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Consommateur trop lent: on le deconnecte plutot que de bloquer les autres.
+            logger.warning("Dropping slow notification socket for admin %s", admin_id)
+            self.disconnect(admin_id, channel.websocket)
+            asyncio.create_task(self._close(channel.websocket))
+
+    async def deliver(self, message: Dict[str, Any]) -> None:
+        recipient = message.get("recipient_admin_id")
+        recipients = [recipient] if recipient else list(self._connections.keys())
+        for admin_id in recipients:
+            for channel in list(self._connections.get(admin_id, [])):
+                self._enqueue(admin_id, channel, message["event"])
+
     async def broadcast(self, notification: NotificationOut) -> None:
         payload = jsonable_encoder(notification)
-        recipients = (
-            [notification.recipient_admin_id]
-            if notification.recipient_admin_id
-            else list(self._connections.keys())
+        await self.bus.publish(
+            {
+                "recipient_admin_id": notification.recipient_admin_id,
+                "event": {"type": "notification.created", "notification": payload},
+            }
         )
-        for admin_id in recipients:
-            if not admin_id:
-                continue
-            for websocket in list(self._connections.get(admin_id, [])):
-                try:
-                    await websocket.send_json({"type": "notification.created", "notification": payload})
-                except Exception:
-                    self.disconnect(admin_id, websocket)
+
+    async def run_heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            event = {"type": "notification.heartbeat", "at": datetime.utcnow().isoformat()}
+            for admin_id, channels in list(self._connections.items()):
+                for channel in list(channels):
+                    self._enqueue(admin_id, channel, event)
 
 
-notification_manager = NotificationConnectionManager()
+notification_manager = NotificationConnectionManager(
+    build_notification_bus(),
+    queue_size=settings.NOTIFICATION_WS_QUEUE_SIZE,
+    send_timeout_seconds=settings.NOTIFICATION_WS_SEND_TIMEOUT_SECONDS,
+    heartbeat_seconds=settings.NOTIFICATION_WS_HEARTBEAT_SECONDS,
+)
 
 
-def serialize_notification(doc: Dict[str, Any], admin_id: Optional[str] = None) -> NotificationOut:
-    read_by = doc.get("read_by_admin_ids") or []
-    read_at_by = doc.get("read_at_by_admin_ids") or {}
-    is_read = bool(admin_id and admin_id in read_by)
+def serialize_notification(doc: Dict[str, Any], admin_id: Optional[str] = None, entry: Optional[Dict[str, Any]] = None) -> NotificationOut:
     return NotificationOut(
         id=str(doc["_id"]),
         audience=doc.get("audience", "admin"),
@@ -60,9 +129,9 @@ def serialize_notification(doc: Dict[str, Any], admin_id: Optional[str] = None)
         action_url=doc.get("action_url"),
         metadata=doc.get("metadata") or {},
         recipient_admin_id=doc.get("recipient_admin_id"),
-        is_read=is_read,
+        is_read=bool(admin_id and entry and entry.get("is_read")),
         created_at=doc["created_at"],
-        read_at=read_at_by.get(admin_id) if admin_id else None,
+        read_at=(entry or {}).get("read_at") if admin_id else None,
     )
 
 
@@ -70,6 +139,37 @@ def notification_visibility_filter(admin_id: str) -> Dict[str, Any]:
     return notification_crud.visibility_filter(admin_id)
 
 
+async def ensure_inbox(db, admin_id: str) -> Dict[str, Any]:
+    """
+    Initialise l'inbox d'un admin au premier acces en rejouant les notifications
+    deja visibles (etat de lecture repris des anciens tableaux read_by_admin_ids).
+    """
+    counters = await notification_crud.find_inbox_counters(db, admin_id)
+    if counters and counters.get("initialized"):
+        return counters
+
+    await notification_crud.open_inbox(db, admin_id)
+    batch: List[Dict[str, Any]] = []
+    async for doc in notification_crud.iter_visible_notifications(db, admin_id):
+        is_read = admin_id in (doc.get("read_by_admin_ids") or [])
+        read_at = (doc.get("read_at_by_admin_ids") or {}).get(admin_id)
+        batch.append(notification_crud.inbox_entry(doc, admin_id, is_read=is_read, read_at=read_at))
+        if len(batch) >= INBOX_BACKFILL_BATCH_SIZE:
+            await notification_crud.insert_inbox_entries(db, batch)
+            batch = []
+    await notification_crud.insert_inbox_entries(db, batch)
+    return await notification_crud.recount_inbox(db, admin_id)
+
+
+async def fan_out_notification(db, doc: Dict[str, Any]) -> List[str]:
+    recipient = doc.get("recipient_admin_id")
+    admin_ids = await notification_crud.list_inbox_admin_ids(db, [recipient] if recipient else None)
+    inserted = await notification_crud.insert_inbox_entries(db, [notification_crud.inbox_entry(doc, admin_id) for admin_id in admin_ids])
+    delivered = [entry["admin_id"] for entry in inserted]
+    await notification_crud.increment_inbox_counters(db, delivered)
+    return delivered
+
+
 async def create_notification(
     db,
     payload: NotificationCreate | Dict[str, Any],
@@ -78,42 +178,73 @@ async def create_notification(
 ) -> NotificationOut:
     data = payload.model_dump() if isinstance(payload, NotificationCreate) else dict(payload)
     doc = await notification_crud.insert_notification(db, data)
+    await fan_out_notification(db, doc)
     notification = serialize_notification(doc)
     if broadcast:
         await notification_manager.broadcast(notification)
     return notification
 
 
+def counter_total(counters: Dict[str, Any], filters: Dict[str, Any]) -> Tuple[int, bool]:
+    """
+    Total servi par les compteurs materialises (jamais de count_documents):
+    exact pour tout / non lu / lu; avec categorie ou priorite, le total du
+    statut sert de borne superieure et est signale comme estime.
+    """
+    total = max(0, int(counters.get("total_count", 0)))
+    unread = min(total, max(0, int(counters.get("unread_count", 0))))
+    read_state = filters.get("is_read")
+    if read_state is False:
+        count = unread
+    elif read_state is True:
+        count = total - unread
+    else:
+        count = total
+    return count, set(filters) <= {"is_read"}
+
+
 async def list_notifications(
     db,
     *,
     admin_id: str,
     filters: Dict[str, Any],
-    skip: int,
-    limit: int,
-) -> List[NotificationOut]:
-    docs = await notification_crud.list_notifications(
-        db,
-        admin_id=admin_id,
-        filters=filters,
-        skip=skip,
-        limit=limit,
+    pagination: PaginationParams,
+) -> Tuple[List[NotificationOut], Dict[str, Any]]:
+    counters = await ensure_inbox(db, admin_id)
+    total, exact = counter_total(counters, filters)
+    entries, window = await notification_crud.paginate_inbox(
+        db, admin_id=admin_id, filters=filters, pagination=pagination, total=total
     )
-    return [serialize_notification(doc, admin_id) for doc in docs]
+    window["total_is_estimate"] = not exact
+    docs = await notification_crud.find_notifications_by_ids(db, [entry["notification_id"] for entry in entries])
+    docs_by_id = {doc["_id"]: doc for doc in docs}
+    items = [
+        serialize_notification(docs_by_id[entry["notification_id"]], admin_id, entry)
+        for entry in entries
+        if entry["notification_id"] in docs_by_id
+    ]
+    return items, window
 
 
 async def count_notifications(db, *, admin_id: str, filters: Dict[str, Any]) -> int:
-    return await notification_crud.count_notifications(db, admin_id=admin_id, filters=filters)
+    counters = await ensure_inbox(db, admin_id)
+    return counter_total(counters, filters)[0]
+
+
+async def unread_notifications_count(db, *, admin_id: str) -> int:
+    return await count_notifications(db, admin_id=admin_id, filters={"is_read": False})
 
 
 async def mark_notification_read(db, *, notification_id: str, admin_id: str) -> Optional[NotificationOut]:
-    doc = await notification_crud.mark_notification_read(
-        db,
-        notification_id=notification_id,
-        admin_id=admin_id,
-    )
-    return serialize_notification(doc, admin_id) if doc else None
+    doc = await notification_crud.find_notification(db, notification_id)
+    if not doc:
+        return None
+    await ensure_inbox(db, admin_id)
+    await notification_crud.mark_inbox_entry_read(db, admin_id=admin_id, notification_id=doc["_id"], now=datetime.utcnow())
+    entry = await notification_crud.find_inbox_entry(db, admin_id=admin_id, notification_id=doc["_id"])
+    return serialize_notification(doc, admin_id, entry) if entry else None
 
 
 async def mark_all_notifications_read(db, *, admin_id: str) -> int:
-    return await notification_crud.mark_all_notifications_read(db, admin_id=admin_id)
+    await ensure_inbox(db, admin_id)
+    return await notification_crud.mark_inbox_read(db, admin_id=admin_id, now=datetime.utcnow())
@@ -6,7 +6,6 @@ from bson import ObjectId
 from bson.errors import InvalidId
 from fastapi import BackgroundTasks, HTTPException, Request, status
 from fastapi.responses import RedirectResponse
-from jinja2 import Environment, FileSystemLoader
 from jose import JWTError, jwt
 
 from app.analytics.service import track_event
@@ -17,13 +16,13 @@ from app.integrations.meta import build_meta_context, enqueue_complete_registrat
 from app.integrations.meta.service import persisted_meta_context
 from app.integrations.meta.schemas import MetaEventContextIn
 from app.services.services_store.email import send_email
+from app.services.services_store.email_templates import render_template
 
 
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 RESEND_COOLDOWN_SECONDS = 120
 _last_resend: dict[str, float] = {}
-jinja_env = Environment(loader=FileSystemLoader("templates"), autoescape=True)
 
 
 def create_access_token(sub: str, expires_delta: timedelta) -> str:
@@ -71,8 +70,7 @@ async def signup(db, user_in, background_tasks: BackgroundTasks, request: Reques
     user_id = str(created["_id"])
     token = create_access_token(user_id, timedelta(hours=1))
     verify_link = build_email_verification_link(token)
-    template = jinja_env.get_template("verify_email.html")
-    html_body = template.render(user_email=user_in.email, verification_link=verify_link, logo_url=settings.LOGO_URL)
+    html_body = render_template("verify_email.html", user_email=user_in.email, verification_link=verify_link, logo_url=settings.LOGO_URL)
     text_body = (
         f"Bonjour {user_in.email},\n\n"
         "Merci pour votre inscription ! Cliquez sur ce lien pour verifier votre adresse email :\n\n"
@@ -122,8 +120,7 @@ async def forgot_password(db, payload, background_tasks: BackgroundTasks):
     if user:
         token = create_access_token(str(user["_id"]), timedelta(hours=1))
         reset_link = f"{settings.FRONTEND_URL}/reset-password?token={token}"
-        template = jinja_env.get_template("reset_password.html")
-        html_body = template.render(user_email=payload.email, reset_link=reset_link, logo_url=settings.LOGO_URL)
+        html_body = render_template("reset_password.html", user_email=payload.email, reset_link=reset_link, logo_url=settings.LOGO_URL)
         body = (
             "Bonjour,\n\nVous avez demande la reinitialisation de votre mot de passe.\n"
             f"Cliquez sur ce lien pour en choisir un nouveau (valable 1 heure) :\n\n{reset_link}\n\n"
@@ -161,8 +158,7 @@ async def resend_verification(db, payload, background_tasks: BackgroundTasks):
         return {"message": "Ce compte est deja verifie."}
     token = create_access_token(str(user["_id"]), timedelta(hours=1))
     verify_link = build_email_verification_link(token)
-    template = jinja_env.get_template("verify_email.html")
-    html_body = template.render(user_email=email, verification_link=verify_link, logo_url=settings.LOGO_URL)
+    html_body = render_template("verify_email.html", user_email=email, verification_link=verify_link, logo_url=settings.LOGO_URL)
     text_body = (
         f"Bonjour {email},\n\nVoici un nouveau lien pour verifier votre adresse email :\n\n"
         f"{verify_link}\n\nCe lien expire dans 1 heure.\n\nL'equipe Savage Rise"
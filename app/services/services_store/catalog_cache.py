@@ -0,0 +1,27 @@
+from bson import ObjectId
+
+from app.core.versioned_cache import VersionedCache, VersionedResponseCache, bump_version, current_version
+
+
+CATALOG_NAMESPACE = "catalog"
+CATALOG_CACHE_SIZE = 2048
+FACET_CACHE_SIZE = 512
+
+catalog_cache = VersionedResponseCache(CATALOG_NAMESPACE, max_entries=CATALOG_CACHE_SIZE)
+# Facettes + total par empreinte de filtres, partagees entre les pages de resultats.
+facet_cache = VersionedCache(CATALOG_NAMESPACE, max_entries=FACET_CACHE_SIZE)
+
+
+async def invalidate_catalog(db, *product_ids) -> int:
+    """
+    A appeler apres toute ecriture produit/variante/stock (apres commit pour
+    les transactions) afin que les lectures catalogue soient reconstruites.
+    Sans product_ids, tout le catalogue est considere modifie; les
+    identifiants invalides sont ignores (jamais journalises).
+    """
+    if not product_ids:
+        return await bump_version(db, CATALOG_NAMESPACE)
+    keys = [str(product_id) for product_id in product_ids if product_id is not None and ObjectId.is_valid(str(product_id))]
+    if not keys:
+        return await current_version(db, CATALOG_NAMESPACE)
+    return await bump_version(db, CATALOG_NAMESPACE, keys)
@@ -0,0 +1,190 @@
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+from pymongo import ASCENDING, DESCENDING
+
+from app.analytics.service import track_event
+from app.core.versioned_cache import CachedPayload, cached_json_response
+from app.crud import product as product_crud
+from app.domain.catalog_search import (
+    FACET_AVAILABILITY,
+    FACET_CATEGORY,
+    FACET_COLOR,
+    FACET_GENDER,
+    FACET_PRICE,
+    FACET_SIZE,
+    PRICE_BUCKET_BOUNDARIES,
+    PRICE_BUCKET_OVERFLOW,
+    facet_filters,
+    filter_fingerprint,
+    merge_filters,
+)
+from app.schemas.product import ProductSearchOut
+from app.services.services_store.catalog_cache import catalog_cache, facet_cache
+from app.services.services_store.product_service import product_to_out
+
+
+TERMS_FACETS = {
+    FACET_GENDER: "$search_facets.gender",
+    FACET_COLOR: "$search_facets.colors",
+    FACET_SIZE: "$search_facets.sizes",
+    FACET_CATEGORY: "$search_facets.categories",
+}
+ARRAY_FACETS = {FACET_COLOR, FACET_SIZE, FACET_CATEGORY}
+
+
+def search_sort(text: Optional[str], sort: Optional[str]) -> list:
+    if sort:
+        field, direction = sort.split(":")
+        return [(field, ASCENDING if direction == "asc" else DESCENDING), ("_id", DESCENDING)]
+    if text:
+        return [("score", {"$meta": "textScore"}), ("_id", DESCENDING)]
+    return [("_id", DESCENDING)]
+
+
+def _terms_branch(facet: str, filters: Dict[str, dict]) -> list[dict]:
+    path = TERMS_FACETS[facet]
+    branch: list[dict] = [{"$match": merge_filters(filters, exclude=facet)}]
+    if facet in ARRAY_FACETS:
+        branch.append({"$unwind": path})
+    branch += [
+        {"$group": {"_id": path, "count": {"$sum": 1}}},
+        {"$match": {"_id": {"$nin": [None, ""]}}},
+        {"$sort": {"count": -1, "_id": 1}},
+    ]
+    return branch
+
+
+def faceted_search_pipeline(text: Optional[str], filters: Dict[str, dict], sort: list, skip: int, limit: int) -> list[dict]:
+    """
+    Une seule agregation: resultats pagines, total et comptes par facette.
+    Chaque facette est comptee sans son propre filtre (selection multiple).
+    """
+    pipeline: list[dict] = []
+    if text:
+        pipeline.append({"$match": {"$text": {"$search": text}}})
+    all_filters = merge_filters(filters)
+    facets: Dict[str, list] = {
+        "hits": [{"$match": all_filters}, {"$sort": dict(sort)}, {"$skip": skip}, {"$limit": limit}],
+        "total": [{"$match": all_filters}, {"$count": "value"}],
+        FACET_PRICE: [
+            {"$match": merge_filters(filters, exclude=FACET_PRICE)},
+            # Prix absent, null ou negatif: hors facette, sinon `default` les
+            # compterait dans la tranche haute.
+            {"$match": {"price": {"$gte": PRICE_BUCKET_BOUNDARIES[0]}}},
+            {
+                "$bucket": {
+                    "groupBy": "$price",
+                    "boundaries": PRICE_BUCKET_BOUNDARIES,
+                    "default": PRICE_BUCKET_OVERFLOW,
+                    "output": {"count": {"$sum": 1}},
+                }
+            },
+        ],
+        FACET_AVAILABILITY: [
+            {"$match": merge_filters(filters, exclude=FACET_AVAILABILITY)},
+            {"$group": {"_id": "$in_stock", "count": {"$sum": 1}}},
+        ],
+    }
+    for facet in TERMS_FACETS:
+        facets[facet] = _terms_branch(facet, filters)
+    pipeline.append({"$facet": facets})
+    return pipeline
+
+
+def _price_buckets(rows: list[dict]) -> list[dict]:
+    upper_bounds = dict(zip(PRICE_BUCKET_BOUNDARIES, PRICE_BUCKET_BOUNDARIES[1:]))
+    buckets = []
+    for row in rows:
+        if row["_id"] == PRICE_BUCKET_OVERFLOW:
+            buckets.append({"min": PRICE_BUCKET_BOUNDARIES[-1], "max": None, "count": row["count"]})
+        else:
+            buckets.append({"min": row["_id"], "max": upper_bounds.get(row["_id"]), "count": row["count"]})
+    return buckets
+
+
+def facets_from_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    total_rows = result.get("total") or []
+    facets = {
+        facet: [{"value": str(row["_id"]), "count": row["count"]} for row in result.get(facet, [])]
+        for facet in TERMS_FACETS
+    }
+    facets[FACET_PRICE] = _price_buckets(result.get(FACET_PRICE, []))
+    facets[FACET_AVAILABILITY] = [
+        {"value": "in_stock" if row["_id"] else "out_of_stock", "count": row["count"]}
+        for row in result.get(FACET_AVAILABILITY, [])
+        if row["_id"] is not None
+    ]
+    return {"total": total_rows[0]["value"] if total_rows else 0, "facets": facets}
+
+
+async def faceted_search(
+    db,
+    *,
+    text: Optional[str] = None,
+    gender: Optional[str] = None,
+    color: Optional[str] = None,
+    size: Optional[str] = None,
+    category: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    in_stock: Optional[bool] = None,
+    sort: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 24,
+) -> ProductSearchOut:
+    filters = facet_filters(
+        gender=gender,
+        color=color,
+        size=size,
+        category=category,
+        min_price=min_price,
+        max_price=max_price,
+        in_stock=in_stock,
+    )
+    order = search_sort(text, sort)
+    fingerprint = filter_fingerprint(text, filters)
+    computed: Dict[str, Any] = {}
+
+    async def build_facets():
+        result = await product_crud.faceted_search(db, faceted_search_pipeline(text, filters, order, skip, limit))
+        computed["hits"] = result.get("hits", [])
+        return facets_from_result(result)
+
+    summary = await facet_cache.get_or_build(db, fingerprint, build_facets)
+    if "hits" in computed:
+        hits = computed["hits"]
+    else:
+        query = merge_filters(filters)
+        if text:
+            query["$text"] = {"$search": text}
+        hits = await product_crud.search_hits(db, query, order, skip, limit)
+    return ProductSearchOut(
+        items=[product_to_out(doc) for doc in hits],
+        total=summary["total"],
+        skip=skip,
+        limit=limit,
+        facets=summary["facets"],
+    )
+
+
+async def faceted_search_response(db, request: Request, current_user, **params) -> Response:
+    if params.get("text"):
+        await track_event(
+            db,
+            "search_submitted",
+            user_id=str(current_user["_id"]) if current_user else None,
+            metadata={
+                "query": params["text"],
+                "filters": {key: params.get(key) for key in ("gender", "color", "size", "category")},
+            },
+            request=request,
+        )
+
+    async def build():
+        result = await faceted_search(db, **params)
+        return CachedPayload.from_body(result.model_dump_json().encode("utf-8"))
+
+    key = ("faceted",) + tuple(sorted(params.items()))
+    payload = await catalog_cache.get_or_build(db, key, build)
+    return cached_json_response(request, payload)
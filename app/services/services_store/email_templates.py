@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Iterable
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, pass_eval_context
+from markupsafe import Markup, escape
+
+
+logger = logging.getLogger("email_templates")
+
+TEMPLATES_DIR = "templates"
+BYTECODE_CACHE_DIR = Path(tempfile.gettempdir()) / "savage_rise_jinja_cache"
+CAMPAIGN_CACHE_SIZE = 64
+THREAD_POOL_THRESHOLD = 200
+RENDER_CHUNK_SIZE = 500
+RENDER_WORKERS = 4
+
+_executor = ThreadPoolExecutor(max_workers=RENDER_WORKERS, thread_name_prefix="email-render")
+_campaigns: "OrderedDict[tuple[str, str], CampaignTemplate]" = OrderedDict()
+
+
+@pass_eval_context
+def nl2br(eval_ctx, value: str) -> Markup:
+    """
+    Transforme les sauts de ligne en <br> pour l'email HTML.
+    """
+    escaped = escape(value)
+    result = escaped.replace("\n", "<br>\n")
+    return Markup(result)
+
+
+def _build_environment() -> Environment:
+    BYTECODE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    env = Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        autoescape=True,
+        bytecode_cache=FileSystemBytecodeCache(str(BYTECODE_CACHE_DIR)),
+        auto_reload=False,
+    )
+    env.filters["nl2br"] = nl2br
+    return env
+
+
+jinja_env = _build_environment()
+
+
+def precompile_templates() -> int:
+    """
+    Compile tous les templates de `templates/` (et alimente le cache bytecode).
+    """
+    names = [name for name in jinja_env.list_templates() if name.endswith(".html")]
+    for name in names:
+        jinja_env.get_template(name)
+    logger.info("Precompiled %s email templates", len(names))
+    return len(names)
+
+
+def render_template(name: str, **context: Any) -> str:
+    return jinja_env.get_template(name).render(**context)
+
+
+class CampaignTemplate:
+    """
+    Rendu HTML partage d'une campagne: les champs propres au destinataire sont
+    remplaces par des marqueurs au rendu puis substitues (echappes) a l'envoi.
+    """
+
+    def __init__(self, html: str, placeholders: dict[str, str]):
+        self.html = html
+        self.placeholders = placeholders
+
+    def personalize(self, **values: Any) -> str:
+        html = self.html
+        for field, marker in self.placeholders.items():
+            html = html.replace(marker, str(escape(values.get(field) or "")))
+        return html
+
+
+def campaign_template(name: str, campaign_key: str, context: dict[str, Any], personalized_fields: Iterable[str]) -> CampaignTemplate:
+    cache_key = (name, campaign_key)
+    cached = _campaigns.get(cache_key)
+    if cached is not None:
+        _campaigns.move_to_end(cache_key)
+        return cached
+
+    placeholders = {field: f"__sr_{field}_placeholder__" for field in personalized_fields}
+    html = render_template(name, **{**context, **placeholders})
+    campaign = CampaignTemplate(html, placeholders)
+    _campaigns[cache_key] = campaign
+    if len(_campaigns) > CAMPAIGN_CACHE_SIZE:
+        _campaigns.popitem(last=False)
+    return campaign
+
+
+def forget_campaign(name: str, campaign_key: str) -> None:
+    _campaigns.pop((name, campaign_key), None)
+
+
+async def personalize_many(campaign: CampaignTemplate, recipients: list[dict[str, Any]]) -> list[str]:
+    """
+    Personnalise un lot de destinataires; au-dela de THREAD_POOL_THRESHOLD le
+    travail est deporte dans le pool de threads pour ne pas bloquer la boucle
+    asyncio.
+    """
+    if len(recipients) < THREAD_POOL_THRESHOLD:
+        return [campaign.personalize(**recipient) for recipient in recipients]
+    loop = asyncio.get_running_loop()
+    chunks = [recipients[index:index + RENDER_CHUNK_SIZE] for index in range(0, len(recipients), RENDER_CHUNK_SIZE)]
+    rendered = await asyncio.gather(
+        *(
+            loop.run_in_executor(_executor, lambda rows=chunk: [campaign.personalize(**row) for row in rows])
+            for chunk in chunks
+        )
+    )
+    return [html for chunk in rendered for html in chunk]
@@ -4,6 +4,7 @@ from typing import Optional
 from bson import ObjectId
 from fastapi import HTTPException, status
 
+from app.core.pagination import PaginationParams
 from app.crud import loyalty as loyalty_crud
 from app.schemas.loyalty import (
     LoyaltyBalanceOut,
@@ -182,21 +183,20 @@ async def adjust_user_loyalty(db, user_id: str, payload) -> LoyaltyBalanceOut:
     )
 
 
-async def list_loyalty_transactions(db, page: int, page_size: int, user_id: str | None, order_id: str | None):
+async def list_loyalty_transactions(db, pagination: PaginationParams, user_id: str | None, order_id: str | None):
     filters = {}
     if user_id:
         filters["user_id"] = user_id
     if order_id:
         filters["order_id"] = order_id
-    skip = (page - 1) * page_size
-    total = await loyalty_crud.count_loyalty_transactions(db, filters)
-    docs = await loyalty_crud.list_loyalty_transactions(db, filters, skip=skip, limit=page_size)
+    docs, window = await loyalty_crud.paginate_loyalty_transactions(db, filters, pagination)
+    total = window["total"]
     return PaginatedLoyaltyTransactionsOut(
         items=[transaction_out(doc) for doc in docs],
-        total=total,
-        page=page,
-        page_size=page_size,
-        pages=(total + page_size - 1) // page_size,
+        page=pagination.page,
+        page_size=pagination.page_size,
+        pages=(total + pagination.page_size - 1) // pagination.page_size,
+        **window,
     )
 
 
@@ -1,17 +1,39 @@
+import asyncio
 import csv
+import hashlib
 import io
+import json
+import logging
 import re
-from typing import Any, Dict, Iterable, List, Optional
+import zlib
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set
 from urllib.parse import urlencode
+from uuid import uuid4
 
-from fastapi import Response
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
 
 from app.config import settings
+from app.core.versioned_cache import changes_since, current_version, etag_matches, strong_etag
 from app.domain.inventory import stock_available_value
+from app.crud import meta_feed as meta_feed_crud
 from app.crud import product as product_crud
+from app.services.services_store.catalog_cache import CATALOG_NAMESPACE
 from app.services.services_store.meta_ids import meta_item_group_id, meta_safe_id, meta_variant_content_id
 
 
+logger = logging.getLogger("meta_catalog")
+
+FEED_BATCH_SIZE = 200
+FEED_CHUNK_SIZE = 64 * 1024
+REFRESH_LEASE_SECONDS = 600
+REFRESH_POLL_SECONDS = 1.0
+
+_refresh_lock = asyncio.Lock()
+
+
 META_CATALOG_FIELDS = [
     "id",
     "title",
@@ -164,27 +186,215 @@ def rows_for_product(product: Dict[str, Any]) -> List[Dict[str, str]]:
     return rows or [product_row(product, product_id)]
 
 
-async def build_meta_catalog_csv(db, include_out_of_stock: bool, include_missing_images: bool) -> Response:
-    products = await product_crud.list_products_for_meta_catalog(db, limit=5000)
-    rows: List[Dict[str, str]] = []
-    for product in products:
-        for row in rows_for_product(product):
-            if not include_out_of_stock and row["availability"] != "in stock":
-                continue
-            if not include_missing_images and not row["image_link"]:
-                continue
-            rows.append({field: row.get(field, "") for field in META_CATALOG_FIELDS})
-
+def feed_format_key() -> str:
+    """
+    Empreinte du format des lignes stockees: un changement de colonnes ou de
+    reglages (marque, devise, URL) force une regeneration complete.
+    """
+    raw = json.dumps([
+        META_CATALOG_FIELDS,
+        settings.META_CATALOG_BRAND,
+        settings.META_CATALOG_CURRENCY,
+        str(settings.FRONTEND_URL),
+        settings.META_PRODUCT_PATH_TEMPLATE,
+    ])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def feed_document(product: Dict[str, Any], generation: Optional[str] = None) -> Dict[str, Any]:
+    doc = {
+        "_id": str(product["_id"]),
+        "sort_key": clean_text(product.get("full_name")),
+        "rows": [{field: row.get(field, "") for field in META_CATALOG_FIELDS} for row in rows_for_product(product)],
+        "updated_at": datetime.utcnow(),
+    }
+    if generation:
+        doc["generation"] = generation
+    return doc
+
+
+def _is_fresh(state: Optional[Dict[str, Any]], version: int, format_key: str) -> bool:
+    return bool(state) and state.get("catalog_version") == version and state.get("format_key") == format_key
+
+
+async def _store_products(db, products: AsyncIterator[Dict[str, Any]], generation: Optional[str] = None) -> Set[str]:
+    stored: Set[str] = set()
+    batch: List[Dict[str, Any]] = []
+    async for product in products:
+        batch.append(feed_document(product, generation))
+        stored.add(str(product["_id"]))
+        if len(batch) >= FEED_BATCH_SIZE:
+            await meta_feed_crud.replace_product_rows(db, batch)
+            batch = []
+    await meta_feed_crud.replace_product_rows(db, batch)
+    return stored
+
+
+def _has_rows(state: Optional[Dict[str, Any]]) -> bool:
+    return bool(state) and state.get("catalog_version") is not None
+
+
+async def _wait_for_first_refresh(db) -> Dict[str, Any]:
+    """
+    Aucun flux genere et un autre worker detient le bail: on attend sa fin,
+    ou l'expiration du bail pour le reprendre.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + REFRESH_LEASE_SECONDS
+    while loop.time() < deadline:
+        await asyncio.sleep(REFRESH_POLL_SECONDS)
+        state = await meta_feed_crud.get_feed_state(db)
+        if _has_rows(state) or not (state or {}).get("refresh_owner"):
+            break
+    return await refresh_meta_feed(db)
+
+
+async def _refresh_rows(db, state: Optional[Dict[str, Any]], format_key: str) -> Dict[str, Any]:
+    version = await current_version(db, CATALOG_NAMESPACE)
+    changed_ids = None
+    refreshed = 0
+    if _has_rows(state) and state.get("format_key") == format_key:
+        version, changed_ids = await changes_since(db, CATALOG_NAMESPACE, int(state["catalog_version"]))
+    if changed_ids is None:
+        generation = uuid4().hex
+        refreshed = len(await _store_products(db, product_crud.iter_products_for_meta_catalog(db), generation))
+        await meta_feed_crud.delete_rows_except_generation(db, generation)
+    elif changed_ids:
+        product_ids = sorted(changed_ids)
+        stored = await _store_products(db, product_crud.iter_products_for_meta_catalog(db, product_ids))
+        await meta_feed_crud.delete_product_rows(db, set(product_ids) - stored)
+        refreshed = len(product_ids)
+
+    state = {
+        "catalog_version": version,
+        "format_key": format_key,
+        "generated_at": datetime.utcnow().replace(microsecond=0),
+    }
+    await meta_feed_crud.set_feed_state(db, **state)
+    logger.info("Meta feed refreshed: catalog v%s, %s products regenerated (full=%s)", version, refreshed, changed_ids is None)
+    return state
+
+
+async def refresh_meta_feed(db) -> Dict[str, Any]:
+    """
+    Met a jour les lignes stockees du flux: seuls les produits modifies depuis
+    la derniere generation (journal de versions du catalogue) sont recalcules.
+    Un seul worker regenere a la fois (bail Mongo sur le document d'etat).
+    """
+    format_key = feed_format_key()
+    state = await meta_feed_crud.get_feed_state(db)
+    if _is_fresh(state, await current_version(db, CATALOG_NAMESPACE), format_key):
+        return state
+
+    async with _refresh_lock:
+        state = await meta_feed_crud.get_feed_state(db)
+        if _is_fresh(state, await current_version(db, CATALOG_NAMESPACE), format_key):
+            return state
+
+        owner = uuid4().hex
+        now = datetime.utcnow()
+        claimed = await meta_feed_crud.claim_feed_refresh(db, owner, now, now - timedelta(seconds=REFRESH_LEASE_SECONDS))
+        if claimed:
+            try:
+                # Relu sous bail: le worker precedent a pu terminer entre-temps.
+                state = await meta_feed_crud.get_feed_state(db)
+                if _is_fresh(state, await current_version(db, CATALOG_NAMESPACE), format_key):
+                    return state
+                return await _refresh_rows(db, state, format_key)
+            finally:
+                await meta_feed_crud.release_feed_refresh(db, owner)
+
+    # Regeneration en cours ailleurs: le flux precedent reste servi.
+    if _has_rows(state):
+        return state
+    return await _wait_for_first_refresh(db)
+
+
+def _keep_row(row: Dict[str, str], include_out_of_stock: bool, include_missing_images: bool) -> bool:
+    if not include_out_of_stock and row.get("availability") != "in stock":
+        return False
+    if not include_missing_images and not row.get("image_link"):
+        return False
+    return True
+
+
+async def stream_meta_catalog_csv(
+    db,
+    include_out_of_stock: bool,
+    include_missing_images: bool,
+    compress: bool = True,
+) -> AsyncIterator[bytes]:
+    """
+    CSV assemble a partir des lignes stockees, par blocs (gzip si demande).
+    """
+    # wbits=31: en-tete et trailer gzip
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
     buffer = io.StringIO()
     writer = csv.DictWriter(buffer, fieldnames=META_CATALOG_FIELDS, extrasaction="ignore")
     writer.writeheader()
-    writer.writerows(rows)
 
-    return Response(
-        content=buffer.getvalue(),
+    def drain(final: bool = False) -> bytes:
+        data = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+        if compressor is None:
+            return data
+        return compressor.compress(data) + (compressor.flush() if final else b"")
+
+    async for doc in meta_feed_crud.iter_feed_rows(db):
+        for row in doc.get("rows", []):
+            if _keep_row(row, include_out_of_stock, include_missing_images):
+                writer.writerow(row)
+        if buffer.tell() >= FEED_CHUNK_SIZE:
+            chunk = drain()
+            if chunk:
+                yield chunk
+    yield drain(final=True)
+
+
+def _not_modified_since(request: Request, generated_at: datetime) -> bool:
+    header = request.headers.get("if-modified-since")
+    if not header:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return generated_at <= since
+
+
+async def build_meta_catalog_csv(
+    db,
+    include_out_of_stock: bool,
+    include_missing_images: bool,
+    request: Optional[Request] = None,
+) -> Response:
+    state = await refresh_meta_feed(db)
+    gzip_ok = request is None or "gzip" in request.headers.get("accept-encoding", "")
+    etag = strong_etag(
+        f"{state['catalog_version']}:{state['format_key']}:{include_out_of_stock}:{include_missing_images}:{gzip_ok}".encode("utf-8")
+    )
+    generated_at = state["generated_at"].replace(tzinfo=timezone.utc)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(generated_at, usegmt=True),
+        "Cache-Control": "public, max-age=900",
+        "Vary": "Accept-Encoding",
+    }
+
+    if request is not None:
+        if_none_match = request.headers.get("if-none-match")
+        if etag_matches(if_none_match, etag) or (not if_none_match and _not_modified_since(request, generated_at)):
+            return Response(status_code=304, headers=headers)
+
+    headers["Content-Disposition"] = 'inline; filename="savage-rise-meta-catalog.csv"'
+    if gzip_ok:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        stream_meta_catalog_csv(db, include_out_of_stock, include_missing_images, compress=gzip_ok),
         media_type="text/csv; charset=utf-8",
-        headers={
-            "Content-Disposition": 'inline; filename="savage-rise-meta-catalog.csv"',
-            "Cache-Control": "public, max-age=900",
-        },
+        headers=headers,
     )
+
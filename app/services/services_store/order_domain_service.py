@@ -54,6 +54,7 @@ from app.domain.order_state_machine import ensure_order_transition, fulfillment_
 from app.integrations.meta import build_meta_context, enqueue_purchase_event, process_meta_outbox_operation
 from app.integrations.meta.service import persisted_meta_context
 from app.services.services_store import outbox_service
+from app.services.services_store.catalog_cache import invalidate_catalog
 from app.services.services_store.loyalty_service import (
     add_loyalty_transaction,
     award_points_for_paid_order,
@@ -120,6 +121,10 @@ def _validate_requested_quantity(*, product_id: str, color: str, size: str, requ
         )
 
 
+def _allocation_product_ids(order: dict) -> list[str]:
+    return sorted({str(allocation["product_id"]) for allocation in order.get("inventory_allocations", [])})
+
+
 def _variant_exists_query(*, product_oid: ObjectId, color: str, size: str) -> dict[str, Any]:
     return {
         "_id": product_oid,
@@ -629,6 +634,7 @@ async def _reserve_allocation(session, db, allocation: dict, order_id: str, orde
                     "message": "Le stock est disponible mais la reservation atomique a echoue.",
                 },
             )
+    await product_crud.refresh_availability_summary(db, product_oid, session=session)
     await _insert_inventory_movement(
         session,
         db,
@@ -656,6 +662,7 @@ async def _release_allocation(session, db, allocation: dict, order_id: str, orde
     )
     if result.modified_count == 0:
         raise InvalidOrderTransitionError("Impossible de liberer la reservation de stock")
+    await product_crud.refresh_availability_summary(db, _parse_oid(allocation["product_id"], "Produit ID"), session=session)
     await _insert_inventory_movement(
         session,
         db,
@@ -683,6 +690,7 @@ async def _fulfill_allocation(session, db, allocation: dict, order_id: str, orde
     )
     if result.modified_count == 0:
         raise InvalidOrderTransitionError("Impossible de consommer la reservation de stock")
+    await product_crud.refresh_availability_summary(db, _parse_oid(allocation["product_id"], "Produit ID"), session=session)
     await _insert_inventory_movement(
         session,
         db,
@@ -848,6 +856,7 @@ async def create_order(db, order_in, background_tasks, request, current_user, *,
                     session=session,
                     meta_context=meta_context,
                 )
+        await invalidate_catalog(db, *_allocation_product_ids(order_doc))
         created = await db["orders"].find_one({"idempotency_key": idempotency_key})
         await _complete_order_idempotency(db, idempotency_key, str(created["_id"]))
     except Exception:
@@ -935,6 +944,7 @@ async def ship_order(db, order_id: str, *, actor_type: str, actor_id: Optional[s
                 {"$set": {"status": ORDER_STATUS_SHIPPED, "order_status": ORDER_STATUS_SHIPPED, "fulfillment_status": FULFILLMENT_STATUS_FULFILLED, "updated_at": datetime.utcnow()}},
                 session=session,
             )
+    await invalidate_catalog(db, *_allocation_product_ids(order))
     await append_history(
         db,
         order_id=order_id,
@@ -991,6 +1001,7 @@ async def cancel_order(db, order_id: str, *, actor_type: str, actor_id: Optional
                 },
                 session=session,
             )
+    await invalidate_catalog(db, *_allocation_product_ids(order))
     await append_history(
         db,
         order_id=order_id,
@@ -1066,18 +1077,21 @@ async def restock_returned_items(db, order_id: str, *, actor_type: str, actor_id
         async with session.start_transaction():
             for index, allocation in enumerate(order.get("inventory_allocations", [])):
                 qty = int(allocation["qty"])
+                product_oid = _parse_oid(allocation["product_id"], "Produit ID")
                 await db["products"].update_one(
-                    {"_id": _parse_oid(allocation["product_id"], "Produit ID"), "variants.color": allocation["color"]},
+                    {"_id": product_oid, "variants.color": allocation["color"]},
                     {"$inc": {"variants.$.sizes.$[s].stock_on_hand": qty}},
                     array_filters=[{"s.size": allocation["size"]}],
                     session=session,
                 )
+                await product_crud.refresh_availability_summary(db, product_oid, session=session)
                 await _insert_inventory_movement(session, db, movement_type=INVENTORY_MOVEMENT_RETURN_RESTOCKED, allocation=allocation, order_id=order_id, order_item_key=str(index), on_hand_delta=qty, reserved_delta=0, reason=reason or "return_restocked", source="order_workflow")
             await db["orders"].update_one(
                 {"_id": order["_id"]},
                 {"$set": {"status": ORDER_STATUS_RETURNED, "order_status": ORDER_STATUS_RETURNED, "fulfillment_status": FULFILLMENT_STATUS_RETURNED, "updated_at": datetime.utcnow()}},
                 session=session,
             )
+    await invalidate_catalog(db, *_allocation_product_ids(order))
     await append_history(
         db,
         order_id=order_id,
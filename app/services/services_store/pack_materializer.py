@@ -0,0 +1,59 @@
+import asyncio
+import logging
+from typing import Optional
+
+from app.core.publish_scheduler import ScheduleSource
+from app.core.versioned_cache import changes_since, current_version
+from app.crud import pack as pack_crud
+from app.db import db
+from app.services.services_store.catalog_cache import CATALOG_NAMESPACE
+from app.services.services_store.pack_service import PACK_SCHEDULE, materialize_packs
+
+logger = logging.getLogger("pack_materializer")
+
+CHECK_INTERVAL_SECONDS = 30
+
+
+async def refresh_packs_once(database, known_version: Optional[int]) -> int:
+    """
+    Rematerialise les packs dont un composant a change depuis `known_version`
+    (tous si le journal ne couvre pas l'ecart). Les bascules starts_at/ends_at
+    sont gerees par le publish_scheduler. Retourne la version catalogue traitee.
+    """
+    version = await current_version(database, CATALOG_NAMESPACE)
+    product_ids = set()
+    if known_version is None:
+        product_ids = None
+    elif version != known_version:
+        version, product_ids = await changes_since(database, CATALOG_NAMESPACE, known_version)
+
+    if product_ids is None:
+        docs = await pack_crud.list_packs_for_materialization(database)
+    elif product_ids:
+        docs = await pack_crud.list_packs_for_materialization(database, product_ids=product_ids)
+    else:
+        docs = []
+    count = await materialize_packs(database, docs)
+    if count:
+        logger.info("Packs rematerialized: %s (catalog v%s)", count, version)
+    return version
+
+
+async def materialize_due_packs(database, now) -> int:
+    docs = await pack_crud.list_packs_for_materialization(database, due_before=now)
+    return await materialize_packs(database, docs)
+
+
+pack_schedule = ScheduleSource(PACK_SCHEDULE, pack_crud.list_visibility_changes, materialize_due_packs)
+
+
+async def pack_materializer_loop() -> None:
+    known_version: Optional[int] = None
+    while True:
+        try:
+            known_version = await refresh_packs_once(db, known_version)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Pack materializer failed")
+        await asyncio.sleep(CHECK_INTERVAL_SECONDS)
@@ -7,11 +7,14 @@ from fastapi import HTTPException, status
 
 from app.crud import pack as pack_crud
 from app.core.pagination import build_page
+from app.core.publish_scheduler import publish_scheduler
 from app.schemas.pack import PackComponentOut, PackOut, PackProductSummary
+from app.services.services_store.product_summaries import load_product_summaries
 
 
 PACKS_COLLECTION = "packs"
 PUBLIC_PACK_STATUSES = ["active"]
+PACK_SCHEDULE = "packs"
 
 
 def now_utc() -> datetime:
@@ -25,28 +28,11 @@ def validate_object_id(value: str, label: str = "ID") -> ObjectId:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, f"{label} invalide")
 
 
-def first_product_image(product: Dict) -> Optional[str]:
-    for variant in product.get("variants", []):
-        for image in variant.get("images", []):
-            if isinstance(image, dict) and image.get("url"):
-                return image["url"]
-            if isinstance(image, str):
-                return image
-    return None
-
-
-async def product_summary(db, product_id: str) -> PackProductSummary:
-    product = await pack_crud.find_product_by_id(db, validate_object_id(product_id, "Produit ID"))
-    if not product:
-        raise HTTPException(status.HTTP_404_NOT_FOUND, "Produit introuvable")
-    return PackProductSummary(
-        id=str(product["_id"]),
-        name=product["name"],
-        full_name=product.get("full_name"),
-        price=float(product["price"]),
-        image_url=first_product_image(product),
-        in_stock=product.get("in_stock", True),
-    )
+def pack_components(doc: Dict) -> List[Dict]:
+    return doc.get("components") or [
+        {"id": str(index), "product_id": product_id, "qty": 1}
+        for index, product_id in enumerate(doc.get("product_ids", []), start=1)
+    ]
 
 
 def normalize_pack_components(data: Dict) -> Dict:
@@ -82,8 +68,10 @@ def _variant_has_size(variant: Dict, size: Optional[str]) -> bool:
 async def validate_pack_components(db, components: List[Dict]) -> None:
     if len(components) < 2:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, "Un pack doit contenir au minimum deux composants")
+    object_ids = list({validate_object_id(component["product_id"], "Produit ID") for component in components})
+    products = {str(product["_id"]): product for product in await pack_crud.find_products_for_components(db, object_ids)}
     for component in components:
-        product = await pack_crud.find_product_by_id(db, validate_object_id(component["product_id"], "Produit ID"))
+        product = products.get(str(component["product_id"]))
         if not product:
             raise HTTPException(status.HTTP_404_NOT_FOUND, "Un ou plusieurs produits du pack sont introuvables")
         if component.get("color"):
@@ -105,25 +93,23 @@ def compute_pack_prices(original_price: float, discount_type: str, discount_valu
 
 
 def is_pack_public(doc: Dict) -> bool:
-    if doc.get("status") not in PUBLIC_PACK_STATUSES:
-        return False
-    now = now_utc()
-    if doc.get("starts_at") and doc["starts_at"] > now:
-        return False
-    if doc.get("ends_at") and doc["ends_at"] < now:
-        return False
-    return True
+    return pack_visibility(doc, now_utc())[0]
 
 
-async def pack_out(db, doc: Dict) -> PackOut:
+def render_pack(doc: Dict, summaries: Dict[str, Dict]) -> PackOut:
+    """
+    Rendu d'un pack a partir des resumes produit deja charges (aucune requete).
+    """
     payload = {k: v for k, v in doc.items() if k != "_id"}
     payload["id"] = str(doc["_id"])
-    components = payload.get("components") or [{"id": str(index), "product_id": product_id, "qty": 1} for index, product_id in enumerate(payload.get("product_ids", []), start=1)]
     component_out = []
     products = []
     original_price = 0.0
-    for component in components:
-        product = await product_summary(db, component["product_id"])
+    for component in pack_components(payload):
+        summary = summaries.get(str(component["product_id"]))
+        if not summary:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, "Produit introuvable")
+        product = PackProductSummary(**summary)
         products.append(product)
         qty = int(component.get("qty", 1) or 1)
         original_price += product.price * qty
@@ -148,6 +134,105 @@ async def pack_out(db, doc: Dict) -> PackOut:
     payload["original_price"] = original_price
     payload["pack_price"] = pack_price
     payload["savings_value"] = savings
+    payload["in_stock"] = all(product.in_stock for product in products)
+    return PackOut(**payload)
+
+
+def pack_product_ids(docs: List[Dict]) -> List[str]:
+    return list(dict.fromkeys(str(component["product_id"]) for doc in docs for component in pack_components(doc)))
+
+
+async def render_packs(db, docs: List[Dict]) -> List[PackOut]:
+    """
+    Rend une page de packs avec une seule requete produit pour tous les composants.
+    """
+    product_ids = pack_product_ids(docs)
+    for product_id in product_ids:
+        validate_object_id(product_id, "Produit ID")
+    summaries = await load_product_summaries(db, product_ids)
+    return [render_pack(doc, summaries) for doc in docs]
+
+
+async def pack_out(db, doc: Dict) -> PackOut:
+    return (await render_packs(db, [doc]))[0]
+
+
+def pack_visibility(doc: Dict, now: datetime) -> tuple[bool, Optional[datetime]]:
+    """
+    (visible maintenant, prochaine bascule de visibilite ou None).
+    """
+    if doc.get("status") not in PUBLIC_PACK_STATUSES:
+        return False, None
+    starts_at, ends_at = doc.get("starts_at"), doc.get("ends_at")
+    if starts_at and starts_at > now:
+        return False, starts_at
+    if ends_at and ends_at <= now:
+        return False, None
+    return True, ends_at
+
+
+def materialized_fields(doc: Dict, summaries: Dict[str, Dict], now: datetime) -> Dict:
+    """
+    Prix, resumes des composants, disponibilite et visibilite stockes sur le
+    pack pour que la lecture publique ne calcule rien.
+    """
+    visible, changes_at = pack_visibility(doc, now)
+    try:
+        pack = render_pack(doc, summaries)
+    except HTTPException:
+        # Composant supprime: le pack reste masque jusqu'a correction par un admin.
+        return {
+            "products": [],
+            "original_price": 0.0,
+            "pack_price": 0.0,
+            "savings_value": 0.0,
+            "in_stock": False,
+            "is_visible": False,
+            "visibility_changes_at": None,
+            "materialized_at": now,
+        }
+    return {
+        "products": [product.model_dump() for product in pack.products],
+        "original_price": pack.original_price,
+        "pack_price": pack.pack_price,
+        "savings_value": pack.savings_value,
+        "in_stock": pack.in_stock,
+        "is_visible": visible,
+        "visibility_changes_at": changes_at,
+        "materialized_at": now,
+    }
+
+
+async def materialize_packs(db, docs: List[Dict]) -> int:
+    if not docs:
+        return 0
+    now = now_utc()
+    summaries = await load_product_summaries(db, pack_product_ids(docs))
+    await pack_crud.set_materialized_fields(db, {doc["_id"]: materialized_fields(doc, summaries, now) for doc in docs})
+    return len(docs)
+
+
+def materialized_pack_out(doc: Dict) -> PackOut:
+    """
+    PackOut a partir des champs materialises (resumes alignes sur les composants).
+    """
+    payload = {k: v for k, v in doc.items() if k != "_id"}
+    payload["id"] = str(doc["_id"])
+    products = [PackProductSummary(**product) for product in doc.get("products") or []]
+    payload["products"] = products
+    payload["components"] = [
+        PackComponentOut(
+            id=component["id"],
+            product_id=component["product_id"],
+            color=component.get("color"),
+            size=component.get("size"),
+            qty=int(component.get("qty", 1) or 1),
+            product=product,
+            locked_variant=bool(component.get("color") or component.get("size")),
+        )
+        for component, product in zip(pack_components(doc), products)
+    ]
+    payload["product_ids"] = [component.product_id for component in payload["components"]]
     return PackOut(**payload)
 
 
@@ -161,15 +246,15 @@ async def validate_pack_products_exist(db, product_ids: List[str]) -> None:
 
 
 async def list_public_packs(db, skip: int, limit: int) -> list[PackOut]:
-    docs = await pack_crud.list_packs(db, {"status": "active"}, skip, limit)
-    return [await pack_out(db, doc) for doc in docs if is_pack_public(doc)]
+    docs = await pack_crud.list_visible_packs(db, skip, limit)
+    return [materialized_pack_out(doc) for doc in docs]
 
 
 async def get_public_pack(db, pack_id: str) -> PackOut:
-    doc = await pack_crud.find_pack_by_id(db, validate_object_id(pack_id, "Pack ID"))
-    if not doc or not is_pack_public(doc):
+    doc = await pack_crud.find_visible_pack(db, validate_object_id(pack_id, "Pack ID"))
+    if not doc:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Pack introuvable")
-    return await pack_out(db, doc)
+    return materialized_pack_out(doc)
 
 
 async def admin_list_packs(db, status_filter, skip: int, limit: int) -> list[PackOut]:
@@ -177,7 +262,7 @@ async def admin_list_packs(db, status_filter, skip: int, limit: int) -> list[Pac
     if status_filter:
         filters["status"] = status_filter
     docs = await pack_crud.list_packs(db, filters, skip, limit)
-    return [await pack_out(db, doc) for doc in docs]
+    return await render_packs(db, docs)
 
 
 async def admin_list_packs_page(db, pagination, status_filter):
@@ -187,7 +272,7 @@ async def admin_list_packs_page(db, pagination, status_filter):
     total = await pack_crud.count_packs(db, filters)
     docs = await pack_crud.list_packs(db, filters, pagination.skip, pagination.page_size)
     return build_page(
-        items=[await pack_out(db, doc) for doc in docs],
+        items=await render_packs(db, docs),
         total=total,
         page=pagination.page,
         page_size=pagination.page_size,
@@ -204,6 +289,8 @@ async def admin_create_pack(db, payload) -> PackOut:
     data["updated_at"] = now
     res = await pack_crud.insert_pack(db, data)
     created = await pack_crud.find_pack_by_id(db, res.inserted_id)
+    await materialize_packs(db, [created])
+    publish_scheduler.reload_soon(PACK_SCHEDULE)
     return await pack_out(db, created)
 
 
@@ -230,6 +317,8 @@ async def admin_update_pack(db, pack_id: str, payload) -> PackOut:
     data["updated_at"] = now_utc()
     await pack_crud.update_pack(db, oid, data)
     updated = await pack_crud.find_pack_by_id(db, oid)
+    await materialize_packs(db, [updated])
+    publish_scheduler.reload_soon(PACK_SCHEDULE)
     return await pack_out(db, updated)
 
 
@@ -253,7 +342,7 @@ async def calculate_order_packs(db, selections) -> Dict:
         if not pack or not is_pack_public(pack):
             raise HTTPException(status.HTTP_400_BAD_REQUEST, "Pack indisponible")
 
-        components = pack.get("components") or [{"id": str(index), "product_id": product_id, "qty": 1} for index, product_id in enumerate(pack.get("product_ids", []), start=1)]
+        components = pack_components(pack)
         components_by_id = {component["id"]: component for component in components}
         if len(selection.items) != len(components):
             raise HTTPException(status.HTTP_400_BAD_REQUEST, "Les composants selectionnes ne correspondent pas au pack")
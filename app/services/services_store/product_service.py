@@ -1,15 +1,22 @@
 from typing import Any, Dict, Optional
 
 from bson import ObjectId
-from fastapi import HTTPException, Request
+from fastapi import HTTPException, Request, Response
+from pydantic import TypeAdapter
 from pymongo import ASCENDING, DESCENDING
 
 from app.analytics.service import track_event
 from app.core.pagination import build_page
-from app.domain.inventory import inventory_projection, stock_available_value
+from app.core.versioned_cache import CachedPayload, cached_json_response
+from app.domain.inventory import availability_summary, inventory_projection
+from app.domain.reviews import review_stats_out
 from app.crud import product as product_crud
-from app.schemas.product import ProductOut
+from app.crud import review as review_crud
+from app.schemas.product import ProductOut, ProductSuggestOut
+from app.schemas.review import ReviewStats
+from app.services.services_store.catalog_cache import catalog_cache
 from app.services.services_store.meta_ids import meta_item_group_id, meta_variant_content_id
+from app.services.services_store.search_index import product_search_index
 
 
 def product_to_out(product: Dict[str, Any]) -> ProductOut:
@@ -51,42 +58,87 @@ def product_to_out(product: Dict[str, Any]) -> ProductOut:
         variant_payload["images"] = remapped_images
         remapped_variants.append(variant_payload)
     payload["variants"] = remapped_variants
-    if product.get("variants"):
-        payload["in_stock"] = any(
-            stock_available_value(size_row) > 0
-            for variant in product.get("variants", [])
-            for size_row in variant.get("sizes", [])
-        )
+    if "stock_available_total" not in product:
+        # Documents anterieurs au resume de disponibilite maintenu en base.
+        payload.update(availability_summary(product.get("variants") or [], fallback_in_stock=product.get("in_stock", True)))
 
     return ProductOut(**payload)
 
 
-async def list_products(db, skip: int = 0, limit: int = 10) -> list[ProductOut]:
-    return [product_to_out(product) for product in await product_crud.get_products(db, skip, limit)]
+_product_list_adapter = TypeAdapter(list[ProductOut])
 
 
-async def list_products_page(db, pagination, gender: Optional[str], in_stock: Optional[bool], q: Optional[str]):
-    filters: Dict[str, Any] = {}
-    if gender:
-        filters["gender"] = gender
-    if in_stock is not None:
-        filters["in_stock"] = in_stock
+def _products_payload(docs) -> CachedPayload:
+    return CachedPayload.from_body(_product_list_adapter.dump_json([product_to_out(doc) for doc in docs]))
+
+
+async def list_products(db, request: Optional[Request] = None, skip: int = 0, limit: int = 10) -> Response:
+    async def build():
+        return _products_payload(await product_crud.get_products(db, skip, limit))
+
+    payload = await catalog_cache.get_or_build(db, ("list", skip, limit), build)
+    return cached_json_response(request, payload)
+
+
+async def list_products_page(
+    db,
+    pagination,
+    gender: Optional[str],
+    in_stock: Optional[bool],
+    q: Optional[str],
+    request: Optional[Request] = None,
+    size: Optional[str] = None,
+    color: Optional[str] = None,
+) -> Response:
+    async def build():
+        page = await _build_products_page(db, pagination, gender, in_stock, q, size, color)
+        return CachedPayload.from_body(page.model_dump_json().encode("utf-8"))
+
+    key = ("page", pagination.page, pagination.page_size, pagination.cursor, pagination.total_mode, gender, in_stock, q, size, color)
+    payload = await catalog_cache.get_or_build(db, key, build)
+    return cached_json_response(request, payload)
+
+
+async def _build_products_page(
+    db,
+    pagination,
+    gender: Optional[str],
+    in_stock: Optional[bool],
+    q: Optional[str],
+    size: Optional[str] = None,
+    color: Optional[str] = None,
+):
+    window: Dict[str, Any] = {}
     if q:
-        filters["$or"] = [
-            {"name": {"$regex": q, "$options": "i"}},
-            {"full_name": {"$regex": q, "$options": "i"}},
-            {"sku": {"$regex": q, "$options": "i"}},
-        ]
-
-    total = await product_crud.count_products(db, filters)
-    docs = await product_crud.list_products_page(db, filters, pagination.skip, pagination.page_size)
+        if pagination.keyset:
+            raise HTTPException(status_code=400, detail="Pagination par curseur indisponible avec une recherche (q)")
+        # Recherche servie par l'index en memoire; Mongo ne charge que la page.
+        await product_search_index.sync(db)
+        ranked_ids = product_search_index.search(q, gender=gender, in_stock=in_stock, size=size, color=color)
+        total = len(ranked_ids)
+        docs = await product_crud.find_products_by_ids(db, ranked_ids[pagination.skip:pagination.skip + pagination.page_size])
+        sort = {"by": "relevance", "dir": "desc"}
+    else:
+        filters: Dict[str, Any] = {}
+        if gender:
+            filters["gender"] = gender
+        if in_stock is not None:
+            filters["in_stock"] = in_stock
+        if size:
+            filters["available_sizes"] = size
+        if color:
+            filters["available_colors"] = color
+        docs, window = await product_crud.paginate_products(db, filters, pagination)
+        total = window.pop("total")
+        sort = {"by": "_id", "dir": "desc"}
     return build_page(
         items=[product_to_out(doc) for doc in docs],
         total=total,
         page=pagination.page,
         page_size=pagination.page_size,
-        sort={"by": "_id", "dir": "desc"},
-        filters={"gender": gender, "in_stock": in_stock, "q": q},
+        sort=sort,
+        filters={"gender": gender, "in_stock": in_stock, "q": q, "size": size, "color": color},
+        **window,
     )
 
 
@@ -103,7 +155,7 @@ async def search_products(
     skip: int,
     limit: int,
     sort: Optional[str],
-) -> list[ProductOut]:
+) -> Response:
     if text:
         await track_event(
             db,
@@ -113,6 +165,26 @@ async def search_products(
             request=request,
         )
 
+    async def build():
+        pipeline = _search_pipeline(text, min_price, max_price, gender, color, size, skip, limit, sort)
+        return _products_payload(await product_crud.aggregate_products(db, pipeline, limit))
+
+    key = ("search", text, min_price, max_price, gender, color, size, skip, limit, sort)
+    payload = await catalog_cache.get_or_build(db, key, build)
+    return cached_json_response(request, payload)
+
+
+def _search_pipeline(
+    text: Optional[str],
+    min_price: Optional[float],
+    max_price: Optional[float],
+    gender: Optional[str],
+    color: Optional[str],
+    size: Optional[str],
+    skip: int,
+    limit: int,
+    sort: Optional[str],
+) -> list[dict]:
     pipeline = []
     filters: dict = {}
     if text:
@@ -131,7 +203,7 @@ async def search_products(
         if color:
             variant_filter["color"] = color
         if size:
-            variant_filter["size"] = size
+            variant_filter["sizes.size"] = size
         filters["variants"] = {"$elemMatch": variant_filter}
     if filters:
         pipeline.append({"$match": filters})
@@ -140,19 +212,34 @@ async def search_products(
         dir_flag = ASCENDING if direction == "asc" else DESCENDING
         pipeline.append({"$sort": {field: dir_flag}})
     pipeline += [{"$skip": skip}, {"$limit": limit}]
+    return pipeline
+
 
-    raw = await product_crud.aggregate_products(db, pipeline, limit)
-    return [product_to_out(doc) for doc in raw]
+async def suggest_products(db, q: str, limit: int = 8) -> ProductSuggestOut:
+    await product_search_index.sync(db)
+    return ProductSuggestOut(**product_search_index.suggest(q, limit))
 
 
-async def get_product_detail(db, product_id: str, request: Request, current_user) -> ProductOut:
+async def get_product_detail(db, product_id: str, request: Request, current_user) -> Response:
     try:
         ObjectId(product_id)
     except Exception:
         raise HTTPException(status_code=400, detail="ID invalide")
 
-    product = await product_crud.get_product(db, product_id)
-    if not product:
+    async def build():
+        product = await product_crud.get_product(db, product_id)
+        if not product:
+            return None
+        stats = review_stats_out(await review_crud.find_review_summary(db, product_id))
+        out = product_to_out(product).model_copy(update={"review_stats": ReviewStats(**stats)})
+        return CachedPayload.from_body(
+            out.model_dump_json().encode("utf-8"),
+            product_name=product.get("full_name") or product.get("name"),
+            style_id=product.get("style_id"),
+        )
+
+    payload = await catalog_cache.get_or_build(db, ("product", product_id), build)
+    if payload is None:
         raise HTTPException(status_code=404, detail="Produit non trouve")
 
     await track_event(
@@ -161,9 +248,9 @@ async def get_product_detail(db, product_id: str, request: Request, current_user
         user_id=str(current_user["_id"]) if current_user else None,
         product_id=product_id,
         metadata={
-            "product_name": product.get("full_name") or product.get("name"),
-            "style_id": product.get("style_id"),
+            "product_name": payload.meta.get("product_name"),
+            "style_id": payload.meta.get("style_id"),
         },
         request=request,
     )
-    return product_to_out(product)
+    return cached_json_response(request, payload)
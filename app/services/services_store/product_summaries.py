@@ -0,0 +1,154 @@
+import asyncio
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, List, Optional
+
+from bson import ObjectId
+
+from app.core.versioned_cache import changes_since, current_version
+from app.crud import product as product_crud
+from app.services.services_store.catalog_cache import CATALOG_NAMESPACE
+
+
+SUMMARY_CACHE_SIZE = 2048
+
+# Memo par requete (cf. ProductSummaryScopeMiddleware); None hors requete HTTP.
+_request_memo: ContextVar[Optional[Dict[str, Optional[Dict[str, Any]]]]] = ContextVar("product_summary_memo", default=None)
+
+
+def first_product_image(product: Dict) -> Optional[str]:
+    for variant in product.get("variants", []) or []:
+        for image in variant.get("images", []) or []:
+            if isinstance(image, dict) and image.get("url"):
+                return image["url"]
+            if isinstance(image, str):
+                return image
+    return None
+
+
+def summary_from_doc(doc: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": str(doc["_id"]),
+        "name": doc.get("name") or "",
+        "full_name": doc.get("full_name"),
+        "price": float(doc.get("price", 0) or 0),
+        "image_url": first_product_image(doc),
+        "in_stock": doc.get("in_stock", True),
+    }
+
+
+def display_name(summary: Optional[Dict[str, Any]]) -> Optional[str]:
+    if not summary:
+        return None
+    return summary.get("full_name") or summary.get("name") or None
+
+
+class ProductSummaryScopeMiddleware:
+    """
+    Middleware ASGI: un memo de resumes produit par requete HTTP.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _request_memo.set({})
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_memo.reset(token)
+
+
+class ProductSummaryCache:
+    """
+    LRU des resumes produit, purge selon le journal de versions du catalogue:
+    seuls les produits modifies sont oublies apres une ecriture.
+    """
+
+    def __init__(self, max_entries: int = SUMMARY_CACHE_SIZE) -> None:
+        self.max_entries = max_entries
+        self.version: Optional[int] = None
+        self._entries: "OrderedDict[str, Optional[Dict[str, Any]]]" = OrderedDict()
+        self._lock = asyncio.Lock()
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.version = None
+
+    async def _sync(self, db) -> None:
+        version = await current_version(db, CATALOG_NAMESPACE)
+        if version == self.version:
+            return
+        async with self._lock:
+            if self.version is None:
+                self._entries.clear()
+            elif version != self.version:
+                version, changed_ids = await changes_since(db, CATALOG_NAMESPACE, self.version)
+                if changed_ids is None:
+                    self._entries.clear()
+                else:
+                    for product_id in changed_ids:
+                        self._entries.pop(product_id, None)
+            self.version = version
+
+    def _remember(self, product_id: str, summary: Optional[Dict[str, Any]]) -> None:
+        self._entries[product_id] = summary
+        self._entries.move_to_end(product_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def load_many(self, db, product_ids: Iterable[Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Resumes par identifiant (une seule requete `$in` projetee pour les
+        absents du cache); les identifiants invalides ou inconnus sont omis.
+        """
+        wanted = list(dict.fromkeys(str(product_id) for product_id in product_ids if product_id is not None))
+        wanted = [product_id for product_id in wanted if ObjectId.is_valid(product_id)]
+        if not wanted:
+            return {}
+
+        memo = _request_memo.get()
+        found: Dict[str, Optional[Dict[str, Any]]] = {}
+        if memo is not None:
+            found.update({product_id: memo[product_id] for product_id in wanted if product_id in memo})
+
+        missing = [product_id for product_id in wanted if product_id not in found]
+        if missing:
+            await self._sync(db)
+            for product_id in missing:
+                if product_id in self._entries:
+                    self._entries.move_to_end(product_id)
+                    found[product_id] = self._entries[product_id]
+            to_fetch = [product_id for product_id in missing if product_id not in found]
+            if to_fetch:
+                docs = await product_crud.find_product_summaries(db, [ObjectId(product_id) for product_id in to_fetch])
+                fetched = {str(doc["_id"]): summary_from_doc(doc) for doc in docs}
+                for product_id in to_fetch:
+                    found[product_id] = fetched.get(product_id)
+                    self._remember(product_id, found[product_id])
+            if memo is not None:
+                memo.update({product_id: found[product_id] for product_id in missing})
+
+        return {product_id: found[product_id] for product_id in wanted if found.get(product_id)}
+
+    async def load(self, db, product_id: Any) -> Optional[Dict[str, Any]]:
+        return (await self.load_many(db, [product_id])).get(str(product_id))
+
+
+product_summaries = ProductSummaryCache()
+
+
+async def load_product_summaries(db, product_ids: Iterable[Any]) -> Dict[str, Dict[str, Any]]:
+    return await product_summaries.load_many(db, product_ids)
+
+
+async def load_product_summary(db, product_id: Any) -> Optional[Dict[str, Any]]:
+    return await product_summaries.load(db, product_id)
+
+
+async def ordered_product_summaries(db, product_ids: List[Any]) -> List[Dict[str, Any]]:
+    by_id = await load_product_summaries(db, product_ids)
+    return [by_id[str(product_id)] for product_id in product_ids if str(product_id) in by_id]
@@ -3,6 +3,7 @@ from typing import List
 from bson import ObjectId
 from fastapi import HTTPException, status
 
+from app.crud import drop_countdown as countdown_crud
 from app.crud import order as order_crud
 from app.crud import review as review_crud
 from app.crud import users as user_crud
@@ -45,6 +46,10 @@ async def update_profile(db, data, current_user) -> UserOut:
         if exists and str(exists["_id"]) != str(current_user["_id"]):
             raise HTTPException(status.HTTP_400_BAD_REQUEST, "Cet email est deja utilise par un autre compte")
     updated = await user_crud.update_user_profile(db, str(current_user["_id"]), update_data)
+    if "email" in update_data or "full_name" in update_data:
+        await countdown_crud.sync_subscriber_profile(
+            db, str(updated["_id"]), updated["email"], updated.get("full_name"), updated["updated_at"]
+        )
     return user_out(updated)
 
 
@@ -1,31 +1,38 @@
 import datetime
 from typing import List, Optional
 
+from bson import ObjectId
 from fastapi import HTTPException, Request, status
 
 from app.analytics.service import track_event
+from app.crud import product as product_crud
 from app.crud import review as review_crud
 from app.schemas.review import ReviewOut
+from app.services.services_cms.engagement_service import author_name, load_authors
+from app.services.services_store.catalog_cache import invalidate_catalog
 
 
-async def attach_author(db, doc: dict) -> dict:
-    user = None
-    try:
-        user = await review_crud.find_user_author(db, doc.get("user_id"))
-    except Exception:
-        user = None
+async def attach_authors(db, docs: List[dict]) -> List[dict]:
+    authors = await load_authors(db, [doc.get("user_id") for doc in docs])
+    for doc in docs:
+        doc["author"] = author_name(authors.get(str(doc.get("user_id"))))
+        doc["status"] = doc.get("status", "visible")
+        if "_id" in doc:
+            doc["id"] = str(doc["_id"])
+    return docs
+
 
-    doc["author"] = (user or {}).get("full_name") or (user or {}).get("email") or "Utilisateur"
-    doc["status"] = doc.get("status", "visible")
-    if "_id" in doc:
-        doc["id"] = str(doc["_id"])
-    return doc
+async def attach_author(db, doc: dict) -> dict:
+    return (await attach_authors(db, [doc]))[0]
 
 
 async def add_review(db, product_id: str, payload, request: Request, current_user) -> ReviewOut:
+    if not ObjectId.is_valid(product_id) or not await product_crud.find_product_name(db, ObjectId(product_id)):
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Produit non trouve")
     data = payload.dict(exclude_none=True)
     data["user_id"] = str(current_user.get("_id"))
     doc = await review_crud.create_review(db, product_id, data)
+    await invalidate_catalog(db, product_id)
     await track_event(
         db,
         "review_created",
@@ -39,7 +46,7 @@ async def add_review(db, product_id: str, payload, request: Request, current_use
 
 async def list_reviews(db, product_id: str, rating: Optional[int], skip: int, limit: int, sort_best: bool) -> List[ReviewOut]:
     docs = await review_crud.list_reviews(db, product_id, rating, skip, limit, sort_best)
-    return [ReviewOut(**await attach_author(db, doc)) for doc in docs]
+    return [ReviewOut(**doc) for doc in await attach_authors(db, docs)]
 
 
 async def get_review_stats(db, product_id: str):
@@ -48,7 +55,7 @@ async def get_review_stats(db, product_id: str):
 
 async def list_my_reviews(db, current_user, skip: int, limit: int) -> List[ReviewOut]:
     docs = await review_crud.list_user_reviews(db, str(current_user.get("_id")), skip, limit)
-    return [ReviewOut(**await attach_author(db, doc)) for doc in docs]
+    return [ReviewOut(**doc) for doc in await attach_authors(db, docs)]
 
 
 async def get_review(db, product_id: str, review_id: str) -> ReviewOut:
@@ -68,6 +75,7 @@ async def update_my_review(db, product_id: str, review_id: str, payload, current
     data = {k: v for k, v in payload.dict().items() if v is not None}
     data["updated_at"] = datetime.datetime.utcnow()
     updated = await review_crud.update_review(db, product_id, review_id, data)
+    await invalidate_catalog(db, product_id)
     return ReviewOut(**await attach_author(db, updated))
 
 
@@ -78,3 +86,4 @@ async def delete_my_review(db, product_id: str, review_id: str, current_user) ->
     if str(doc["user_id"]) != str(current_user["_id"]):
         raise HTTPException(status.HTTP_403_FORBIDDEN, "Action non autorisee")
     await review_crud.delete_review(db, product_id, review_id)
+    await invalidate_catalog(db, product_id)
@@ -0,0 +1,331 @@
+import asyncio
+import heapq
+import logging
+import re
+import unicodedata
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from app.core.versioned_cache import changes_since, current_version
+from app.crud import product as product_crud
+from app.domain.catalog_search import normalize_facet_value
+from app.services.services_store.catalog_cache import CATALOG_NAMESPACE
+
+
+logger = logging.getLogger("search_index")
+
+FIELD_WEIGHTS = {"sku": 5.0, "name": 3.0, "full_name": 2.0, "categories": 1.0, "colors": 1.0}
+PREFIX_MATCH_FACTOR = 0.8
+RESULT_CACHE_SIZE = 256
+MIN_STEM_LENGTH = 3
+FRENCH_SUFFIXES = (
+    "issements", "issement", "ations", "ation", "ements", "ement", "euses", "euse",
+    "eaux", "eux", "ites", "ite", "ives", "ive", "ees", "ee", "es", "er", "ez", "s", "e", "x",
+)
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def fold(text: Any) -> str:
+    decomposed = unicodedata.normalize("NFKD", str(text or ""))
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def tokenize(text: Any) -> list[str]:
+    return _TOKEN_RE.findall(fold(text))
+
+
+def stem(word: str) -> str:
+    """
+    Racinisation legere du francais (suffixes de pluriel/feminin/derivation),
+    suffisante pour rapprocher "noires"/"noir" ou "chemises"/"chemise".
+    """
+    if word.isdigit():
+        return word
+    for suffix in FRENCH_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LENGTH:
+            return word[: -len(suffix)]
+    return word
+
+
+class _TrieNode:
+    __slots__ = ("children", "best", "terminal")
+
+    def __init__(self) -> None:
+        self.children: dict[str, "_TrieNode"] = {}
+        # product_id -> meilleur poids des mots du produit sous ce prefixe
+        self.best: dict[str, float] = {}
+        # nombre de produits dont un mot se termine ici
+        self.terminal = 0
+
+
+class PrefixTrie:
+    """
+    Trie des mots indexes; chaque noeud connait les produits (et leur meilleur
+    poids) sous son prefixe, la completion est donc en O(longueur du prefixe).
+    Les mots d'un produit sont toujours retires ensemble (cf. ProductSearchIndex.remove).
+    """
+
+    def __init__(self) -> None:
+        self.root = _TrieNode()
+
+    def insert(self, word: str, product_id: str, weight: float = 1.0) -> None:
+        node = self.root
+        for char in word:
+            node = node.children.setdefault(char, _TrieNode())
+            node.best[product_id] = max(node.best.get(product_id, 0.0), weight)
+        node.terminal += 1
+
+    def remove(self, word: str, product_id: str) -> None:
+        path = []
+        node = self.root
+        for char in word:
+            child = node.children.get(char)
+            if child is None:
+                return
+            path.append((node, char, child))
+            node = child
+        node.terminal = max(node.terminal - 1, 0)
+        for parent, char, child in reversed(path):
+            child.best.pop(product_id, None)
+            if not child.best:
+                del parent.children[char]
+
+    def _node(self, prefix: str) -> Optional[_TrieNode]:
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def weights(self, prefix: str) -> dict[str, float]:
+        node = self._node(prefix)
+        return node.best if node else {}
+
+    def complete(self, prefix: str, limit: int = 5) -> list[str]:
+        node = self._node(prefix)
+        if node is None:
+            return []
+        terms: list[tuple[int, str]] = []
+        stack = [(node, prefix)]
+        while stack:
+            current, word = stack.pop()
+            if current.terminal and word != prefix:
+                terms.append((current.terminal, word))
+            stack.extend((child, word + char) for char, child in current.children.items())
+        return [word for _, word in heapq.nsmallest(limit, terms, key=lambda item: (-item[0], len(item[1]), item[1]))]
+
+
+@dataclass
+class IndexedProduct:
+    id: str
+    name: str
+    full_name: str
+    sku: Optional[str]
+    price: float
+    in_stock: bool
+    gender: str
+    available_sizes: set[str]
+    available_colors: set[str]
+    image_url: Optional[str]
+    word_weights: dict[str, float] = field(default_factory=dict)
+    stem_weights: dict[str, float] = field(default_factory=dict)
+
+    def suggestion(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "full_name": self.full_name,
+            "sku": self.sku,
+            "price": self.price,
+            "in_stock": self.in_stock,
+            "image_url": self.image_url,
+        }
+
+
+def _first_image_url(product: dict[str, Any]) -> Optional[str]:
+    for variant in product.get("variants", []) or []:
+        for image in variant.get("images", []) or []:
+            url = image.get("url") if isinstance(image, dict) else image
+            if url:
+                return url
+    return None
+
+
+def index_record(product: dict[str, Any]) -> IndexedProduct:
+    record = IndexedProduct(
+        id=str(product["_id"]),
+        name=product.get("name") or "",
+        full_name=product.get("full_name") or product.get("name") or "",
+        sku=product.get("sku"),
+        price=float(product.get("price", 0) or 0),
+        in_stock=bool(product.get("in_stock", True)),
+        gender=normalize_facet_value(product.get("gender")),
+        available_sizes={normalize_facet_value(size) for size in product.get("available_sizes", []) or []},
+        available_colors={normalize_facet_value(color) for color in product.get("available_colors", []) or []},
+        image_url=_first_image_url(product),
+    )
+    sources = {
+        "sku": [product.get("sku")],
+        "name": [product.get("name")],
+        "full_name": [product.get("full_name")],
+        "categories": product.get("categories", []) or [],
+        "colors": [variant.get("color") for variant in product.get("variants", []) or []],
+    }
+    for field_name, values in sources.items():
+        weight = FIELD_WEIGHTS[field_name]
+        for value in values:
+            for word in tokenize(value):
+                record.word_weights[word] = max(record.word_weights.get(word, 0.0), weight)
+                root = stem(word)
+                record.stem_weights[root] = max(record.stem_weights.get(root, 0.0), weight)
+    return record
+
+
+class ProductSearchIndex:
+    """
+    Index inverse (racines -> produits ponderes) + trie de prefixes sur les mots
+    des produits, tenu a jour depuis le journal de versions du catalogue.
+    """
+
+    def __init__(self) -> None:
+        self.records: dict[str, IndexedProduct] = {}
+        self.postings: dict[str, dict[str, float]] = defaultdict(dict)
+        self.trie = PrefixTrie()
+        self.version: Optional[int] = None
+        self._lock = asyncio.Lock()
+        self._results: "OrderedDict[tuple, list[str]]" = OrderedDict()
+
+    def add(self, product: dict[str, Any]) -> None:
+        record = index_record(product)
+        self.remove(record.id)
+        self.records[record.id] = record
+        for root, weight in record.stem_weights.items():
+            self.postings[root][record.id] = weight
+        for word, weight in record.word_weights.items():
+            self.trie.insert(word, record.id, weight)
+        self._results.clear()
+
+    def remove(self, product_id: str) -> None:
+        record = self.records.pop(product_id, None)
+        if record is None:
+            return
+        for root in record.stem_weights:
+            postings = self.postings.get(root)
+            if postings is not None:
+                postings.pop(product_id, None)
+                if not postings:
+                    del self.postings[root]
+        for word in record.word_weights:
+            self.trie.remove(word, product_id)
+        self._results.clear()
+
+    def clear(self) -> None:
+        self.records.clear()
+        self.postings.clear()
+        self.trie = PrefixTrie()
+        self._results.clear()
+
+    async def rebuild(self, db) -> int:
+        version = await current_version(db, CATALOG_NAMESPACE)
+        products = await product_crud.list_products_for_search_index(db)
+        self.clear()
+        for product in products:
+            self.add(product)
+        self.version = version
+        logger.info("Search index built: %s products (catalog v%s)", len(self.records), version)
+        return len(self.records)
+
+    async def sync(self, db) -> None:
+        if self.version is not None and await current_version(db, CATALOG_NAMESPACE) == self.version:
+            return
+        async with self._lock:
+            if self.version is None:
+                await self.rebuild(db)
+                return
+            version, changed_ids = await changes_since(db, CATALOG_NAMESPACE, self.version)
+            if version == self.version:
+                return
+            if changed_ids is None:
+                await self.rebuild(db)
+                return
+            products = await product_crud.list_products_for_search_index(db, list(changed_ids))
+            for product_id in changed_ids:
+                self.remove(product_id)
+            for product in products:
+                self.add(product)
+            self.version = version
+
+    def _token_scores(self, token: str, prefix: bool) -> dict[str, float]:
+        scores = self.postings.get(stem(token), {})
+        if not prefix:
+            return scores
+        prefixed = {product_id: weight * PREFIX_MATCH_FACTOR for product_id, weight in self.trie.weights(token).items()}
+        for product_id, weight in scores.items():
+            if weight > prefixed.get(product_id, 0.0):
+                prefixed[product_id] = weight
+        return prefixed
+
+    def _matches_filters(self, record: IndexedProduct, gender, in_stock, size, color) -> bool:
+        if gender and record.gender != normalize_facet_value(gender):
+            return False
+        if in_stock is not None and record.in_stock != in_stock:
+            return False
+        if size and normalize_facet_value(size) not in record.available_sizes:
+            return False
+        if color and normalize_facet_value(color) not in record.available_colors:
+            return False
+        return True
+
+    def search(
+        self,
+        query: str,
+        *,
+        gender: Optional[str] = None,
+        in_stock: Optional[bool] = None,
+        size: Optional[str] = None,
+        color: Optional[str] = None,
+    ) -> list[str]:
+        """
+        Identifiants tries par pertinence; tous les mots doivent correspondre et
+        le dernier est traite comme un prefixe (saisie en cours).
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        last_is_prefix = not query[-1:].isspace()
+        cache_key = (tuple(tokens), last_is_prefix, gender, in_stock, size, color)
+        cached = self._results.get(cache_key)
+        if cached is not None:
+            self._results.move_to_end(cache_key)
+            return cached
+
+        scores: dict[str, float] = {}
+        for index, token in enumerate(tokens):
+            token_scores = self._token_scores(token, prefix=last_is_prefix and index == len(tokens) - 1)
+            if index == 0:
+                scores = token_scores
+            else:
+                scores = {product_id: score + token_scores[product_id] for product_id, score in scores.items() if product_id in token_scores}
+            if not scores:
+                break
+        records = (self.records[product_id] for product_id in scores)
+        if gender or in_stock is not None or size or color:
+            records = (record for record in records if self._matches_filters(record, gender, in_stock, size, color))
+        ranked = [record.id for record in sorted(records, key=lambda record: (-scores[record.id], not record.in_stock, record.full_name))]
+
+        self._results[cache_key] = ranked
+        if len(self._results) > RESULT_CACHE_SIZE:
+            self._results.popitem(last=False)
+        return ranked
+
+    def suggest(self, query: str, limit: int = 8) -> dict[str, list]:
+        tokens = tokenize(query)
+        return {
+            "items": [self.records[product_id].suggestion() for product_id in self.search(query)[:limit]],
+            "terms": self.trie.complete(tokens[-1], limit) if tokens else [],
+        }
+
+
+product_search_index = ProductSearchIndex()
@@ -1,8 +1,9 @@
-from typing import List
+from typing import List, Optional
 
 from fastapi import HTTPException, Request, status
 
 from app.analytics.service import track_event
+from app.core.versioned_cache import CachedPayload, cached_json_response, current_version
 from app.crud import vlog as vlog_crud
 from app.schemas.vlog import (
     VlogChapterWithEpisodesOut,
@@ -11,15 +12,19 @@ from app.schemas.vlog import (
     VlogEpisodeViewOut,
     VlogPageOut,
 )
-from app.services.services_cms.engagement_service import comment_out
+from app.services.services_cms.engagement_service import comment_out, comments_out
 from app.services.services_cms.vlog_service import (
     PUBLIC_CHAPTER_STATUSES,
     PUBLIC_EPISODE_STATUSES,
     chapter_with_episodes,
+    chapters_with_episodes,
     now_utc,
     settings_out,
     validate_object_id,
 )
+from app.services.services_cms.vlog_cache import invalidate_vlog, vlog_page_cache
+from app.services.services_store.catalog_cache import CATALOG_NAMESPACE
+from app.services.services_store.vlog_view_counter import episode_view_counter
 
 
 async def public_episode_or_404(db, episode_id: str):
@@ -30,19 +35,34 @@ async def public_episode_or_404(db, episode_id: str):
     return episode
 
 
-async def read_storefront_vlog(db, current_user) -> VlogPageOut:
+async def build_storefront_vlog(db, current_user) -> VlogPageOut:
     settings = await settings_out(db)
     if not settings.is_active:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Page vlog desactivee")
 
     chapter_docs = await vlog_crud.list_chapters(db, {"status": {"$in": PUBLIC_CHAPTER_STATUSES}}, limit=100)
-    chapters = [
-        await chapter_with_episodes(db, chapter, public_only=True, current_user=current_user)
-        for chapter in chapter_docs
-    ]
+    chapters = await chapters_with_episodes(db, chapter_docs, public_only=True, current_user=current_user)
     return VlogPageOut(settings=settings, chapters=chapters)
 
 
+async def read_storefront_vlog(db, current_user, request: Optional[Request] = None):
+    """
+    La page anonyme est servie depuis le cache (version vlog + version
+    catalogue pour les produits lies); les likes du client sont propres a
+    chaque utilisateur et ne sont pas caches.
+    """
+    if current_user:
+        return await build_storefront_vlog(db, current_user)
+
+    async def build():
+        page = await build_storefront_vlog(db, None)
+        return CachedPayload.from_body(page.model_dump_json().encode("utf-8"))
+
+    catalog_version = await current_version(db, CATALOG_NAMESPACE)
+    payload = await vlog_page_cache.get_or_build(db, ("page", catalog_version), build)
+    return cached_json_response(request, payload)
+
+
 async def read_storefront_vlog_chapter(db, slug: str, current_user) -> VlogChapterWithEpisodesOut:
     chapter = await vlog_crud.find_chapter(db, {
         "slug": slug,
@@ -55,7 +75,7 @@ async def read_storefront_vlog_chapter(db, slug: str, current_user) -> VlogChapt
 
 async def track_episode_view(db, episode_id: str, request: Request, current_user) -> VlogEpisodeViewOut:
     episode = await public_episode_or_404(db, episode_id)
-    updated = await vlog_crud.increment_episode_view_count(db, episode["_id"], now_utc())
+    view_count = episode_view_counter.record(episode["_id"], episode.get("view_count", 0))
     await track_event(
         db,
         "vlog_episode_viewed",
@@ -69,22 +89,29 @@ async def track_episode_view(db, episode_id: str, request: Request, current_user
     )
     return VlogEpisodeViewOut(
         episode_id=str(episode["_id"]),
-        view_count=int((updated or episode).get("view_count", 0) or 0),
+        view_count=view_count,
     )
 
 
+async def episode_like_count(db, episode_id) -> int:
+    counters = await vlog_crud.find_episode_counters(db, episode_id) or {}
+    return max(int(counters.get("like_count", 0) or 0), 0)
+
+
 async def like_episode(db, episode_id: str, current_user) -> VlogEpisodeLikeOut:
     episode = await public_episode_or_404(db, episode_id)
-    await vlog_crud.upsert_episode_like(db, episode["_id"], current_user["_id"], now_utc())
-    like_count = await vlog_crud.count_episode_likes(db, episode["_id"])
-    return VlogEpisodeLikeOut(episode_id=str(episode["_id"]), liked=True, like_count=like_count)
+    result = await vlog_crud.upsert_episode_like(db, episode["_id"], current_user["_id"], now_utc())
+    if result.upserted_id is not None:
+        await invalidate_vlog(db)
+    return VlogEpisodeLikeOut(episode_id=str(episode["_id"]), liked=True, like_count=await episode_like_count(db, episode["_id"]))
 
 
 async def unlike_episode(db, episode_id: str, current_user) -> VlogEpisodeLikeOut:
     episode = await public_episode_or_404(db, episode_id)
-    await vlog_crud.delete_episode_like(db, episode["_id"], current_user["_id"])
-    like_count = await vlog_crud.count_episode_likes(db, episode["_id"])
-    return VlogEpisodeLikeOut(episode_id=str(episode["_id"]), liked=False, like_count=like_count)
+    result = await vlog_crud.delete_episode_like(db, episode["_id"], current_user["_id"])
+    if result.deleted_count:
+        await invalidate_vlog(db)
+    return VlogEpisodeLikeOut(episode_id=str(episode["_id"]), liked=False, like_count=await episode_like_count(db, episode["_id"]))
 
 
 async def create_episode_comment(db, episode_id: str, payload, current_user) -> VlogCommentOut:
@@ -102,6 +129,7 @@ async def create_episode_comment(db, episode_id: str, payload, current_user) ->
         "updated_at": now,
     }
     res = await vlog_crud.insert_comment(db, data)
+    await invalidate_vlog(db)
     created = await vlog_crud.find_comment_by_id(db, res.inserted_id)
     return await comment_out(db, created)
 
@@ -109,7 +137,7 @@ async def create_episode_comment(db, episode_id: str, payload, current_user) ->
 async def list_episode_comments(db, episode_id: str, skip: int, limit: int) -> List[VlogCommentOut]:
     episode = await public_episode_or_404(db, episode_id)
     docs = await vlog_crud.list_visible_episode_comments(db, episode["_id"], skip, limit)
-    return [await comment_out(db, doc) for doc in docs]
+    return await comments_out(db, docs)
 
 
 async def delete_own_episode_comment(db, episode_id: str, comment_id: str, current_user) -> None:
@@ -121,3 +149,4 @@ async def delete_own_episode_comment(db, episode_id: str, comment_id: str, curre
     if str(doc["user_id"]) != str(current_user["_id"]):
         raise HTTPException(status.HTTP_403_FORBIDDEN, "Action non autorisee")
     await vlog_crud.delete_comment(db, comment_oid)
+    await invalidate_vlog(db)
@@ -0,0 +1,78 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict
+
+from app.crud import vlog as vlog_crud
+from app.db import db
+from app.services.services_cms.vlog_cache import invalidate_vlog
+from app.services.services_cms.vlog_service import now_utc
+
+logger = logging.getLogger("vlog_view_counter")
+
+FLUSH_INTERVAL_SECONDS = 5
+# Les compteurs de vues de la page vlog en cache sont approximatifs: on ne
+# change la version vlog pour eux qu'a cet intervalle, pas a chaque flush.
+VIEW_INVALIDATE_INTERVAL_SECONDS = 15 * 60
+
+
+class EpisodeViewCounter:
+    """
+    Accumule les vues d'episode en memoire et les ecrit par lots: un episode
+    tendance ne devient plus un document ecrit a chaque vue.
+    """
+
+    def __init__(self) -> None:
+        self._pending: Dict[Any, int] = {}
+        self._lock = asyncio.Lock()
+        self._invalidated_at = time.monotonic()
+
+    def pending(self, episode_id) -> int:
+        return self._pending.get(episode_id, 0)
+
+    def record(self, episode_id, persisted_count: int = 0) -> int:
+        """
+        Compte une vue et retourne le total approximatif (valeur en base +
+        vues pas encore ecrites).
+        """
+        self._pending[episode_id] = self._pending.get(episode_id, 0) + 1
+        return int(persisted_count or 0) + self._pending[episode_id]
+
+    async def flush(self, database) -> int:
+        async with self._lock:
+            counts, self._pending = self._pending, {}
+            if not counts:
+                return 0
+            try:
+                await vlog_crud.increment_episode_view_counts(database, counts, now_utc())
+            except BaseException:
+                # Rien n'est perdu, y compris sur annulation (arret): les
+                # increments repartent au prochain flush.
+                for episode_id, count in counts.items():
+                    self._pending[episode_id] = self._pending.get(episode_id, 0) + count
+                raise
+        if time.monotonic() - self._invalidated_at >= VIEW_INVALIDATE_INTERVAL_SECONDS:
+            self._invalidated_at = time.monotonic()
+            await invalidate_vlog(database)
+        return sum(counts.values())
+
+
+episode_view_counter = EpisodeViewCounter()
+
+
+async def episode_view_flush_loop() -> None:
+    while True:
+        await asyncio.sleep(FLUSH_INTERVAL_SECONDS)
+        try:
+            await episode_view_counter.flush(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Episode view flush failed")
+
+
+async def flush_episode_views_on_shutdown() -> None:
+    try:
+        await episode_view_counter.flush(db)
+    except Exception:
+        logger.exception("Episode view flush failed on shutdown")
@@ -0,0 +1,45 @@
+import argparse
+import asyncio
+import json
+from pathlib import Path
+
+from app.domain.inventory import availability_summary, availability_summary_pipeline
+
+
+def read_env_value(name: str) -> str:
+    for line in Path(".env").read_text(encoding="utf-8").splitlines():
+        if line.startswith(f"{name}="):
+            return line.split("=", 1)[1].strip().strip('"').strip("'")
+    raise RuntimeError(f"Variable {name} introuvable dans .env")
+
+
+async def main():
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    parser = argparse.ArgumentParser(description="Calcule le resume de disponibilite (stock_available_total, available_sizes, ...) des produits")
+    parser.add_argument("--apply", action="store_true", help="Ecrit les resumes en base")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(read_env_value("MONGODB_URL"))
+    db = client[read_env_value("MONGODB_DB_NAME")]
+    summary = {"mode": "apply" if args.apply else "dry-run", "products": 0, "drifted": 0}
+    async for product in db["products"].find({}, {"variants": 1, "in_stock": 1, "stock_available_total": 1, "available_sizes": 1, "available_colors": 1}):
+        summary["products"] += 1
+        expected = availability_summary(product.get("variants") or [], fallback_in_stock=product.get("in_stock", True))
+        current = {
+            "stock_available_total": product.get("stock_available_total"),
+            "available_sizes": sorted(product.get("available_sizes") or []),
+            "available_colors": sorted(product.get("available_colors") or []),
+            "in_stock": product.get("in_stock", True),
+        }
+        if current != {**expected, "available_sizes": sorted(expected["available_sizes"]), "available_colors": sorted(expected["available_colors"])}:
+            summary["drifted"] += 1
+    if args.apply:
+        result = await db["products"].update_many({}, availability_summary_pipeline())
+        summary["modified"] = result.modified_count
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
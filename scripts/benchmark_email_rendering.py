@@ -0,0 +1,62 @@
+import argparse
+import asyncio
+import json
+import time
+
+from app.services.services_store import email_templates
+
+
+DROP_CONTEXT = {
+    "drop_name": "Savage Rise Drop",
+    "title": "Le drop est disponible",
+    "subtitle": "Nouvelle collection",
+    "preview": "Les pieces sont en ligne.",
+    "cta_label": "Shop the drop",
+    "cta_url": "https://savagerise.com/products",
+    "logo_url": "https://ik.imagekit.io/savagerise/logo.png",
+}
+
+
+def _timed(label: str, count: int, started: float) -> dict:
+    elapsed = time.perf_counter() - started
+    return {"mode": label, "messages": count, "seconds": round(elapsed, 4), "us_per_message": round(elapsed / count * 1e6, 2)}
+
+
+async def run(count: int) -> list[dict]:
+    recipients = [{"recipient_email": f"client{index}@example.com"} for index in range(count)]
+    results = []
+
+    started = time.perf_counter()
+    env = email_templates._build_environment()
+    env.cache = None
+    for recipient in recipients:
+        env.get_template("drop_release.html").render(**DROP_CONTEXT, **recipient)
+    results.append(_timed("uncached_env_per_message", count, started))
+
+    email_templates.precompile_templates()
+    started = time.perf_counter()
+    for recipient in recipients:
+        email_templates.render_template("drop_release.html", **DROP_CONTEXT, **recipient)
+    results.append(_timed("precompiled_render_per_message", count, started))
+
+    started = time.perf_counter()
+    campaign = email_templates.campaign_template("drop_release.html", "benchmark", DROP_CONTEXT, ["recipient_email"])
+    for recipient in recipients:
+        campaign.personalize(**recipient)
+    results.append(_timed("campaign_memoized_personalize", count, started))
+
+    started = time.perf_counter()
+    await email_templates.personalize_many(campaign, recipients)
+    results.append(_timed("campaign_memoized_thread_pool", count, started))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du rendu des emails (python -m scripts.benchmark_email_rendering)")
+    parser.add_argument("--messages", type=int, default=10000)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.messages)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,8 @@ from pathlib import Path
 
 from bson import ObjectId
 
+from app.domain.inventory import availability_summary_pipeline
+
 
 def read_env_value(name: str) -> str:
     for line in Path(".env").read_text(encoding="utf-8").splitlines():
@@ -50,6 +52,7 @@ async def main():
     )
     if result.modified_count == 0:
         raise SystemExit("Variante introuvable ou non modifiee")
+    await db["products"].update_one({"_id": ObjectId(args.product_id)}, availability_summary_pipeline())
     await db["inventory_movements"].update_one(
         {"operation_key": operation_key},
         {
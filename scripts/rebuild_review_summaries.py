@@ -0,0 +1,36 @@
+import argparse
+import asyncio
+import json
+from pathlib import Path
+
+from app.crud.review import recompute_review_summaries
+from app.services.services_store.catalog_cache import invalidate_catalog
+
+
+def read_env_value(name: str) -> str:
+    for line in Path(".env").read_text(encoding="utf-8").splitlines():
+        if line.startswith(f"{name}="):
+            return line.split("=", 1)[1].strip().strip('"').strip("'")
+    raise RuntimeError(f"Variable {name} introuvable dans .env")
+
+
+async def main():
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    parser = argparse.ArgumentParser(description="Recalcule les resumes d'avis (nombre, moyenne, histogramme) depuis la collection reviews")
+    parser.add_argument("--apply", action="store_true", help="Ecrit les resumes corriges en base")
+    parser.add_argument("--product", action="append", dest="products", help="Limite a un produit (option repetable)")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(read_env_value("MONGODB_URL"))
+    db = client[read_env_value("MONGODB_DB_NAME")]
+    summary = {"mode": "apply" if args.apply else "dry-run"}
+    summary.update(await recompute_review_summaries(db, args.products, apply=args.apply))
+    if args.apply and (summary["drifted"] or summary["removed"]):
+        await invalidate_catalog(db, *(args.products or []))
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,239 @@
+import asyncio
+import unittest
+from datetime import datetime
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
+
+from bson import ObjectId
+
+from app.core import pagination
+from app.core.pagination import PaginationParams
+from app.crud import notification as notification_crud
+from app.schemas.notification import NotificationOut
+from app.services.services_erp import notification_bus, notification_service
+from app.services.services_erp.notification_bus import LocalNotificationBus, MongoNotificationBus
+
+
+class AdminNotificationInboxTests(unittest.IsolatedAsyncioTestCase):
+    async def test_broadcast_fans_out_to_every_open_inbox(self):
+        doc = {"_id": ObjectId(), "category": "orders", "priority": "high", "created_at": datetime.utcnow()}
+        increment = AsyncMock()
+        with (
+            patch.object(notification_crud, "list_inbox_admin_ids", AsyncMock(return_value=["a1", "a2"])) as list_ids,
+            patch.object(notification_crud, "insert_inbox_entries", AsyncMock(side_effect=lambda db, entries: entries)),
+            patch.object(notification_crud, "increment_inbox_counters", increment),
+        ):
+            delivered = await notification_service.fan_out_notification(object(), doc)
+
+        list_ids.assert_awaited_once_with(ANY, None)
+        self.assertEqual(delivered, ["a1", "a2"])
+        increment.assert_awaited_once_with(ANY, ["a1", "a2"])
+
+    async def test_targeted_notification_only_counts_inserted_entries(self):
+        doc = {"_id": ObjectId(), "category": "orders", "recipient_admin_id": "a1", "created_at": datetime.utcnow()}
+        increment = AsyncMock()
+        with (
+            patch.object(notification_crud, "list_inbox_admin_ids", AsyncMock(return_value=["a1"])) as list_ids,
+            patch.object(notification_crud, "insert_inbox_entries", AsyncMock(return_value=[])),
+            patch.object(notification_crud, "increment_inbox_counters", increment),
+        ):
+            delivered = await notification_service.fan_out_notification(object(), doc)
+
+        list_ids.assert_awaited_once_with(ANY, ["a1"])
+        self.assertEqual(delivered, [])
+        increment.assert_awaited_once_with(ANY, [])
+
+    async def test_unread_count_reads_materialized_counter(self):
+        counters = {"_id": "a1", "initialized": True, "unread_count": 7, "total_count": 40}
+        with patch.object(notification_crud, "find_inbox_counters", AsyncMock(return_value=counters)):
+            unread = await notification_service.unread_notifications_count(object(), admin_id="a1")
+            total = await notification_service.count_notifications(object(), admin_id="a1", filters={})
+            read = await notification_service.count_notifications(object(), admin_id="a1", filters={"is_read": True})
+
+        self.assertEqual((unread, total, read), (7, 40, 33))
+
+    async def test_inbox_list_pages_by_cursor_without_counting(self):
+        notification = {"_id": ObjectId(), "title": "Commande", "message": "m", "category": "orders", "priority": "high", "created_at": datetime(2026, 5, 1)}
+        entries = [
+            {"_id": ObjectId(), "admin_id": "a1", "notification_id": notification["_id"], "is_read": False, "created_at": datetime(2026, 5, 1)}
+            for _ in range(3)
+        ]
+        cursor = MagicMock()
+        cursor.sort.return_value = cursor
+        cursor.limit.return_value = cursor
+        cursor.to_list = AsyncMock(return_value=entries)
+        inbox = MagicMock()
+        inbox.find.return_value = cursor
+        inbox.count_documents = AsyncMock()
+        db = {notification_crud.INBOX_COLLECTION: inbox}
+        counters = {"_id": "a1", "initialized": True, "unread_count": 7, "total_count": 40}
+        token = pagination.encode_cursor(("created_at", -1), entries[0], "next")
+
+        with (
+            patch.object(notification_crud, "find_inbox_counters", AsyncMock(return_value=counters)),
+            patch.object(notification_crud, "find_notifications_by_ids", AsyncMock(return_value=[notification])),
+        ):
+            items, window = await notification_service.list_notifications(
+                db, admin_id="a1", filters={"category": "orders"}, pagination=PaginationParams(page_size=2, cursor=token)
+            )
+
+        inbox.count_documents.assert_not_awaited()
+        cursor.skip.assert_not_called()
+        self.assertEqual(len(items), 2)
+        self.assertEqual((window["total"], window["total_is_estimate"], window["has_next"]), (40, True, True))
+
+    async def test_mark_all_read_decrements_by_rows_marked(self):
+        now = datetime(2026, 5, 1)
+        inbox = MagicMock()
+        inbox.update_many = AsyncMock(return_value=MagicMock(modified_count=3))
+        counters = MagicMock()
+        counters.update_one = AsyncMock()
+        db = {notification_crud.INBOX_COLLECTION: inbox, notification_crud.COUNTERS_COLLECTION: counters}
+
+        self.assertEqual(await notification_crud.mark_inbox_read(db, admin_id="a1", now=now), 3)
+        pipeline = counters.update_one.await_args.args[1]
+        self.assertEqual(pipeline[0]["$set"]["unread_count"], {"$max": [0, {"$subtract": ["$unread_count", 3]}]})
+
+        inbox.update_many.return_value = MagicMock(modified_count=0)
+        counters.update_one.reset_mock()
+        self.assertEqual(await notification_crud.mark_inbox_read(db, admin_id="a1", now=now), 0)
+        counters.update_one.assert_not_awaited()
+
+    def test_inbox_entry_copies_filterable_fields(self):
+        doc = {"_id": ObjectId(), "category": "stock", "priority": "urgent", "created_at": datetime(2026, 1, 1)}
+        entry = notification_crud.inbox_entry(doc, "a1")
+
+        self.assertEqual(entry["notification_id"], doc["_id"])
+        self.assertEqual(entry["category"], "stock")
+        self.assertEqual(entry["priority"], "urgent")
+        self.assertFalse(entry["is_read"])
+
+
+class FakeWebSocket:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.sent = []
+        self.closed_code = None
+
+    async def accept(self):
+        return None
+
+    async def send_json(self, message):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(message)
+
+    async def close(self, code=1000):
+        self.closed_code = code
+
+
+class NotificationConnectionManagerTests(unittest.IsolatedAsyncioTestCase):
+    def _notification(self, recipient_admin_id=None):
+        return NotificationOut(
+            id=str(ObjectId()),
+            category="orders",
+            title="Nouvelle commande",
+            message="Commande #1",
+            recipient_admin_id=recipient_admin_id,
+            created_at=datetime.utcnow(),
+        )
+
+    async def test_broadcast_reaches_every_local_socket(self):
+        manager = notification_service.NotificationConnectionManager(LocalNotificationBus())
+        first, second = FakeWebSocket(), FakeWebSocket()
+        await manager.connect("a1", first)
+        await manager.connect("a2", second)
+
+        await manager.broadcast(self._notification())
+        await asyncio.sleep(0.01)
+
+        self.assertEqual(first.sent[0]["type"], "notification.created")
+        self.assertEqual(second.sent[0]["type"], "notification.created")
+
+    async def test_targeted_notification_only_reaches_recipient(self):
+        manager = notification_service.NotificationConnectionManager(LocalNotificationBus())
+        first, second = FakeWebSocket(), FakeWebSocket()
+        await manager.connect("a1", first)
+        await manager.connect("a2", second)
+
+        await manager.broadcast(self._notification(recipient_admin_id="a2"))
+        await asyncio.sleep(0.01)
+
+        self.assertEqual(first.sent, [])
+        self.assertEqual(len(second.sent), 1)
+
+    async def test_slow_consumer_is_dropped_without_blocking_others(self):
+        manager = notification_service.NotificationConnectionManager(LocalNotificationBus(), queue_size=1)
+        slow, fast = FakeWebSocket(delay=1.0), FakeWebSocket()
+        await manager.connect("slow", slow)
+        await manager.connect("fast", fast)
+
+        for _ in range(3):
+            await manager.broadcast(self._notification())
+            await asyncio.sleep(0.01)
+
+        self.assertEqual(len(fast.sent), 3)
+        self.assertEqual(slow.closed_code, 1013)
+        self.assertNotIn("slow", manager._connections)
+        manager.disconnect("fast", fast)
+
+
+
+class FakeTailableCursor:
+    """Curseur tailable: un lot par iteration, vivant tant qu'il reste des lots."""
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.closed = False
+
+    @property
+    def alive(self):
+        return bool(self.batches)
+
+    def __aiter__(self):
+        return self._batch()
+
+    async def _batch(self):
+        for doc in self.batches.pop(0):
+            yield doc
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBusCollection:
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.find_calls = 0
+
+    def find(self, query, cursor_type=None):
+        self.find_calls += 1
+        if self.find_calls > 1:
+            raise asyncio.CancelledError
+        return self.cursor
+
+
+class MongoNotificationBusTests(unittest.IsolatedAsyncioTestCase):
+    async def test_tail_keeps_alive_cursor_across_empty_batches(self):
+        messages = [{"_id": ObjectId(), "message": {"title": "a"}}, {"_id": ObjectId(), "message": {"title": "b"}}]
+        cursor = FakeTailableCursor([[messages[0]], [], [], [messages[1]]])
+        collection = FakeBusCollection(cursor)
+        bus = MongoNotificationBus({notification_bus.BUS_COLLECTION: collection})
+        delivered = []
+        bus.bind(AsyncMock(side_effect=delivered.append))
+
+        with (
+            patch.object(bus, "ensure_collection", AsyncMock()),
+            patch.object(bus, "_latest_id", AsyncMock(return_value=None)),
+            patch.object(notification_bus, "TAIL_RETRY_SECONDS", 0),
+        ):
+            with self.assertRaises(asyncio.CancelledError):
+                await bus.run()
+
+        self.assertEqual(delivered, [{"title": "a"}, {"title": "b"}])
+        self.assertTrue(cursor.closed)
+        # Reouvert une seule fois, apres la mort du curseur.
+        self.assertEqual(collection.find_calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import json
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from bson import ObjectId
+from starlette.requests import Request
+
+from app.core import versioned_cache
+from app.crud import product as product_crud
+from app.crud import review as review_crud
+from app.services.services_store import product_service
+from app.services.services_store.catalog_cache import catalog_cache, invalidate_catalog
+
+
+class FakeVersionsCollection:
+    def __init__(self):
+        self.docs = {}
+
+    async def find_one(self, query, projection=None):
+        return self.docs.get(query["_id"])
+
+    async def find_one_and_update(self, query, update, upsert=False, return_document=None):
+        # update pipeline de bump_version: version + 1 puis ajout au journal
+        doc = self.docs.setdefault(query["_id"], {"_id": query["_id"], "version": 0, "changes": []})
+        doc["version"] += 1
+        keys = update[1]["$set"]["changes"]["$slice"][0]["$concatArrays"][1][0]["keys"]["$literal"]
+        doc["changes"].append({"version": doc["version"], "keys": keys})
+        return doc
+
+
+class FakeDb:
+    def __init__(self):
+        self.versions = FakeVersionsCollection()
+
+    def __getitem__(self, name):
+        assert name == versioned_cache.VERSIONS_COLLECTION
+        return self.versions
+
+
+def make_request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/products", "headers": headers, "query_string": b""})
+
+
+class CatalogCacheUnitTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        versioned_cache.forget_versions()
+        catalog_cache.clear()
+        self.db = FakeDb()
+        self.product = {
+            "_id": ObjectId(),
+            "name": "Hoodie",
+            "full_name": "Hoodie Oversize",
+            "style_id": "SR-HOOD",
+            "price": 120.0,
+            "variants": [{"color": "Noir", "sizes": [{"size": "M", "stock_on_hand": 3, "stock_reserved": 1}], "images": []}],
+        }
+
+    async def _detail(self, get_product, request):
+        with (
+            patch.object(product_crud, "get_product", get_product),
+            patch.object(review_crud, "find_review_summary", AsyncMock(return_value={"count": 2, "rating_sum": 9, "histogram": {"4": 1, "5": 1}})),
+            patch.object(product_service, "track_event", AsyncMock()) as track_event,
+        ):
+            response = await product_service.get_product_detail(self.db, str(self.product["_id"]), request, None)
+        return response, track_event
+
+    async def test_product_detail_is_served_from_cache_with_etag(self):
+        get_product = AsyncMock(return_value=self.product)
+
+        first, _ = await self._detail(get_product, make_request())
+        second, track_event = await self._detail(get_product, make_request())
+
+        self.assertEqual(get_product.await_count, 1)
+        self.assertEqual(first.body, second.body)
+        self.assertEqual(json.loads(first.body)["id"], str(self.product["_id"]))
+        self.assertEqual(json.loads(first.body)["review_stats"]["average_rating"], 4.5)
+        self.assertEqual(track_event.await_args.kwargs["metadata"]["product_name"], "Hoodie Oversize")
+
+        not_modified, _ = await self._detail(get_product, make_request(first.headers["etag"]))
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.body, b"")
+
+    async def test_catalog_bump_rebuilds_payload(self):
+        get_product = AsyncMock(return_value=self.product)
+        first, _ = await self._detail(get_product, make_request())
+
+        self.product["variants"][0]["sizes"][0]["stock_reserved"] = 3
+        await invalidate_catalog(self.db, self.product["_id"])
+        second, _ = await self._detail(get_product, make_request(first.headers["etag"]))
+
+        self.assertEqual(get_product.await_count, 2)
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(first.headers["etag"], second.headers["etag"])
+        self.assertFalse(json.loads(second.body)["in_stock"])
+
+    async def test_changes_since_reports_changed_ids_or_full_rebuild(self):
+        a, b, c = (str(ObjectId()) for _ in range(3))
+        await invalidate_catalog(self.db, a)
+        await invalidate_catalog(self.db, b, ObjectId(c), "garbage", None)
+        self.assertEqual(await invalidate_catalog(self.db, "garbage", None), 2)
+
+        self.assertEqual(await versioned_cache.changes_since(self.db, "catalog", 1), (2, {b, c}))
+        self.assertEqual(await versioned_cache.changes_since(self.db, "catalog", 2), (2, set()))
+
+        await invalidate_catalog(self.db)
+        self.assertEqual(await versioned_cache.changes_since(self.db, "catalog", 1), (3, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
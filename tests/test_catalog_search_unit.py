@@ -0,0 +1,101 @@
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from bson import ObjectId
+
+from app.core import versioned_cache
+from app.crud import product as product_crud
+from app.domain.catalog_search import facet_filters, search_facets
+from app.services.services_store import catalog_search_service
+from app.services.services_store.catalog_cache import facet_cache
+
+
+class FakeVersionsDb:
+    class Collection:
+        async def find_one(self, query, projection=None):
+            return {"_id": query["_id"], "version": 3}
+
+    def __getitem__(self, name):
+        return self.Collection()
+
+
+def make_product(name="Hoodie"):
+    return {
+        "_id": ObjectId(),
+        "style_id": "SR-1",
+        "name": name,
+        "full_name": name,
+        "price": 120.0,
+        "in_stock": True,
+        "variants": [],
+    }
+
+
+class CatalogSearchUnitTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        versioned_cache.forget_versions()
+        facet_cache.clear()
+
+    def test_search_facets_are_normalized(self):
+        facets = search_facets({
+            "gender": " Homme ",
+            "categories": ["Hoodies", "hoodies"],
+            "variants": [
+                {"color": "Noir  Mat", "sizes": [{"size": "M"}, {"size": "l"}]},
+                {"color": "noir mat", "sizes": [{"size": "L"}]},
+            ],
+        })
+        self.assertEqual(facets, {"gender": "homme", "colors": ["noir mat"], "sizes": ["m", "l"], "categories": ["hoodies"]})
+
+    def test_each_facet_branch_ignores_its_own_filter(self):
+        filters = facet_filters(color="Noir", size="M", in_stock=True)
+        pipeline = catalog_search_service.faceted_search_pipeline(None, filters, [("_id", -1)], 0, 10)
+        branches = pipeline[-1]["$facet"]
+
+        self.assertEqual(branches["hits"][0]["$match"], {"search_facets.colors": "noir", "search_facets.sizes": "m", "in_stock": True})
+        self.assertEqual(branches["color"][0]["$match"], {"search_facets.sizes": "m", "in_stock": True})
+        self.assertEqual(branches["availability"][0]["$match"], {"search_facets.colors": "noir", "search_facets.sizes": "m"})
+
+    def test_price_branch_skips_products_without_a_valid_price(self):
+        pipeline = catalog_search_service.faceted_search_pipeline(None, {}, [("_id", -1)], 0, 10)
+        stages = pipeline[-1]["$facet"]["price"]
+
+        self.assertEqual(stages[1], {"$match": {"price": {"$gte": 0}}})
+        self.assertIn("$bucket", stages[2])
+
+    def test_facets_from_result_maps_price_buckets_and_availability(self):
+        summary = catalog_search_service.facets_from_result({
+            "total": [{"value": 4}],
+            "color": [{"_id": "noir", "count": 3}],
+            "price": [{"_id": 100, "count": 2}, {"_id": "overflow", "count": 1}],
+            "availability": [{"_id": True, "count": 3}, {"_id": False, "count": 1}],
+        })
+
+        self.assertEqual(summary["total"], 4)
+        self.assertEqual(summary["facets"]["color"], [{"value": "noir", "count": 3}])
+        self.assertEqual(summary["facets"]["price"], [{"min": 100, "max": 150, "count": 2}, {"min": 300, "max": None, "count": 1}])
+        self.assertEqual([row["value"] for row in summary["facets"]["availability"]], ["in_stock", "out_of_stock"])
+
+    async def test_next_page_reuses_cached_facets(self):
+        first_page = [make_product("A")]
+        second_page = [make_product("B")]
+        faceted = AsyncMock(return_value={"hits": first_page, "total": [{"value": 2}], "gender": [{"_id": "homme", "count": 2}]})
+        hits = AsyncMock(return_value=second_page)
+
+        with (
+            patch.object(product_crud, "faceted_search", faceted),
+            patch.object(product_crud, "search_hits", hits),
+        ):
+            first = await catalog_search_service.faceted_search(FakeVersionsDb(), gender="Homme", limit=1)
+            second = await catalog_search_service.faceted_search(FakeVersionsDb(), gender="homme", skip=1, limit=1)
+
+        faceted.assert_awaited_once()
+        hits.assert_awaited_once()
+        self.assertEqual(hits.await_args.args[1], {"search_facets.gender": "homme"})
+        self.assertEqual([item.name for item in first.items + second.items], ["A", "B"])
+        self.assertEqual(second.total, 2)
+        self.assertEqual(second.facets.gender[0].count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
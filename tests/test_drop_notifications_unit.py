@@ -0,0 +1,130 @@
+import unittest
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+from bson import ObjectId
+
+from app.crud import drop_countdown as countdown_crud
+from app.services.services_cms import drop_countdown_notifier
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def __aiter__(self):
+        self._iter = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class DropNotificationPipelineTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.users = [{"_id": ObjectId(), "email": f"user{index}@example.com"} for index in range(5)]
+        self.subscriptions = [
+            {"_id": ObjectId(), "user_id": str(user["_id"]), "email": user["email"]}
+            for user in self.users
+        ]
+        self.value = {
+            "drop_name": "Drop <One>",
+            "launch_at": datetime(2026, 6, 1, 12, 0, 0),
+            "email_subject": "Drop",
+            "cta_url": "/products",
+        }
+        self.sent_keys = set()
+        self.checkpoints = []
+
+    def _iter_subscriptions(self, db, drop_key, after_id=None, batch_size=500):
+        docs = [doc for doc in self.subscriptions if after_id is None or doc["_id"] > after_id]
+        return FakeCursor(docs)
+
+    async def _list_users(self, db, user_ids):
+        return [user for user in self.users if user["_id"] in user_ids]
+
+    async def _claim_delivery(self, db, drop_key, user_id, email, now):
+        if (drop_key, user_id) in self.sent_keys:
+            return None
+        return {"drop_key": drop_key, "user_id": user_id, "status": countdown_crud.DELIVERY_SENDING}
+
+    async def _mark_delivery(self, db, drop_key, user_id, status, now, error=None):
+        if status == countdown_crud.DELIVERY_SENT:
+            self.sent_keys.add((drop_key, user_id))
+
+    async def _save_checkpoint(self, db, last_subscription_id, sent_count, failure_count, now):
+        self.checkpoints.append((last_subscription_id, sent_count, failure_count))
+
+    async def _run(self, claim, send_email):
+        with (
+            patch.object(countdown_crud, "claim_due_drop_notification", AsyncMock(return_value=claim)),
+            patch.object(countdown_crud, "iter_drop_subscriptions", side_effect=self._iter_subscriptions),
+            patch.object(countdown_crud, "list_active_users_with_email", side_effect=self._list_users),
+            patch.object(countdown_crud, "claim_delivery", side_effect=self._claim_delivery),
+            patch.object(countdown_crud, "mark_delivery", side_effect=self._mark_delivery),
+            patch.object(countdown_crud, "save_notification_checkpoint", side_effect=self._save_checkpoint),
+            patch.object(countdown_crud, "mark_drop_notification_sent", AsyncMock(return_value={})),
+            patch.object(drop_countdown_notifier, "invalidate_storefront_bootstrap", AsyncMock()),
+            patch.object(drop_countdown_notifier, "send_email", send_email),
+            patch.object(drop_countdown_notifier, "SEND_BATCH_SIZE", 2),
+        ):
+            return await drop_countdown_notifier.send_due_drop_notification_once()
+
+    async def test_sends_every_subscriber_in_checkpointed_batches(self):
+        recipients = []
+
+        def fake_send_email(*, subject, recipient, body, html):
+            recipients.append(recipient)
+            self.assertIn(recipient, html)
+            self.assertNotIn("placeholder", html)
+
+        processed = await self._run({"value": self.value}, fake_send_email)
+
+        self.assertTrue(processed)
+        self.assertEqual(sorted(recipients), sorted(user["email"] for user in self.users))
+        self.assertEqual([checkpoint[0] for checkpoint in self.checkpoints], [
+            self.subscriptions[1]["_id"],
+            self.subscriptions[3]["_id"],
+            self.subscriptions[4]["_id"],
+        ])
+        self.assertEqual(sum(checkpoint[1] for checkpoint in self.checkpoints), 5)
+
+    async def test_resume_skips_checkpointed_and_already_delivered_recipients(self):
+        drop_key = drop_countdown_notifier.drop_key_from_value(self.value)
+        self.sent_keys.add((drop_key, self.subscriptions[2]["user_id"]))
+        recipients = []
+
+        def fake_send_email(*, subject, recipient, body, html):
+            recipients.append(recipient)
+
+        claim = {"value": self.value, "notification_checkpoint_id": self.subscriptions[1]["_id"]}
+        await self._run(claim, fake_send_email)
+
+        self.assertEqual(sorted(recipients), sorted([self.users[3]["email"], self.users[4]["email"]]))
+
+    async def test_reset_generation_resends_to_already_delivered_subscribers(self):
+        drop_key = drop_countdown_notifier.drop_key_from_value(self.value)
+        self.sent_keys.update((drop_key, subscription["user_id"]) for subscription in self.subscriptions)
+        recipients = []
+
+        def fake_send_email(*, subject, recipient, body, html):
+            recipients.append(recipient)
+
+        await self._run({"value": self.value, "notification_generation": "2026-05-20T10:00:00"}, fake_send_email)
+
+        self.assertEqual(len(recipients), 5)
+        self.assertIn((f"{drop_key}#2026-05-20T10:00:00", self.subscriptions[0]["user_id"]), self.sent_keys)
+
+    def test_personalized_html_escapes_recipient(self):
+        _, campaign = drop_countdown_notifier._render_email(self.value, "test-campaign")
+        personalized = campaign.personalize(recipient_email="a<b>@example.com")
+
+        self.assertIn("Drop &lt;One&gt;", personalized)
+        self.assertIn("a&lt;b&gt;@example.com", personalized)
+
+
+if __name__ == "__main__":
+    unittest.main()
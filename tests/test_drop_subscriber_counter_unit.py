@@ -0,0 +1,64 @@
+import unittest
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from bson import ObjectId
+
+from app.crud import drop_countdown as countdown_crud
+from app.services.services_cms import drop_countdown_service
+
+
+class DropSubscriberCounterUnitTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.value = {"drop_name": "Drop", "launch_at": datetime(2026, 6, 1, 12, 0)}
+        self.drop_key = drop_countdown_service.drop_key_from_value(self.value)
+
+    async def test_subscription_writes_maintain_counter(self):
+        settings, subscribers = MagicMock(), MagicMock()
+        settings.update_one = AsyncMock()
+        subscribers.update_one = AsyncMock(side_effect=[SimpleNamespace(upserted_id=ObjectId()), SimpleNamespace(upserted_id=None)])
+        subscribers.delete_one = AsyncMock(side_effect=[SimpleNamespace(deleted_count=1), SimpleNamespace(deleted_count=0)])
+        db = {countdown_crud.SETTINGS_COLLECTION: settings, countdown_crud.SUBSCRIBERS_COLLECTION: subscribers}
+
+        await countdown_crud.upsert_subscription(db, self.drop_key, "u1", "a@example.com", datetime(2026, 5, 1))
+        await countdown_crud.upsert_subscription(db, self.drop_key, "u1", "a@example.com", datetime(2026, 5, 1))
+        await countdown_crud.delete_subscription(db, self.drop_key, "u1")
+        await countdown_crud.delete_subscription(db, self.drop_key, "u1")
+
+        self.assertEqual(
+            [call.args[1] for call in settings.update_one.await_args_list],
+            [{"$inc": {"subscribers_count": 1}}, {"$inc": {"subscribers_count": -1}}],
+        )
+        self.assertEqual(settings.update_one.await_args.args[0]["subscribers_drop_key"], self.drop_key)
+
+    async def test_countdown_reads_maintained_counter_without_counting(self):
+        count = AsyncMock(return_value=3)
+        doc = {"value": {**self.value, "is_active": True}, "subscribers_drop_key": self.drop_key, "subscribers_count": 42}
+
+        with patch.object(countdown_crud, "count_subscribers", count):
+            out = await drop_countdown_service.doc_to_out(object(), doc)
+
+        self.assertEqual(out.subscribers_count, 42)
+        count.assert_not_awaited()
+
+    async def test_counter_for_previous_drop_is_recounted_once(self):
+        count, save, invalidate = AsyncMock(return_value=3), AsyncMock(), AsyncMock()
+        doc = {"value": self.value, "subscribers_drop_key": "ancien::drop", "subscribers_count": 42}
+
+        with (
+            patch.object(countdown_crud, "count_subscribers", count),
+            patch.object(countdown_crud, "save_subscribers_count", save),
+            patch.object(drop_countdown_service, "invalidate_storefront_bootstrap", invalidate),
+        ):
+            self.assertEqual(await drop_countdown_service.subscribers_count(object(), doc), 3)
+            self.assertEqual(await drop_countdown_service.reconcile_subscribers_count(object(), {**doc, "subscribers_drop_key": self.drop_key, "subscribers_count": 3}), 3)
+
+        self.assertEqual(count.await_args_list[0].args[1], {"drop_key": self.drop_key})
+        save.assert_awaited_once()
+        self.assertEqual(save.await_args.args[1:3], (self.drop_key, 3))
+        invalidate.assert_awaited_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
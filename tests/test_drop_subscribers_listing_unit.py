@@ -0,0 +1,95 @@
+import unittest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from bson import ObjectId
+
+from app.core.pagination import PaginationParams
+from app.crud import drop_countdown as countdown_crud
+from app.crud import users as user_crud
+from app.services.services_cms import drop_countdown_service
+from app.services.services_store import profile_service
+
+
+class DropSubscribersListingUnitTests(unittest.IsolatedAsyncioTestCase):
+    async def test_search_filters_subscriptions_and_loads_only_page_users(self):
+        value = {"drop_name": "Drop", "launch_at": datetime(2026, 6, 1, 12, 0)}
+        users = [{"_id": ObjectId(), "email": f"sam{index}@example.com", "full_name": "Sam", "is_active": True} for index in range(2)]
+        subscriptions = [
+            {"_id": ObjectId(), "drop_key": "k", "user_id": str(user["_id"]), "email": user["email"], "full_name": "Sam", "created_at": datetime(2026, 5, 1)}
+            for user in users
+        ]
+        window = {"total": 40, "total_is_estimate": True, "has_next": True, "has_prev": False, "next_cursor": "abc", "prev_cursor": None}
+        paginate = AsyncMock(return_value=(subscriptions, window))
+        load_users = AsyncMock(return_value=users)
+
+        with (
+            patch.object(countdown_crud, "find_drop_doc", AsyncMock(return_value={"value": value})),
+            patch.object(countdown_crud, "paginate_subscribers", paginate),
+            patch.object(countdown_crud, "list_users_by_ids", load_users),
+        ):
+            page = await drop_countdown_service.list_subscribers(object(), PaginationParams(page_size=2), "sam", True)
+
+        filters = paginate.await_args.args[1]
+        self.assertEqual(filters["drop_key"], drop_countdown_service.drop_key_from_value(value))
+        self.assertEqual(filters["$or"], [{"email_lower": {"$regex": "^sam"}}, {"full_name_lower": {"$regex": "^sam"}}])
+        self.assertEqual(load_users.await_args.args[1], [user["_id"] for user in users])
+        self.assertEqual([item.email for item in page.items], ["sam0@example.com", "sam1@example.com"])
+        self.assertEqual((page.total, page.pages, page.next_cursor, page.has_next), (40, 20, "abc", True))
+
+    async def test_search_is_an_escaped_lowercase_prefix(self):
+        paginate = AsyncMock(return_value=([], {"total": 0, "total_is_estimate": False, "has_next": False, "has_prev": False, "next_cursor": None, "prev_cursor": None}))
+        with patch.object(countdown_crud, "paginate_subscribers", paginate):
+            await drop_countdown_service.list_subscribers(object(), PaginationParams(), "  A.b+(x)@Mail ", False)
+
+        filters = paginate.await_args.args[1]
+        self.assertEqual(filters["$or"][0], {"email_lower": {"$regex": r"^a\.b\+\(x\)@mail"}})
+        self.assertEqual(filters["$or"][1], {"full_name_lower": {"$regex": r"^a\.b\+\(x\)@mail"}})
+
+    async def test_backfill_copies_user_names_in_batches(self):
+        user = {"_id": ObjectId(), "email": "a@example.com", "full_name": "Ana"}
+        batch = [{"_id": ObjectId(), "user_id": str(user["_id"]), "email": "old@example.com"}, {"_id": ObjectId(), "user_id": "inconnu"}]
+        collection = MagicMock()
+        collection.find.return_value.limit.return_value.to_list = AsyncMock(side_effect=[batch, []])
+        collection.bulk_write = AsyncMock()
+
+        with patch.object(countdown_crud, "list_users_by_ids", AsyncMock(return_value=[user])):
+            updated = await countdown_crud.backfill_subscriber_names({countdown_crud.SUBSCRIBERS_COLLECTION: collection})
+
+        self.assertEqual(updated, 2)
+        operations = collection.bulk_write.await_args.args[0]
+        self.assertEqual(operations[0]._doc, {"$set": {"email": "a@example.com", "full_name": "Ana", "email_lower": "a@example.com", "full_name_lower": "ana"}})
+        self.assertEqual(operations[1]._doc, {"$set": {"email": None, "full_name": None, "email_lower": "", "full_name_lower": ""}})
+
+    async def test_profile_update_refreshes_subscription_copies(self):
+        user_id = ObjectId()
+        updated = {
+            "_id": user_id,
+            "email": "new@example.com",
+            "full_name": "Ana B",
+            "is_active": True,
+            "updated_at": datetime(2026, 5, 2),
+        }
+        collection = MagicMock()
+        collection.update_many = AsyncMock()
+        db = {countdown_crud.SUBSCRIBERS_COLLECTION: collection}
+        payload = MagicMock()
+        payload.dict.return_value = {"full_name": "Ana B"}
+
+        with patch.object(user_crud, "update_user_profile", AsyncMock(return_value=updated)):
+            await profile_service.update_profile(db, payload, {"_id": user_id})
+
+        collection.update_many.assert_awaited_once_with(
+            {"user_id": str(user_id)},
+            {"$set": {
+                "email": "new@example.com",
+                "full_name": "Ana B",
+                "email_lower": "new@example.com",
+                "full_name_lower": "ana b",
+                "updated_at": datetime(2026, 5, 2),
+            }},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
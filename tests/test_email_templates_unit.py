@@ -0,0 +1,37 @@
+import unittest
+from pathlib import Path
+
+from app.services.services_store import email_templates
+
+
+class EmailTemplatesUnitTests(unittest.IsolatedAsyncioTestCase):
+    def test_precompile_loads_every_html_template(self):
+        expected = len(list(Path(email_templates.TEMPLATES_DIR).glob("*.html")))
+        self.assertEqual(email_templates.precompile_templates(), expected)
+
+    def test_campaign_template_is_memoized_and_escapes_recipient(self):
+        context = {"drop_name": "Drop", "title": "Titre", "cta_label": "Go", "cta_url": "/products", "logo_url": "logo.png"}
+        first = email_templates.campaign_template("drop_release.html", "unit-campaign", context, ["recipient_email"])
+        second = email_templates.campaign_template("drop_release.html", "unit-campaign", {}, ["recipient_email"])
+
+        self.assertIs(first, second)
+        html = first.personalize(recipient_email="x<y>@example.com")
+        self.assertIn("x&lt;y&gt;@example.com", html)
+        email_templates.forget_campaign("drop_release.html", "unit-campaign")
+
+    async def test_personalize_many_in_thread_pool_matches_single_personalize(self):
+        context = {"drop_name": "Drop", "title": "Titre", "cta_label": "Go", "cta_url": "/products", "logo_url": "logo.png"}
+        campaign = email_templates.campaign_template("drop_release.html", "unit-batch", context, ["recipient_email"])
+        recipients = [
+            {"recipient_email": f"user{index}@example.com"}
+            for index in range(email_templates.THREAD_POOL_THRESHOLD + 5)
+        ]
+        rendered = await email_templates.personalize_many(campaign, recipients)
+
+        self.assertEqual(len(rendered), len(recipients))
+        self.assertEqual(rendered[-1], campaign.personalize(**recipients[-1]))
+        email_templates.forget_campaign("drop_release.html", "unit-batch")
+
+
+if __name__ == "__main__":
+    unittest.main()
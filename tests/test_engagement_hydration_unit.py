@@ -0,0 +1,58 @@
+import unittest
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+from bson import ObjectId
+
+from app.crud import users as users_crud
+from app.crud import vlog as vlog_crud
+from app.services.services_cms import engagement_service
+
+
+class EngagementHydrationUnitTests(unittest.IsolatedAsyncioTestCase):
+    async def test_comment_page_hydrates_with_one_query_per_kind(self):
+        now = datetime(2026, 5, 1)
+        users = [{"_id": ObjectId(), "full_name": "Amira"}, {"_id": ObjectId(), "email": "sami@example.com"}]
+        episode = {"_id": ObjectId(), "title": "Episode 1"}
+        docs = [
+            {"_id": ObjectId(), "episode_id": episode["_id"], "user_id": users[index % 2]["_id"], "content": "Top", "created_at": now, "updated_at": now}
+            for index in range(50)
+        ]
+        find_users = AsyncMock(return_value=users)
+        find_episodes = AsyncMock(return_value=[episode])
+
+        with (
+            patch.object(users_crud, "find_user_authors", find_users),
+            patch.object(vlog_crud, "find_episode_titles", find_episodes),
+        ):
+            comments = await engagement_service.comments_out(object(), docs)
+
+        find_users.assert_awaited_once()
+        find_episodes.assert_awaited_once()
+        self.assertEqual(len(find_users.await_args.args[1]), 2)
+        self.assertEqual([comment.author for comment in comments[:2]], ["Amira", "sami@example.com"])
+        self.assertEqual({comment.episode_title for comment in comments}, {"Episode 1"})
+
+    async def test_review_page_maps_string_ids_back(self):
+        now = datetime(2026, 5, 1)
+        user = {"_id": ObjectId(), "full_name": "Amira"}
+        product_id = str(ObjectId())
+        docs = [
+            {"_id": ObjectId(), "user_id": str(user["_id"]), "product_id": product_id, "rating": 5, "comment": "Top", "created_at": now, "updated_at": now},
+            {"_id": ObjectId(), "user_id": "inconnu", "product_id": product_id, "rating": 3, "comment": "Bof", "created_at": now, "updated_at": now},
+        ]
+        summaries = AsyncMock(return_value={product_id: {"id": product_id, "name": "Hoodie", "full_name": "Hoodie Oversize"}})
+
+        with (
+            patch.object(users_crud, "find_user_authors", AsyncMock(return_value=[user])),
+            patch.object(engagement_service, "load_product_summaries", summaries),
+        ):
+            reviews = await engagement_service.reviews_out(object(), docs)
+
+        summaries.assert_awaited_once()
+        self.assertEqual([review.author for review in reviews], ["Amira", "Utilisateur"])
+        self.assertEqual({review.product_name for review in reviews}, {"Hoodie Oversize"})
+
+
+if __name__ == "__main__":
+    unittest.main()
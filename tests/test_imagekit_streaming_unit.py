@@ -0,0 +1,132 @@
+import asyncio
+import io
+import threading
+import unittest
+
+import httpx
+from fastapi import FastAPI, HTTPException, Request, UploadFile
+from starlette.datastructures import Headers
+
+from app.services.services_cms.imagekit_streaming import ImageKitUploader
+
+
+def make_fake_imagekit():
+    """
+    Faux serveur ImageKit (ASGI) qui enregistre les uploads recus.
+    """
+    app = FastAPI()
+    app.state.received = []
+    app.state.in_flight = 0
+    app.state.max_in_flight = 0
+
+    @app.post("/api/v1/files/upload")
+    async def upload(request: Request):
+        app.state.in_flight += 1
+        app.state.max_in_flight = max(app.state.max_in_flight, app.state.in_flight)
+        try:
+            form = await request.form()
+            content = await form["file"].read()
+            await asyncio.sleep(0.01)
+            app.state.received.append({
+                "auth": request.headers.get("authorization"),
+                "folder": form["folder"],
+                "unique": form["useUniqueFileName"],
+                "size": len(content),
+            })
+            name = form["fileName"]
+            return {"fileId": f"id-{name}", "name": name, "url": f"https://ik.test/{name}", "filePath": f"{form['folder']}/{name}", "size": len(content)}
+        finally:
+            app.state.in_flight -= 1
+
+    return app
+
+
+class ThreadRecordingFile(io.BytesIO):
+    """
+    Fichier vu comme spoole sur disque par Starlette (pas d'attribut `_rolled`):
+    on note le thread de chaque lecture.
+    """
+
+    def __init__(self, content):
+        super().__init__(content)
+        self.read_threads = set()
+
+    def read(self, size=-1):
+        self.read_threads.add(threading.get_ident())
+        return super().read(size)
+
+
+def make_upload(name, size, content_type="image/jpeg"):
+    return UploadFile(io.BytesIO(b"x" * size), filename=name, headers=Headers({"content-type": content_type}))
+
+
+class ImageKitStreamingUnitTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.fake = make_fake_imagekit()
+        self.uploader = ImageKitUploader(
+            "http://imagekit.test/api/v1/files/upload",
+            "private_test",
+            concurrency=2,
+            transport=httpx.ASGITransport(app=self.fake),
+        )
+        self.addAsyncCleanup(self.uploader.aclose)
+
+    async def test_upload_sends_binary_multipart_with_progress(self):
+        progress = []
+
+        asset = await self.uploader.upload(
+            make_upload("hoodie.jpg", 200_000),
+            folder="uploads",
+            use_unique_file_name=False,
+            max_bytes=1_000_000,
+            on_progress=lambda sent, total: progress.append((sent, total)),
+        )
+
+        self.assertEqual(asset["url"], "https://ik.test/hoodie.jpg")
+        self.assertEqual(asset["mime"], "image/jpeg")
+        received = self.fake.state.received[0]
+        self.assertEqual((received["folder"], received["unique"], received["size"]), ("uploads", "false", 200_000))
+        self.assertTrue(received["auth"].startswith("Basic "))
+        self.assertEqual(progress[-1], (200_000, 200_000))
+
+    async def test_disk_spooled_file_is_never_read_on_event_loop(self):
+        source = ThreadRecordingFile(b"y" * 3_000_000)
+        upload = UploadFile(source, filename='clip "final".mp4', headers=Headers({"content-type": "video/mp4"}))
+
+        asset = await self.uploader.upload(upload, folder="videos", use_unique_file_name=True, max_bytes=5_000_000)
+
+        self.assertEqual(asset["name"], 'clip "final".mp4')
+        self.assertEqual(self.fake.state.received[0]["size"], 3_000_000)
+        self.assertTrue(source.read_threads)
+        self.assertNotIn(threading.get_ident(), source.read_threads)
+
+    async def test_upload_bytes_sends_in_memory_content(self):
+        asset = await self.uploader.upload_bytes(
+            b"webp" * 10, file_name="hoodie-320w.webp", folder="uploads/derivatives", content_type="image/webp"
+        )
+
+        self.assertEqual(asset["url"], "https://ik.test/hoodie-320w.webp")
+        received = self.fake.state.received[0]
+        self.assertEqual((received["folder"], received["unique"], received["size"]), ("uploads/derivatives", "true", 40))
+
+    async def test_size_limit_is_enforced_before_sending(self):
+        with self.assertRaises(HTTPException) as ctx:
+            await self.uploader.upload(make_upload("big.jpg", 5000), folder="uploads", use_unique_file_name=True, max_bytes=4096)
+
+        self.assertEqual(ctx.exception.status_code, 413)
+        self.assertEqual(self.fake.state.received, [])
+
+    async def test_many_uploads_run_concurrently_within_limit(self):
+        files = [make_upload(f"img-{index}.jpg", 1000) for index in range(5)]
+
+        async def upload(file):
+            return (await self.uploader.upload(file, folder="uploads", use_unique_file_name=False, max_bytes=4096))["url"]
+
+        urls = await self.uploader.upload_many(files, upload)
+
+        self.assertEqual(urls, [f"https://ik.test/img-{index}.jpg" for index in range(5)])
+        self.assertEqual(self.fake.state.max_in_flight, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
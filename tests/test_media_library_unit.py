@@ -0,0 +1,43 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from app.core.pagination import PaginationParams
+from app.crud import media_asset as media_asset_crud
+from app.services.services_cms import media_library
+from app.services.services_cms.imagekit_video import HEADER_VIDEO_FOLDER
+
+
+class MediaLibraryUnitTests(unittest.IsolatedAsyncioTestCase):
+    async def test_picker_queries_local_index_with_escaped_search(self):
+        paginate = AsyncMock(return_value=([], {}))
+        pagination = PaginationParams(page=1, page_size=20, cursor=None)
+
+        with patch.object(media_asset_crud, "paginate_assets", paginate):
+            await media_library.list_media_assets(object(), pagination, kind="video", folder=HEADER_VIDEO_FOLDER, q=" teaser (v2) ")
+
+        filters = paginate.await_args.args[1]
+        self.assertEqual(filters["kind"], "video")
+        self.assertEqual(filters["$or"], [{"folder": HEADER_VIDEO_FOLDER}, {"shared_folders": HEADER_VIDEO_FOLDER}])
+        self.assertEqual(filters["name"], {"$regex": r"teaser\ \(v2\)", "$options": "i"})
+
+    async def test_reconcile_upserts_listing_then_drops_stale_entries(self):
+        item = SimpleNamespace(file_id="f1", name="teaser.mp4", url="https://ik.test/teaser.mp4", mime=None, created_at="2026-05-01T10:00:00.000Z")
+        upsert = AsyncMock()
+        stale = AsyncMock(return_value=2)
+
+        with (
+            patch.object(media_library, "run_in_threadpool", AsyncMock(return_value=media_library.ListFileResult([item]))),
+            patch.object(media_asset_crud, "upsert_reconciled_assets", upsert),
+            patch.object(media_asset_crud, "delete_stale_assets", stale),
+        ):
+            report = await media_library.reconcile_folder(object(), HEADER_VIDEO_FOLDER)
+
+        self.assertEqual(report, {"listed": 1, "removed": 2})
+        asset = upsert.await_args.args[1][0]
+        self.assertEqual((asset["kind"], asset["folder"], asset["created_at"].year), ("video", HEADER_VIDEO_FOLDER, 2026))
+        self.assertEqual(stale.await_args.args[2], upsert.await_args.args[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import io
+import unittest
+from unittest.mock import ANY, AsyncMock, patch
+
+from fastapi import UploadFile
+from PIL import Image
+from starlette.datastructures import Headers
+
+from app.crud import media_asset as media_asset_crud
+from app.crud import vlog as vlog_crud
+from app.services.services_cms import header_video_service
+from app.services.services_cms import media_pipeline
+from app.services.services_cms.media_derivatives import generate_webp_derivatives, shutdown_derivative_pool
+from app.services.services_cms.media_pipeline import store_media
+
+
+def make_upload(content, content_type="image/jpeg"):
+    return UploadFile(io.BytesIO(content), filename="hoodie.jpg", headers=Headers({"content-type": content_type}))
+
+
+def make_jpeg(width, height):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 30, 30)).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+class MediaPipelineUnitTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.upload = AsyncMock(return_value={"file_id": "f1", "url": "https://ik.test/hoodie.jpg", "mime": "image/jpeg", "width": 800, "height": 1000})
+        self.save = AsyncMock()
+        self.upload_bytes = AsyncMock(side_effect=lambda content, **kwargs: {"url": f"https://ik.test/{kwargs['folder']}/{kwargs['file_name']}"})
+        for target, name, value in (
+            (media_pipeline.imagekit_uploader, "upload", self.upload),
+            (media_pipeline.imagekit_uploader, "upload_bytes", self.upload_bytes),
+            (media_asset_crud, "save_asset", self.save),
+            (vlog_crud, "find_media_by_hash", AsyncMock(return_value=None)),
+        ):
+            patcher = patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def test_new_image_is_uploaded_with_hash_dimensions_and_webp_derivatives(self):
+        content = make_jpeg(800, 1000)
+        with patch.object(media_asset_crud, "find_asset_by_hash", AsyncMock(return_value=None)):
+            asset = await store_media(object(), make_upload(content), folder="uploads", max_bytes=len(content))
+
+        self.upload.assert_awaited_once()
+        self.assertEqual(len(asset["content_hash"]), 64)
+        self.assertEqual(asset["size"], len(content))
+        self.assertEqual((asset["width"], asset["height"]), (800, 1000))
+        self.assertEqual(asset["derivatives"], {
+            "320": "https://ik.test/uploads/derivatives/hoodie-320w.webp",
+            "640": "https://ik.test/uploads/derivatives/hoodie-640w.webp",
+        })
+        uploaded = {call.kwargs["file_name"]: call.args[0] for call in self.upload_bytes.await_args_list}
+        with Image.open(io.BytesIO(uploaded["hoodie-640w.webp"])) as image:
+            self.assertEqual((image.format, image.size), ("WEBP", (640, 800)))
+        saved = self.save.await_args.args[1]
+        self.assertEqual((saved["kind"], saved["derivatives"]), ("image", asset["derivatives"]))
+
+    async def test_undecodable_image_is_kept_without_derivatives(self):
+        with patch.object(media_asset_crud, "find_asset_by_hash", AsyncMock(return_value=None)):
+            asset = await store_media(object(), make_upload(b"image-bytes"), folder="uploads", max_bytes=1024)
+
+        self.assertEqual(asset["derivatives"], {})
+        self.upload_bytes.assert_not_awaited()
+
+    async def test_known_content_is_not_uploaded_again(self):
+        existing = {"content_hash": "abc", "url": "https://ik.test/old.jpg", "width": 800}
+        finder = AsyncMock(return_value=existing)
+        with patch.object(media_asset_crud, "find_asset_by_hash", finder):
+            asset = await store_media(object(), make_upload(b"image-bytes"), folder="uploads", max_bytes=1024)
+
+        self.assertEqual(finder.await_args.args[2], "uploads")
+        self.upload.assert_not_awaited()
+        self.save.assert_not_awaited()
+        self.assertEqual(asset["url"], "https://ik.test/old.jpg")
+        self.assertEqual(asset["derivatives"], {})
+
+    async def test_content_known_in_another_folder_is_shared_with_a_reference(self):
+        other = {"file_id": "f9", "content_hash": "abc", "url": "https://ik.test/vlog.jpg", "folder": "/vlog"}
+        share = AsyncMock(return_value={**other, "ref_count": 2, "shared_folders": ["uploads"]})
+        with (
+            patch.object(media_asset_crud, "find_asset_by_hash", AsyncMock(side_effect=[None, other])),
+            patch.object(media_asset_crud, "share_asset", share),
+        ):
+            asset = await store_media(object(), make_upload(b"image-bytes"), folder="uploads", max_bytes=1024)
+
+        share.assert_awaited_once_with(ANY, "f9", "uploads")
+        self.upload.assert_not_awaited()
+        self.assertEqual(asset["url"], "https://ik.test/vlog.jpg")
+
+    async def test_content_registered_in_vlog_media_is_indexed_then_shared(self):
+        media = {"file_id": "f7", "url": "https://ik.test/c.jpg", "file_path": "/store-savage-rise/vlog/concept/c.jpg", "mime": "image/jpeg"}
+        share = AsyncMock(side_effect=lambda db, file_id, folder: {**media, "ref_count": 2})
+        self.save.return_value = {**media, "folder": "/store-savage-rise/vlog/concept"}
+        with (
+            patch.object(media_asset_crud, "find_asset_by_hash", AsyncMock(return_value=None)),
+            patch.object(vlog_crud, "find_media_by_hash", AsyncMock(return_value=media)),
+            patch.object(media_asset_crud, "share_asset", share),
+        ):
+            asset = await store_media(object(), make_upload(b"image-bytes"), folder="uploads", max_bytes=1024)
+
+        self.assertEqual(self.save.await_args.args[1]["folder"], "/store-savage-rise/vlog/concept")
+        share.assert_awaited_once_with(ANY, "f7", "uploads")
+        self.upload.assert_not_awaited()
+        self.assertEqual(asset["file_id"], "f7")
+
+    async def test_header_delete_keeps_shared_file_until_last_reference(self):
+        delete_remote = AsyncMock()
+        delete_record = AsyncMock()
+        with (
+            patch.object(header_video_service, "delete_header_video_from_imagekit", delete_remote),
+            patch.object(media_asset_crud, "delete_asset_by_file_id", delete_record),
+            patch.object(media_asset_crud, "release_asset", AsyncMock(side_effect=[1, 0])),
+        ):
+            await header_video_service.release_header_file(object(), "f9", header_video_service.HEADER_IMAGE_FOLDER)
+            delete_remote.assert_not_awaited()
+            await header_video_service.release_header_file(object(), "f9", header_video_service.HEADER_IMAGE_FOLDER)
+
+        delete_remote.assert_awaited_once_with("f9")
+        delete_record.assert_awaited_once()
+
+
+class MediaDerivativesUnitTests(unittest.IsolatedAsyncioTestCase):
+    def tearDown(self):
+        shutdown_derivative_pool()
+
+    async def test_process_pool_renders_webp_without_upscaling(self):
+        buffer = io.BytesIO()
+        Image.new("RGBA", (500, 250), (0, 0, 0, 0)).save(buffer, "PNG")
+
+        rendered = await generate_webp_derivatives(buffer.getvalue(), [1080, 320, 500])
+
+        self.assertEqual(list(rendered), [320])
+        with Image.open(io.BytesIO(rendered[320])) as image:
+            self.assertEqual((image.format, image.size, image.mode), ("WEBP", (320, 160), "RGBA"))
+
+
+if __name__ == "__main__":
+    unittest.main()
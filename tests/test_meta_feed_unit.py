@@ -0,0 +1,171 @@
+import csv
+import gzip
+import io
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from bson import ObjectId
+
+from app.crud import meta_feed as meta_feed_crud
+from app.crud import product as product_crud
+from app.services.services_store import meta_catalog_service
+
+
+def make_product(name, *, stock=3, image=True):
+    return {
+        "_id": ObjectId(),
+        "name": name,
+        "full_name": name,
+        "price": 80,
+        "in_stock": True,
+        "variants": [
+            {
+                "color": "Noir",
+                "images": [{"url": f"https://img/{name}.jpg"}] if image else [],
+                "sizes": [{"size": "M", "stock_on_hand": stock, "stock_reserved": 0}],
+            }
+        ],
+    }
+
+
+class FeedStore:
+    """
+    Collections meta_feed_* en memoire (memes signatures que app.crud.meta_feed).
+    """
+
+    def __init__(self):
+        self.rows = {}
+        self.state = None
+        self.lease_owner = None
+        self.claims = []
+
+    async def get_feed_state(self, db):
+        return self.state
+
+    async def set_feed_state(self, db, **state):
+        self.state = state
+
+    async def claim_feed_refresh(self, db, owner, now, stale_before):
+        self.claims.append(owner)
+        if self.lease_owner is not None:
+            return False
+        self.lease_owner = owner
+        return True
+
+    async def release_feed_refresh(self, db, owner):
+        if self.lease_owner == owner:
+            self.lease_owner = None
+
+    async def replace_product_rows(self, db, docs):
+        for doc in docs:
+            self.rows[doc["_id"]] = doc
+
+    async def delete_product_rows(self, db, product_ids):
+        for product_id in product_ids:
+            self.rows.pop(product_id, None)
+
+    async def delete_rows_except_generation(self, db, generation):
+        stale = [key for key, doc in self.rows.items() if doc.get("generation") != generation]
+        for key in stale:
+            del self.rows[key]
+        return len(stale)
+
+    async def iter_feed_rows(self, db, batch_size=500):
+        for doc in sorted(self.rows.values(), key=lambda doc: (doc["sort_key"], doc["_id"])):
+            yield doc
+
+
+class MetaFeedUnitTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.store = FeedStore()
+        self.products = {}
+        self.loaded = []
+        patches = [patch.object(meta_feed_crud, name, getattr(self.store, name)) for name in (
+            "get_feed_state", "set_feed_state", "replace_product_rows", "delete_product_rows",
+            "delete_rows_except_generation", "iter_feed_rows", "claim_feed_refresh", "release_feed_refresh",
+        )]
+        patches.append(patch.object(product_crud, "iter_products_for_meta_catalog", self._iter_products))
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def _iter_products(self, db, product_ids=None, batch_size=200):
+        self.loaded.append(product_ids)
+        for product_id, product in self.products.items():
+            if product_ids is None or product_id in product_ids:
+                yield product
+
+    def _add(self, product):
+        self.products[str(product["_id"])] = product
+        return product
+
+    async def _refresh(self, version, changed=None):
+        with (
+            patch.object(meta_catalog_service, "current_version", AsyncMock(return_value=version)),
+            patch.object(meta_catalog_service, "changes_since", AsyncMock(return_value=(version, changed))),
+        ):
+            return await meta_catalog_service.refresh_meta_feed(object())
+
+    async def test_refresh_regenerates_only_changed_products(self):
+        hoodie = self._add(make_product("Hoodie"))
+        tee = self._add(make_product("Tee"))
+        await self._refresh(1)
+        self.assertEqual(self.loaded, [None])
+
+        tee["price"] = 50
+        del self.products[str(hoodie["_id"])]
+        state = await self._refresh(2, {str(tee["_id"]), str(hoodie["_id"])})
+
+        self.assertEqual(self.loaded[-1], sorted([str(tee["_id"]), str(hoodie["_id"])]))
+        self.assertEqual(list(self.store.rows), [str(tee["_id"])])
+        self.assertEqual(self.store.rows[str(tee["_id"])]["rows"][0]["price"], "50.00 TND")
+        self.assertEqual(state["catalog_version"], 2)
+
+        await self._refresh(2)
+        self.assertEqual(len(self.loaded), 2)
+
+    async def test_refresh_leased_by_another_worker_serves_previous_feed(self):
+        self._add(make_product("Hoodie"))
+        first = await self._refresh(1)
+        self.assertIsNone(self.store.lease_owner)
+
+        self.store.lease_owner = "autre-worker"
+        state = await self._refresh(2, None)
+
+        self.assertEqual(state, first)
+        self.assertEqual(self.loaded, [None])
+        self.assertEqual(len(self.store.claims), 2)
+
+    async def test_stream_is_gzipped_filtered_and_ordered(self):
+        self._add(make_product("Zip"))
+        self._add(make_product("Alpha", stock=0))
+        self._add(make_product("Beta", image=False))
+        await self._refresh(1)
+
+        chunks = [
+            chunk async for chunk in meta_catalog_service.stream_meta_catalog_csv(
+                object(), include_out_of_stock=True, include_missing_images=False
+            )
+        ]
+        rows = list(csv.DictReader(io.StringIO(gzip.decompress(b"".join(chunks)).decode("utf-8"))))
+
+        self.assertEqual([row["title"] for row in rows], ["Alpha", "Zip"])
+        self.assertEqual(rows[0]["availability"], "out of stock")
+
+    async def test_matching_etag_returns_304_without_reading_rows(self):
+        self._add(make_product("Hoodie"))
+        state = await self._refresh(3)
+        request = SimpleNamespace(headers={"accept-encoding": "gzip"})
+
+        with patch.object(meta_catalog_service, "refresh_meta_feed", AsyncMock(return_value=state)):
+            first = await meta_catalog_service.build_meta_catalog_csv(object(), True, False, request)
+            request.headers["if-none-match"] = first.headers["etag"]
+            second = await meta_catalog_service.build_meta_catalog_csv(object(), True, False, request)
+
+        self.assertEqual(first.headers["content-encoding"], "gzip")
+        self.assertEqual(second.status_code, 304)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,7 +11,7 @@ from pymongo.errors import DuplicateKeyError
 from app.domain.order_constants import OUTBOX_DEAD_LETTER, OUTBOX_FAILED, OUTBOX_PENDING, OUTBOX_PROCESSING, OUTBOX_SENT
 from app.domain.order_errors import InsufficientStockError
 from app.integrations.meta.client import MetaConversionsApiClient, MetaPermanentError, MetaRetryableError
-from app.integrations.meta.hashing import normalize_email, normalize_phone, sha256_hexdigest
+from app.integrations.meta.hashing import hashed_identity, normalize_email, normalize_phone, sha256_hexdigest
 from app.integrations.meta.schemas import MetaEventContext
 from app.integrations.meta.service import (
     build_complete_registration_payload,
@@ -196,6 +196,16 @@ class MetaHashingTests(unittest.TestCase):
         self.assertEqual(normalize_phone("+216 21 461 637"), "21621461637")
         self.assertEqual(normalize_phone("21 461 637"), "21621461637")
 
+    def test_hashed_identity_is_cached_for_repeat_customers(self):
+        hashed_identity.cache_clear()
+        first = hashed_identity("Repeat@Example.com", "+216 21 461 637", "Jane", None, "Tunis", "Tunisia", "user-7")
+        second = hashed_identity("Repeat@Example.com", "+216 21 461 637", "Jane", None, "Tunis", "Tunisia", "user-7")
+
+        self.assertEqual(first, second)
+        self.assertEqual(hashed_identity.cache_info().hits, 1)
+        self.assertEqual(dict(first)["em"], sha256_hexdigest("repeat@example.com"))
+        self.assertNotIn("ln", dict(first))
+
 
 class MetaPayloadTests(unittest.TestCase):
     def test_purchase_payload_for_guest_uses_persisted_order_data(self):
@@ -585,6 +595,7 @@ class MetaOrderFlowTests(unittest.IsolatedAsyncioTestCase):
         with (
             patch.object(order_domain_service, "quote_order", AsyncMock(return_value=quote)),
             patch.object(order_domain_service, "_reserve_allocation", AsyncMock()),
+            patch.object(order_domain_service, "invalidate_catalog", AsyncMock()),
             patch.object(order_domain_service, "append_history", AsyncMock()),
             patch.object(order_domain_service, "track_event", AsyncMock()),
             patch("app.integrations.meta.service.is_meta_enabled", return_value=True),
@@ -624,6 +635,7 @@ class MetaOrderFlowTests(unittest.IsolatedAsyncioTestCase):
         with (
             patch.object(order_domain_service, "quote_order", AsyncMock(return_value=quote)),
             patch.object(order_domain_service, "_reserve_allocation", AsyncMock()),
+            patch.object(order_domain_service, "invalidate_catalog", AsyncMock()),
             patch.object(order_domain_service, "append_history", AsyncMock()),
             patch.object(order_domain_service, "track_event", AsyncMock()),
             patch("app.integrations.meta.service.is_meta_enabled", return_value=True),
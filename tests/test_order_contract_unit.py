@@ -330,10 +330,12 @@ class OrderContractUnitTests(unittest.IsolatedAsyncioTestCase):
             ),
             patch.object(order_domain_service, "_insert_inventory_movement", AsyncMock()),
             patch.object(order_domain_service, "_parse_oid", return_value=ObjectId()),
+            patch.object(order_domain_service.product_crud, "refresh_availability_summary", AsyncMock()) as refresh_summary,
         ):
             await order_domain_service._reserve_allocation(session, db, allocation, "order-1", "0")
 
         self.assertEqual(db.products.update_one.await_count, 2)
+        refresh_summary.assert_awaited_once()
 
     async def test_reserve_allocation_reports_variant_not_found_when_atomic_filter_matches_nothing(self):
         db = ReserveOnlyDb([
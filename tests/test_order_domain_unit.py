@@ -20,7 +20,7 @@ fastapi_stub.status = types.SimpleNamespace(
 )
 sys.modules.setdefault("fastapi", fastapi_stub)
 
-from app.domain.inventory import inventory_projection, stock_available_value
+from app.domain.inventory import availability_summary, availability_summary_pipeline, inventory_projection, stock_available_value
 from app.domain.order_errors import InvalidOrderTransitionError
 from app.domain.order_state_machine import ensure_order_transition, fulfillment_status_for_order_status, payment_status_after_refund
 from scripts.migrate_inventory_model import migrate_variant_sizes
@@ -37,6 +37,23 @@ class OrderDomainUnitTests(unittest.TestCase):
         row = inventory_projection({"size": "L", "stock_on_hand": 10, "stock_reserved": 4})
         self.assertEqual(stock_available_value(row), 6)
 
+    def test_availability_summary_lists_only_available_sizes_and_colors(self):
+        summary = availability_summary([
+            {"color": "Black", "sizes": [{"size": "M", "stock_on_hand": 3, "stock_reserved": 3}, {"size": "L", "stock_on_hand": 2}]},
+            {"color": "White", "sizes": [{"size": "M", "stock_on_hand": 1, "stock_reserved": 2}]},
+        ])
+        self.assertEqual(summary, {"stock_available_total": 2, "available_sizes": ["L"], "available_colors": ["Black"], "in_stock": True})
+        self.assertFalse(availability_summary([{"color": "Black", "sizes": [{"size": "M", "stock_on_hand": 0}]}])["in_stock"])
+        self.assertTrue(availability_summary([], fallback_in_stock=True)["in_stock"])
+
+    def test_availability_summary_pipeline_sets_every_summary_field(self):
+        stages = availability_summary_pipeline()
+        self.assertEqual(
+            set(stages[1]["$set"]),
+            {"stock_available_total", "available_sizes", "available_colors", "in_stock"},
+        )
+        self.assertEqual(stages[-1], {"$unset": "_availability_rows"})
+
     def test_valid_order_transition(self):
         ensure_order_transition("pending", "confirmed")
         ensure_order_transition("confirmed", "preparing")
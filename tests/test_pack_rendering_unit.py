@@ -0,0 +1,104 @@
+import unittest
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.crud import pack as pack_crud
+from app.services.services_store import pack_materializer, pack_service
+
+
+def summary(product_id, price):
+    return {"id": product_id, "name": f"P{price}", "full_name": None, "price": price, "image_url": None, "in_stock": True}
+
+
+def make_pack(product_ids, discount=10):
+    now = datetime(2026, 5, 1)
+    return {
+        "_id": ObjectId(),
+        "title": "Pack",
+        "discount_type": "percent",
+        "discount_value": discount,
+        "status": "active",
+        "components": [{"id": f"c{index}", "product_id": product_id, "qty": 1} for index, product_id in enumerate(product_ids)],
+        "product_ids": list(product_ids),
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+class PackRenderingUnitTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.prices = {str(ObjectId()): price for price in (40.0, 60.0, 100.0)}
+        self.ids = list(self.prices)
+        self.loader = AsyncMock(side_effect=lambda db, ids: {pid: summary(pid, self.prices[pid]) for pid in ids if pid in self.prices})
+        patcher = patch.object(pack_service, "load_product_summaries", self.loader)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_page_of_packs_loads_all_components_at_once(self):
+        packs = [make_pack(self.ids[:2]), make_pack(self.ids[1:]), make_pack([self.ids[0], self.ids[2]], discount=50)]
+
+        rendered = await pack_service.render_packs(object(), packs)
+
+        self.loader.assert_awaited_once()
+        self.assertEqual(self.loader.await_args.args[1], self.ids)
+        self.assertEqual([pack.original_price for pack in rendered], [100.0, 160.0, 140.0])
+        self.assertEqual(rendered[2].pack_price, 70.0)
+        self.assertEqual(rendered[2].savings_value, 70.0)
+
+    def test_materialized_fields_carry_prices_availability_and_next_flip(self):
+        summaries = {pid: summary(pid, price) for pid, price in self.prices.items()}
+        summaries[self.ids[1]]["in_stock"] = False
+        now = datetime(2026, 5, 10)
+        scheduled = {**make_pack(self.ids[:2]), "starts_at": datetime(2026, 6, 1), "ends_at": datetime(2026, 6, 30)}
+        running = {**scheduled, "starts_at": datetime(2026, 5, 1)}
+
+        pending = pack_service.materialized_fields(scheduled, summaries, now)
+        live = pack_service.materialized_fields(running, summaries, now)
+        broken = pack_service.materialized_fields(make_pack([self.ids[0], str(ObjectId())]), summaries, now)
+
+        self.assertEqual((pending["is_visible"], pending["visibility_changes_at"]), (False, datetime(2026, 6, 1)))
+        self.assertEqual((live["is_visible"], live["visibility_changes_at"]), (True, datetime(2026, 6, 30)))
+        self.assertEqual((live["original_price"], live["pack_price"], live["in_stock"]), (100.0, 90.0, False))
+        self.assertFalse(broken["is_visible"])
+
+        rendered = pack_service.materialized_pack_out({**running, **live})
+        self.assertEqual([component.product.price for component in rendered.components], [40.0, 60.0])
+        self.assertEqual(rendered.pack_price, 90.0)
+
+    async def test_refresh_only_rematerializes_packs_of_changed_products(self):
+        finder = AsyncMock(return_value=[])
+        with (
+            patch.object(pack_crud, "list_packs_for_materialization", finder),
+            patch.object(pack_materializer, "current_version", AsyncMock(return_value=5)),
+            patch.object(pack_materializer, "changes_since", AsyncMock(return_value=(5, {self.ids[0]}))),
+        ):
+            self.assertEqual(await pack_materializer.refresh_packs_once(object(), None), 5)
+            await pack_materializer.refresh_packs_once(object(), 4)
+
+        self.assertEqual(finder.await_args_list[0].kwargs, {})
+        self.assertEqual(finder.await_args_list[1].kwargs, {"product_ids": {self.ids[0]}})
+
+    async def test_component_validation_uses_one_query(self):
+        products = [
+            {"_id": ObjectId(self.ids[0]), "variants": [{"color": "Noir", "sizes": [{"size": "M"}]}]},
+            {"_id": ObjectId(self.ids[1]), "variants": [{"color": "Blanc", "sizes": [{"size": "L"}]}]},
+        ]
+        finder = AsyncMock(return_value=products)
+        components = [
+            {"product_id": self.ids[0], "color": "Noir", "size": "M"},
+            {"product_id": self.ids[1], "color": "Blanc", "size": "XL"},
+        ]
+
+        with patch.object(pack_crud, "find_products_for_components", finder):
+            with self.assertRaises(HTTPException) as ctx:
+                await pack_service.validate_pack_components(object(), components)
+
+        finder.assert_awaited_once()
+        self.assertEqual(ctx.exception.detail, "Une taille configuree dans le pack est introuvable")
+
+
+if __name__ == "__main__":
+    unittest.main()
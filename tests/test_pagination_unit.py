@@ -0,0 +1,174 @@
+import unittest
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.core import pagination
+from app.core.pagination import PaginationParams, build_page, decode_cursor, encode_cursor, paginate_collection
+from app.crud import loyalty as loyalty_crud
+from app.services.services_store import loyalty_service
+
+
+def _matches(doc, query):
+    for key, condition in query.items():
+        if key == "$and":
+            if not all(_matches(doc, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(_matches(doc, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = doc.get(key)
+            for op, operand in condition.items():
+                if op == "$ne" and value == operand:
+                    return False
+                if op == "$lt" and not (value is not None and value < operand):
+                    return False
+                if op == "$gt" and not (value is not None and value > operand):
+                    return False
+        elif doc.get(key) != condition:
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+        self._skip = 0
+        self._limit = None
+
+    def sort(self, keys):
+        for field, order in reversed(keys):
+            self.docs.sort(key=lambda doc: (doc.get(field) is not None, doc.get(field) or 0), reverse=order < 0)
+        return self
+
+    def skip(self, value):
+        self._skip = value
+        return self
+
+    def limit(self, value):
+        self._limit = value
+        return self
+
+    async def to_list(self, length=None):
+        return self.docs[self._skip:self._skip + self._limit]
+
+
+class FakeCollection:
+    name = "movements"
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.count_calls = 0
+
+    def find(self, query, projection=None):
+        return FakeCursor([doc for doc in self.docs if _matches(doc, query)])
+
+    async def count_documents(self, query):
+        self.count_calls += 1
+        return len([doc for doc in self.docs if _matches(doc, query)])
+
+    async def estimated_document_count(self):
+        return len(self.docs)
+
+
+class PaginationUnitTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        pagination._count_cache.clear()
+        start = datetime(2026, 1, 1)
+        # created_at en doublon pour verifier le departage par _id
+        self.docs = [
+            {"_id": ObjectId(), "created_at": start + timedelta(minutes=index // 2), "source": "manual" if index % 3 else "order"}
+            for index in range(7)
+        ]
+        self.collection = FakeCollection(self.docs)
+        self.sort = ("created_at", -1)
+
+    async def _walk(self, filters):
+        seen = []
+        params = PaginationParams(page_size=3, cursor=None)
+        docs, window = await paginate_collection(self.collection, filters, params, sort=self.sort)
+        seen += docs
+        while window["next_cursor"]:
+            params = PaginationParams(page_size=3, cursor=window["next_cursor"])
+            docs, window = await paginate_collection(self.collection, filters, params, sort=self.sort)
+            seen += docs
+        return seen, window
+
+    async def test_cursor_walk_matches_page_order_without_duplicates(self):
+        expected = FakeCursor(list(self.docs)).sort([("created_at", -1), ("_id", -1)]).limit(100)
+        expected = await expected.to_list()
+
+        seen, window = await self._walk({})
+
+        self.assertEqual([doc["_id"] for doc in seen], [doc["_id"] for doc in expected])
+        self.assertFalse(window["has_next"])
+        self.assertTrue(window["total_is_estimate"])
+
+    async def test_prev_cursor_returns_previous_window_in_sort_order(self):
+        first, window = await paginate_collection(self.collection, {}, PaginationParams(page_size=3), sort=self.sort)
+        second, window = await paginate_collection(
+            self.collection, {}, PaginationParams(page_size=3, cursor=window["next_cursor"]), sort=self.sort
+        )
+        back, back_window = await paginate_collection(
+            self.collection, {}, PaginationParams(page_size=3, cursor=window["prev_cursor"]), sort=self.sort
+        )
+
+        self.assertEqual([doc["_id"] for doc in back], [doc["_id"] for doc in first])
+        self.assertFalse(back_window["has_prev"])
+        self.assertIsNone(back_window["prev_cursor"])
+
+    async def test_filtered_estimate_is_cached_and_page_mode_stays_exact(self):
+        # premiere page exacte + un seul comptage pour les pages suivantes en mode curseur
+        await self._walk({"source": "manual"})
+        await self._walk({"source": "manual"})
+        self.assertEqual(self.collection.count_calls, 3)
+
+        docs, window = await paginate_collection(
+            self.collection, {"source": "manual"}, PaginationParams(page=2, page_size=3), sort=self.sort
+        )
+        page = build_page(items=docs, page=2, page_size=3, **window)
+
+        self.assertEqual(self.collection.count_calls, 4)
+        self.assertEqual(page.total, 4)
+        self.assertFalse(page.total_is_estimate)
+        self.assertFalse(page.has_next)
+        self.assertTrue(page.has_prev)
+
+    async def test_loyalty_transactions_list_follows_cursors(self):
+        user_id = str(ObjectId())
+        for doc in self.docs:
+            doc.update({"user_id": user_id, "type": "earn", "points": 10, "value": 1.0, "balance_after": 10})
+        db = {loyalty_crud.TRANSACTIONS_COLLECTION: self.collection}
+
+        first = await loyalty_service.list_loyalty_transactions(db, PaginationParams(page_size=4), user_id, None)
+        second = await loyalty_service.list_loyalty_transactions(
+            db, PaginationParams(page_size=4, cursor=first.next_cursor), user_id, None
+        )
+
+        ids = [item.id for item in first.items + second.items]
+        self.assertEqual(len(ids), 7)
+        self.assertEqual(len(set(ids)), 7)
+        self.assertTrue(first.has_next)
+        self.assertFalse(second.has_next)
+        self.assertEqual((first.total, first.total_is_estimate), (7, False))
+
+    def test_cursor_is_bound_to_its_sort(self):
+        token = encode_cursor(self.sort, self.docs[0], "next")
+
+        self.assertEqual(decode_cursor(token, self.sort)["id"], self.docs[0]["_id"])
+        with self.assertRaises(HTTPException):
+            decode_cursor(token, ("total_amount", -1))
+        with self.assertRaises(HTTPException):
+            decode_cursor("pas-un-curseur", self.sort)
+
+    def test_cursor_that_is_not_an_object_is_rejected(self):
+        for token in ("W10", "MQ", "Im5leHQi", "eyJzIjogNX0"):
+            with self.assertRaises(HTTPException) as ctx:
+                decode_cursor(token, self.sort)
+            self.assertEqual(ctx.exception.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from bson import ObjectId
+
+from app.crud import product as product_crud
+from app.services.services_store import product_summaries
+from app.services.services_store.product_summaries import ProductSummaryCache, display_name
+
+
+def make_doc(name, price=40):
+    return {"_id": ObjectId(), "name": name, "full_name": f"{name} Savage", "price": price, "variants": [{"images": [{"url": f"https://img/{name}.jpg"}]}]}
+
+
+class ProductSummariesUnitTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.hoodie = make_doc("Hoodie")
+        self.tee = make_doc("Tee")
+        self.docs = {str(doc["_id"]): doc for doc in (self.hoodie, self.tee)}
+        self.find = AsyncMock(side_effect=lambda db, ids: [self.docs[str(oid)] for oid in ids if str(oid) in self.docs])
+        self.cache = ProductSummaryCache(max_entries=10)
+        patcher = patch.object(product_crud, "find_product_summaries", self.find)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_batch_load_uses_one_query_then_serves_from_cache(self):
+        ids = [str(self.hoodie["_id"]), "pas-un-id", str(self.tee["_id"]), str(ObjectId())]
+        with patch.object(product_summaries, "current_version", AsyncMock(return_value=1)):
+            first = await self.cache.load_many(object(), ids)
+            second = await self.cache.load_many(object(), ids)
+
+        self.find.assert_awaited_once()
+        self.assertEqual(len(self.find.await_args.args[1]), 3)
+        self.assertEqual(first, second)
+        self.assertEqual(first[str(self.hoodie["_id"])]["image_url"], "https://img/Hoodie.jpg")
+        self.assertEqual(display_name(first[str(self.tee["_id"])]), "Tee Savage")
+
+    async def test_catalog_change_only_evicts_changed_products(self):
+        ids = [str(self.hoodie["_id"]), str(self.tee["_id"])]
+        with patch.object(product_summaries, "current_version", AsyncMock(return_value=1)):
+            await self.cache.load_many(object(), ids)
+
+        self.tee["price"] = 25
+        with (
+            patch.object(product_summaries, "current_version", AsyncMock(return_value=2)),
+            patch.object(product_summaries, "changes_since", AsyncMock(return_value=(2, {str(self.tee["_id"])}))),
+        ):
+            summaries = await self.cache.load_many(object(), ids)
+
+        self.assertEqual(self.find.await_args.args[1], [self.tee["_id"]])
+        self.assertEqual(summaries[str(self.tee["_id"])]["price"], 25.0)
+
+    async def test_request_memo_skips_version_check(self):
+        version = AsyncMock(return_value=1)
+        token = product_summaries._request_memo.set({})
+        try:
+            with patch.object(product_summaries, "current_version", version):
+                await self.cache.load(object(), str(self.hoodie["_id"]))
+                await self.cache.load(object(), str(self.hoodie["_id"]))
+        finally:
+            product_summaries._request_memo.reset(token)
+
+        self.assertEqual(version.await_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
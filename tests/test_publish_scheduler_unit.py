@@ -0,0 +1,100 @@
+import asyncio
+import unittest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi import HTTPException
+
+from app.core.publish_scheduler import PublishScheduler, ScheduleSource
+from app.crud import vlog as vlog_crud
+from app.services.services_cms import admin_vlog_service, vlog_schedule
+
+
+class FakeSource:
+    def __init__(self, name, boundaries):
+        self.boundaries = list(boundaries)
+        self.applied = []
+        self.loads = 0
+        self.source = ScheduleSource(name, self.upcoming, self.apply_due)
+
+    async def upcoming(self, db, limit):
+        self.loads += 1
+        return sorted(self.boundaries)[:limit]
+
+    async def apply_due(self, db, now):
+        self.applied.append(now)
+        due = [when for when in self.boundaries if when <= now]
+        self.boundaries = [when for when in self.boundaries if when > now]
+        return len(due)
+
+
+class PublishSchedulerUnitTests(unittest.IsolatedAsyncioTestCase):
+    async def test_due_boundaries_flip_once_per_source_and_refill_heap(self):
+        now = datetime(2026, 6, 1, 12, 0)
+        packs = FakeSource("packs", [now - timedelta(minutes=1), now, now + timedelta(hours=2)])
+        episodes = FakeSource("episodes", [now + timedelta(minutes=5)])
+        scheduler = PublishScheduler([packs.source, episodes.source], upcoming_limit=2)
+        await scheduler.reload(object())
+
+        flipped = await scheduler.run_due(object(), now)
+
+        self.assertEqual(flipped, {"packs": 2})
+        self.assertEqual((len(packs.applied), episodes.applied), (1, []))
+        self.assertEqual((packs.loads, episodes.loads), (2, 1))
+        self.assertEqual(scheduler.next_boundary(), now + timedelta(minutes=5))
+        self.assertEqual(scheduler.seconds_until_next(now), 60)
+        self.assertEqual(scheduler.seconds_until_next(now + timedelta(minutes=4, seconds=30)), 30)
+
+    async def test_reload_soon_wakes_loop_for_new_boundary(self):
+        packs = FakeSource("packs", [])
+        scheduler = PublishScheduler([packs.source], reload_interval=30)
+        task = asyncio.create_task(scheduler.run(object()))
+        self.addCleanup(task.cancel)
+        await asyncio.sleep(0.05)
+
+        packs.boundaries = [datetime.utcnow() + timedelta(milliseconds=50)]
+        scheduler.reload_soon("packs")
+        scheduler.reload_soon("inconnue")
+        await asyncio.sleep(0.3)
+
+        self.assertEqual(len(packs.applied), 1)
+        self.assertIsNone(scheduler.next_boundary())
+
+    async def test_episode_release_invalidates_vlog_only_when_something_flipped(self):
+        invalidate = AsyncMock()
+        with (
+            patch.object(vlog_crud, "release_due_episodes", AsyncMock(side_effect=[2, 0])),
+            patch.object(vlog_schedule, "invalidate_vlog", invalidate),
+        ):
+            self.assertEqual(await vlog_schedule.release_due_episodes(object(), datetime(2026, 6, 1)), 2)
+            self.assertEqual(await vlog_schedule.release_due_episodes(object(), datetime(2026, 6, 1)), 0)
+
+        invalidate.assert_awaited_once()
+
+
+    async def test_only_opted_in_episodes_are_released(self):
+        episodes = MagicMock()
+        episodes.update_many = AsyncMock(return_value=SimpleNamespace(modified_count=1))
+        now = datetime(2026, 6, 1)
+
+        await vlog_crud.release_due_episodes({vlog_crud.EPISODES_COLLECTION: episodes}, now)
+
+        self.assertEqual(
+            episodes.update_many.await_args.args[0],
+            {"status": "coming_soon", "scheduled_release": True, "release_date": {"$lte": now}},
+        )
+
+    def test_scheduling_a_past_release_is_rejected(self):
+        now = datetime(2026, 6, 1)
+        episode = {"status": "coming_soon", "scheduled_release": True, "release_date": now - timedelta(days=1)}
+
+        with self.assertRaises(HTTPException):
+            admin_vlog_service.validate_scheduled_release(episode, now)
+        with self.assertRaises(HTTPException):
+            admin_vlog_service.validate_scheduled_release({**episode, "release_date": None}, now)
+        admin_vlog_service.validate_scheduled_release({**episode, "release_date": now + timedelta(hours=1)}, now)
+        admin_vlog_service.validate_scheduled_release({**episode, "scheduled_release": False}, now)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.crud import product as product_crud
+from app.crud import review as review_crud
+from app.domain.reviews import review_stats_out, review_summary_delta, summaries_from_rating_counts
+from app.services.services_store import review_service
+
+
+class ReviewSummariesUnitTests(unittest.IsolatedAsyncioTestCase):
+    def test_delta_follows_edits_and_moderation(self):
+        review = {"product_id": "p1", "rating": 4, "status": "visible"}
+
+        self.assertEqual(review_summary_delta(None, review), {"count": 1, "rating_sum": 4, "histogram.4": 1})
+        self.assertEqual(
+            review_summary_delta(review, {**review, "rating": 2}),
+            {"rating_sum": -2, "histogram.2": 1, "histogram.4": -1},
+        )
+        self.assertEqual(review_summary_delta(review, {**review, "status": "hidden"}), {"count": -1, "rating_sum": -4, "histogram.4": -1})
+        self.assertEqual(review_summary_delta(review, {**review, "title": "Top"}), {})
+        self.assertEqual(review_summary_delta({**review, "status": "hidden"}, None), {})
+
+    def test_stats_from_repaired_summaries(self):
+        rows = [
+            {"_id": {"product_id": "p1", "rating": 5}, "count": 3},
+            {"_id": {"product_id": "p1", "rating": 2}, "count": 1},
+        ]
+
+        stats = review_stats_out(summaries_from_rating_counts(rows)["p1"])
+
+        self.assertEqual(stats["count"], 4)
+        self.assertEqual(stats["average_rating"], 4.25)
+        self.assertEqual(stats["histogram"], {"1": 0, "2": 1, "3": 0, "4": 0, "5": 3})
+        self.assertEqual(review_stats_out(None), {"average_rating": None, "count": 0, "histogram": {str(r): 0 for r in range(1, 6)}})
+
+    async def test_review_change_increments_product_summary(self):
+        summaries = MagicMock()
+        summaries.update_one = AsyncMock()
+        db = {review_crud.SUMMARIES_COLLECTION: summaries}
+        review = {"product_id": "p1", "rating": 5, "status": "visible"}
+
+        await review_crud.apply_review_change(db, review, {**review, "comment": "ok"})
+        await review_crud.apply_review_change(db, review, None)
+
+        summaries.update_one.assert_awaited_once()
+        selector, update = summaries.update_one.await_args.args
+        self.assertEqual(selector, {"_id": "p1"})
+        self.assertEqual(update["$inc"], {"count": -1, "rating_sum": -5, "histogram.5": -1})
+        self.assertTrue(summaries.update_one.await_args.kwargs["upsert"])
+
+
+    async def test_review_on_unknown_product_is_rejected_before_any_write(self):
+        create = AsyncMock()
+        invalidate = AsyncMock()
+        with (
+            patch.object(product_crud, "find_product_name", AsyncMock(return_value=None)),
+            patch.object(review_crud, "create_review", create),
+            patch.object(review_service, "invalidate_catalog", invalidate),
+        ):
+            for product_id in ("garbage", str(ObjectId())):
+                with self.assertRaises(HTTPException) as ctx:
+                    await review_service.add_review(object(), product_id, MagicMock(), None, {"_id": ObjectId()})
+                self.assertEqual(ctx.exception.status_code, 404)
+
+        create.assert_not_awaited()
+        invalidate.assert_not_awaited()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from bson import ObjectId
+
+from app.crud import product as product_crud
+from app.services.services_store import search_index
+from app.services.services_store.search_index import ProductSearchIndex, stem, tokenize
+
+
+def make_product(name, full_name, *, sku=None, colors=("Noir",), in_stock=True, categories=(), sizes=("M",)):
+    return {
+        "_id": ObjectId(),
+        "name": name,
+        "full_name": full_name,
+        "sku": sku,
+        "price": 100,
+        "gender": "Homme",
+        "categories": list(categories),
+        "in_stock": in_stock,
+        "available_sizes": list(sizes) if in_stock else [],
+        "available_colors": list(colors) if in_stock else [],
+        "variants": [{"color": color, "images": [{"url": f"https://img/{name}.jpg"}]} for color in colors],
+    }
+
+
+class SearchIndexUnitTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.hoodie = make_product("Hoodie", "Hoodie Écru Oversize", sku="SR-HD-01", colors=("Écru", "Noire"), categories=["Sweats"])
+        self.tee = make_product("Tee", "T-shirt Noir", sku="SR-TS-02", sizes=("L",))
+        self.jogger = make_product("Jogger", "Jogger Noir", in_stock=False)
+        self.index = ProductSearchIndex()
+        for product in (self.hoodie, self.tee, self.jogger):
+            self.index.add(product)
+
+    def test_tokenize_folds_accents_and_stem_merges_plural_feminine(self):
+        self.assertEqual(tokenize("Écru, NOIRES"), ["ecru", "noires"])
+        self.assertEqual(stem("noires"), stem("noir"))
+        self.assertEqual(stem("chemises"), stem("chemise"))
+
+    def test_search_is_accent_insensitive_stemmed_and_prefix_aware(self):
+        self.assertEqual(self.index.search("ecru "), [str(self.hoodie["_id"])])
+        self.assertEqual(self.index.search("noires "), [str(self.tee["_id"]), str(self.jogger["_id"]), str(self.hoodie["_id"])])
+        self.assertEqual(self.index.search("hood"), [str(self.hoodie["_id"])])
+        self.assertEqual(self.index.search("sr hd"), [str(self.hoodie["_id"])])
+        self.assertEqual(self.index.search("noir", in_stock=True, size="l"), [str(self.tee["_id"])])
+
+    def test_suggest_returns_products_and_term_completions(self):
+        suggestions = self.index.suggest("jog")
+
+        self.assertEqual([item["name"] for item in suggestions["items"]], ["Jogger"])
+        self.assertEqual(suggestions["items"][0]["image_url"], "https://img/Jogger.jpg")
+        self.assertEqual(suggestions["terms"], ["jogger"])
+
+    def test_remove_drops_postings_and_trie_entries(self):
+        self.index.remove(str(self.jogger["_id"]))
+
+        self.assertEqual(self.index.search("jog"), [])
+        self.assertEqual(self.index.trie.complete("jo"), [])
+        self.assertNotIn(str(self.jogger["_id"]), self.index.search("noir "))
+
+    async def test_sync_reindexes_only_changed_products(self):
+        self.index.version = 4
+        renamed = {**self.tee, "full_name": "T-shirt Blanc", "variants": [{"color": "Blanc", "images": []}]}
+        loader = AsyncMock(return_value=[renamed])
+
+        with (
+            patch.object(search_index, "current_version", AsyncMock(return_value=5)),
+            patch.object(search_index, "changes_since", AsyncMock(return_value=(5, {str(self.tee["_id"]), "deleted-id"}))),
+            patch.object(product_crud, "list_products_for_search_index", loader),
+        ):
+            await self.index.sync(object())
+
+        loader.assert_awaited_once()
+        self.assertEqual(self.index.version, 5)
+        self.assertEqual(self.index.search("blanc"), [str(self.tee["_id"])])
+        self.assertNotIn(str(self.tee["_id"]), self.index.search("noir "))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import json
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+from fastapi import HTTPException
+
+from app.crud import header_video as header_video_crud
+from app.schemas.drop_countdown import DropCountdownOut
+from app.schemas.vlog import VlogSettingsOut
+from app.services.services_cms import drop_countdown_service, storefront_bootstrap, vlog_service
+
+
+class FakeSettings:
+    def __init__(self):
+        self.docs = {}
+        self.reads = 0
+
+    async def find_one(self, query):
+        self.reads += 1
+        return self.docs.get(query["_id"])
+
+    async def update_one(self, query, update, upsert=False):
+        self.docs.setdefault(query["_id"], {"_id": query["_id"]}).update(update["$set"])
+
+
+class StorefrontBootstrapUnitTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.settings = FakeSettings()
+        self.db = {storefront_bootstrap.SNAPSHOT_COLLECTION: self.settings}
+        self.version = 1
+        self.header = {"value": {"video": {"url": "https://ik/header.mp4"}}}
+        self.drop = AsyncMock(side_effect=HTTPException(404, "Aucun drop actif configure"))
+        self.vlog = AsyncMock(return_value=VlogSettingsOut())
+
+        async def bump(db, namespace):
+            self.version += 1
+            return self.version
+
+        storefront_bootstrap.forget_storefront_bootstrap()
+        self.addCleanup(storefront_bootstrap.forget_storefront_bootstrap)
+        for patcher in (
+            patch.object(storefront_bootstrap, "current_version", AsyncMock(side_effect=lambda db, ns: self.version)),
+            patch.object(storefront_bootstrap, "bump_version", AsyncMock(side_effect=bump)),
+            patch.object(header_video_crud, "find_header_video_doc", AsyncMock(side_effect=lambda db: self.header)),
+            patch.object(drop_countdown_service, "get_active_storefront_drop", self.drop),
+            patch.object(vlog_service, "settings_out", self.vlog),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def test_publish_then_reads_are_served_from_memory(self):
+        published = await storefront_bootstrap.publish_storefront_bootstrap(self.db)
+        first = await storefront_bootstrap.read_storefront_bootstrap(self.db)
+        second = await storefront_bootstrap.read_storefront_bootstrap(self.db)
+
+        self.assertIs(first, published.payload)
+        self.assertIs(second, first)
+        self.assertEqual(self.settings.reads, 0)
+        body = json.loads(first.body)
+        self.assertEqual(body["header_video"]["video"]["url"], "https://ik/header.mp4")
+        self.assertIsNone(body["drop"])
+        self.assertEqual(self.settings.docs["storefront_bootstrap"]["etag"], first.etag)
+
+    async def test_other_worker_loads_stored_snapshot_and_rebuilds_after_invalidation(self):
+        published = await storefront_bootstrap.publish_storefront_bootstrap(self.db)
+        storefront_bootstrap.forget_storefront_bootstrap()
+
+        loaded = await storefront_bootstrap.read_storefront_bootstrap(self.db)
+        self.assertEqual((loaded.body, loaded.etag), (published.payload.body, published.payload.etag))
+        self.vlog.assert_awaited_once()
+
+        self.header = None
+        await storefront_bootstrap.invalidate_storefront_bootstrap(self.db)
+        rebuilt = await storefront_bootstrap.read_storefront_bootstrap(self.db)
+
+        self.assertIsNone(json.loads(rebuilt.body)["header_video"])
+        self.assertNotEqual(rebuilt.etag, published.payload.etag)
+        self.assertEqual(self.settings.docs["storefront_bootstrap"]["version"], self.version)
+
+    async def test_snapshot_expires_at_drop_launch(self):
+        launch_at = datetime.utcnow() + timedelta(hours=1)
+        self.drop.side_effect = None
+        self.drop.return_value = DropCountdownOut(launch_at=launch_at, seconds_remaining=3600, is_released=False)
+
+        snapshot = await storefront_bootstrap.publish_storefront_bootstrap(self.db)
+
+        self.assertEqual(snapshot.expires_at, launch_at)
+        self.assertTrue(snapshot.fresh(self.version, launch_at - timedelta(seconds=1)))
+        self.assertFalse(snapshot.fresh(self.version, launch_at))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from bson import ObjectId
+
+from app.crud import vlog as vlog_crud
+from app.services.services_cms import vlog_service
+
+
+def make_chapter(order):
+    now = datetime(2026, 5, 1)
+    return {"_id": ObjectId(), "title": f"Chapitre {order}", "slug": f"chapitre-{order}", "order": order, "status": "active", "created_at": now, "updated_at": now}
+
+
+def make_episode(chapter, number, product_ids=(), likes=0, comments=0):
+    now = datetime(2026, 5, 1)
+    return {
+        "_id": ObjectId(),
+        "chapter_id": chapter["_id"],
+        "episode_number": number,
+        "title": f"Episode {number}",
+        "status": "released",
+        "linked_product_ids": list(product_ids),
+        "order": number,
+        "view_count": 7,
+        "like_count": likes,
+        "comment_count": comments,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+class VlogPageUnitTests(unittest.IsolatedAsyncioTestCase):
+    async def test_page_uses_one_query_per_kind(self):
+        product_id = str(ObjectId())
+        chapters = [make_chapter(1), make_chapter(2)]
+        episodes = [
+            make_episode(chapters[0], 1, [product_id], likes=3, comments=2),
+            make_episode(chapters[0], 2),
+            make_episode(chapters[1], 1, [product_id, str(ObjectId())]),
+        ]
+        list_episodes = AsyncMock(return_value=episodes)
+        liked = AsyncMock(return_value={episodes[2]["_id"]})
+        summaries = AsyncMock(return_value={product_id: {"id": product_id, "name": "Hoodie", "price": 120.0}})
+
+        with (
+            patch.object(vlog_crud, "list_episodes_for_chapters", list_episodes),
+            patch.object(vlog_crud, "list_liked_episode_ids", liked),
+            patch.object(vlog_service, "load_product_summaries", summaries),
+        ):
+            page = await vlog_service.chapters_with_episodes(object(), chapters, public_only=True, current_user={"_id": ObjectId()})
+
+        list_episodes.assert_awaited_once()
+        liked.assert_awaited_once()
+        summaries.assert_awaited_once()
+        self.assertEqual([len(chapter.episodes) for chapter in page], [2, 1])
+        first = page[0].episodes[0]
+        self.assertEqual((first.like_count, first.comment_count, first.view_count), (3, 2, 7))
+        self.assertEqual([product.name for product in first.products], ["Hoodie"])
+        self.assertEqual([episode.liked_by_current_user for chapter in page for episode in chapter.episodes], [False, False, True])
+
+    async def test_like_and_comment_writes_maintain_episode_counters(self):
+        episodes, likes, comments = MagicMock(), MagicMock(), MagicMock()
+        episodes.update_one = AsyncMock()
+        likes.update_one = AsyncMock(side_effect=[SimpleNamespace(upserted_id=ObjectId()), SimpleNamespace(upserted_id=None)])
+        comments.find_one_and_update = AsyncMock(return_value={"episode_id": "e1", "status": "visible"})
+        db = {vlog_crud.EPISODES_COLLECTION: episodes, vlog_crud.LIKES_COLLECTION: likes, vlog_crud.COMMENTS_COLLECTION: comments}
+
+        await vlog_crud.upsert_episode_like(db, "e1", "u1", datetime(2026, 5, 1))
+        await vlog_crud.upsert_episode_like(db, "e1", "u1", datetime(2026, 5, 1))
+        await vlog_crud.update_comment(db, "c1", {"status": "hidden"})
+        await vlog_crud.update_comment(db, "c1", {"content": "edit"})
+
+        self.assertEqual(
+            [call.args[1] for call in episodes.update_one.await_args_list],
+            [{"$inc": {"like_count": 1}}, {"$inc": {"comment_count": -1}}],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.crud import vlog as vlog_crud
+from app.services.services_store import vlog_view_counter
+from app.services.services_store.vlog_view_counter import EpisodeViewCounter
+
+
+class EpisodeViewCounterUnitTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        patcher = patch.object(vlog_view_counter, "invalidate_vlog", AsyncMock())
+        self.invalidate_vlog = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_views_are_counted_in_memory_and_flushed_in_one_bulk_write(self):
+        counter = EpisodeViewCounter()
+        episodes = MagicMock()
+        episodes.bulk_write = AsyncMock()
+        db = {vlog_crud.EPISODES_COLLECTION: episodes}
+
+        self.assertEqual([counter.record("e1", 10) for _ in range(3)], [11, 12, 13])
+        counter.record("e2")
+
+        self.assertEqual(await counter.flush(db), 4)
+        episodes.bulk_write.assert_awaited_once()
+        operations = episodes.bulk_write.await_args.args[0]
+        self.assertEqual([op._doc["$inc"] for op in operations], [{"view_count": 3}, {"view_count": 1}])
+        self.assertEqual(counter.pending("e1"), 0)
+        self.assertEqual(await counter.flush(db), 0)
+
+    async def test_flush_only_invalidates_vlog_cache_after_interval(self):
+        counter = EpisodeViewCounter()
+        with patch.object(vlog_crud, "increment_episode_view_counts", AsyncMock()):
+            counter.record("e1")
+            await counter.flush(object())
+            self.invalidate_vlog.assert_not_awaited()
+
+            counter._invalidated_at -= vlog_view_counter.VIEW_INVALIDATE_INTERVAL_SECONDS
+            counter.record("e1")
+            await counter.flush(object())
+            counter.record("e1")
+            await counter.flush(object())
+
+        self.invalidate_vlog.assert_awaited_once()
+
+    async def test_failed_flush_keeps_increments(self):
+        counter = EpisodeViewCounter()
+        counter.record("e1")
+        with patch.object(vlog_crud, "increment_episode_view_counts", AsyncMock(side_effect=RuntimeError("down"))):
+            with self.assertRaises(RuntimeError):
+                await counter.flush(object())
+        counter.record("e1")
+
+        self.assertEqual(counter.pending("e1"), 2)
+
+    async def test_cancelled_flush_keeps_increments(self):
+        counter = EpisodeViewCounter()
+        counter.record("e1")
+        counter.record("e1")
+        started = asyncio.Event()
+
+        async def slow_write(database, counts, now):
+            started.set()
+            await asyncio.sleep(10)
+
+        with patch.object(vlog_crud, "increment_episode_view_counts", slow_write):
+            task = asyncio.create_task(counter.flush(object()))
+            await started.wait()
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        self.assertEqual(counter.pending("e1"), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()